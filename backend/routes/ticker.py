@@ -1,31 +1,28 @@
 ﻿# backend/routes/ticker.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_login import login_required
 import json
 
+from slms.services.db import get_db
+from slms.services.score_ticker import refresh_ticker, ticker_snapshot
+
 bp = Blueprint("ticker", __name__, url_prefix="/api/ticker")
 
-def q1(sql, params=()):
-    return current_app.db.fetch_one(sql, params)  # adapt to your db wrapper
-def qn(sql, params=()):
-    return current_app.db.fetch_all(sql, params)
 def execsql(sql, params=()):
-    return current_app.db.execute(sql, params)
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    conn.commit()
 
 @bp.get("/<league_id>")
 def get_public(league_id):
-    settings = q1("SELECT enabled, theme FROM ticker_settings WHERE league_id=%s", (league_id,))
-    if not settings or not settings["enabled"]:
-        return jsonify({"enabled": False, "items": []})
-    items = qn("""
-        SELECT id, status, start_time, home_name, away_name, home_score, away_score,
-               home_logo, away_logo, venue, link_url
-        FROM ticker_items
-        WHERE league_id=%s
-        ORDER BY sort_key DESC, id DESC
-        LIMIT 100
-    """, (league_id,))
-    return jsonify({"enabled": True, "theme": settings["theme"], "items": items})
+    # One snapshot read per poll; game events and admin edits rebuild it
+    snapshot = ticker_snapshot(league_id)
+    response = current_app.response_class(snapshot["body"], mimetype="application/json")
+    response.set_etag(f"{league_id}:{snapshot['version']}", weak=True)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @bp.put("/admin/<league_id>/settings")
 @login_required
@@ -43,6 +40,7 @@ def put_settings(league_id):
             source=COALESCE(EXCLUDED.source, ticker_settings.source),
             updated_at=NOW()
     """, (league_id, enabled, json.dumps(theme), json.dumps(source) if source is not None else None))
+    refresh_ticker(league_id)
     return jsonify({"ok": True})
 
 @bp.post("/admin/<league_id>/items")
@@ -56,10 +54,12 @@ def post_item(league_id):
       (league_id, b.get("start_time"), b.get("status",'SCHEDULED'),
        b["home_name"], b["away_name"], b.get("home_score"), b.get("away_score"),
        b.get("home_logo"), b.get("away_logo"), b.get("venue"), b.get("link_url"), b.get("sort_key")))
+    refresh_ticker(league_id)
     return jsonify({"ok": True})
 
 @bp.delete("/admin/<league_id>/items/<int:item_id>")
 @login_required
 def delete_item(league_id, item_id):
     execsql("DELETE FROM ticker_items WHERE id=%s AND league_id=%s", (item_id, league_id))
+    refresh_ticker(league_id)
     return jsonify({"ok": True})
@@ -0,0 +1,21 @@
+"""Gunicorn settings for the SLMS web container.
+
+Threaded workers keep a few slow admin requests (AI calls, webhook tests,
+SMTP) from stalling the rest of the site: each worker serves
+``GUNICORN_THREADS`` requests at once, while the outbound pool in
+``slms.services.outbound`` caps how many of those may wait on third parties.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+# Above OUTBOUND_IO_TIMEOUT so slow outbound calls answer 504 instead of killing the worker
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+accesslog = '-'
+errorlog = '-'
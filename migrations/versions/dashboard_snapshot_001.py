@@ -0,0 +1,37 @@
+"""add dashboard snapshot table
+
+Revision ID: dashboard_snapshot_001
+Revises: org_counters_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dashboard_snapshot_001'
+down_revision = 'org_counters_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'dashboard_snapshot' not in inspector.get_table_names():
+        op.create_table(
+            'dashboard_snapshot',
+            sa.Column('id', sa.String(length=36), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('key', sa.String(length=128), nullable=False),
+            sa.Column('payload', sa.JSON(), nullable=True),
+            sa.Column('computed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('key'),
+        )
+
+
+def downgrade():
+    op.drop_table('dashboard_snapshot')
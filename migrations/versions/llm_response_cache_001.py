@@ -0,0 +1,40 @@
+"""add llm response cache table
+
+Revision ID: llm_response_cache_001
+Revises: dashboard_snapshot_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'llm_response_cache_001'
+down_revision = 'dashboard_snapshot_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'llm_response_cache' not in inspector.get_table_names():
+        op.create_table(
+            'llm_response_cache',
+            sa.Column('id', sa.String(length=36), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('key', sa.String(length=64), nullable=False),
+            sa.Column('model', sa.String(length=64), nullable=False),
+            sa.Column('response', sa.Text(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('key'),
+        )
+        op.create_index('ix_llm_response_cache_expires_at', 'llm_response_cache', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_llm_response_cache_expires_at', table_name='llm_response_cache')
+    op.drop_table('llm_response_cache')
@@ -0,0 +1,39 @@
+"""add image rendition columns to media_asset
+
+Revision ID: media_renditions_001
+Revises: storage_blob_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'media_renditions_001'
+down_revision = 'storage_blob_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    cols = {c['name'] for c in inspector.get_columns('media_asset')}
+    json_type = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+    if 'width' not in cols:
+        op.add_column('media_asset', sa.Column('width', sa.Integer(), nullable=True))
+    if 'height' not in cols:
+        op.add_column('media_asset', sa.Column('height', sa.Integer(), nullable=True))
+    if 'renditions' not in cols:
+        op.add_column('media_asset', sa.Column('renditions', json_type, nullable=True))
+    if 'derivatives_status' not in cols:
+        op.add_column('media_asset', sa.Column('derivatives_status', sa.String(length=16), nullable=True))
+
+
+def downgrade():
+    op.drop_column('media_asset', 'derivatives_status')
+    op.drop_column('media_asset', 'renditions')
+    op.drop_column('media_asset', 'height')
+    op.drop_column('media_asset', 'width')
@@ -0,0 +1,96 @@
+"""add denormalized organization counters
+
+Revision ID: org_counters_001
+Revises: org_normalization_001
+Create Date: 2026-10-18
+
+"""
+import uuid
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'org_counters_001'
+down_revision = 'org_normalization_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'org_counter' not in inspector.get_table_names():
+        op.create_table(
+            'org_counter',
+            sa.Column('id', sa.String(length=36), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('org_id', sa.String(length=36), nullable=False),
+            sa.Column('leagues', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('seasons', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('active_seasons', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('teams', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('players', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('games', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('reconciled_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['org_id'], ['organization.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('org_id'),
+        )
+
+    _backfill_counters(bind)
+
+
+_COUNTED_TABLES = (
+    ('leagues', 'league', ''),
+    ('seasons', 'season', ''),
+    ('active_seasons', 'season', 'WHERE is_active = TRUE'),
+    ('teams', 'team', ''),
+    ('players', 'player', ''),
+    ('games', 'game', ''),
+)
+
+
+def _backfill_counters(bind):
+    """Create a counter row for every organization that does not have one yet."""
+    existing = {row[0] for row in bind.execute(sa.text('SELECT org_id FROM org_counter'))}
+    org_ids = [
+        row[0] for row in bind.execute(sa.text('SELECT id FROM organization'))
+        if row[0] not in existing
+    ]
+    if not org_ids:
+        return
+
+    counts = {org_id: {} for org_id in org_ids}
+    for field, table, where in _COUNTED_TABLES:
+        rows = bind.execute(
+            sa.text(f'SELECT org_id, COUNT(*) FROM {table} {where} GROUP BY org_id')
+        )
+        for org_id, total in rows:
+            if org_id in counts:
+                counts[org_id][field] = total
+
+    counter_table = sa.table(
+        'org_counter',
+        sa.column('id', sa.String),
+        sa.column('org_id', sa.String),
+        *(sa.column(field, sa.Integer) for field, _, _ in _COUNTED_TABLES),
+        sa.column('reconciled_at', sa.DateTime(timezone=True)),
+    )
+    now = datetime.now(timezone.utc)
+    op.bulk_insert(counter_table, [
+        {
+            'id': str(uuid.uuid4()),
+            'org_id': org_id,
+            **{field: org_counts.get(field, 0) for field, _, _ in _COUNTED_TABLES},
+            'reconciled_at': now,
+        }
+        for org_id, org_counts in counts.items()
+    ])
+
+
+def downgrade():
+    op.drop_table('org_counter')
@@ -0,0 +1,46 @@
+"""add content-addressed storage blob table
+
+Revision ID: storage_blob_001
+Revises: llm_response_cache_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'storage_blob_001'
+down_revision = 'llm_response_cache_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'storage_blob' not in inspector.get_table_names():
+        op.create_table(
+            'storage_blob',
+            sa.Column('id', sa.String(length=36), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('org_id', sa.String(length=36), nullable=True),
+            sa.Column('root', sa.String(length=16), nullable=False),
+            sa.Column('path', sa.String(length=512), nullable=False),
+            sa.Column('sha256', sa.String(length=64), nullable=False),
+            sa.Column('size', sa.Integer(), nullable=False),
+            sa.Column('mime_type', sa.String(length=128), nullable=True),
+            sa.Column('ref_count', sa.Integer(), nullable=False, server_default='1'),
+            sa.ForeignKeyConstraint(['org_id'], ['organization.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('root', 'path', name='uq_storage_blob_root_path'),
+        )
+        op.create_index('ix_storage_blob_org_id', 'storage_blob', ['org_id'])
+        op.create_index('ix_storage_blob_org_sha', 'storage_blob', ['org_id', 'sha256'])
+
+
+def downgrade():
+    op.drop_index('ix_storage_blob_org_sha', table_name='storage_blob')
+    op.drop_index('ix_storage_blob_org_id', table_name='storage_blob')
+    op.drop_table('storage_blob')
@@ -0,0 +1,37 @@
+"""add mtime and listing index to storage_blob
+
+Revision ID: storage_manifest_001
+Revises: media_renditions_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'storage_manifest_001'
+down_revision = 'media_renditions_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    cols = {c['name'] for c in inspector.get_columns('storage_blob')}
+    if 'mtime' not in cols:
+        op.add_column(
+            'storage_blob',
+            sa.Column('mtime', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        )
+        op.execute('UPDATE storage_blob SET mtime = created_at')
+
+    idxs = {i['name'] for i in inspector.get_indexes('storage_blob')}
+    if 'ix_storage_blob_org_root_mtime' not in idxs:
+        op.create_index('ix_storage_blob_org_root_mtime', 'storage_blob', ['org_id', 'root', 'mtime'])
+
+
+def downgrade():
+    op.drop_index('ix_storage_blob_org_root_mtime', table_name='storage_blob')
+    op.drop_column('storage_blob', 'mtime')
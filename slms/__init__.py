@@ -24,7 +24,16 @@ from slms.extensions import (
 )
 from slms.models import User
 from slms.blueprints.common.tenant import init_tenant
+from slms.services.conditional import init_conditional_get
 from slms.services.db import close_db, ensure_minimum_schema, ensure_core_tables
+from slms.services.file_serving import init_upload_serving
+from slms.services.media_derivatives import init_media_derivatives
+from slms.services.page_cache import init_page_cache
+from slms.services.query_profiler import init_query_profiler
+from slms.services.replicas import init_replica_routing
+from slms.services.score_ticker import init_score_ticker
+from slms.services.startup_profile import startup_span
+from slms.services.theme_bundles import init_theme_bundles
 from slms.security.config import (
     configure_security_headers,
     configure_secure_session,
@@ -39,27 +48,37 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
 
     # Initialize Flask extensions
-    db.init_app(app)
-    migrate.init_app(app, db)
-    login_manager.init_app(app)
-    login_manager.login_view = "auth.login"
-    csrf.init_app(app)
-    limiter.init_app(app)
-    init_tenant(app)
+    with startup_span('extensions'):
+        init_replica_routing(app)
+        db.init_app(app)
+        migrate.init_app(app, db)
+        login_manager.init_app(app)
+        login_manager.login_view = "auth.login"
+        csrf.init_app(app)
+        limiter.init_app(app)
+        init_query_profiler(app)
+        init_tenant(app)
+        init_page_cache(app)
+        init_conditional_get(app)
+        init_score_ticker(app)
 
     # Safety nets for development environments without migrations
     if os.getenv('SLMS_SKIP_BOOTSTRAP', '0') != '1':
-        try:
-            with app.app_context():
-                ensure_core_tables()
-                ensure_minimum_schema()
-        except Exception:
-            pass
+        with startup_span('bootstrap'):
+            try:
+                with app.app_context():
+                    with startup_span('ensure_core_tables'):
+                        ensure_core_tables()
+                    with startup_span('ensure_minimum_schema'):
+                        ensure_minimum_schema()
+            except Exception:
+                pass
 
     # Configure security
-    configure_security_headers(app)
-    configure_secure_session(app)
-    validate_input_length(app)
+    with startup_span('security'):
+        configure_security_headers(app)
+        configure_secure_session(app)
+        validate_input_length(app)
 
     @login_manager.user_loader
     def load_user(user_id: str):
@@ -71,6 +90,8 @@ def create_app(config_class=Config):
 
     # Ensure models are registered for migrations
     import slms.models  # noqa: F401
+    # Register org counter maintenance hooks
+    import slms.services.org_counters  # noqa: F401
 
     # Enable live reload and disable caching in development
     if os.getenv("FLASK_ENV") == "development":
@@ -79,18 +100,22 @@ def create_app(config_class=Config):
         app.jinja_env.auto_reload = True
 
     # Register blueprints
-    app.register_blueprint(auth_bp, url_prefix='/auth')
-    app.register_blueprint(org_admin_bp, url_prefix='/org')
-    app.register_blueprint(admin_bp, url_prefix='/admin')
-    app.register_blueprint(schedule_mgmt_bp)  # Schedule management routes
-    app.register_blueprint(league_mgmt_bp)  # League lifecycle management routes
-    app.register_blueprint(live_scoring_bp)  # Live scoring console routes
-    app.register_blueprint(content_mgmt_bp)  # Content management routes
-    app.register_blueprint(registration_admin_bp)  # Registration admin routes
-    app.register_blueprint(portal_bp)  # Portal routes at root
-    app.register_blueprint(registration_bp)  # Registration routes at root
-    app.register_blueprint(public_bp)
-    app.register_blueprint(api_bp, url_prefix='/api/v1')
+    with startup_span('blueprints'):
+        app.register_blueprint(auth_bp, url_prefix='/auth')
+        app.register_blueprint(org_admin_bp, url_prefix='/org')
+        app.register_blueprint(admin_bp, url_prefix='/admin')
+        app.register_blueprint(schedule_mgmt_bp)  # Schedule management routes
+        app.register_blueprint(league_mgmt_bp)  # League lifecycle management routes
+        app.register_blueprint(live_scoring_bp)  # Live scoring console routes
+        app.register_blueprint(content_mgmt_bp)  # Content management routes
+        app.register_blueprint(registration_admin_bp)  # Registration admin routes
+        app.register_blueprint(portal_bp)  # Portal routes at root
+        app.register_blueprint(registration_bp)  # Registration routes at root
+        app.register_blueprint(public_bp)
+        app.register_blueprint(api_bp, url_prefix='/api/v1')
+        init_upload_serving(app)  # /static/uploads with immutable caching and proxy offload
+        init_theme_bundles(app)  # /static/themes compiled theme stylesheets
+        init_media_derivatives(app)  # media_srcset/media_thumbnail_url template globals
 
     @app.teardown_appcontext
     def teardown_db(exception):
@@ -102,15 +127,17 @@ def create_app(config_class=Config):
 
     # Site settings and branding processors (can be skipped for CLI/migrations)
     if os.getenv('SLMS_SKIP_SITE', '0') != '1':
-        from slms.services.site import inject_site_settings
-        app.context_processor(inject_site_settings)
+        with startup_span('context_processors'):
+            from slms.services.site import inject_site_settings
+            app.context_processor(inject_site_settings)
 
-        from slms.services.branding import inject_branding_context
-        app.context_processor(inject_branding_context)
+            from slms.services.branding import inject_branding_context
+            app.context_processor(inject_branding_context)
 
     # Register CLI commands
-    from slms.commands import register_commands
-    register_commands(app)
+    with startup_span('commands'):
+        from slms.commands import register_commands
+        register_commands(app)
 
     return app
 
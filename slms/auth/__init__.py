@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import inspect
 from functools import wraps
 from typing import Callable, TypeVar, cast
 
@@ -24,18 +25,39 @@ def login_required_with_message(func: F) -> F:
     return cast(F, wrapper)
 
 
+def _admin_denied():
+    """Return a redirect if the current user is not an admin/owner, else None."""
+    if not current_user.is_authenticated:
+        flash('Please log in to access this page', 'warning')
+        return redirect(url_for('auth.login', next=request.url))
+
+    if not current_user.has_role(UserRole.OWNER, UserRole.ADMIN):
+        flash('You need administrator privileges to access this page', 'error')
+        return redirect(url_for('public.home', org=session.get('org_slug')))
+
+    return None
+
+
 def admin_required(func: F) -> F:
-    """Decorator to ensure the current user has admin/owner privileges."""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        if not current_user.is_authenticated:
-            flash('Please log in to access this page', 'warning')
-            return redirect(url_for('auth.login', next=request.url))
+    """Decorator to ensure the current user has admin/owner privileges.
 
-        if not current_user.has_role(UserRole.OWNER, UserRole.ADMIN):
-            flash('You need administrator privileges to access this page', 'error')
-            return redirect(url_for('public.home', org=session.get('org_slug')))
+    Works for both regular and ``async def`` views.
+    """
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            denied = _admin_denied()
+            if denied is not None:
+                return denied
+            return await func(*args, **kwargs)
 
+        return cast(F, async_wrapper)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        denied = _admin_denied()
+        if denied is not None:
+            return denied
         return func(*args, **kwargs)
 
     return cast(F, wrapper)
@@ -1,6 +1,7 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, g, jsonify, Response, make_response
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, g, jsonify, Response, make_response, current_app
 from datetime import datetime, date, timedelta, timezone
 from decimal import Decimal, InvalidOperation
+import asyncio
 import copy
 import json
 import random
@@ -28,6 +29,7 @@ from slms.services.site import (
     list_site_theme_versions,
     get_site_theme_version,
     apply_site_payload,
+    refresh_theme_bundle,
     _apply_payload_to_settings,
     default_cta_slots,
     merge_theme_cta_slots,
@@ -40,14 +42,30 @@ from slms.services.site import (
 )
 from slms.services.ai_finance import (
     categorize_expense,
+    categorize_expenses_batch,
     detect_expense_anomalies,
     suggest_vendor_info,
     generate_budget_insights,
-    search_expenses_natural_language,
     generate_news_article,
     generate_match_recap,
     generate_waiver
 )
+from slms.services.dashboard_insights import get_league_insights
+from slms.services.expense_anomaly import get_expense_anomaly_detector
+from slms.services.expense_search import get_expense_search_registry, search_expenses
+from slms.services.outbound import OutboundBusy, run_outbound
+from slms.services.query_profiler import get_query_profiler
+from slms.services.finance_rollups import (
+    EXPENSE_LEDGER,
+    IN_PERSON_LEDGER,
+    REVENUE_LEDGER,
+    ensure_finance_rollup_tables,
+    fetch_expense_page,
+    fetch_revenue_page,
+    get_finance_rollups,
+    iter_ledger_rows,
+    record_finance_entry,
+)
 from slms.services.media_library import (
     create_media_asset,
     update_media_asset,
@@ -69,8 +87,6 @@ def _default_homepage_config():
     }
 
 
-AVERAGE_MATCH_REVENUE_USD = 7500  # fallback estimate when transaction data is unavailable
-
 ICON_PICKER_CHOICES = {
     "Sports": [
         {"value": "ph ph-football", "label": "Football"},
@@ -348,26 +364,6 @@ def get_existing_data(table_name):
     return data
 
 
-def _calc_metric(current_value, previous_value):
-    current = current_value or 0
-    previous = previous_value or 0
-    delta = current - previous
-    delta_pct = (delta / previous * 100) if previous else None
-    return {
-        'current': current,
-        'previous': previous,
-        'delta': delta,
-        'delta_pct': delta_pct,
-    }
-
-
-def _execute_scalar(cur, query, params=None):
-    cur.execute(query, params or ())
-    row = cur.fetchone()
-    return row[0] if row and row[0] is not None else 0
-
-
-
 def _parse_amount_to_cents(value):
     if value is None:
         return None
@@ -527,6 +523,9 @@ def _ensure_finance_hub_tables(db_wrapper):
         cur.execute("CREATE INDEX IF NOT EXISTS idx_league_expenses_date ON league_expenses(expense_date)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_league_expenses_category ON league_expenses(category)")
 
+        # Monthly/category summary rows read by the hub instead of full-ledger aggregates
+        ensure_finance_rollup_tables(cur)
+
         db_wrapper.commit()
     except Exception:
         db_wrapper.rollback()
@@ -562,8 +561,48 @@ def _ensure_scorer_metrics_table(db_wrapper):
         pass
 
 
-def _get_comprehensive_finance_data(db, league_id_int):
-    """Get all financial data for the finance hub"""
+def _format_revenue_row(row):
+    _revenue_id, trans_date, revenue_type, amount_cents, description, payment_method = row
+    return {
+        'type': revenue_type,
+        'amount_display': _format_cents_to_decimal(amount_cents),
+        'date': _format_ledger_date(trans_date),
+        'description': description or '',
+        'payment_method': payment_method or ''
+    }
+
+
+def _format_expense_row(row):
+    expense_id, exp_date, amount_cents, category, vendor, desc, payment_method, ref_num, tax_ded = row
+    return {
+        'expense_id': expense_id,
+        'date': _format_ledger_date(exp_date),
+        'amount_cents': amount_cents,
+        'amount_display': _format_cents_to_decimal(amount_cents),
+        'category': category,
+        'vendor': vendor or '',
+        'description': desc,
+        'payment_method': payment_method or '',
+        'reference_number': ref_num or '',
+        'tax_deductible': tax_ded
+    }
+
+
+def _format_ledger_date(value):
+    if not value:
+        return ''
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+
+def _get_comprehensive_finance_data(db, league_id_int, expenses_cursor=None, transactions_cursor=None):
+    """Get all financial data for the finance hub.
+
+    Totals and breakdowns come from the pre-aggregated ledger rollups; the
+    expense and transaction lists are single keyset pages starting after
+    the given cursors.
+    """
     if not league_id_int:
         return {
             'total_revenue': {'amount': 0, 'display': '$0.00'},
@@ -571,8 +610,11 @@ def _get_comprehensive_finance_data(db, league_id_int):
             'net_profit': {'amount': 0, 'display': '$0.00', 'is_positive': True},
             'revenue_breakdown': {},
             'expense_breakdown': {},
+            'monthly_summary': [],
             'expenses': [],
+            'expenses_next_cursor': None,
             'recent_transactions': [],
+            'transactions_next_cursor': None,
             'budget_vs_actual': [],
             'sponsor_revenue': {'amount': 0, 'display': '$0.00'},
             'fee_revenue': {'amount': 0, 'display': '$0.00'},
@@ -582,50 +624,45 @@ def _get_comprehensive_finance_data(db, league_id_int):
             'teams': []
         }
 
-    cur = db.cursor()
-    try:
-        # Get total revenue by type
-        cur.execute("""
-            SELECT revenue_type,
-                   COALESCE(SUM(amount_cents), 0) as total_cents,
-                   COUNT(*) as transaction_count
-            FROM league_revenue
-            WHERE league_id = %s AND status = 'confirmed'
-            GROUP BY revenue_type
-            ORDER BY total_cents DESC
-        """, (league_id_int,))
+    rollups = get_finance_rollups(db, league_id_int)
 
-        revenue_breakdown = {}
-        total_revenue_cents = 0
+    revenue_breakdown = {
+        revenue_type: {
+            'amount_cents': amount_cents,
+            'amount_display': _format_cents_to_decimal(amount_cents),
+            'transaction_count': count
+        }
+        for revenue_type, (amount_cents, count) in rollups['by_category'][REVENUE_LEDGER].items()
+    }
+    expense_breakdown = {
+        category: {
+            'amount_cents': amount_cents,
+            'amount_display': _format_cents_to_decimal(amount_cents),
+            'count': count
+        }
+        for category, (amount_cents, count) in rollups['by_category'][EXPENSE_LEDGER].items()
+    }
+    total_revenue_cents = rollups['totals'][REVENUE_LEDGER]
+    total_expenses_cents = rollups['totals'][EXPENSE_LEDGER]
+    in_person_revenue_cents = rollups['totals'][IN_PERSON_LEDGER]
 
-        for row in cur.fetchall():
-            revenue_type, amount_cents, count = row
-            revenue_breakdown[revenue_type] = {
-                'amount_cents': amount_cents,
-                'amount_display': _format_cents_to_decimal(amount_cents),
-                'transaction_count': count
-            }
-            total_revenue_cents += amount_cents
+    monthly_summary = [
+        {
+            'period': month['period'],
+            'revenue_display': _format_cents_to_decimal(month['revenue_cents']),
+            'expense_display': _format_cents_to_decimal(month['expense_cents']),
+            'net_cents': month['revenue_cents'] - month['expense_cents'],
+            'net_display': _format_cents_to_decimal(month['revenue_cents'] - month['expense_cents']),
+        }
+        for month in rollups['monthly'][:12]
+    ]
 
-        # Get recent transactions
-        cur.execute("""
-            SELECT revenue_type, amount_cents, transaction_date, description, payment_method
-            FROM league_revenue
-            WHERE league_id = %s
-            ORDER BY transaction_date DESC, created_at DESC
-            LIMIT 10
-        """, (league_id_int,))
-
-        recent_transactions = []
-        for row in cur.fetchall():
-            revenue_type, amount_cents, trans_date, description, payment_method = row
-            recent_transactions.append({
-                'type': revenue_type,
-                'amount_display': _format_cents_to_decimal(amount_cents),
-                'date': trans_date.strftime('%Y-%m-%d') if trans_date else '',
-                'description': description or '',
-                'payment_method': payment_method or ''
-            })
+    cur = db.cursor()
+    try:
+        revenue_rows, transactions_next_cursor = fetch_revenue_page(
+            cur, league_id_int, transactions_cursor
+        )
+        recent_transactions = [_format_revenue_row(row) for row in revenue_rows]
 
         # Get sponsor revenue data (all active deals since sponsors aren't league-specific in current schema)
         cur.execute("""
@@ -663,64 +700,12 @@ def _get_comprehensive_finance_data(db, league_id_int):
                 if status == 'paid':
                     fee_revenue_cents += amount_cents or 0
 
-        # Get in-person payments
-        cur.execute("""
-            SELECT COALESCE(SUM(amount_cents), 0)
-            FROM in_person_payments
-            WHERE league_id = %s
-        """, (league_id_int,))
-
-        in_person_revenue_cents = cur.fetchone()[0] or 0
-
         # Get teams for the league
         cur.execute('SELECT team_id, name FROM teams WHERE league_id = %s ORDER BY name', (league_id_int,))
         teams = [{'team_id': row[0], 'name': row[1]} for row in cur.fetchall()]
 
-        # Get expense data
-        cur.execute("""
-            SELECT expense_id, expense_date, amount_cents, category, vendor_name,
-                   description, payment_method, reference_number, tax_deductible
-            FROM league_expenses
-            WHERE league_id = %s
-            ORDER BY expense_date DESC
-            LIMIT 50
-        """, (league_id_int,))
-
-        expenses = []
-        total_expenses_cents = 0
-        for row in cur.fetchall():
-            expense_id, exp_date, amount_cents, category, vendor, desc, payment_method, ref_num, tax_ded = row
-            expenses.append({
-                'expense_id': expense_id,
-                'date': exp_date.strftime('%Y-%m-%d') if exp_date else '',
-                'amount_cents': amount_cents,
-                'amount_display': _format_cents_to_decimal(amount_cents),
-                'category': category,
-                'vendor': vendor or '',
-                'description': desc,
-                'payment_method': payment_method or '',
-                'reference_number': ref_num or '',
-                'tax_deductible': tax_ded
-            })
-            total_expenses_cents += amount_cents
-
-        # Get expense breakdown by category
-        cur.execute("""
-            SELECT category, COALESCE(SUM(amount_cents), 0) as total_cents, COUNT(*) as count
-            FROM league_expenses
-            WHERE league_id = %s
-            GROUP BY category
-            ORDER BY total_cents DESC
-        """, (league_id_int,))
-
-        expense_breakdown = {}
-        for row in cur.fetchall():
-            category, amount_cents, count = row
-            expense_breakdown[category] = {
-                'amount_cents': amount_cents,
-                'amount_display': _format_cents_to_decimal(amount_cents),
-                'count': count
-            }
+        expense_rows, expenses_next_cursor = fetch_expense_page(cur, league_id_int, expenses_cursor)
+        expenses = [_format_expense_row(row) for row in expense_rows]
 
         # Calculate net profit/loss
         net_profit_cents = total_revenue_cents - total_expenses_cents
@@ -741,8 +726,11 @@ def _get_comprehensive_finance_data(db, league_id_int):
             },
             'revenue_breakdown': revenue_breakdown,
             'expense_breakdown': expense_breakdown,
+            'monthly_summary': monthly_summary,
             'expenses': expenses,
+            'expenses_next_cursor': expenses_next_cursor,
             'recent_transactions': recent_transactions,
+            'transactions_next_cursor': transactions_next_cursor,
             'sponsor_revenue': {
                 'amount': sponsor_revenue_cents,
                 'display': f'${_format_cents_to_decimal(sponsor_revenue_cents)}'
@@ -811,6 +799,11 @@ def _handle_add_in_person_payment(db):
                 payment_method, 'confirmed', current_user.id
             ))
 
+            record_finance_entry(cur, league_id, IN_PERSON_LEDGER, payment_date,
+                                 payment_method, amount_cents)
+            record_finance_entry(cur, league_id, REVENUE_LEDGER, payment_date,
+                                 'in_person', amount_cents)
+
             db.commit()
             flash('In-person payment recorded successfully.', 'success')
 
@@ -852,8 +845,35 @@ def _handle_legacy_fee_actions(db):
                            league_id=request.form.get('league_id')))
 
 
+ANOMALY_PRIME_LIMIT = 500
+
+
+def _load_expense_history(cur, league_id, limit):
+    """Return a league's most recent expenses, oldest first."""
+    cur.execute("""
+        SELECT expense_date, amount_cents, category, vendor_name, description
+        FROM league_expenses
+        WHERE league_id = %s
+        ORDER BY expense_date DESC, expense_id DESC
+        LIMIT %s
+    """, (league_id, limit))
+
+    history = []
+    for row in cur.fetchall():
+        exp_date, amt, cat, vendor, desc = row
+        history.append({
+            'date': _format_ledger_date(exp_date),
+            'amount_cents': amt,
+            'category': cat,
+            'vendor': vendor,
+            'description': desc
+        })
+    history.reverse()
+    return history
+
+
 def _handle_add_expense(db):
-    """Handle adding a new expense with optional AI anomaly detection"""
+    """Handle adding a new expense with local (and optional AI) anomaly detection"""
     try:
         league_id = int(request.form.get('league_id'))
         amount_cents = _parse_amount_to_cents(request.form.get('amount'))
@@ -872,35 +892,25 @@ def _handle_add_expense(db):
 
         cur = db.cursor()
         try:
-            # Get historical expenses for anomaly detection
-            cur.execute("""
-                SELECT expense_date, amount_cents, category, vendor_name, description
-                FROM league_expenses
-                WHERE league_id = %s
-                ORDER BY expense_date DESC
-                LIMIT 50
-            """, (league_id,))
-
-            historical_expenses = []
-            for row in cur.fetchall():
-                exp_date, amt, cat, vendor, desc = row
-                historical_expenses.append({
-                    'date': exp_date.strftime('%Y-%m-%d') if exp_date else '',
-                    'amount_cents': amt,
-                    'category': cat,
-                    'vendor': vendor,
-                    'description': desc
-                })
-
-            # Check for anomalies using AI
             new_expense_data = {
+                'date': expense_date,
                 'amount_cents': amount_cents,
                 'category': category,
                 'description': description,
                 'vendor': vendor_name
             }
 
-            anomaly_result = detect_expense_anomalies(historical_expenses, new_expense_data)
+            # Score locally; the LLM review only runs when explicitly requested
+            detector = get_expense_anomaly_detector()
+            if not detector.is_primed(league_id):
+                detector.prime(league_id, _load_expense_history(cur, league_id, ANOMALY_PRIME_LIMIT))
+            anomaly_result = detector.score(league_id, new_expense_data)
+
+            if request.form.get('ai_anomaly_review') == 'on':
+                historical_expenses = _load_expense_history(cur, league_id, 50)
+                ai_result = detect_expense_anomalies(historical_expenses, new_expense_data)
+                if ai_result.get('anomaly_score', 0) > anomaly_result['anomaly_score']:
+                    anomaly_result = ai_result
 
             # Insert expense
             cur.execute("""
@@ -924,7 +934,11 @@ def _handle_add_expense(db):
                 current_user.id
             ))
 
+            record_finance_entry(cur, league_id, EXPENSE_LEDGER, expense_date,
+                                 category, amount_cents)
+
             db.commit()
+            detector.observe(league_id, new_expense_data)
 
             # Show anomaly warning if detected
             if anomaly_result.get('is_anomaly') and anomaly_result.get('anomaly_score', 0) > 0.7:
@@ -954,8 +968,20 @@ def _handle_delete_expense(db):
 
         cur = db.cursor()
         try:
+            cur.execute(
+                'SELECT league_id, expense_date, category, amount_cents FROM league_expenses WHERE expense_id = %s',
+                (expense_id,)
+            )
+            existing = cur.fetchone()
             cur.execute('DELETE FROM league_expenses WHERE expense_id = %s', (expense_id,))
+            if existing:
+                expense_league_id, expense_date, category, amount_cents = existing
+                record_finance_entry(cur, expense_league_id, EXPENSE_LEDGER, expense_date,
+                                     category, -(amount_cents or 0), count=-1)
             db.commit()
+            if existing:
+                get_expense_anomaly_detector().invalidate(existing[0])
+                get_expense_search_registry().remove(existing[0], [expense_id])
             flash('Expense deleted successfully.', 'success')
         except Exception as e:
             db.rollback()
@@ -1210,211 +1236,11 @@ def _persist_navigation_settings(layout: str, links: list[dict]):
     finally:
         cur.close()
     invalidate_site_settings_cache()
-def _build_league_insights():
-    db = get_db()
-    cur = db.cursor()
-    try:
-        current_year = datetime.now(timezone.utc).year
-        previous_year = current_year - 1
-
-        teams_current = _execute_scalar(
-            cur,
-            """
-            SELECT COUNT(DISTINCT team_id)
-            FROM (
-                SELECT home_team_id AS team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-                UNION
-                SELECT away_team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-            ) AS teams_year
-            """,
-            (current_year, current_year),
-        )
-        teams_previous = _execute_scalar(
-            cur,
-            """
-            SELECT COUNT(DISTINCT team_id)
-            FROM (
-                SELECT home_team_id AS team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-                UNION
-                SELECT away_team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-            ) AS teams_year
-            """,
-            (previous_year, previous_year),
-        )
-
-        players_current = _execute_scalar(
-            cur,
-            """
-            SELECT COUNT(DISTINCT p.player_id)
-            FROM players p
-            WHERE p.team_id IN (
-                SELECT team_id FROM (
-                    SELECT home_team_id AS team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-                    UNION
-                    SELECT away_team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-                ) AS teams_year
-            )
-            """,
-            (current_year, current_year),
-        )
-        players_previous = _execute_scalar(
-            cur,
-            """
-            SELECT COUNT(DISTINCT p.player_id)
-            FROM players p
-            WHERE p.team_id IN (
-                SELECT team_id FROM (
-                    SELECT home_team_id AS team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-                    UNION
-                    SELECT away_team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-                ) AS teams_year
-            )
-            """,
-            (previous_year, previous_year),
-        )
-
-        matches_current = _execute_scalar(
-            cur,
-            "SELECT COUNT(*) FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s",
-            (current_year,),
-        )
-        matches_previous = _execute_scalar(
-            cur,
-            "SELECT COUNT(*) FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s",
-            (previous_year,),
-        )
-        matches_completed_current = _execute_scalar(
-            cur,
-            "SELECT COUNT(*) FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s AND winner IS NOT NULL",
-            (current_year,),
-        )
-        matches_completed_previous = _execute_scalar(
-            cur,
-            "SELECT COUNT(*) FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s AND winner IS NOT NULL",
-            (previous_year,),
-        )
-
-        revenue_current_cents = int(matches_current * AVERAGE_MATCH_REVENUE_USD * 100)
-        revenue_previous_cents = int(matches_previous * AVERAGE_MATCH_REVENUE_USD * 100)
-
-        average_team_size = (players_current / teams_current) if teams_current else None
-
-        conversion_rate = (
-            (matches_completed_current / matches_current) * 100
-            if matches_current
-            else None
-        )
-
-        league_data = {}
-
-        cur.execute(
-            """
-            SELECT sub.league_id, l.name, COUNT(DISTINCT sub.team_id) AS team_count
-            FROM (
-                SELECT league_id, home_team_id AS team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-                UNION
-                SELECT league_id, away_team_id AS team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-            ) AS sub
-            JOIN leagues l ON l.league_id = sub.league_id
-            GROUP BY sub.league_id, l.name
-            """,
-            (current_year, current_year),
-        )
-        for league_id, name, team_count in cur.fetchall():
-            league_data[league_id] = {
-                'name': name,
-                'teams_current': int(team_count or 0),
-                'teams_previous': 0,
-                'registrations_current': 0,
-                'revenue_cents': 0,
-            }
-
-        cur.execute(
-            """
-            SELECT sub.league_id, l.name, COUNT(DISTINCT sub.team_id) AS team_count
-            FROM (
-                SELECT league_id, home_team_id AS team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-                UNION
-                SELECT league_id, away_team_id AS team_id FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s
-            ) AS sub
-            JOIN leagues l ON l.league_id = sub.league_id
-            GROUP BY sub.league_id, l.name
-            """,
-            (previous_year, previous_year),
-        )
-        for league_id, name, team_count in cur.fetchall():
-            entry = league_data.setdefault(
-                league_id,
-                {
-                    'name': name,
-                    'teams_current': 0,
-                    'teams_previous': 0,
-                    'registrations_current': 0,
-                    'revenue_cents': 0,
-                },
-            )
-            entry['teams_previous'] = int(team_count or 0)
-
-        cur.execute(
-            "SELECT league_id, COUNT(*) FROM matches WHERE EXTRACT(YEAR FROM utc_date) = %s GROUP BY league_id",
-            (current_year,),
-        )
-        for league_id, match_count in cur.fetchall():
-            entry = league_data.setdefault(
-                league_id,
-                {
-                    'name': '',
-                    'teams_current': 0,
-                    'teams_previous': 0,
-                    'registrations_current': 0,
-                    'revenue_cents': 0,
-                },
-            )
-            entry['registrations_current'] = int(match_count or 0)
-            entry['revenue_cents'] = int((match_count or 0) * AVERAGE_MATCH_REVENUE_USD * 100)
-
-        league_breakdown = []
-        for entry in league_data.values():
-            metric = _calc_metric(entry['teams_current'], entry['teams_previous'])
-            league_breakdown.append(
-                {
-                    'name': entry['name'],
-                    'teams_current': entry['teams_current'],
-                    'teams_previous': entry['teams_previous'],
-                    'team_delta': metric['delta'],
-                    'team_delta_pct': metric['delta_pct'],
-                    'registrations_current': entry['registrations_current'],
-                    'revenue_cents': entry['revenue_cents'],
-                }
-            )
-
-        league_breakdown.sort(key=lambda item: item['teams_current'], reverse=True)
-        league_breakdown = league_breakdown[:6]
-
-        return {
-            'current_year': current_year,
-            'previous_year': previous_year,
-            'totals': {
-                'teams': _calc_metric(teams_current, teams_previous),
-                'players': _calc_metric(players_current, players_previous),
-                'registrations': _calc_metric(matches_current, matches_previous),
-                'paid_registrations': _calc_metric(matches_completed_current, matches_completed_previous),
-                'revenue': _calc_metric(revenue_current_cents, revenue_previous_cents),
-            },
-            'conversion_rate': conversion_rate,
-            'average_team_size': average_team_size,
-            'league_breakdown': league_breakdown,
-            'updated_at': datetime.now(timezone.utc),
-        }
-    finally:
-        cur.close()
-
-
 @admin_bp.route('/')
 @admin_required
 def admin_dashboard():
     try:
-        insights = _build_league_insights()
+        insights = get_league_insights()
     except Exception as e:
         print(f"Error building insights: {e}")
         import traceback
@@ -1422,6 +1248,27 @@ def admin_dashboard():
         insights = None
     return render_template('admin.html', insights=insights)
 
+@admin_bp.route('/perf', methods=['GET', 'POST'])
+@admin_required
+def query_performance():
+    """Per-endpoint query counts and the slowest statements seen by this worker."""
+    profiler = get_query_profiler()
+    if request.method == 'POST':
+        profiler.reset()
+        flash('Query statistics reset for this worker.', 'success')
+        return redirect(url_for('admin.query_performance'))
+
+    limit = request.args.get('limit', 25, type=int)
+    snapshot = profiler.snapshot(limit=max(1, min(limit, 200)))
+    if request.args.get('format') == 'json':
+        return jsonify(snapshot)
+    return render_template(
+        'admin/perf.html',
+        snapshot=snapshot,
+        since=datetime.fromtimestamp(snapshot['since']),
+        profiler_enabled=current_app.config.get('QUERY_PROFILER_ENABLED', False),
+    )
+
 @admin_bp.route('/manage_venues', methods=['GET', 'POST'])
 @admin_required
 def manage_venues():
@@ -2473,7 +2320,12 @@ def league_finance_hub():
     league_id_int = int(selected_league_id) if selected_league_id else None
 
     # Gather comprehensive financial data
-    finance_data = _get_comprehensive_finance_data(db, league_id_int)
+    finance_data = _get_comprehensive_finance_data(
+        db,
+        league_id_int,
+        expenses_cursor=request.args.get('expenses_after'),
+        transactions_cursor=request.args.get('transactions_after'),
+    )
 
     return render_template('league_finance_hub.html',
                          leagues=leagues,
@@ -2483,9 +2335,16 @@ def league_finance_hub():
                          **finance_data)
 
 
+def _outbound_unavailable(exc):
+    """JSON response for AI calls rejected for lack of capacity or cut off by timeout."""
+    if isinstance(exc, OutboundBusy):
+        return jsonify({'error': str(exc)}), 503, {'Retry-After': '5'}
+    return jsonify({'error': 'The AI service took too long to respond. Please try again.'}), 504
+
+
 @admin_bp.route('/api/ai/suggest_expense_category', methods=['POST'])
 @admin_required
-def suggest_expense_category():
+async def suggest_expense_category():
     """AI-powered expense category suggestion"""
     try:
         data = request.get_json()
@@ -2496,17 +2355,40 @@ def suggest_expense_category():
         if not description:
             return jsonify({'error': 'Description required'}), 400
 
-        result = categorize_expense(description, vendor, amount)
+        result = await run_outbound(categorize_expense, description, vendor, amount)
 
         return jsonify(result)
 
+    except (OutboundBusy, asyncio.TimeoutError) as e:
+        return _outbound_unavailable(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/api/ai/categorize_expenses', methods=['POST'])
+@admin_required
+async def categorize_expenses():
+    """AI-powered category suggestions for a batch of expenses (e.g. an imported sheet)"""
+    try:
+        data = request.get_json() or {}
+        expenses = data.get('expenses') or []
+
+        if not isinstance(expenses, list) or not expenses:
+            return jsonify({'error': 'Expenses required'}), 400
+
+        results = await run_outbound(categorize_expenses_batch, expenses)
+
+        return jsonify({'results': results})
+
+    except (OutboundBusy, asyncio.TimeoutError) as e:
+        return _outbound_unavailable(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @admin_bp.route('/api/ai/suggest_vendor', methods=['POST'])
 @admin_required
-def suggest_vendor():
+async def suggest_vendor():
     """AI-powered vendor and category suggestions"""
     try:
         data = request.get_json()
@@ -2515,17 +2397,19 @@ def suggest_vendor():
         if not description:
             return jsonify({'error': 'Description required'}), 400
 
-        result = suggest_vendor_info(description)
+        result = await run_outbound(suggest_vendor_info, description)
 
         return jsonify(result)
 
+    except (OutboundBusy, asyncio.TimeoutError) as e:
+        return _outbound_unavailable(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @admin_bp.route('/api/ai/budget_insights')
 @admin_required
-def get_budget_insights():
+async def get_budget_insights():
     """Get AI-powered budget insights for a league"""
     try:
         league_id = request.args.get('league_id')
@@ -2554,11 +2438,13 @@ def get_budget_insights():
         total_revenue = finance_data.get('total_revenue', {}).get('amount', 0) / 100.0
         total_expenses = finance_data.get('total_expenses', {}).get('amount', 0) / 100.0
 
-        insights = generate_budget_insights(revenue_breakdown, expense_breakdown,
-                                           total_revenue, total_expenses)
+        insights = await run_outbound(generate_budget_insights, revenue_breakdown, expense_breakdown,
+                                      total_revenue, total_expenses)
 
         return jsonify(insights)
 
+    except (OutboundBusy, asyncio.TimeoutError) as e:
+        return _outbound_unavailable(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2576,11 +2462,18 @@ def search_expenses_ai():
             return jsonify({'error': 'query and league_id required'}), 400
 
         league_id_int = int(league_id)
+        limit = min(int(data.get('limit', 50)), 200)
         db = get_db()
-        finance_data = _get_comprehensive_finance_data(db, league_id_int)
+        cur = db.cursor()
+        try:
+            ranked = search_expenses(cur, league_id_int, query, limit=limit)
+        finally:
+            cur.close()
 
-        expenses = finance_data.get('expenses', [])
-        matching_expenses = search_expenses_natural_language(query, expenses)
+        matching_expenses = [
+            dict(_format_expense_row(row), score=round(score, 4))
+            for row, score in ranked
+        ]
 
         return jsonify({'results': matching_expenses, 'count': len(matching_expenses)})
 
@@ -2607,6 +2500,17 @@ def export_financial_data(export_type):
     cur.execute('SELECT name FROM leagues WHERE league_id = %s', (league_id_int,))
     league_row = cur.fetchone()
     league_name = league_row[0] if league_row else f'League {league_id}'
+
+    # The hub only holds one page of each ledger; exports walk every page
+    if export_type in ('csv_expenses', 'csv_revenue', 'csv_all'):
+        finance_data['expenses'] = [
+            _format_expense_row(row)
+            for row in iter_ledger_rows(fetch_expense_page, cur, league_id_int)
+        ]
+        finance_data['recent_transactions'] = [
+            _format_revenue_row(row)
+            for row in iter_ledger_rows(fetch_revenue_page, cur, league_id_int)
+        ]
     cur.close()
 
     if export_type == 'csv_expenses':
@@ -3774,7 +3678,7 @@ def manage_players():
 
 @admin_bp.route('/api/ai/generate_news', methods=['POST'])
 @admin_required
-def generate_ai_news():
+async def generate_ai_news():
     """Generate news article using AI"""
     try:
         data = request.get_json()
@@ -3782,6 +3686,7 @@ def generate_ai_news():
         include_recent_matches = data.get('include_recent_matches', False)
         context = data.get('context', '')
         league_id = data.get('league_id')
+        regenerate = bool(data.get('regenerate'))
 
         recent_matches = []
         if include_recent_matches and league_id:
@@ -3821,20 +3726,22 @@ def generate_ai_news():
             cur.close()
 
         # Generate article using AI
-        result = generate_news_article(topic, recent_matches, context)
+        result = await run_outbound(generate_news_article, topic, recent_matches, context, regenerate=regenerate)
 
         if result.get('success'):
             return jsonify(result)
         else:
             return jsonify({'error': result.get('error', 'Failed to generate article')}), 500
 
+    except (OutboundBusy, asyncio.TimeoutError) as e:
+        return _outbound_unavailable(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @admin_bp.route('/api/ai/generate_match_recap/<int:match_id>', methods=['POST'])
 @admin_required
-def generate_ai_match_recap(match_id):
+async def generate_ai_match_recap(match_id):
     """Generate a match recap article"""
     try:
         db = get_db()
@@ -3891,13 +3798,16 @@ def generate_ai_match_recap(match_id):
         }
 
         # Generate recap using AI
-        result = generate_match_recap(match_data)
+        regenerate = bool((request.get_json(silent=True) or {}).get('regenerate'))
+        result = await run_outbound(generate_match_recap, match_data, regenerate=regenerate)
 
         if result.get('success'):
             return jsonify(result)
         else:
             return jsonify({'error': result.get('error', 'Failed to generate recap')}), 500
 
+    except (OutboundBusy, asyncio.TimeoutError) as e:
+        return _outbound_unavailable(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -3968,7 +3878,7 @@ def manage_news():
 
 @admin_bp.route('/api/ai/generate_waiver', methods=['POST'])
 @admin_required
-def generate_ai_waiver():
+async def generate_ai_waiver():
     """Generate a waiver using AI"""
     try:
         from slms.models.models import Waiver
@@ -3977,19 +3887,23 @@ def generate_ai_waiver():
         waiver_type = data.get('waiver_type', 'general')
         sport = data.get('sport', '')
         custom_requirements = data.get('custom_requirements', '')
+        regenerate = bool(data.get('regenerate'))
 
         # Get organization name from g.org
         org = getattr(g, 'org', None)
         org_name = org.name if org else 'Sports League'
 
         # Generate waiver using AI
-        result = generate_waiver(waiver_type, org_name, sport, custom_requirements)
+        result = await run_outbound(generate_waiver, waiver_type, org_name, sport, custom_requirements,
+                                    regenerate=regenerate)
 
         if result.get('success'):
             return jsonify(result)
         else:
             return jsonify({'error': result.get('error', 'Failed to generate waiver')}), 500
 
+    except (OutboundBusy, asyncio.TimeoutError) as e:
+        return _outbound_unavailable(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -5956,17 +5870,21 @@ def recalculate_standings():
 
                 if save_flag and results:
                     try:
-                        for entry in results:
-                            cur.execute('DELETE FROM standings WHERE team_id = %s', (entry['team_id'],))
-                        for entry in results:
-                            cur.execute(
-                                'INSERT INTO standings (position, team_id, played_games, won, draw, lost, points, goals_for, goals_against, goal_difference, form) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                        cur.executemany(
+                            'DELETE FROM standings WHERE team_id = %s',
+                            [(entry['team_id'],) for entry in results]
+                        )
+                        cur.executemany(
+                            'INSERT INTO standings (position, team_id, played_games, won, draw, lost, points, goals_for, goals_against, goal_difference, form) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                            [
                                 (
                                     entry['position'], entry['team_id'], entry['played_games'], entry['won'],
                                     entry['draw'], entry['lost'], entry['points'], entry['goals_for'],
                                     entry['goals_against'], entry['goal_difference'], entry['form']
                                 )
-                            )
+                                for entry in results
+                            ]
+                        )
                         db.commit()
                         flash('Standings recalculated and saved.', 'success')
                     except Exception as exc:
@@ -7233,6 +7151,8 @@ def save_branding():
             org.modules_config = data['modules']
 
         db.session.commit()
+        # Colors and custom CSS are served from the compiled theme bundle
+        refresh_theme_bundle()
 
         return jsonify({'success': True, 'message': 'Branding saved successfully'})
 
@@ -6,7 +6,8 @@ from flask import Blueprint, jsonify, request
 from flask_login import current_user, login_required
 
 from slms.blueprints.common.tenant import org_query, tenant_required
-from slms.models import Game, League, MediaAsset, Team
+from slms.models import Game, League, MediaAsset, Team, Venue
+from slms.services.conditional import conditional_get, game_stamp
 from slms.services.media_library import (
     create_media_asset,
     delete_media_asset,
@@ -50,6 +51,7 @@ def serialize_game(game: Game) -> dict:
 
 @api_bp.route('/leagues', methods=['GET'])
 @tenant_required
+@conditional_get(League)
 def list_leagues():
     leagues = org_query(League).all()
     return jsonify({'items': [serialize_league(l) for l in leagues]})
@@ -57,6 +59,7 @@ def list_leagues():
 
 @api_bp.route('/teams', methods=['GET'])
 @tenant_required
+@conditional_get(Team)
 def list_teams():
     teams = org_query(Team).all()
     return jsonify({'items': [serialize_team(t) for t in teams]})
@@ -64,6 +67,7 @@ def list_teams():
 
 @api_bp.route('/games', methods=['GET'])
 @tenant_required
+@conditional_get(Game)
 def list_games():
     games = org_query(Game).all()
     return jsonify({'items': [serialize_game(g) for g in games]})
@@ -71,6 +75,7 @@ def list_games():
 
 @api_bp.route('/games/live', methods=['GET'])
 @tenant_required
+@conditional_get(Game, Team, Venue)
 def live_games():
     """Get all currently live games with score updates."""
     from slms.models import GameStatus
@@ -104,6 +109,7 @@ def live_games():
 
 @api_bp.route('/games/<game_id>', methods=['GET'])
 @tenant_required
+@conditional_get(game_stamp)
 def game_detail(game_id):
     """Get detailed game information including events and player stats."""
     game = org_query(Game).filter(Game.id == game_id).first()
@@ -410,6 +416,7 @@ def serialize_venue(venue: Venue) -> dict:
 
 @api_bp.route('/teams-crud', methods=['GET'])
 @tenant_required
+@conditional_get(Team)
 def list_teams_crud():
     """List all teams (CRUD version)."""
     season_id = request.args.get('season_id')
@@ -432,6 +439,7 @@ def create_team_crud():
 
 @api_bp.route('/teams-crud/<team_id>', methods=['GET'])
 @tenant_required
+@conditional_get(Team)
 def get_team_crud(team_id: str):
     """Get a single team."""
     team = CRUDService(Team).get_by_id(team_id)
@@ -482,6 +490,7 @@ def bulk_create_teams_crud():
 
 @api_bp.route('/players', methods=['GET'])
 @tenant_required
+@conditional_get(Player)
 def list_players():
     """List all players."""
     team_id = request.args.get('team_id')
@@ -504,6 +513,7 @@ def create_player():
 
 @api_bp.route('/players/<player_id>', methods=['GET'])
 @tenant_required
+@conditional_get(Player)
 def get_player(player_id: str):
     """Get a single player."""
     player = CRUDService(Player).get_by_id(player_id)
@@ -574,6 +584,7 @@ def bulk_delete_players():
 
 @api_bp.route('/coaches', methods=['GET'])
 @tenant_required
+@conditional_get(Coach)
 def list_coaches():
     """List all coaches."""
     coaches = CRUDService(Coach).list_all(order_by=Coach.last_name)
@@ -593,6 +604,7 @@ def create_coach():
 
 @api_bp.route('/coaches/<coach_id>', methods=['GET'])
 @tenant_required
+@conditional_get(Coach)
 def get_coach(coach_id: str):
     """Get a single coach."""
     coach = CRUDService(Coach).get_by_id(coach_id)
@@ -630,6 +642,7 @@ def delete_coach(coach_id: str):
 
 @api_bp.route('/referees', methods=['GET'])
 @tenant_required
+@conditional_get(Referee)
 def list_referees():
     """List all referees."""
     referees = CRUDService(Referee).list_all(order_by=Referee.last_name)
@@ -649,6 +662,7 @@ def create_referee():
 
 @api_bp.route('/referees/<referee_id>', methods=['GET'])
 @tenant_required
+@conditional_get(Referee)
 def get_referee(referee_id: str):
     """Get a single referee."""
     referee = CRUDService(Referee).get_by_id(referee_id)
@@ -686,6 +700,7 @@ def delete_referee(referee_id: str):
 
 @api_bp.route('/venues', methods=['GET'])
 @tenant_required
+@conditional_get(Venue)
 def list_venues():
     """List all venues."""
     venues = CRUDService(Venue).list_all(order_by=Venue.name)
@@ -705,6 +720,7 @@ def create_venue():
 
 @api_bp.route('/venues/<venue_id>', methods=['GET'])
 @tenant_required
+@conditional_get(Venue)
 def get_venue(venue_id: str):
     """Get a single venue."""
     venue = CRUDService(Venue).get_by_id(venue_id)
@@ -742,6 +758,7 @@ def delete_venue(venue_id: str):
 
 @api_bp.route('/sponsors', methods=['GET'])
 @tenant_required
+@conditional_get(Sponsor)
 def list_sponsors():
     """List all sponsors."""
     tier = request.args.get('tier')
@@ -769,6 +786,7 @@ def create_sponsor():
 
 @api_bp.route('/sponsors/<sponsor_id>', methods=['GET'])
 @tenant_required
+@conditional_get(Sponsor)
 def get_sponsor(sponsor_id: str):
     """Get a single sponsor."""
     sponsor = CRUDService(Sponsor).get_by_id(sponsor_id)
@@ -1206,7 +1224,7 @@ def delete_webhook(webhook_id: str):
 @api_bp.route('/webhooks/<webhook_id>/test', methods=['POST'])
 @admin_required
 @tenant_required
-def test_webhook(webhook_id: str):
+async def test_webhook(webhook_id: str):
     """Send a test event to webhook."""
     webhook = org_query(Webhook).filter_by(id=webhook_id).first()
     if not webhook:
@@ -1222,9 +1240,15 @@ def test_webhook(webhook_id: str):
         'timestamp': datetime.now(timezone.utc).isoformat()
     }
 
-    WebhookService._queue_delivery(webhook, 'test.event', test_payload)
+    delivery = WebhookService._queue_delivery_record(webhook, 'test.event', test_payload)
+    await WebhookService.deliver_async(delivery)
 
-    return jsonify({'message': 'Test event sent'})
+    return jsonify({
+        'message': 'Test event sent',
+        'status': delivery.status.value,
+        'response_status': delivery.response_status,
+        'error': delivery.error_message,
+    })
 
 
 @api_bp.route('/webhook-events', methods=['GET'])
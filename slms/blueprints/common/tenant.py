@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import inspect
 from functools import wraps
 from typing import Type, TypeVar
 
@@ -10,6 +11,7 @@ from sqlalchemy.orm import Query
 
 from slms.extensions import db
 from slms.models import Organization
+from slms.services.tenant_registry import get_tenant_registry
 
 Model = TypeVar("Model", bound=db.Model)
 
@@ -44,26 +46,24 @@ def resolve_tenant() -> Organization | None:
     if not slug:
         slug = session.get("org_slug")
 
+    registry = get_tenant_registry()
     organization: Organization | None = None
     if slug:
-        organization = Organization.query.filter_by(slug=slug).first()
+        organization = registry.attach(registry.get_by_slug(slug))
 
     # Development convenience: if still not found, attempt safe fallbacks
     if organization is None:
         # If in debug OR only one org exists (common for local dev), pick it
         try:
-            query = Organization.query.order_by(Organization.created_at.asc())
-            first = query.first()
-            second = query.offset(1).first()
-            only_one = first is not None and second is None
+            first, only_one = registry.get_fallback()
         except Exception:
             first = None
             only_one = False
 
         if current_app.debug or only_one:
             if first:
-                organization = first
-                slug = first.slug
+                organization = registry.attach(first)
+                slug = organization.slug
 
     # Persist org in session for subsequent requests (helps when not using subdomains)
     if organization is not None:
@@ -80,6 +80,15 @@ def resolve_tenant() -> Organization | None:
 def tenant_required(view):
     """Ensure a tenant is loaded before executing the view."""
 
+    if inspect.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapped(*args, **kwargs):
+            if getattr(g, "org", None) is None:
+                abort(404)
+            return await view(*args, **kwargs)
+
+        return async_wrapped
+
     @wraps(view)
     def wrapped(*args, **kwargs):
         if getattr(g, "org", None) is None:
@@ -89,6 +98,12 @@ def tenant_required(view):
     return wrapped
 
 
+def get_current_org() -> Organization | None:
+    """Return the organization resolved for the current request, if any."""
+
+    return getattr(g, "org", None)
+
+
 def org_query(model: Type[Model]) -> Query:
     """Return a query for the current tenant for the provided model."""
 
@@ -116,9 +131,9 @@ def _extract_request_slug() -> str | None:
         return None
 
     # Check for custom domain match first
-    org_by_domain = Organization.query.filter_by(custom_domain=host).first()
+    org_by_domain = get_tenant_registry().get_by_domain(host)
     if org_by_domain:
-        return org_by_domain.slug
+        return org_by_domain["slug"]
 
     parts = host.split(".")
     if len(parts) < 2:
@@ -162,6 +177,7 @@ __all__ = [
     "init_tenant",
     "resolve_tenant",
     "tenant_required",
+    "get_current_org",
     "org_query",
     "get_object_or_404",
 ]
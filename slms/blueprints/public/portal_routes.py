@@ -11,7 +11,16 @@ from sqlalchemy.orm import joinedload
 
 from slms.blueprints.common.tenant import org_query, tenant_required
 from slms.extensions import db
-from slms.models import Game, GameStatus, League, Player, Season, Team
+from slms.models import Game, GameStatus, League, Player, Season, Team, Venue
+from slms.services.conditional import (
+    conditional_get,
+    game_stamp,
+    news_stamp,
+    season_stamp,
+    site_stamp,
+    team_stamp,
+)
+from slms.services.page_cache import add_cache_tags, cached_view
 
 
 # Serve portal pages under /portal to avoid clashing with public landing at /
@@ -115,6 +124,8 @@ def compute_standings(season: Season) -> list[dict]:
 
 @portal_bp.route('/')
 @tenant_required
+@conditional_get(League, Season, Game, Team, news_stamp, site_stamp)
+@cached_view(tags=('results:{org}',))
 def index():
     """Homepage with leagues and seasons."""
     try:
@@ -158,6 +169,8 @@ def index():
 
 @portal_bp.route('/seasons/<season_id>/schedule')
 @tenant_required
+@conditional_get(Venue, season_stamp, site_stamp)
+@cached_view(tags=('season:{season_id}',))
 def season_schedule(season_id: str):
     """Season schedule grouped by date."""
     season = org_query(Season).filter(Season.id == season_id).first_or_404()
@@ -194,6 +207,7 @@ def season_schedule(season_id: str):
 
 @portal_bp.route('/seasons/<season_id>/standings')
 @tenant_required
+@conditional_get(season_stamp, site_stamp)
 def season_standings(season_id: str):
     """Season standings computed from game results."""
     season = (
@@ -214,6 +228,8 @@ def season_standings(season_id: str):
 
 @portal_bp.route('/teams/<team_id>')
 @tenant_required
+@conditional_get(team_stamp, site_stamp)
+@cached_view(tags=('team:{team_id}',))
 def team_detail(team_id: str):
     """Team profile with roster, fixtures, and results."""
     team = (
@@ -262,6 +278,8 @@ def team_detail(team_id: str):
     # Compute team stats if they have a season
     team_stats = None
     if team.season:
+        # Standings move with every result in the season, not just this team's
+        add_cache_tags(f'season:{team.season_id}')
         standings = compute_standings(team.season)
         team_stats = next((s for s in standings if s['team'].id == team_id), None)
 
@@ -277,6 +295,7 @@ def team_detail(team_id: str):
 
 @portal_bp.route('/games/<game_id>')
 @tenant_required
+@conditional_get(game_stamp, site_stamp)
 def game_detail(game_id: str):
     """Game details with scores, status, and notes."""
     game = (
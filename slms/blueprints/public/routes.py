@@ -1,9 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, g
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, g, jsonify, current_app
 from flask_login import current_user
 
 from slms.security import roles_required
 from slms.services.db import get_db
-from slms.models import MediaAsset, UserRole, User
+from slms.models import UserRole, User
+from slms.services.media_library import media_category_facets, page_media_assets
+from slms.services.page_cache import cached_view
 import json
 from slms.extensions import bcrypt
 
@@ -795,51 +797,71 @@ def profile():
     return render_template('profile.html', user=user)
 
 
-@public_bp.route('/gallery')
-def media_gallery():
-    """Public media gallery - photos and videos"""
+def _gallery_item(asset):
+    return {
+        'id': asset.id,
+        'media_id': asset.id,
+        'title': asset.title,
+        'description': asset.description,
+        'url': asset.url,
+        'renditions': asset.renditions or [],
+        'width': asset.width,
+        'height': asset.height,
+        'media_type': asset.media_type,
+        'category': asset.category,
+        'created_at': asset.created_at,
+    }
+
+
+def _gallery_page(cursor=None):
+    """Filters from the query string plus one page of gallery items."""
     category = (request.args.get('category') or '').strip()
     media_type = (request.args.get('type') or '').strip()
-
-    query = MediaAsset.query.order_by(MediaAsset.created_at.desc())
     org = getattr(g, 'org', None)
-    if org is not None:
-        query = query.filter(MediaAsset.org_id == org.id)
-
-    if category:
-        query = query.filter(MediaAsset.category == category)
-
-    if media_type:
-        query = query.filter(MediaAsset.media_type == media_type)
-
-    assets = query.all()
-    media_items = [
-        {
-            'id': asset.id,
-            'media_id': asset.id,
-            'title': asset.title,
-            'description': asset.description,
-            'url': asset.url,
-            'media_type': asset.media_type,
-            'category': asset.category,
-            'created_at': asset.created_at.isoformat() if asset.created_at else None,
-        }
-        for asset in assets
-    ]
+    try:
+        assets, next_cursor = page_media_assets(
+            org.id if org is not None else None,
+            category=category or None,
+            media_type=media_type or None,
+            limit=int(current_app.config.get('MEDIA_GALLERY_PAGE_SIZE', 24)),
+            cursor=cursor,
+        )
+    except ValueError:
+        abort(400)
+    next_url = None
+    if next_cursor:
+        next_url = url_for('public.media_gallery_items', cursor=next_cursor,
+                           category=category or None, type=media_type or None)
+    return category, media_type, [_gallery_item(asset) for asset in assets], next_url
 
-    category_query = MediaAsset.query
-    if org is not None:
-        category_query = category_query.filter(MediaAsset.org_id == org.id)
-    raw_categories = category_query.with_entities(MediaAsset.category).distinct().all()
-    category_values = sorted({value for (value,) in raw_categories if value})
+
+@public_bp.route('/gallery')
+def media_gallery():
+    """Public media gallery - photos and videos"""
+    category, media_type, media_items, next_url = _gallery_page()
+    org = getattr(g, 'org', None)
+    facets = media_category_facets(org.id if org is not None else None)
 
     return render_template('public_gallery.html',
                          media_items=media_items,
-                         categories=category_values,
+                         next_url=next_url,
+                         categories=[facet['category'] for facet in facets],
+                         category_counts={facet['category']: facet['count'] for facet in facets},
                          selected_category=category,
                          selected_type=media_type)
 
 
+@public_bp.route('/gallery/items')
+def media_gallery_items():
+    """Next page of gallery cards for infinite scroll."""
+    _, _, media_items, next_url = _gallery_page(request.args.get('cursor'))
+    return jsonify({
+        'html': render_template('components/gallery_cards.html', media_items=media_items),
+        'count': len(media_items),
+        'next_url': next_url,
+    })
+
+
 @public_bp.route('/search')
 def search_page():
     """Universal search page."""
@@ -951,6 +973,7 @@ def game_detail_public(game_id):
 
 
 @public_bp.route('/teams/<team_id>')
+@cached_view(tags=('team:{team_id}',))
 def team_profile(team_id):
     """Team profile page."""
     from slms.models.models import Team
@@ -985,6 +1008,7 @@ def player_profile(player_id):
 
 
 @public_bp.route('/venues/<venue_id>')
+@cached_view(tags=('venue:{venue_id}',))
 def venue_profile(venue_id):
     """Venue profile page."""
     from slms.models.models import Venue
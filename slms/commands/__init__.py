@@ -5,6 +5,9 @@ from .seed import seed_commands
 from .export import export_commands
 from .templates import template_commands
 from .user import user_commands
+from .perf import perf_commands
+from .storage import storage_commands
+from .snapshots import snapshot_commands
 
 
 def register_commands(app):
@@ -14,3 +17,6 @@ def register_commands(app):
     app.cli.add_command(export_commands)
     app.cli.add_command(template_commands)
     app.cli.add_command(user_commands)
+    app.cli.add_command(perf_commands)
+    app.cli.add_command(storage_commands)
+    app.cli.add_command(snapshot_commands)
@@ -201,4 +201,26 @@ def org_info(slug):
 
     click.echo('URLs:')
     click.echo(f'  Public: http://localhost:5000/{org.slug}')
-    click.echo(f'  Admin: http://localhost:5000/{org.slug}/admin')
\ No newline at end of file
+    click.echo(f'  Admin: http://localhost:5000/{org.slug}/admin')
+
+@org_commands.command('reconcile-counters')
+@click.argument('slug', required=False)
+@with_appcontext
+def reconcile_counters(slug):
+    """Rebuild denormalized row counters for one or all organizations."""
+    from slms.services.org_counters import reconcile_org_counters
+
+    org_ids = None
+    if slug:
+        org = db.session.query(Organization).filter_by(slug=slug).first()
+        if not org:
+            click.echo(click.style(f'Error: Organization with slug "{slug}" not found', fg='red'))
+            return
+        org_ids = [org.id]
+
+    try:
+        reconciled = reconcile_org_counters(org_ids)
+        click.echo(click.style(f'✓ Reconciled counters for {reconciled} organization(s)', fg='green'))
+    except Exception as e:
+        db.session.rollback()
+        click.echo(click.style(f'Error reconciling counters: {str(e)}', fg='red'))
@@ -0,0 +1,66 @@
+"""Performance benchmark CLI commands."""
+
+import json
+from pathlib import Path
+
+import click
+
+from slms.services.startup_profile import DEFAULT_TEMPLATES, compare_reports, measure_startup
+
+
+@click.group('perf')
+def perf_commands():
+    """Performance benchmarks."""
+    pass
+
+
+@perf_commands.command('startup')
+@click.option('--runs', default=5, show_default=True, help='Cold starts to sample (median is reported)')
+@click.option('--database-url', help='Database to boot against (default: a fresh SQLite file per run)')
+@click.option('--template', 'templates', multiple=True,
+              help=f'Template to compile in the jinja phase (default: {", ".join(DEFAULT_TEMPLATES)})')
+@click.option('--top', default=25, show_default=True, help='Slowest imports to list')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the full report as JSON')
+@click.option('--compare', 'baseline_path', type=click.Path(exists=True, dir_okay=False),
+              help='Earlier JSON report to diff phase timings against')
+def perf_startup(runs, database_url, templates, top, output, baseline_path):
+    """Time each phase of create_app() and list the costliest imports.
+
+    Every run is a fresh interpreter, so results reflect a new gunicorn
+    worker or RQ job booting.
+
+    Example:
+        flask perf startup --output startup.json
+        flask perf startup --compare startup.json
+    """
+    click.echo(f'Sampling {runs} cold start(s)...')
+    try:
+        report = measure_startup(runs=runs, database_url=database_url,
+                                 templates=templates or DEFAULT_TEMPLATES)
+    except RuntimeError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+    rows = report['spans']
+    if baseline_path:
+        baseline = json.loads(Path(baseline_path).read_text())
+        rows = compare_reports(baseline, report)
+        click.echo(f"Compared with {baseline.get('revision') or baseline_path}")
+
+    click.echo()
+    click.echo(f"{'Phase':<40} {'ms':>10} {'delta':>10}")
+    for row in rows:
+        label = '  ' * row['depth'] + row['name']
+        delta = row.get('delta_ms')
+        delta_text = '' if delta is None else f'{delta:+.1f}'
+        click.echo(f"{label:<40} {row['ms']:>10.1f} {delta_text:>10}")
+
+    if top > 0:
+        click.echo()
+        click.echo(f"{'Module':<50} {'self ms':>10} {'cumul. ms':>10}")
+        for item in report['imports'][:top]:
+            click.echo(f"{item['module']:<50} {item['self_us'] / 1000:>10.1f} {item['cumulative_us'] / 1000:>10.1f}")
+
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2))
+        click.echo()
+        click.echo(click.style(f'Report written to {output}', fg='green'))
@@ -0,0 +1,49 @@
+"""Static snapshot CLI commands."""
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from slms.extensions import db
+from slms.models import Organization
+from slms.services.static_snapshots import publish_organization
+
+
+@click.group('snapshots')
+def snapshot_commands():
+    """Static portal page snapshot commands."""
+    pass
+
+
+@snapshot_commands.command('publish')
+@click.option('--org', 'org_slug', help='Organization slug (default: all organizations)')
+@with_appcontext
+def publish(org_slug):
+    """Render every finished season and final game into STATIC_SNAPSHOT_DIR.
+
+    Only changed files are rewritten, so this is safe to run after edits
+    the automatic hooks do not see (team renames, manual score fixes).
+
+    Example:
+        flask snapshots publish
+        flask snapshots publish --org demo
+    """
+    if not current_app.config.get('STATIC_SNAPSHOT_DIR'):
+        click.echo(click.style('Error: STATIC_SNAPSHOT_DIR is not set', fg='red'))
+        return
+
+    orgs = db.session.query(Organization)
+    if org_slug:
+        orgs = orgs.filter_by(slug=org_slug)
+    orgs = orgs.all()
+    if org_slug and not orgs:
+        click.echo(click.style(f'Error: Organization "{org_slug}" not found', fg='red'))
+        return
+
+    for org in orgs:
+        stats = publish_organization(org)
+        click.echo(
+            f"{org.slug}: {stats['written']} written, {stats['unchanged']} unchanged, "
+            f"{stats['failed']} failed"
+        )
+    click.echo(click.style(f'✓ Snapshots published for {len(orgs)} organization(s)', fg='green'))
@@ -0,0 +1,105 @@
+"""Storage manifest CLI commands."""
+
+from pathlib import Path
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from slms.extensions import db
+from slms.models import Organization
+from slms.services.storage import TenantStorage
+from slms.services.storage_manifest import ORPHAN_GRACE_SECONDS, recompute_storage_used, reconcile_storage
+
+
+@click.group('storage')
+def storage_commands():
+    """Uploaded file storage commands."""
+    pass
+
+
+def _format_stats(label, stats):
+    return (
+        f"{label}: {stats['scanned']} files scanned, {stats['indexed']} indexed, "
+        f"{stats['updated']} updated, {stats['missing']} missing, "
+        f"{stats['orphans']} orphans ({stats['orphans_removed']} removed), "
+        f"{stats['incoming_removed']} stale partial uploads removed"
+    )
+
+
+@storage_commands.command('reconcile')
+@click.option('--org', 'org_slug', help='Organization slug (default: all organizations)')
+@click.option('--remove-orphans', is_flag=True, help='Delete unreferenced blobs and stale partial uploads')
+@click.option('--grace', default=ORPHAN_GRACE_SECONDS, show_default=True,
+              help='Seconds before an unreferenced file counts as orphaned')
+@click.option('--dry-run', is_flag=True, help='Report differences without changing anything')
+@with_appcontext
+def reconcile(org_slug, remove_orphans, grace, dry_run):
+    """Rebuild the storage manifest from disk and reset storage_used.
+
+    Example:
+        flask storage reconcile --dry-run
+        flask storage reconcile --org demo --remove-orphans
+    """
+    orgs = db.session.query(Organization)
+    if org_slug:
+        orgs = orgs.filter_by(slug=org_slug)
+    orgs = orgs.all()
+    if org_slug and not orgs:
+        click.echo(click.style(f'Error: Organization "{org_slug}" not found', fg='red'))
+        return
+    org_ids = {org.slug: org.id for org in orgs}
+
+    tenant_root = Path(current_app.config.get('UPLOAD_FOLDER', 'uploads'))
+    static_root = Path(current_app.static_folder)
+    options = {'remove_orphans': remove_orphans, 'grace_seconds': grace, 'dry_run': dry_run}
+
+    # Tenant storage: <UPLOAD_FOLDER>/<org slug>/...
+    for slug in ([org_slug] if org_slug else [None]):
+        stats = reconcile_storage(
+            'tenant', tenant_root, scope=slug,
+            org_for_path=lambda path: org_ids.get(path.split('/', 1)[0]),
+            **options,
+        )
+        click.echo(_format_stats(f'tenant {tenant_root}', stats))
+
+    # Static uploads: media library files live in uploads/<library>/<org slug>/...
+    tenant_dirs = tuple(tenant_root / slug for slug in org_ids)
+    static_scopes = [f'uploads/media/{org_slug}'] if org_slug else ['uploads']
+    for scope in static_scopes:
+        stats = reconcile_storage(
+            'static', static_root, scope=scope, skip=tenant_dirs,
+            org_for_path=lambda path: org_ids.get(path.split('/')[2]) if path.count('/') >= 3 else None,
+            **options,
+        )
+        click.echo(_format_stats(f'static {static_root / scope}', stats))
+
+    if dry_run:
+        click.echo(click.style('Dry run: no changes written', fg='yellow'))
+        return
+
+    recompute_storage_used(org_ids.values())
+    db.session.commit()
+    click.echo(click.style(f'✓ Storage usage recomputed for {len(org_ids)} organization(s)', fg='green'))
+
+
+@storage_commands.command('ls')
+@click.option('--org', 'org_slug', required=True, help='Organization slug')
+@click.option('--subdir', help='Subdirectory to list')
+@click.option('--pattern', default='*', show_default=True, help='Glob pattern matched against file names')
+@click.option('--limit', default=50, show_default=True, help='Files per page')
+@click.option('--cursor', help='Cursor printed at the end of the previous page')
+@with_appcontext
+def list_storage(org_slug, subdir, pattern, limit, cursor):
+    """List an organization's stored files, newest first."""
+    org = db.session.query(Organization).filter_by(slug=org_slug).first()
+    if org is None:
+        click.echo(click.style(f'Error: Organization "{org_slug}" not found', fg='red'))
+        return
+
+    with current_app.test_request_context():
+        page = TenantStorage(org).list_files_page(subdir, pattern, limit=limit, cursor=cursor)
+    for item in page['files']:
+        click.echo(f"{item['size']:>12}  {item['mime_type'] or '-':<24}  {item['path']}")
+    if page['next_cursor']:
+        click.echo(f"Next page: --cursor {page['next_cursor']}")
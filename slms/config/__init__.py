@@ -12,6 +12,18 @@ class Config:
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or 'sqlite:///slms.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Comma-separated read replica URLs; read-only request traffic is routed to them
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    # Blueprints whose GET/HEAD requests read from a replica (views can opt in/out with decorators)
+    REPLICA_READ_BLUEPRINTS = tuple(
+        name.strip() for name in os.getenv('REPLICA_READ_BLUEPRINTS', 'public,portal,api').split(',') if name.strip()
+    )
+    # Seconds a client reads from the primary after one of its requests wrote
+    REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+    # Replicas lagging more than this many seconds are skipped
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '10'))
+    # Seconds between replica health/lag probes per worker
+    REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', '5'))
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
@@ -26,4 +38,74 @@ class Config:
     DEFAULT_ORG_SLUG = os.getenv('DEFAULT_ORG_SLUG')
     # Allow aligning tenant to the authenticated user's organization on mismatch (dev convenience)
     ALLOW_ORG_FALLBACK = os.getenv('ALLOW_ORG_FALLBACK', 'true').lower() in ('1', 'true', 'yes')
+    # Seconds to cache slug/custom-domain -> organization lookups per worker (0 disables)
+    TENANT_REGISTRY_TTL = float(os.getenv('TENANT_REGISTRY_TTL', '30'))
+    # Seconds before the admin dashboard insight snapshot is recomputed
+    DASHBOARD_SNAPSHOT_TTL = float(os.getenv('DASHBOARD_SNAPSHOT_TTL', '900'))
+    # Seconds before per-worker expense anomaly statistics are re-primed from the ledger
+    EXPENSE_ANOMALY_STATE_TTL = float(os.getenv('EXPENSE_ANOMALY_STATE_TTL', '600'))
+    # Seconds before a worker rebuilds a league's expense search index from scratch
+    EXPENSE_SEARCH_INDEX_TTL = float(os.getenv('EXPENSE_SEARCH_INDEX_TTL', '900'))
+    # Seconds identical AI prompts are answered from llm_response_cache (0 disables)
+    AI_RESPONSE_CACHE_TTL = float(os.getenv('AI_RESPONSE_CACHE_TTL', '604800'))
+    # Per-request SQL profiling: Server-Timing header, sampled logs and /admin/perf (opt-in)
+    QUERY_PROFILER_ENABLED = os.getenv('QUERY_PROFILER_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    # Server-Timing is only ever sent in debug mode or to signed-in admins
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    # Share of requests whose SQL profile is logged regardless of cost
+    QUERY_PROFILER_SAMPLE_RATE = float(os.getenv('QUERY_PROFILER_SAMPLE_RATE', '0.01'))
+    # Requests spending at least this many ms in the database are always logged
+    QUERY_PROFILER_SLOW_MS = float(os.getenv('QUERY_PROFILER_SLOW_MS', '500'))
+    # Requests running one statement this many times are always logged (likely N+1)
+    QUERY_PROFILER_REPEAT_THRESHOLD = int(os.getenv('QUERY_PROFILER_REPEAT_THRESHOLD', '20'))
+    # Slowest statements listed per logged request
+    QUERY_PROFILER_TOP_N = int(os.getenv('QUERY_PROFILER_TOP_N', '5'))
+    # Seconds an OpenAI request may take before the client gives up
+    AI_REQUEST_TIMEOUT = float(os.getenv('AI_REQUEST_TIMEOUT', '30'))
+    # Threads per worker for blocking outbound calls made from views (AI, SMTP)
+    OUTBOUND_IO_CONCURRENCY = int(os.getenv('OUTBOUND_IO_CONCURRENCY', '4'))
+    # Seconds a view waits for a free outbound slot before answering 503
+    OUTBOUND_QUEUE_TIMEOUT = float(os.getenv('OUTBOUND_QUEUE_TIMEOUT', '2'))
+    # Seconds a view waits on an outbound call before answering 504
+    OUTBOUND_IO_TIMEOUT = float(os.getenv('OUTBOUND_IO_TIMEOUT', '30'))
+    # Where password reset and security alert mail is sent from: rq (email queue) or inline
+    TRANSACTIONAL_EMAIL_BACKEND = os.getenv('TRANSACTIONAL_EMAIL_BACKEND', 'rq')
 
+    # Where media image renditions are generated: rq, pool (local processes) or inline
+    MEDIA_DERIVATIVES_BACKEND = os.getenv('MEDIA_DERIVATIVES_BACKEND', 'rq')
+    # Worker processes per app for the pool backend
+    MEDIA_DERIVATIVES_WORKERS = int(os.getenv('MEDIA_DERIVATIVES_WORKERS', '2'))
+    # Encoder quality for JPEG and WebP renditions
+    MEDIA_DERIVATIVES_QUALITY = int(os.getenv('MEDIA_DERIVATIVES_QUALITY', '80'))
+    # Media assets per public gallery page (further pages load as the visitor scrolls)
+    MEDIA_GALLERY_PAGE_SIZE = int(os.getenv('MEDIA_GALLERY_PAGE_SIZE', '24'))
+    # Seconds a worker caches an organization's gallery category counts (0 disables)
+    MEDIA_FACET_CACHE_TTL = float(os.getenv('MEDIA_FACET_CACHE_TTL', '300'))
+    # Who sends uploaded files: app (Flask), x-accel-redirect (nginx) or x-sendfile (Apache/lighttpd)
+    UPLOAD_SERVE_MODE = os.getenv('UPLOAD_SERVE_MODE', 'app')
+    # nginx internal location aliased to static/uploads, used in x-accel-redirect mode
+    UPLOAD_ACCEL_PREFIX = os.getenv('UPLOAD_ACCEL_PREFIX', '/_uploads/')
+    # Browser cache lifetime for uploads without a content-hashed name (hashed ones are immutable)
+    UPLOAD_CACHE_MAX_AGE = int(os.getenv('UPLOAD_CACHE_MAX_AGE', '3600'))
+    # Page/fragment cache for anonymous visitors: memory (LRU per worker), redis (shared) or none
+    PAGE_CACHE_BACKEND = os.getenv('PAGE_CACHE_BACKEND', 'memory')
+    # Seconds a cached page or fragment lives unless a tag invalidates it first
+    PAGE_CACHE_TIMEOUT = float(os.getenv('PAGE_CACHE_TIMEOUT', '120'))
+    # Entries kept per worker by the memory backend
+    PAGE_CACHE_MAX_ENTRIES = int(os.getenv('PAGE_CACHE_MAX_ENTRIES', '2048'))
+    # Redis server for the redis backend
+    PAGE_CACHE_REDIS_URL = os.getenv('PAGE_CACHE_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    # Release token mixed into conditional-GET ETags (defaults to the newest template's mtime)
+    ETAG_VERSION = os.getenv('ETAG_VERSION', '')
+    # Score ticker snapshots: memory (per worker) or redis (shared)
+    TICKER_BACKEND = os.getenv('TICKER_BACKEND', 'memory')
+    # Redis server for the redis ticker backend
+    TICKER_REDIS_URL = os.getenv('TICKER_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    # Seconds game events are collected before a league's ticker is rebuilt (0 rebuilds immediately)
+    TICKER_COALESCE_SECONDS = float(os.getenv('TICKER_COALESCE_SECONDS', '1'))
+    # Seconds a ticker snapshot is served before it is rebuilt from the database
+    TICKER_SNAPSHOT_TTL = float(os.getenv('TICKER_SNAPSHOT_TTL', '60'))
+    # Directory the web server serves finished portal pages from (empty disables static snapshots)
+    STATIC_SNAPSHOT_DIR = os.getenv('STATIC_SNAPSHOT_DIR', '')
+    # How snapshot hooks run: rq (background worker) or inline (in the triggering request)
+    STATIC_SNAPSHOT_BACKEND = os.getenv('STATIC_SNAPSHOT_BACKEND', 'rq')
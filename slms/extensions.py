@@ -6,9 +6,11 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import bcrypt
 
+from slms.services.replicas import RoutingSession
+
 # Application-wide extension instances
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 login_manager = LoginManager()
 csrf = CSRFProtect()
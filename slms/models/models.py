@@ -220,6 +220,44 @@ class Organization(TimestampedBase):
     )
 
 
+class OrgCounter(TimestampedBase):
+    """Denormalized per-organization row counts for landing pages and dashboards."""
+    __tablename__ = "org_counter"
+
+    org_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("organization.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    leagues: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    seasons: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    active_seasons: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    teams: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    players: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    games: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reconciled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class DashboardSnapshot(TimestampedBase):
+    """Precomputed dashboard payloads keyed by scope (e.g. ``league_insights:2025``)."""
+    __tablename__ = "dashboard_snapshot"
+
+    key: Mapped[str] = mapped_column(String(128), nullable=False, unique=True)
+    payload: Mapped[dict | None] = mapped_column(JSONType, default=dict)
+    computed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class LLMResponse(TimestampedBase):
+    """Cached LLM completion keyed by the hash of its normalized request."""
+    __tablename__ = "llm_response_cache"
+
+    key: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    model: Mapped[str] = mapped_column(String(64), nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), index=True)
+
+
 class User(TimestampedBase):
     __tablename__ = "user"
     __table_args__ = (
@@ -412,7 +450,8 @@ class Season(TimestampedBase):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     start_date: Mapped[date | None] = mapped_column(Date)
     end_date: Mapped[date | None] = mapped_column(Date)
-    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # active_history keeps the prior value available to the org counter hooks
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, active_history=True)
     default_game_length_minutes: Mapped[int | None] = mapped_column(Integer)
 
     # Lifecycle status
@@ -869,6 +908,13 @@ class MediaAsset(TimestampedBase):
     mime_type: Mapped[str | None] = mapped_column(String(128))
     file_size: Mapped[int | None] = mapped_column(Integer)
     alt_text: Mapped[str | None] = mapped_column(String(255))
+    # Pixel size of the original image, filled in with the renditions
+    width: Mapped[int | None] = mapped_column(Integer)
+    height: Mapped[int | None] = mapped_column(Integer)
+    # Resized copies: [{"name", "format", "width", "height", "size", "path", "url"}, ...]
+    renditions: Mapped[list | None] = mapped_column(JSONType)
+    # pending / ready / failed; None for assets without renditions (videos, links)
+    derivatives_status: Mapped[str | None] = mapped_column(String(16))
     uploaded_by_user_id: Mapped[str | None] = mapped_column(
         String(36),
         ForeignKey("user.id", ondelete="SET NULL"),
@@ -883,6 +929,36 @@ class MediaAsset(TimestampedBase):
         return self.public_url or self.source_url
 
 
+class StorageBlob(TimestampedBase):
+    """Content-addressed stored file shared by every upload with the same bytes.
+
+    ``root`` names the directory ``path`` is relative to (``static`` for
+    files under the static folder, ``tenant`` for ``UPLOAD_FOLDER``). The
+    table doubles as the storage manifest: listings and ``storage_used``
+    are read from it instead of the filesystem.
+    """
+    __tablename__ = "storage_blob"
+    __table_args__ = (
+        UniqueConstraint("root", "path", name="uq_storage_blob_root_path"),
+        Index("ix_storage_blob_org_sha", "org_id", "sha256"),
+        Index("ix_storage_blob_org_root_mtime", "org_id", "root", "mtime"),
+    )
+
+    org_id: Mapped[str | None] = mapped_column(
+        String(36),
+        ForeignKey("organization.id", ondelete="CASCADE"),
+        index=True,
+    )
+    root: Mapped[str] = mapped_column(String(16), nullable=False)
+    path: Mapped[str] = mapped_column(String(512), nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    mime_type: Mapped[str | None] = mapped_column(String(128))
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    # Modification time of the file on disk
+    mtime: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
 
 
 class EmailMessage(TimestampedBase):
@@ -6,7 +6,18 @@ import json
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from flask import current_app
-import openai
+
+from slms.services.lazy import lazy_import
+from slms.services.llm_cache import (
+    OpenAIChatClient,
+    cached_completion,
+    lookup_response,
+    prompt_key,
+    resolve_llm_client,
+    store_response,
+)
+
+openai = lazy_import('openai')
 
 
 def _get_openai_client():
@@ -24,34 +35,20 @@ def _get_openai_client():
     if not api_key:
         raise ValueError("OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file.")
 
-    return openai.OpenAI(api_key=api_key)
+    timeout = 30.0
+    try:
+        timeout = float(current_app.config.get('AI_REQUEST_TIMEOUT', timeout))
+    except RuntimeError:
+        pass
 
+    return openai.OpenAI(api_key=api_key, timeout=timeout, max_retries=1)
 
-def categorize_expense(description: str, vendor: Optional[str] = None, amount: Optional[float] = None) -> Dict:
-    """
-    Use AI to suggest an expense category based on description and vendor
-
-    Args:
-        description: Expense description
-        vendor: Vendor/payee name
-        amount: Expense amount (optional, for context)
 
-    Returns:
-        Dict with 'category', 'confidence', 'reasoning'
-    """
-    try:
-        client = _get_openai_client()
+CHAT_MODEL = "gpt-4o-mini"
 
-        # Build prompt with context
-        prompt = f"Categorize this sports league expense:\n"
-        prompt += f"Description: {description}\n"
-        if vendor:
-            prompt += f"Vendor: {vendor}\n"
-        if amount:
-            prompt += f"Amount: ${amount:.2f}\n"
+_CATEGORIZE_SYSTEM = "You are a financial categorization assistant for sports league management. Always respond with valid JSON."
 
-        prompt += """
-Valid categories:
+_EXPENSE_CATEGORIES = """Valid categories:
 - equipment: Sports equipment, balls, goals, nets, etc.
 - facilities: Field rental, gym rental, venue costs
 - officials: Referee fees, umpire payments
@@ -61,7 +58,48 @@ Valid categories:
 - travel: Transportation, team travel expenses
 - uniforms: Jerseys, team apparel, uniforms
 - utilities: Water, electricity, internet for facilities
-- other: Anything else
+- other: Anything else"""
+
+# Expenses sent per batch categorization request
+CATEGORIZE_BATCH_SIZE = 25
+
+
+def _messages(system: str, prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _chat_json(system: str, prompt: str, temperature: float, max_tokens: int,
+               bypass_cache: bool = False) -> Dict:
+    """Run a cached chat completion and parse its JSON response."""
+    client = resolve_llm_client(OpenAIChatClient(_get_openai_client))
+    result_text = cached_completion(
+        _messages(system, prompt),
+        model=CHAT_MODEL,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        client=client,
+        bypass_cache=bypass_cache,
+    )
+    return json.loads(result_text)
+
+
+def _clean(value) -> str:
+    return ' '.join(str(value).split()) if value else ''
+
+
+def _categorize_prompt(description: str, vendor: Optional[str] = None, amount: Optional[float] = None) -> str:
+    # Build prompt with context
+    prompt = f"Categorize this sports league expense:\n"
+    prompt += f"Description: {_clean(description)}\n"
+    if vendor:
+        prompt += f"Vendor: {_clean(vendor)}\n"
+    if amount:
+        prompt += f"Amount: ${float(amount):.2f}\n"
+
+    prompt += "\n" + _EXPENSE_CATEGORIES + """
 
 Respond with JSON only:
 {
@@ -69,27 +107,38 @@ Respond with JSON only:
     "confidence": 0.0-1.0,
     "reasoning": "brief explanation"
 }"""
+    return prompt
+
+
+def _category_result(result: Dict) -> Dict:
+    return {
+        'category': result.get('category', 'other'),
+        'confidence': float(result.get('confidence', 0.5)),
+        'reasoning': result.get('reasoning', 'AI categorization')
+    }
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a financial categorization assistant for sports league management. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=150
-        )
 
-        result_text = response.choices[0].message.content.strip()
+def categorize_expense(description: str, vendor: Optional[str] = None, amount: Optional[float] = None) -> Dict:
+    """
+    Use AI to suggest an expense category based on description and vendor
 
-        # Parse JSON response
+    Args:
+        description: Expense description
+        vendor: Vendor/payee name
+        amount: Expense amount (optional, for context)
+
+    Returns:
+        Dict with 'category', 'confidence', 'reasoning'
+    """
+    try:
         try:
-            result = json.loads(result_text)
-            return {
-                'category': result.get('category', 'other'),
-                'confidence': float(result.get('confidence', 0.5)),
-                'reasoning': result.get('reasoning', 'AI categorization')
-            }
+            result = _chat_json(
+                _CATEGORIZE_SYSTEM,
+                _categorize_prompt(description, vendor, amount),
+                temperature=0.3,
+                max_tokens=150,
+            )
+            return _category_result(result)
         except json.JSONDecodeError:
             # Fallback if JSON parsing fails
             return {
@@ -106,6 +155,89 @@ Respond with JSON only:
         }
 
 
+def categorize_expenses_batch(expenses: List[Dict]) -> List[Dict]:
+    """
+    Categorize many expenses (e.g. an imported expense sheet) with few requests
+
+    Each expense is looked up in the response cache under the same key a
+    single ``categorize_expense`` call would use; identical rows are asked
+    once, and the remaining misses are sent ``CATEGORIZE_BATCH_SIZE`` at a
+    time. Batch answers are stored per expense so later single lookups hit.
+
+    Args:
+        expenses: Dicts with 'description' and optional 'vendor'/'amount'
+
+    Returns:
+        One 'category'/'confidence'/'reasoning' dict per input, in order
+    """
+    results: List[Optional[Dict]] = [None] * len(expenses)
+    pending: Dict[str, List[int]] = {}
+    pending_items: Dict[str, Dict] = {}
+
+    for idx, expense in enumerate(expenses):
+        description = expense.get('description', '')
+        vendor = expense.get('vendor')
+        amount = expense.get('amount')
+        key = prompt_key(
+            _messages(_CATEGORIZE_SYSTEM, _categorize_prompt(description, vendor, amount)),
+            CHAT_MODEL, 0.3, 150,
+        )
+        cached = lookup_response(key)
+        if cached is not None:
+            try:
+                results[idx] = _category_result(json.loads(cached))
+                continue
+            except (json.JSONDecodeError, TypeError, ValueError):
+                pass
+        if key not in pending:
+            pending[key] = []
+            pending_items[key] = {
+                'description': _clean(description),
+                'vendor': _clean(vendor) or None,
+                'amount': float(amount) if amount else None,
+            }
+        pending[key].append(idx)
+
+    keys = list(pending)
+    for start in range(0, len(keys), CATEGORIZE_BATCH_SIZE):
+        chunk = keys[start:start + CATEGORIZE_BATCH_SIZE]
+        items = [dict(pending_items[key], index=position) for position, key in enumerate(chunk)]
+        prompt = f"""Categorize each of these sports league expenses:
+{json.dumps(items, indent=2)}
+
+{_EXPENSE_CATEGORIES}
+
+Respond with JSON only, one entry per expense index:
+{{
+    "results": [
+        {{"index": 0, "category": "one of the categories above", "confidence": 0.0-1.0, "reasoning": "brief explanation"}}
+    ]
+}}"""
+        try:
+            response = _chat_json(_CATEGORIZE_SYSTEM, prompt, temperature=0.3,
+                                  max_tokens=60 * len(chunk) + 100)
+            answers = {
+                int(entry.get('index')): entry
+                for entry in response.get('results', [])
+                if isinstance(entry, dict) and entry.get('index') is not None
+            }
+            error = 'AI categorization returned no result for this expense'
+        except Exception as e:
+            answers = {}
+            error = f'AI categorization failed: {str(e)}'
+
+        for position, key in enumerate(chunk):
+            try:
+                result = _category_result(answers[position])
+                store_response(key, CHAT_MODEL, json.dumps(result))
+            except (KeyError, TypeError, ValueError):
+                result = {'category': 'other', 'confidence': 0.0, 'reasoning': error}
+            for idx in pending[key]:
+                results[idx] = dict(result)
+
+    return results
+
+
 def detect_expense_anomalies(expenses: List[Dict], new_expense: Dict) -> Dict:
     """
     Detect if a new expense is anomalous compared to historical expenses
@@ -125,8 +257,6 @@ def detect_expense_anomalies(expenses: List[Dict], new_expense: Dict) -> Dict:
                 'reasons': ['Insufficient historical data']
             }
 
-        client = _get_openai_client()
-
         # Prepare expense summary for AI
         category = new_expense.get('category', 'unknown')
         amount = new_expense.get('amount_cents', 0) / 100.0
@@ -173,19 +303,13 @@ Respond with JSON only:
     "reasons": ["reason1", "reason2"]
 }}"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a financial fraud detection assistant. Analyze expenses for anomalies and respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
+        result = _chat_json(
+            "You are a financial fraud detection assistant. Analyze expenses for anomalies and respond with valid JSON.",
+            prompt,
             temperature=0.2,
-            max_tokens=200
+            max_tokens=200,
         )
 
-        result_text = response.choices[0].message.content.strip()
-        result = json.loads(result_text)
-
         return {
             'is_anomaly': result.get('is_anomaly', False),
             'anomaly_score': float(result.get('anomaly_score', 0.0)),
@@ -211,8 +335,6 @@ def suggest_vendor_info(description: str) -> Dict:
         Dict with suggested vendor, category, and tags
     """
     try:
-        client = _get_openai_client()
-
         prompt = f"""Based on this expense description, suggest the vendor and category:
 
 Description: {description}
@@ -225,19 +347,13 @@ Respond with JSON only:
     "tags": ["tag1", "tag2"] (useful tags for this expense)
 }}"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that extracts vendor and categorization info from expense descriptions. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
+        result = _chat_json(
+            "You are a helpful assistant that extracts vendor and categorization info from expense descriptions. Always respond with valid JSON.",
+            prompt,
             temperature=0.3,
-            max_tokens=150
+            max_tokens=150,
         )
 
-        result_text = response.choices[0].message.content.strip()
-        result = json.loads(result_text)
-
         return {
             'vendor': result.get('vendor'),
             'category_suggestions': result.get('category_suggestions', []),
@@ -284,8 +400,6 @@ def generate_budget_insights(revenue_breakdown: Dict, expense_breakdown: Dict,
         }
 
     try:
-        client = _get_openai_client()
-
         net_profit = total_revenue - total_expenses
 
         prompt = f"""Analyze this sports league's financial data and provide insights:
@@ -313,19 +427,13 @@ Respond with JSON only:
     "expense_optimization": ["suggestion1", "suggestion2"]
 }}"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a financial advisor specializing in sports league management. Provide actionable insights. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
+        result = _chat_json(
+            "You are a financial advisor specializing in sports league management. Provide actionable insights. Always respond with valid JSON.",
+            prompt,
             temperature=0.4,
-            max_tokens=500
+            max_tokens=500,
         )
 
-        result_text = response.choices[0].message.content.strip()
-        result = json.loads(result_text)
-
         return {
             'overall_health': result.get('overall_health', 'unknown'),
             'key_insights': result.get('key_insights', []),
@@ -344,7 +452,8 @@ Respond with JSON only:
         }
 
 
-def generate_news_article(topic: str, recent_matches: List[Dict] = None, context: str = None) -> Dict:
+def generate_news_article(topic: str, recent_matches: List[Dict] = None, context: str = None,
+                          regenerate: bool = False) -> Dict:
     """
     Generate a news article using AI
 
@@ -352,13 +461,12 @@ def generate_news_article(topic: str, recent_matches: List[Dict] = None, context
         topic: The topic/title for the article
         recent_matches: Optional list of recent match data
         context: Optional additional context
+        regenerate: Ask for a new draft instead of the cached one
 
     Returns:
         Dict with 'title', 'content', 'summary'
     """
     try:
-        client = _get_openai_client()
-
         # Build prompt based on available data
         prompt = f"Write a professional sports league news article.\n\n"
 
@@ -395,19 +503,14 @@ Respond with JSON only:
     "content": "Full article content in markdown format"
 }"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a professional sports journalist writing engaging articles for a sports league. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
+        result = _chat_json(
+            "You are a professional sports journalist writing engaging articles for a sports league. Always respond with valid JSON.",
+            prompt,
             temperature=0.7,
-            max_tokens=1500
+            max_tokens=1500,
+            bypass_cache=regenerate,
         )
 
-        result_text = response.choices[0].message.content.strip()
-        result = json.loads(result_text)
-
         return {
             'title': result.get('title', topic),
             'summary': result.get('summary', ''),
@@ -425,19 +528,18 @@ Respond with JSON only:
         }
 
 
-def generate_match_recap(match_data: Dict) -> Dict:
+def generate_match_recap(match_data: Dict, regenerate: bool = False) -> Dict:
     """
     Generate a match recap article
 
     Args:
         match_data: Match information including teams, scores, stats
+        regenerate: Ask for a new draft instead of the cached one
 
     Returns:
         Dict with article content
     """
     try:
-        client = _get_openai_client()
-
         home_team = match_data.get('home_team', 'Home Team')
         away_team = match_data.get('away_team', 'Away Team')
         home_score = match_data.get('home_score', 0)
@@ -471,19 +573,14 @@ Respond with JSON only:
     "content": "Full recap content"
 }"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an enthusiastic sports journalist writing match recaps. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
+        result = _chat_json(
+            "You are an enthusiastic sports journalist writing match recaps. Always respond with valid JSON.",
+            prompt,
             temperature=0.8,
-            max_tokens=800
+            max_tokens=800,
+            bypass_cache=regenerate,
         )
 
-        result_text = response.choices[0].message.content.strip()
-        result = json.loads(result_text)
-
         return {
             'title': result.get('title', f'{home_team} vs {away_team} - Match Recap'),
             'summary': result.get('summary', ''),
@@ -502,7 +599,7 @@ Respond with JSON only:
 
 
 def generate_waiver(waiver_type: str, organization_name: str, sport: str = None,
-                   custom_requirements: str = None) -> Dict:
+                   custom_requirements: str = None, regenerate: bool = False) -> Dict:
     """
     Generate a liability waiver using AI
 
@@ -511,13 +608,12 @@ def generate_waiver(waiver_type: str, organization_name: str, sport: str = None,
         organization_name: Name of the sports organization
         sport: Specific sport (optional)
         custom_requirements: Any custom clauses or requirements
+        regenerate: Ask for a new draft instead of the cached one
 
     Returns:
         Dict with 'title', 'content', 'version'
     """
     try:
-        client = _get_openai_client()
-
         waiver_templates = {
             'general': 'a comprehensive general liability waiver',
             'youth': 'a youth participant waiver with parental consent sections',
@@ -568,19 +664,14 @@ Respond with JSON only:
     "summary": "Brief description of what this waiver covers"
 }"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a legal document specialist creating liability waivers for sports organizations. Always respond with valid JSON. The waivers should be legally sound and comprehensive."},
-                {"role": "user", "content": prompt}
-            ],
+        result = _chat_json(
+            "You are a legal document specialist creating liability waivers for sports organizations. Always respond with valid JSON. The waivers should be legally sound and comprehensive.",
+            prompt,
             temperature=0.3,
-            max_tokens=2000
+            max_tokens=2000,
+            bypass_cache=regenerate,
         )
 
-        result_text = response.choices[0].message.content.strip()
-        result = json.loads(result_text)
-
         return {
             'title': result.get('title', f'{waiver_type.title()} Waiver'),
             'content': result.get('content', ''),
@@ -612,8 +703,6 @@ def search_expenses_natural_language(query: str, expenses: List[Dict]) -> List[D
         Filtered list of relevant expenses
     """
     try:
-        client = _get_openai_client()
-
         # Prepare expense summaries for AI
         expense_summaries = []
         for idx, exp in enumerate(expenses[:100]):  # Limit to 100 for token limits
@@ -639,19 +728,13 @@ Respond with JSON only:
     "explanation": "why these match"
 }}"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a search assistant. Find expenses that match the user's natural language query. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
+        result = _chat_json(
+            "You are a search assistant. Find expenses that match the user's natural language query. Always respond with valid JSON.",
+            prompt,
             temperature=0.2,
-            max_tokens=300
+            max_tokens=300,
         )
 
-        result_text = response.choices[0].message.content.strip()
-        result = json.loads(result_text)
-
         matching_indices = result.get('matching_indices', [])
         return [expenses[i] for i in matching_indices if i < len(expenses)]
 
@@ -0,0 +1,231 @@
+"""Streaming, content-addressed file storage with reference counts.
+
+Uploads are copied to disk ``CHUNK_SIZE`` bytes at a time while their
+SHA-256 is computed, so a worker never holds a whole video in memory. The
+temporary file lands in ``<root>/.incoming`` and is renamed to
+``<prefix>/<sha[:2]>/<sha>.<ext>``. An identical upload under the same prefix
+(usually one tenant) maps to the same path.
+
+``storage_blob`` keeps one row per stored file with a reference count:
+
+* Storing bytes that already exist bumps the count and throws the new copy
+  away. The duplicate costs neither disk nor quota.
+* Releasing the last reference deletes the row and refunds the owning
+  organization's ``storage_used``. The file itself is unlinked only once
+  the session commits, so a rolled-back delete never leaves a row pointing
+  at a missing file.
+
+The quota check and the increment happen in a single ``UPDATE ... WHERE
+storage_used + :n <= storage_quota``, so concurrent uploads cannot overshoot.
+
+Statements run on ``db.session``; callers commit. A rollback after a new
+blob has been moved into place leaves an unreferenced file on disk, which
+the storage reconciliation removes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+from sqlalchemy import and_, case, delete, event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from slms.extensions import db
+from slms.models import Organization, StorageBlob
+
+# Bytes copied per read while streaming an upload to disk
+CHUNK_SIZE = 1024 * 1024
+
+# Directory under each root holding partially written uploads
+INCOMING_DIR = '.incoming'
+
+# session.info key for files to unlink once the transaction commits
+_PENDING_UNLINKS = 'blob_store_unlinks'
+
+
+class QuotaExceeded(ValueError):
+    """Raised when a new blob would take an organization past its storage quota."""
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload is larger than the caller's limit."""
+
+
+def stream_to_temp(stream: BinaryIO, directory: Path, max_size: int | None = None,
+                   chunk_size: int = CHUNK_SIZE) -> tuple[Path, str, int]:
+    """Copy ``stream`` into a temp file in ``directory``; returns (path, sha256, size)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    handle = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+    temp_path = Path(handle.name)
+    try:
+        with handle:
+            if hasattr(stream, 'seek'):
+                stream.seek(0)
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadTooLarge(f'File exceeds maximum upload size of {max_size} bytes')
+                digest.update(chunk)
+                handle.write(chunk)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return temp_path, digest.hexdigest(), size
+
+
+def blob_relative_path(prefix: str, sha256: str, extension: str) -> str:
+    name = f"{sha256}.{extension}" if extension else sha256
+    return '/'.join(part for part in (prefix.strip('/'), sha256[:2], name) if part)
+
+
+def _reserve_quota(org_id: str, size: int) -> bool:
+    org = Organization.__table__
+    result = db.session.execute(
+        update(org)
+        .where(and_(
+            org.c.id == org_id,
+            # A quota of 0 (or NULL) means unlimited, as in TenantStorage
+            org.c.storage_quota.is_(None) | (org.c.storage_quota == 0)
+            | (org.c.storage_used + size <= org.c.storage_quota),
+        ))
+        .values(storage_used=org.c.storage_used + size)
+    )
+    return result.rowcount == 1
+
+
+def _refund_quota(org_id: str, size: int) -> None:
+    org = Organization.__table__
+    db.session.execute(
+        update(org)
+        .where(org.c.id == org_id)
+        .values(storage_used=case((org.c.storage_used > size, org.c.storage_used - size), else_=0))
+    )
+
+
+def _add_reference(root: str, path: str) -> bool:
+    blobs = StorageBlob.__table__
+    result = db.session.execute(
+        update(blobs)
+        .where(and_(blobs.c.root == root, blobs.c.path == path))
+        .values(ref_count=blobs.c.ref_count + 1)
+    )
+    return result.rowcount == 1
+
+
+def _keep_file(target: Path) -> None:
+    """Cancel a pending unlink of ``target`` (released and stored again in one transaction)."""
+    pending = db.session.info.get(_PENDING_UNLINKS)
+    if pending:
+        pending.discard(target)
+
+
+def store_blob(stream: BinaryIO, *, root: str, root_dir: Path, prefix: str, extension: str,
+               org_id: Optional[str] = None, mime_type: Optional[str] = None,
+               max_size: int | None = None) -> Dict[str, Any]:
+    """Store ``stream`` content-addressed under ``root_dir/prefix`` and take a reference.
+
+    New blobs count against ``org_id``'s quota (when given); duplicates are
+    free. Returns ``path`` (relative to ``root_dir``), ``sha256``, ``size``
+    and ``deduplicated``.
+    """
+    root_dir = Path(root_dir)
+    extension = (extension or '').lower().lstrip('.')
+    temp_path, sha256, size = stream_to_temp(stream, root_dir / INCOMING_DIR, max_size=max_size)
+    path = blob_relative_path(prefix, sha256, extension)
+    target = root_dir / path
+
+    try:
+        if _add_reference(root, path):
+            _keep_file(target)
+            if not target.exists():
+                # The row outlived its file; restore it from this upload
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp_path, target)
+            return {'path': path, 'sha256': sha256, 'size': size, 'deduplicated': True}
+
+        try:
+            with db.session.begin_nested():
+                if org_id and not _reserve_quota(org_id, size):
+                    raise QuotaExceeded('Storage quota exceeded')
+                db.session.execute(insert(StorageBlob.__table__).values(
+                    org_id=org_id, root=root, path=path, sha256=sha256, size=size,
+                    mime_type=mime_type, ref_count=1, mtime=datetime.now(timezone.utc),
+                ))
+        except IntegrityError:
+            # A concurrent upload of the same bytes created the row first
+            if not _add_reference(root, path):
+                raise
+            return {'path': path, 'sha256': sha256, 'size': size, 'deduplicated': True}
+
+        _keep_file(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, target)
+        return {'path': path, 'sha256': sha256, 'size': size, 'deduplicated': False}
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def release_blob(*, root: str, root_dir: Path, path: str) -> Optional[Dict[str, Any]]:
+    """Drop one reference to ``path``; the last one deletes the blob and refunds quota.
+
+    Returns the blob's ``size``, ``org_id`` and whether the blob was
+    ``deleted``, or None when ``path`` is not a tracked blob. A deleted
+    blob's file is removed after the caller commits.
+    """
+    blobs = StorageBlob.__table__
+    where = and_(blobs.c.root == root, blobs.c.path == path)
+    db.session.execute(update(blobs).where(and_(where, blobs.c.ref_count > 0))
+                       .values(ref_count=blobs.c.ref_count - 1))
+    row = db.session.execute(
+        select(blobs.c.ref_count, blobs.c.size, blobs.c.org_id).where(where)
+    ).first()
+    if row is None:
+        return None
+    if row.ref_count > 0:
+        return {'size': row.size, 'org_id': row.org_id, 'deleted': False}
+
+    if db.session.execute(delete(blobs).where(and_(where, blobs.c.ref_count <= 0))).rowcount != 1:
+        return {'size': row.size, 'org_id': row.org_id, 'deleted': False}
+    if row.org_id:
+        _refund_quota(row.org_id, row.size)
+    db.session.info.setdefault(_PENDING_UNLINKS, set()).add(Path(root_dir) / path)
+    return {'size': row.size, 'org_id': row.org_id, 'deleted': True}
+
+
+@event.listens_for(Session, 'after_commit')
+def _unlink_released_files(session):
+    for target in session.info.pop(_PENDING_UNLINKS, ()):
+        target.unlink(missing_ok=True)
+        try:
+            # Drop the emptied <sha[:2]> shard directory
+            target.parent.rmdir()
+        except OSError:
+            pass
+
+
+@event.listens_for(Session, 'after_rollback')
+def _keep_released_files(session):
+    session.info.pop(_PENDING_UNLINKS, None)
+
+
+__all__ = [
+    'CHUNK_SIZE',
+    'INCOMING_DIR',
+    'QuotaExceeded',
+    'UploadTooLarge',
+    'stream_to_temp',
+    'blob_relative_path',
+    'store_blob',
+    'release_blob',
+]
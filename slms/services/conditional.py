@@ -0,0 +1,240 @@
+"""Conditional GET: ETag and Last-Modified from cheap version stamps.
+
+Polling clients (scoreboard widgets, the ticker bar, API consumers)
+re-request the same resources every few seconds. ``conditional_get``
+computes a *version stamp* before the view runs and answers a matching
+``If-None-Match`` (or ``If-Modified-Since``) with ``304 Not Modified``
+without loading or serializing anything.
+
+A stamp is a tuple of values that changes whenever the response would.
+Usually that means ``max(updated_at)`` and ``count(*)`` of the rows a view
+reads. Counting catches deletes, which do not move ``max(updated_at)``.
+Sources passed to the decorator are either model classes, stamped across
+the current organization, or callables that receive the view's keyword
+arguments and return a tuple. ``season_stamp``, ``team_stamp`` and
+``game_stamp`` cover the portal pages. Each collects all of its aggregates
+in a single round trip.
+
+The ETag is a weak hash of the stamp, the endpoint, the path and query
+string, the organization, the signed-in user and a release token. The
+release token comes from ``ETAG_VERSION``, or from the newest template's
+mtime, so a deploy that changes markup also changes every ETag. Responses
+carry ``Cache-Control: private, no-cache``, so browsers keep a copy but
+revalidate it on every use. Shared caches stay out because the pages
+embed per-session CSRF tokens.
+
+Those tokens are also part of the ETag. When the session holds one, the
+hash includes it and a time bucket of half ``WTF_CSRF_TIME_LIMIT``, so a
+revalidated page never carries a token from another session or one that
+is about to expire.
+
+``Last-Modified`` is only sent when the stamp consists of timestamps
+alone. A count that drops after a delete does not move any timestamp, so
+``If-Modified-Since`` would wrongly answer 304. Stamps with counts, and
+pages that embed a CSRF token, revalidate through ``If-None-Match`` only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import func, or_, select, text
+
+from slms.extensions import db
+from slms.models import Game, GameEvent, Organization, Player, Season, Team, Venue
+
+Stamp = Tuple[Any, ...]
+
+
+def init_conditional_get(app: Flask) -> None:
+    """Fix the release token mixed into every ETag for this app."""
+    token = app.config.get('ETAG_VERSION')
+    if not token:
+        # Newest template on disk: redeploying changed markup invalidates old ETags
+        templates = Path(app.root_path) / (app.template_folder or 'templates')
+        token = str(max((int(path.stat().st_mtime) for path in templates.rglob('*') if path.is_file()), default=0))
+    app.extensions['etag_release'] = token
+
+
+def _aggregates(*sources) -> Stamp:
+    """``max(updated_at)`` and ``count(*)`` for each ``(model, *criteria)`` in one query."""
+    columns = []
+    for model, *criteria in sources:
+        columns.append(select(func.max(model.updated_at)).where(*criteria).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).where(*criteria).scalar_subquery())
+    return tuple(db.session.execute(select(*columns)).one())
+
+
+def org_stamp(*models) -> Stamp:
+    """Stamp over every row of ``models`` in the current organization."""
+    org_id = g.org.id
+    return _aggregates(*[(model, model.org_id == org_id) for model in models])
+
+
+def season_stamp(season_id: str, **_kwargs) -> Stamp:
+    """A season, its teams and its games."""
+    return _aggregates(
+        (Season, Season.id == season_id),
+        (Team, Team.season_id == season_id),
+        (Game, Game.season_id == season_id),
+    )
+
+
+def team_stamp(team_id: str, **_kwargs) -> Stamp:
+    """A team, its roster, and the games of its season (standings use them all)."""
+    season_id = select(Team.season_id).where(Team.id == team_id).scalar_subquery()
+    return _aggregates(
+        (Team, Team.season_id == season_id),
+        (Player, Player.team_id == team_id),
+        (Game, or_(Game.season_id == season_id, Game.home_team_id == team_id, Game.away_team_id == team_id)),
+    )
+
+
+def game_stamp(game_id: str, **_kwargs) -> Stamp:
+    """A game, its events, venue and teams, and every game the two teams play (head-to-head)."""
+    game = select(Game.home_team_id, Game.away_team_id, Game.venue_id).where(Game.id == game_id).subquery()
+    teams = select(game.c.home_team_id).union(select(game.c.away_team_id))
+    return _aggregates(
+        (Game, or_(Game.id == game_id, Game.home_team_id.in_(teams), Game.away_team_id.in_(teams))),
+        (GameEvent, GameEvent.game_id == game_id),
+        (Team, Team.id.in_(teams)),
+        (Venue, Venue.id.in_(select(game.c.venue_id))),
+    )
+
+
+def _legacy_stamp(sql: str) -> Stamp:
+    # Legacy tables may be missing (fresh databases, tests); a savepoint keeps
+    # a failed probe from aborting the request's transaction on PostgreSQL
+    try:
+        with db.session.begin_nested():
+            return tuple(db.session.execute(text(sql)).one())
+    except Exception:
+        return ()
+
+
+def site_stamp(**_kwargs) -> Stamp:
+    """Site settings, theme and organization branding, which every HTML page renders."""
+    org_id = g.org.id
+    return _aggregates((Organization, Organization.id == org_id)) + _legacy_stamp(
+        'SELECT MAX(updated_at) FROM site_settings'
+    )
+
+
+def news_stamp(**_kwargs) -> Stamp:
+    """Published homepage news."""
+    return _legacy_stamp(
+        "SELECT MAX(published_at), COUNT(*) FROM news WHERE status = 'published' AND show_on_homepage = true"
+    )
+
+
+def _last_modified(stamp: Iterable[Any]) -> Optional[datetime]:
+    """The newest timestamp in ``stamp``, or None if it holds anything but timestamps."""
+    moments = [value for value in stamp if value is not None]
+    if not moments or not all(isinstance(value, datetime) for value in moments):
+        return None
+    newest = max(moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc) for moment in moments)
+    return newest.replace(microsecond=0)
+
+
+def _csrf_material() -> Optional[Tuple[str, Optional[int]]]:
+    """The session's CSRF secret and its current expiry bucket, if a page has issued one."""
+    token = session.get(current_app.config.get('WTF_CSRF_FIELD_NAME', 'csrf_token'))
+    if not token:
+        return None
+    time_limit = current_app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    # Half the lifetime: a page revalidated late in a bucket still has a usable token
+    bucket = int(time.time() // max(time_limit // 2, 1)) if time_limit else None
+    return token, bucket
+
+
+def _etag(stamp: Stamp, csrf: Optional[Tuple[str, Optional[int]]] = None) -> str:
+    material = repr((
+        current_app.extensions.get('etag_release', ''),
+        request.endpoint,
+        request.path,
+        sorted(request.args.items(multi=True)),
+        getattr(getattr(g, 'org', None), 'id', None),
+        current_user.get_id() if current_user.is_authenticated else None,
+        csrf,
+        stamp,
+    ))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+def _apply_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> Response:
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional_get(*sources) -> Callable:
+    """Validate GET/HEAD responses against a version stamp before the view runs.
+
+    ``sources`` are model classes (stamped over the current organization)
+    or callables taking the view's keyword arguments and returning a tuple.
+    """
+    models = [source for source in sources if isinstance(source, type)]
+    stampers = [source for source in sources if not isinstance(source, type)]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Flashed messages are consumed by the next render, which a 304 would skip
+            if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                return view(*args, **kwargs)
+
+            try:
+                stamp: Stamp = org_stamp(*models) if models else ()
+                for stamper in stampers:
+                    stamp += tuple(stamper(**kwargs))
+            except Exception as exc:
+                # Validation is an optimization; never fail the page over it
+                current_app.logger.warning(f"Conditional GET stamp failed for {request.endpoint}: {exc}")
+                db.session.rollback()
+                return view(*args, **kwargs)
+            csrf = _csrf_material()
+            etag = _etag(stamp, csrf)
+            # If-Modified-Since cannot see the session's CSRF token either
+            last_modified = None if csrf else _last_modified(stamp)
+
+            if _not_modified(etag, last_modified):
+                return _apply_validators(Response(status=304), etag, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _apply_validators(response, etag, last_modified)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    'init_conditional_get',
+    'conditional_get',
+    'org_stamp',
+    'season_stamp',
+    'team_stamp',
+    'game_stamp',
+    'site_stamp',
+    'news_stamp',
+]
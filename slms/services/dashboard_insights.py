@@ -0,0 +1,239 @@
+"""Admin dashboard insights with snapshot caching.
+
+Year-over-year league metrics are computed with two aggregate queries over
+the legacy ``matches``/``players``/``leagues`` tables (totals, then the
+per-league breakdown) and stored in ``dashboard_snapshot`` so dashboard
+loads normally read a single row. Snapshots expire after
+``DASHBOARD_SNAPSHOT_TTL`` seconds and are dropped when legacy writes to the
+source tables are committed. The RQ worker rebuilds the snapshot every 15
+minutes (``refresh_dashboard_insights_job``), so an admin request only
+computes it after an invalidating write or when no worker is running.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict
+
+from flask import current_app
+from sqlalchemy import select
+
+from slms.extensions import db
+from slms.models import DashboardSnapshot
+from slms.services.db import get_db, on_legacy_commit
+
+AVERAGE_MATCH_REVENUE_USD = 7500  # fallback estimate when transaction data is unavailable
+
+INSIGHTS_SOURCE_TABLES = ('matches', 'teams', 'players', 'leagues')
+
+_YEAR_MATCHES_CTE = """
+    year_matches AS (
+        SELECT league_id, home_team_id, away_team_id, winner,
+               CASE WHEN utc_date >= %s THEN 1 ELSE 0 END AS is_current
+        FROM matches
+        WHERE utc_date >= %s AND utc_date < %s
+    )
+"""
+
+_TOTALS_QUERY = """
+    WITH {year_matches},
+    year_teams AS (
+        SELECT home_team_id AS team_id, is_current FROM year_matches
+        UNION
+        SELECT away_team_id, is_current FROM year_matches
+    )
+    SELECT
+        (SELECT COUNT(DISTINCT CASE WHEN is_current = 1 THEN team_id END) FROM year_teams),
+        (SELECT COUNT(DISTINCT CASE WHEN is_current = 0 THEN team_id END) FROM year_teams),
+        (SELECT COUNT(DISTINCT CASE WHEN yt.is_current = 1 THEN p.player_id END)
+           FROM players p JOIN year_teams yt ON yt.team_id = p.team_id),
+        (SELECT COUNT(DISTINCT CASE WHEN yt.is_current = 0 THEN p.player_id END)
+           FROM players p JOIN year_teams yt ON yt.team_id = p.team_id),
+        (SELECT COUNT(CASE WHEN is_current = 1 THEN 1 END) FROM year_matches),
+        (SELECT COUNT(CASE WHEN is_current = 0 THEN 1 END) FROM year_matches),
+        (SELECT COUNT(CASE WHEN is_current = 1 AND winner IS NOT NULL THEN 1 END) FROM year_matches),
+        (SELECT COUNT(CASE WHEN is_current = 0 AND winner IS NOT NULL THEN 1 END) FROM year_matches)
+""".format(year_matches=_YEAR_MATCHES_CTE)
+
+_LEAGUE_BREAKDOWN_QUERY = """
+    WITH {year_matches},
+    league_teams AS (
+        SELECT league_id, home_team_id AS team_id, is_current FROM year_matches
+        UNION
+        SELECT league_id, away_team_id, is_current FROM year_matches
+    ),
+    team_counts AS (
+        SELECT league_id,
+               COUNT(DISTINCT CASE WHEN is_current = 1 THEN team_id END) AS teams_current,
+               COUNT(DISTINCT CASE WHEN is_current = 0 THEN team_id END) AS teams_previous
+        FROM league_teams
+        GROUP BY league_id
+    ),
+    match_counts AS (
+        SELECT league_id, SUM(is_current) AS matches_current
+        FROM year_matches
+        GROUP BY league_id
+    )
+    SELECT tc.league_id, COALESCE(l.name, ''), tc.teams_current, tc.teams_previous,
+           COALESCE(mc.matches_current, 0)
+    FROM team_counts tc
+    LEFT JOIN leagues l ON l.league_id = tc.league_id
+    LEFT JOIN match_counts mc ON mc.league_id = tc.league_id
+""".format(year_matches=_YEAR_MATCHES_CTE)
+
+
+def _calc_metric(current_value, previous_value):
+    current = current_value or 0
+    previous = previous_value or 0
+    delta = current - previous
+    delta_pct = (delta / previous * 100) if previous else None
+    return {
+        'current': current,
+        'previous': previous,
+        'delta': delta,
+        'delta_pct': delta_pct,
+    }
+
+
+def build_league_insights(now: datetime | None = None) -> Dict:
+    """Compute dashboard insights directly from the legacy tables."""
+    now = now or datetime.now(timezone.utc)
+    current_year = now.year
+    previous_year = current_year - 1
+    window = (
+        datetime(current_year, 1, 1),
+        datetime(previous_year, 1, 1),
+        datetime(current_year + 1, 1, 1),
+    )
+
+    cur = get_db().cursor()
+    try:
+        cur.execute(_TOTALS_QUERY, window)
+        (
+            teams_current,
+            teams_previous,
+            players_current,
+            players_previous,
+            matches_current,
+            matches_previous,
+            matches_completed_current,
+            matches_completed_previous,
+        ) = (int(value or 0) for value in cur.fetchone())
+
+        cur.execute(_LEAGUE_BREAKDOWN_QUERY, window)
+        league_rows = cur.fetchall()
+    finally:
+        cur.close()
+
+    revenue_current_cents = int(matches_current * AVERAGE_MATCH_REVENUE_USD * 100)
+    revenue_previous_cents = int(matches_previous * AVERAGE_MATCH_REVENUE_USD * 100)
+
+    average_team_size = (players_current / teams_current) if teams_current else None
+
+    conversion_rate = (
+        (matches_completed_current / matches_current) * 100
+        if matches_current
+        else None
+    )
+
+    league_breakdown = []
+    for _league_id, name, team_current, team_previous, match_count in league_rows:
+        metric = _calc_metric(int(team_current or 0), int(team_previous or 0))
+        league_breakdown.append(
+            {
+                'name': name,
+                'teams_current': metric['current'],
+                'teams_previous': metric['previous'],
+                'team_delta': metric['delta'],
+                'team_delta_pct': metric['delta_pct'],
+                'registrations_current': int(match_count or 0),
+                'revenue_cents': int((match_count or 0) * AVERAGE_MATCH_REVENUE_USD * 100),
+            }
+        )
+
+    league_breakdown.sort(key=lambda item: item['teams_current'], reverse=True)
+    league_breakdown = league_breakdown[:6]
+
+    return {
+        'current_year': current_year,
+        'previous_year': previous_year,
+        'totals': {
+            'teams': _calc_metric(teams_current, teams_previous),
+            'players': _calc_metric(players_current, players_previous),
+            'registrations': _calc_metric(matches_current, matches_previous),
+            'paid_registrations': _calc_metric(matches_completed_current, matches_completed_previous),
+            'revenue': _calc_metric(revenue_current_cents, revenue_previous_cents),
+        },
+        'conversion_rate': conversion_rate,
+        'average_team_size': average_team_size,
+        'league_breakdown': league_breakdown,
+        'updated_at': now,
+    }
+
+
+def _snapshot_key(year: int) -> str:
+    return f'league_insights:{year}'
+
+
+def _store_snapshot(key: str, insights: Dict) -> None:
+    payload = dict(insights, updated_at=insights['updated_at'].isoformat())
+    snapshot = db.session.execute(
+        select(DashboardSnapshot).where(DashboardSnapshot.key == key)
+    ).scalar_one_or_none()
+    if snapshot is None:
+        snapshot = DashboardSnapshot(key=key)
+        db.session.add(snapshot)
+    snapshot.payload = payload
+    snapshot.computed_at = insights['updated_at']
+    db.session.commit()
+
+
+def _load_snapshot(snapshot: DashboardSnapshot) -> Dict:
+    insights = dict(snapshot.payload)
+    insights['updated_at'] = datetime.fromisoformat(insights['updated_at'])
+    return insights
+
+
+def refresh_league_insights() -> Dict:
+    """Recompute insights and store them as the current snapshot."""
+    insights = build_league_insights()
+    _store_snapshot(_snapshot_key(insights['current_year']), insights)
+    return insights
+
+
+def get_league_insights() -> Dict:
+    """Return dashboard insights, preferring a fresh snapshot."""
+    now = datetime.now(timezone.utc)
+    ttl = float(current_app.config.get('DASHBOARD_SNAPSHOT_TTL', 900))
+    snapshot = db.session.execute(
+        select(DashboardSnapshot).where(DashboardSnapshot.key == _snapshot_key(now.year))
+    ).scalar_one_or_none()
+
+    if snapshot is not None and snapshot.computed_at is not None:
+        computed_at = snapshot.computed_at
+        if computed_at.tzinfo is None:
+            computed_at = computed_at.replace(tzinfo=timezone.utc)
+        if (now - computed_at).total_seconds() < ttl:
+            return _load_snapshot(snapshot)
+
+    return refresh_league_insights()
+
+
+def invalidate_league_insights() -> None:
+    """Drop stored insight snapshots so the next dashboard load recomputes."""
+    db.session.execute(
+        DashboardSnapshot.__table__.delete().where(DashboardSnapshot.key.like('league_insights:%'))
+    )
+    db.session.commit()
+
+
+on_legacy_commit(INSIGHTS_SOURCE_TABLES, invalidate_league_insights)
+
+
+__all__ = [
+    'AVERAGE_MATCH_REVENUE_USD',
+    'build_league_insights',
+    'get_league_insights',
+    'refresh_league_insights',
+    'invalidate_league_insights',
+]
@@ -1,43 +1,106 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Mapping, Sequence, Union
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Set, Tuple, Union
 
 from flask import g
 from sqlalchemy import text
 
 from slms.extensions import db
+from slms.services.query_profiler import note_legacy_execute
 from sqlalchemy import text as _text, inspect
 
 ParamType = Union[Sequence[Any], Mapping[str, Any], Any]
 
+_WRITE_TABLE_RE = re.compile(
+    r'^\s*(?:insert\s+into|update|delete\s+from)\s+"?(\w+)"?',
+    re.IGNORECASE,
+)
+
+# Distinct (query, parameter shape) pairs whose rewritten TextClause is kept
+STATEMENT_CACHE_SIZE = 2048
+
+# (tables, callback) pairs notified after a legacy-cursor commit touching those tables
+_commit_listeners: List[Tuple[frozenset, Callable[[], None]]] = []
+
+
+def on_legacy_commit(tables: Iterable[str], callback: Callable[[], None]) -> None:
+    """Call ``callback`` after a commit that included writes to any of ``tables``."""
+    _commit_listeners.append((frozenset(t.lower() for t in tables), callback))
+
+
+def _written_table(query: str) -> str | None:
+    match = _WRITE_TABLE_RE.match(query)
+    return match.group(1).lower() if match else None
+
 
 class DatabaseWrapper:
     """Lightweight helper that mimics the previous DB-API connection pattern."""
 
     def __init__(self) -> None:
         self._session = db.session
+        self._written_tables: Set[str] = set()
 
     def cursor(self) -> "SessionCursor":
-        return SessionCursor(self._session)
+        return SessionCursor(self._session, self._written_tables)
 
     def commit(self) -> None:
         self._session.commit()
+        written = set(self._written_tables)
+        self._written_tables.clear()
+        if written:
+            for tables, callback in _commit_listeners:
+                if tables & written:
+                    try:
+                        callback()
+                    except Exception:
+                        # Listeners are best-effort; the caller's commit already succeeded
+                        self._session.rollback()
 
     def rollback(self) -> None:
         self._session.rollback()
+        self._written_tables.clear()
 
     def close(self) -> None:
         self._session.close()
 
 
 class SessionCursor:
-    def __init__(self, session) -> None:
+    def __init__(self, session, written_tables: Set[str] | None = None) -> None:
         self._session = session
         self._result = None
+        self._written_tables = written_tables
 
     def execute(self, query: str, params: ParamType = None):
         statement, bind_params = _prepare_statement(query, params)
+        note_legacy_execute()
         self._result = self._session.execute(statement, bind_params)
+        if self._written_tables is not None:
+            table = _written_table(query)
+            if table:
+                self._written_tables.add(table)
+        return self._result
+
+    def executemany(self, query: str, seq_of_params: Iterable[ParamType]):
+        """Run ``query`` once per parameter set in a single batched execute."""
+        param_sets = list(seq_of_params)
+        if not param_sets:
+            self._result = None
+            return None
+        shape = _param_shape(param_sets[0])
+        statement, names = _compile_statement(query, shape)
+        batch = []
+        for params in param_sets:
+            if _param_shape(params) != shape:
+                raise ValueError("All parameter sets passed to executemany must have the same shape.")
+            batch.append(_bind_params(names, params))
+        note_legacy_execute()
+        self._result = self._session.execute(statement, batch)
+        if self._written_tables is not None:
+            table = _written_table(query)
+            if table:
+                self._written_tables.add(table)
         return self._result
 
     def fetchone(self):
@@ -59,32 +122,59 @@ class SessionCursor:
         self._result = None
 
 
-def _prepare_statement(query: str, params: ParamType = None):
+def _param_shape(params: ParamType) -> Tuple[str, Any]:
+    """Cache key for how ``params`` binds: no params, named keys, or a positional count."""
     if params is None:
-        return text(query), {}
-
+        return ("none", None)
     if isinstance(params, Mapping):
-        bind_params: Dict[str, Any] = {}
-        new_query = query
-        for key, value in params.items():
-            placeholder = f"%({key})s"
-            new_query = new_query.replace(placeholder, f":{key}")
-            bind_params[key] = value
-        return text(new_query), bind_params
-
+        return ("named", tuple(sorted(params)))
     if not isinstance(params, Sequence) or isinstance(params, (str, bytes)):
-        params = (params,)
+        return ("positional", 1)
+    return ("positional", len(params))
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _compile_statement(query: str, shape: Tuple[str, Any]):
+    """Rewrite ``%s``/``%(name)s`` placeholders once per (query, shape).
+
+    Returns the ``TextClause`` and the bind names in parameter order (the
+    mapping keys for named parameters).
+    """
+    kind, detail = shape
+    if kind == "none":
+        return text(query), ()
+
+    if kind == "named":
+        new_query = query
+        for key in detail:
+            new_query = new_query.replace(f"%({key})s", f":{key}")
+        return text(new_query), detail
 
     parts = query.split("%s")
-    if len(parts) - 1 != len(params):
+    if len(parts) - 1 != detail:
         raise ValueError("Mismatched placeholders and parameters in query.")
 
-    bind_params = {f"param_{idx}": value for idx, value in enumerate(params)}
+    names = tuple(f"param_{idx}" for idx in range(detail))
     new_query = "".join(
-        part + (f":param_{idx}" if idx < len(params) else "")
+        part + (f":{names[idx]}" if idx < detail else "")
         for idx, part in enumerate(parts)
     )
-    return text(new_query), bind_params
+    return text(new_query), names
+
+
+def _bind_params(names: Tuple[str, ...], params: ParamType) -> Dict[str, Any]:
+    if params is None:
+        return {}
+    if isinstance(params, Mapping):
+        return dict(params)
+    if not isinstance(params, Sequence) or isinstance(params, (str, bytes)):
+        params = (params,)
+    return dict(zip(names, params))
+
+
+def _prepare_statement(query: str, params: ParamType = None):
+    statement, names = _compile_statement(query, _param_shape(params))
+    return statement, _bind_params(names, params)
 
 
 def get_db() -> DatabaseWrapper:
@@ -100,7 +190,7 @@ def close_db(_: Exception | None = None) -> None:
     db.session.remove()
 
 
-__all__ = ["get_db", "close_db", "DatabaseWrapper"]
+__all__ = ["get_db", "close_db", "DatabaseWrapper", "on_legacy_commit"]
 
 
 
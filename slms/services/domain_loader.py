@@ -2,7 +2,7 @@
 
 from flask import request, g
 from slms.extensions import db
-from slms.models.models import Organization
+from slms.services.tenant_registry import get_tenant_registry
 import json
 
 
@@ -17,25 +17,19 @@ def load_org_by_domain():
     if ':' in host:
         host = host.split(':')[0]
 
-    # Try to find org by custom domain
-    org = Organization.query.filter(
-        Organization.custom_domain == host,
-        Organization.is_active == True
-    ).first()
+    registry = get_tenant_registry()
 
-    if org:
-        return org, 'custom_domain'
+    # Try to find org by custom domain
+    snapshot = registry.get_by_domain(host)
+    if snapshot and snapshot['is_active']:
+        return registry.attach(snapshot), 'custom_domain'
 
     # Check if it's a subdomain pattern (e.g., myorg.sportslms.com)
     if '.' in host:
         subdomain = host.split('.')[0]
-        org = Organization.query.filter(
-            Organization.slug == subdomain,
-            Organization.is_active == True
-        ).first()
-
-        if org:
-            return org, 'subdomain'
+        snapshot = registry.get_by_slug(subdomain)
+        if snapshot and snapshot['is_active']:
+            return registry.attach(snapshot), 'subdomain'
 
     # Fall back to slug in URL path or session
     return None, None
@@ -181,7 +175,7 @@ def get_org_stats(org):
     """
     Get organization statistics for display.
     """
-    from slms.models.models import Team, Game, Player, Season
+    from slms.services.org_counters import get_org_counters
 
     stats = {
         'teams': 0,
@@ -191,10 +185,11 @@ def get_org_stats(org):
     }
 
     if org:
-        stats['teams'] = Team.query.filter_by(org_id=org.id).count()
-        stats['games'] = Game.query.filter_by(org_id=org.id).count()
-        stats['players'] = Player.query.filter_by(org_id=org.id).count()
-        stats['seasons'] = Season.query.filter_by(org_id=org.id, is_active=True).count()
+        counters = get_org_counters(org.id)
+        stats['teams'] = counters['teams']
+        stats['games'] = counters['games']
+        stats['players'] = counters['players']
+        stats['seasons'] = counters['active_seasons']
 
     return stats
 
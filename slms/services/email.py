@@ -1,4 +1,10 @@
-"""Email service for sending transactional emails."""
+"""Email service for sending transactional emails.
+
+Messages are built in the request (they need ``url_for``), then handed to
+the RQ ``email`` queue, so the SMTP round trips never hold a web worker.
+``TRANSACTIONAL_EMAIL_BACKEND=inline`` sends in place instead, which is
+also the fallback when the queue cannot be reached.
+"""
 
 from __future__ import annotations
 
@@ -94,6 +100,22 @@ This is an automated message, please do not reply.
 
 
 def _send_email(to_email: str, subject: str, html_body: str, text_body: str) -> bool:
+    """Queue an email for delivery, or log it while email is disabled."""
+    if os.getenv('EMAIL_ENABLED', 'false').lower() != 'true':
+        return deliver_email(to_email, subject, html_body, text_body)
+
+    if current_app.config.get('TRANSACTIONAL_EMAIL_BACKEND', 'rq') == 'rq':
+        try:
+            from slms.services.queue import queue_service
+            queue_service.enqueue_transactional_email(to_email, subject, html_body, text_body)
+            return True
+        except Exception as e:
+            # A reset link that never arrives is worse than a slow request
+            current_app.logger.warning(f"Could not queue email to {to_email}, sending inline: {e}")
+    return deliver_email(to_email, subject, html_body, text_body)
+
+
+def deliver_email(to_email: str, subject: str, html_body: str, text_body: str) -> bool:
     """
     Send email using configured email service.
 
@@ -125,6 +147,7 @@ def _send_email(to_email: str, subject: str, html_body: str, text_body: str) ->
     try:
         smtp_host = os.getenv('SMTP_HOST')
         smtp_port = int(os.getenv('SMTP_PORT', 587))
+        smtp_timeout = float(os.getenv('SMTP_TIMEOUT', 15))
         smtp_user = os.getenv('SMTP_USER')
         smtp_password = os.getenv('SMTP_PASSWORD')
         from_email = os.getenv('FROM_EMAIL', 'noreply@example.com')
@@ -150,7 +173,7 @@ def _send_email(to_email: str, subject: str, html_body: str, text_body: str) ->
         msg.attach(part2)
 
         # Send email
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
+        with smtplib.SMTP(smtp_host, smtp_port, timeout=smtp_timeout) as server:
             server.starttls()
             server.login(smtp_user, smtp_password)
             server.send_message(msg)
@@ -237,4 +260,4 @@ This is an automated security notification.
         return False
 
 
-__all__ = ["send_password_reset_email", "send_security_alert"]
+__all__ = ["send_password_reset_email", "send_security_alert", "deliver_email"]
@@ -0,0 +1,165 @@
+"""Compiled, cached rendering of email templates."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from flask import current_app
+from jinja2 import Template, TemplateNotFound
+
+from slms.services.branding import get_branding_context
+
+if TYPE_CHECKING:
+    from jinja2 import Environment
+    from slms.models import Organization
+
+
+DEFAULT_ORG_NAME = 'Sports League Management'
+
+# Keys supplied by the renderer itself; hidden from the fallback body listing.
+_SHARED_KEYS = {'organization', 'org_name', 'base_url', 'template_key', 'subject'}
+
+_FALLBACK_TEMPLATE = Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>{{ subject }}</title>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                .header { background: #007bff; color: white; padding: 20px; text-align: center; }
+                .content { padding: 20px; background: #f8f9fa; }
+                .footer { padding: 10px; text-align: center; color: #666; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>{{ org_name }}</h1>
+                </div>
+                <div class="content">
+                    <h2>{{ template_key.replace('_', ' ').title() }}</h2>
+                    <p>This is an automated message from {{ org_name }}.</p>
+                    {% for key, value in fields %}
+                        <p><strong>{{ key.replace('_', ' ').title() }}:</strong> {{ value }}</p>
+                    {% endfor %}
+                </div>
+                <div class="footer">
+                    <p>© {{ org_name }}. This is an automated email.</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """)
+
+
+class EmailRenderer:
+    """Render ``email/<template_key>.html`` templates for many recipients.
+
+    Templates are looked up and compiled once per key, and the organization
+    branding variables are resolved once per organization version, so each
+    message only pays for rendering its own context.
+    """
+
+    def __init__(self, max_orgs: int = 256):
+        self.max_orgs = max_orgs
+        self._templates: Dict[str, Optional[Template]] = {}
+        self._org_fragments: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_template(self, template_key: str) -> Optional[Template]:
+        """Return the compiled template for a key, or None if it doesn't exist."""
+        env: Environment = current_app.jinja_env
+        template = self._templates.get(template_key, False)
+        if template is not False:
+            if template is None or not env.auto_reload or template.is_up_to_date:
+                return template
+
+        try:
+            template = env.get_template(f'email/{template_key}.html')
+        except TemplateNotFound:
+            template = None
+
+        with self._lock:
+            self._templates[template_key] = template
+        return template
+
+    def get_org_fragment(self, org: Organization | None) -> Dict:
+        """Return the static per-organization variables shared by every message."""
+        base_url = current_app.config.get('BASE_URL', 'http://localhost:5000')
+        if org is None:
+            return {'org_name': DEFAULT_ORG_NAME, 'base_url': base_url}
+
+        key = (org.id, org.updated_at, base_url)
+        with self._lock:
+            fragment = self._org_fragments.get(key)
+            if fragment is not None:
+                self._org_fragments.move_to_end(key)
+                return fragment
+
+        fragment = dict(get_branding_context(org))
+        fragment.update({
+            'org_name': org.name or DEFAULT_ORG_NAME,
+            'base_url': base_url,
+        })
+
+        with self._lock:
+            self._org_fragments[key] = fragment
+            while len(self._org_fragments) > self.max_orgs:
+                self._org_fragments.popitem(last=False)
+        return fragment
+
+    def render(self, template_key: str, context: Dict | None = None,
+               org: Organization | None = None, subject: str | None = None) -> str:
+        """Render a single message."""
+        return self.render_many(template_key, [context or {}], org=org, subject=subject)[0]
+
+    def render_many(self, template_key: str, contexts: Iterable[Dict],
+                    org: Organization | None = None, subject: str | None = None) -> List[str]:
+        """Render one message per context, sharing template and org lookups."""
+        template = self.get_template(template_key)
+        fragment = self.get_org_fragment(org)
+        shared = dict(fragment, organization=org)
+
+        rendered = []
+        for context in contexts:
+            context = context or {}
+            variables = {**shared, **context}
+            if template is not None:
+                try:
+                    rendered.append(template.render(variables))
+                    continue
+                except Exception:
+                    pass
+            rendered.append(self._render_fallback(template_key, variables, context, subject))
+        return rendered
+
+    def clear(self, org_id: str | None = None) -> None:
+        """Drop cached templates and org fragments (or only one org's fragments)."""
+        with self._lock:
+            if org_id is None:
+                self._templates.clear()
+                self._org_fragments.clear()
+                return
+            for key in [k for k in self._org_fragments if k[0] == org_id]:
+                del self._org_fragments[key]
+
+    def _render_fallback(self, template_key: str, variables: Dict, context: Dict,
+                         subject: str | None) -> str:
+        fields = [(key, value) for key, value in context.items() if key not in _SHARED_KEYS]
+        return _FALLBACK_TEMPLATE.render(
+            subject=subject or template_key,
+            template_key=template_key,
+            org_name=variables.get('org_name', DEFAULT_ORG_NAME),
+            fields=fields,
+        )
+
+
+# Global renderer instance
+email_renderer = EmailRenderer()
+
+
+__all__ = ['EmailRenderer', 'email_renderer']
@@ -6,15 +6,13 @@ import os
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
-from flask import current_app, render_template, g
-from jinja2 import Template
-
 from slms.extensions import db
 from slms.models import EmailMessage, EmailStatus, EmailType
 from slms.blueprints.common.tenant import get_current_org
+from slms.services.email_renderer import email_renderer
 
 
 class EmailerError(Exception):
@@ -31,6 +29,7 @@ class EmailService:
         self.smtp_username = os.getenv('SMTP_USERNAME')
         self.smtp_password = os.getenv('SMTP_PASSWORD')
         self.smtp_use_tls = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+        self.smtp_timeout = float(os.getenv('SMTP_TIMEOUT', 15))
         self.from_email = os.getenv('FROM_EMAIL', self.smtp_username)
         self.from_name = os.getenv('FROM_NAME', 'Sports League Management')
 
@@ -88,7 +87,7 @@ class EmailService:
 
         try:
             # Render template
-            html_content = self._render_template(template_key, context)
+            html_content = self._render_template(template_key, context, subject=subject)
             email_message.html_content = html_content
             email_message.status = EmailStatus.SENDING
 
@@ -117,65 +116,13 @@ class EmailService:
             db.session.commit()
             raise EmailerError(f"Failed to send email: {str(e)}")
 
-    def _render_template(self, template_key: str, context: Dict) -> str:
+    def _render_template(self, template_key: str, context: Dict, subject: str = None) -> str:
         """Render email template with context."""
-        try:
-            # Add common context variables
-            org = get_current_org()
-            context.update({
-                'organization': org,
-                'org_name': org.name if org else 'Sports League Management',
-                'base_url': current_app.config.get('BASE_URL', 'http://localhost:5000')
-            })
-
-            # Try to render from templates/email/ directory
-            template_path = f'email/{template_key}.html'
-            return render_template(template_path, **context)
-
-        except Exception as e:
-            # Fallback to simple template
-            return self._render_fallback_template(template_key, context)
-
-    def _render_fallback_template(self, template_key: str, context: Dict) -> str:
-        """Render a basic fallback template."""
-        fallback_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>{{ subject }}</title>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                .header { background: #007bff; color: white; padding: 20px; text-align: center; }
-                .content { padding: 20px; background: #f8f9fa; }
-                .footer { padding: 10px; text-align: center; color: #666; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>{{ org_name }}</h1>
-                </div>
-                <div class="content">
-                    <h2>{{ template_key.replace('_', ' ').title() }}</h2>
-                    <p>This is an automated message from {{ org_name }}.</p>
-                    {% for key, value in context.items() %}
-                        {% if key not in ['organization', 'org_name', 'base_url'] %}
-                            <p><strong>{{ key.replace('_', ' ').title() }}:</strong> {{ value }}</p>
-                        {% endif %}
-                    {% endfor %}
-                </div>
-                <div class="footer">
-                    <p>© {{ org_name }}. This is an automated email.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return email_renderer.render(template_key, context, org=get_current_org(), subject=subject)
 
-        template = Template(fallback_template)
-        return template.render(**context)
+    def render_batch(self, template_key: str, contexts: List[Dict], subject: str = None) -> List[str]:
+        """Render the same template for many recipients in one call."""
+        return email_renderer.render_many(template_key, contexts, org=get_current_org(), subject=subject)
 
     def _send_smtp_email(self, to_email: str, subject: str, html_content: str, to_name: str = None):
         """Send email via SMTP."""
@@ -190,7 +137,7 @@ class EmailService:
 
         # Send email
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
+            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.smtp_timeout) as server:
                 if self.smtp_use_tls:
                     server.starttls()
                 server.login(self.smtp_username, self.smtp_password)
@@ -315,6 +262,37 @@ def send_game_reminder(game_id: str, to_email: str, to_name: str = None):
     )
 
 
+def send_game_reminder_digest(game_ids, to_email: str, to_name: str = None):
+    """Send a single reminder email covering several upcoming games."""
+    from slms.models import Game
+
+    games = (
+        db.session.query(Game)
+        .filter(Game.id.in_(list(game_ids)))
+        .order_by(Game.start_time)
+        .all()
+    )
+    if not games:
+        raise EmailerError("Games not found")
+
+    if len(games) == 1:
+        return send_game_reminder(games[0].id, to_email=to_email, to_name=to_name)
+
+    context = {
+        'games': games,
+        'game_count': len(games),
+    }
+
+    return send_email(
+        to_email=to_email,
+        subject=f"Game Reminder - {len(games)} games tomorrow",
+        template_key='game_reminder_digest',
+        context=context,
+        to_name=to_name,
+        email_type=EmailType.GAME_REMINDER
+    )
+
+
 def send_game_recap(game_id: str, to_email: str, to_name: str = None):
     """Send post-game recap email."""
     from slms.models import Game
@@ -351,5 +329,6 @@ __all__ = [
     'send_email',
     'send_registration_confirmation',
     'send_game_reminder',
+    'send_game_reminder_digest',
     'send_game_recap'
 ]
\ No newline at end of file
@@ -0,0 +1,298 @@
+"""Local statistical anomaly detection for league expenses.
+
+Replaces the per-expense LLM round trip in the finance hub with a
+deterministic engine. For every league the detector keeps running
+statistics per category and per (category, vendor): Welford mean and
+variance plus a bounded window of recent amounts for the median, MAD and
+interquartile range. It also keeps a ring of recent (day, amount, vendor)
+entries for duplicate detection. Scoring a new expense runs a few NumPy
+operations over those arrays.
+
+State is per process. It is primed from the ledger on first use for a
+league, updated as expenses are added, and re-primed after
+``EXPENSE_ANOMALY_STATE_TTL`` seconds so workers converge on deletes and on
+writes made by other processes.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+from slms.services.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+# Observations required before amount statistics are trusted
+MIN_HISTORY = 5
+# Window kept per statistics group for median/MAD/IQR
+WINDOW_SIZE = 256
+# Recent expenses kept per league for duplicate-burst checks
+RECENT_SIZE = 512
+# Same-amount expenses within this many days count as a burst
+DUPLICATE_WINDOW_DAYS = 7
+
+# Scores at or above this flag the expense as anomalous
+ANOMALY_THRESHOLD = 0.5
+
+_MAD_SCALE = 0.6745  # makes MAD-based z comparable to a normal z-score
+
+
+def _normalize_vendor(vendor: Any) -> Optional[str]:
+    if not vendor:
+        return None
+    normalized = ' '.join(str(vendor).lower().split())
+    return normalized or None
+
+
+def _day_ordinal(value: Any) -> int:
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if value:
+        try:
+            return date.fromisoformat(str(value)[:10]).toordinal()
+        except ValueError:
+            pass
+    return date.today().toordinal()
+
+
+class _RunningStats:
+    """Welford mean/variance plus a bounded window for robust statistics."""
+
+    __slots__ = ('count', 'mean', 'm2', '_window', '_size', '_pos', '_robust')
+
+    def __init__(self, window: int = WINDOW_SIZE):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._window = np.empty(window, dtype=np.float64)
+        self._size = 0
+        self._pos = 0
+        self._robust: Optional[Tuple[float, float, float, float]] = None
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        self._window[self._pos] = value
+        self._pos = (self._pos + 1) % self._window.shape[0]
+        self._size = min(self._size + 1, self._window.shape[0])
+        self._robust = None
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def robust(self) -> Tuple[float, float, float, float]:
+        """Return ``(median, mad, q1, q3)`` over the window (cached until the next push)."""
+        if self._robust is None:
+            values = self._window[:self._size]
+            median = float(np.median(values))
+            mad = float(np.median(np.abs(values - median)))
+            q1, q3 = (float(q) for q in np.percentile(values, [25, 75]))
+            self._robust = (median, mad, q1, q3)
+        return self._robust
+
+
+class _LeagueState:
+    __slots__ = ('groups', 'vendors', 'recent_days', 'recent_amounts', 'recent_vendors',
+                 '_recent_size', '_recent_pos', 'primed_at')
+
+    def __init__(self):
+        self.groups: Dict[Tuple[str, Optional[str]], _RunningStats] = {}
+        self.vendors: set = set()
+        self.recent_days = np.zeros(RECENT_SIZE, dtype=np.int64)
+        self.recent_amounts = np.zeros(RECENT_SIZE, dtype=np.int64)
+        self.recent_vendors = np.zeros(RECENT_SIZE, dtype=np.int64)
+        self._recent_size = 0
+        self._recent_pos = 0
+        self.primed_at = time.monotonic()
+
+    def observe(self, category: str, vendor: Optional[str], amount_cents: int, day: int) -> None:
+        for key in ((category, None), (category, vendor)) if vendor else ((category, None),):
+            stats = self.groups.get(key)
+            if stats is None:
+                stats = self.groups[key] = _RunningStats()
+            stats.push(float(amount_cents))
+        if vendor:
+            self.vendors.add(vendor)
+
+        pos = self._recent_pos
+        self.recent_days[pos] = day
+        self.recent_amounts[pos] = amount_cents
+        self.recent_vendors[pos] = hash(vendor) if vendor else 0
+        self._recent_pos = (pos + 1) % RECENT_SIZE
+        self._recent_size = min(self._recent_size + 1, RECENT_SIZE)
+
+    def recent(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        size = self._recent_size
+        return self.recent_days[:size], self.recent_amounts[:size], self.recent_vendors[:size]
+
+
+def _amount_signal(stats: Optional[_RunningStats], amount: float, label: str) -> Tuple[float, List[str]]:
+    """Score an amount against a statistics group (robust z first, then IQR fence)."""
+    if stats is None or stats.count < MIN_HISTORY:
+        return 0.0, []
+
+    median, mad, q1, q3 = stats.robust()
+    if mad > 0:
+        z = _MAD_SCALE * (amount - median) / mad
+    elif stats.std > 0:
+        z = (amount - stats.mean) / stats.std
+    else:
+        # Constant history: only an amount above it is unusual
+        z = math.inf if amount > median else 0.0
+
+    score = float(np.clip((z - 2.0) / 4.0, 0.0, 1.0)) if z > 0 else 0.0
+    reasons = []
+    if score > 0:
+        if math.isinf(z):
+            reasons.append(f'Amount exceeds every previous {label} expense (${median / 100:.2f})')
+        else:
+            reasons.append(f'Amount is {z:.1f} deviations above the typical {label} expense (${median / 100:.2f})')
+
+    iqr = q3 - q1
+    if iqr > 0 and amount > q3 + 3 * iqr and score < 0.8:
+        score = 0.8
+        reasons.append(f'Amount is far outside the usual {label} range (${q1 / 100:.2f}-${q3 / 100:.2f})')
+    return score, reasons
+
+
+class ExpenseAnomalyDetector:
+    """Per-league expense statistics and scoring."""
+
+    def __init__(self, state_ttl: float = 600.0):
+        self.state_ttl = state_ttl
+        self._leagues: Dict[Any, _LeagueState] = {}
+        self._lock = threading.Lock()
+
+    def is_primed(self, league_id) -> bool:
+        """Return whether a league has fresh in-memory statistics."""
+        state = self._leagues.get(league_id)
+        return state is not None and (time.monotonic() - state.primed_at) < self.state_ttl
+
+    def prime(self, league_id, expenses: Iterable[Dict]) -> None:
+        """Replace a league's statistics with ``expenses`` (oldest first)."""
+        state = _LeagueState()
+        for expense in expenses:
+            state.observe(
+                expense.get('category') or 'other',
+                _normalize_vendor(expense.get('vendor')),
+                int(expense.get('amount_cents') or 0),
+                _day_ordinal(expense.get('date')),
+            )
+        with self._lock:
+            self._leagues[league_id] = state
+
+    def observe(self, league_id, expense: Dict) -> None:
+        """Fold a newly recorded expense into a primed league's statistics."""
+        state = self._leagues.get(league_id)
+        if state is None:
+            return
+        with self._lock:
+            state.observe(
+                expense.get('category') or 'other',
+                _normalize_vendor(expense.get('vendor')),
+                int(expense.get('amount_cents') or 0),
+                _day_ordinal(expense.get('date')),
+            )
+
+    def invalidate(self, league_id=None) -> None:
+        """Drop statistics for one league (or all) so they are re-primed."""
+        with self._lock:
+            if league_id is None:
+                self._leagues.clear()
+            else:
+                self._leagues.pop(league_id, None)
+
+    def score(self, league_id, expense: Dict) -> Dict:
+        """Score a candidate expense.
+
+        Returns the same shape as the LLM detector (``is_anomaly``,
+        ``anomaly_score``, ``reasons``) plus the per-signal scores.
+        """
+        state = self._leagues.get(league_id)
+        category = expense.get('category') or 'other'
+        vendor = _normalize_vendor(expense.get('vendor'))
+        amount_cents = int(expense.get('amount_cents') or 0)
+        amount = float(amount_cents)
+
+        if state is None or not state.groups:
+            return {
+                'is_anomaly': False,
+                'anomaly_score': 0.0,
+                'reasons': ['Insufficient historical data'],
+                'signals': {},
+            }
+
+        signals: Dict[str, float] = {}
+        reasons: List[str] = []
+
+        category_stats = state.groups.get((category, None))
+        if category_stats is None:
+            reasons.append(f'First expense in category: {category}')
+        signals['category_amount'], found = _amount_signal(category_stats, amount, category)
+        reasons.extend(found)
+
+        if vendor:
+            signals['vendor_amount'], found = _amount_signal(
+                state.groups.get((category, vendor)), amount, f'{category} expense from this vendor'
+            )
+            reasons.extend(found)
+
+            total_seen = sum(stats.count for (cat, v), stats in state.groups.items() if v is None)
+            if vendor not in state.vendors and total_seen >= MIN_HISTORY:
+                signals['vendor_novelty'] = 0.3
+                reasons.append('New vendor for this league')
+
+        days, amounts, vendors = state.recent()
+        if days.size:
+            recent_same = (amounts == amount_cents) & (days >= _day_ordinal(expense.get('date')) - DUPLICATE_WINDOW_DAYS)
+            same_amount = int(np.count_nonzero(recent_same))
+            if same_amount:
+                same_vendor = int(np.count_nonzero(recent_same & (vendors == hash(vendor)))) if vendor else 0
+                if same_vendor:
+                    signals['duplicate'] = float(min(1.0, 0.75 + 0.1 * (same_vendor - 1)))
+                    reasons.append(
+                        f'{same_vendor} expense(s) with the same amount and vendor in the last {DUPLICATE_WINDOW_DAYS} days'
+                    )
+                else:
+                    signals['duplicate'] = float(min(0.6, 0.3 + 0.1 * same_amount))
+                    reasons.append(
+                        f'{same_amount} expense(s) with the same amount in the last {DUPLICATE_WINDOW_DAYS} days'
+                    )
+
+        anomaly_score = max(signals.values(), default=0.0)
+        return {
+            'is_anomaly': anomaly_score >= ANOMALY_THRESHOLD,
+            'anomaly_score': round(anomaly_score, 3),
+            'reasons': reasons,
+            'signals': signals,
+        }
+
+
+def get_expense_anomaly_detector() -> ExpenseAnomalyDetector:
+    """Return the detector for the current app, creating it on first use."""
+    detector = current_app.extensions.get('expense_anomaly_detector')
+    if detector is None:
+        detector = ExpenseAnomalyDetector(
+            state_ttl=float(current_app.config.get('EXPENSE_ANOMALY_STATE_TTL', 600))
+        )
+        current_app.extensions['expense_anomaly_detector'] = detector
+    return detector
+
+
+__all__ = [
+    'ANOMALY_THRESHOLD',
+    'ExpenseAnomalyDetector',
+    'get_expense_anomaly_detector',
+]
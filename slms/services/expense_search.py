@@ -0,0 +1,370 @@
+"""Per-league BM25 search over the expense ledger.
+
+``/api/ai/search_expenses`` used to send the first 100 expenses to the LLM.
+Each league now gets an inverted index over expense description, vendor
+and category, ranked with BM25. Query terms are expanded with category
+synonyms ("refs" also matches ``officials``), and amount/date phrases such
+as "over $200", "between 50 and 100", "last month" or "in March 2024" become
+filters.
+
+Indexes live per process. New rows are pulled incrementally by
+``expense_id`` high-water mark on each search, deletes are applied
+directly, and an index is rebuilt after ``EXPENSE_SEARCH_INDEX_TTL`` seconds
+so workers converge on changes made elsewhere.
+"""
+
+from __future__ import annotations
+
+import calendar
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+# Field weights applied to term frequencies
+FIELD_WEIGHTS = {'description': 1.0, 'vendor': 1.5, 'category': 1.2}
+
+# Weight of a term added by synonym expansion relative to a typed term
+SYNONYM_WEIGHT = 0.6
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+CATEGORY_SYNONYMS = {
+    'officials': ('referee', 'ref', 'umpire', 'official', 'linesman', 'judge'),
+    'facilities': ('field', 'gym', 'venue', 'rental', 'pitch', 'court', 'arena', 'rink'),
+    'equipment': ('ball', 'net', 'goal', 'gear', 'cone', 'bib', 'pump'),
+    'uniforms': ('jersey', 'kit', 'apparel', 'shirt', 'sock', 'short'),
+    'marketing': ('ad', 'advertising', 'promo', 'promotion', 'flyer', 'social', 'banner'),
+    'travel': ('bus', 'gas', 'fuel', 'mileage', 'hotel', 'flight', 'transport'),
+    'admin': ('software', 'office', 'supply', 'postage', 'printing', 'subscription'),
+    'utilities': ('electricity', 'water', 'internet', 'power', 'light', 'lighting'),
+    'insurance': ('liability', 'coverage', 'policy', 'premium'),
+}
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'the', 'for', 'of', 'on', 'to', 'in', 'at', 'by', 'with',
+    'from', 'my', 'our', 'all', 'show', 'me', 'find', 'expense', 'expenses',
+    'spent', 'spend', 'spending', 'paid', 'cost', 'costs', 'what', 'which', 'did', 'we',
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_MONTHS = {name.lower(): index for index, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): index for index, name in enumerate(calendar.month_abbr) if name})
+
+_AMOUNT = r'\$?\s*(\d+(?:,\d{3})*(?:\.\d+)?)'
+_FILTER_PATTERNS = [
+    ('between', re.compile(rf'\bbetween\s+{_AMOUNT}\s+and\s+{_AMOUNT}')),
+    ('min', re.compile(rf'(?:\bover|\babove|\bmore than|\bat least|>=?)\s*{_AMOUNT}')),
+    ('max', re.compile(rf'(?:\bunder|\bbelow|\bless than|\bat most|<=?)\s*{_AMOUNT}')),
+    ('since', re.compile(r'\b(?:since|after)\s+(\d{4}-\d{2}-\d{2})')),
+    ('before', re.compile(r'\bbefore\s+(\d{4}-\d{2}-\d{2})')),
+    ('last_days', re.compile(r'\b(?:last|past)\s+(\d+)\s+days?\b')),
+    ('relative', re.compile(r'\b(this|last)\s+(month|year)\b')),
+    ('month', re.compile(r'\b(?:in\s+)?(' + '|'.join(sorted(_MONTHS, key=len, reverse=True)) + r')\b(?:\s+(\d{4}))?')),
+    ('year', re.compile(r'\b(?:in\s+)?((?:19|20)\d{2})\b')),
+]
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+# Stemmed synonym -> stemmed category term, and the reverse
+_SYNONYM_LOOKUP: Dict[str, str] = {}
+_CATEGORY_TERMS: Dict[str, Tuple[str, ...]] = {}
+for _category, _words in CATEGORY_SYNONYMS.items():
+    _CATEGORY_TERMS[_stem(_category)] = tuple(_stem(word) for word in _words)
+    for _word in _words:
+        _SYNONYM_LOOKUP[_stem(_word)] = _stem(_category)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, split, drop stopwords and strip simple plurals."""
+    if not text:
+        return []
+    return [
+        _stem(token)
+        for token in _TOKEN_RE.findall(str(text).lower())
+        if token not in _STOPWORDS
+    ]
+
+
+def _to_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if value:
+        try:
+            return date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _month_range(year: int, month: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def parse_query(query: str, today: Optional[date] = None) -> Tuple[str, Dict]:
+    """Split a query into free text and amount/date filters.
+
+    Returns ``(text, filters)`` where ``filters`` may hold ``min_cents``,
+    ``max_cents``, ``start`` and ``end`` (inclusive dates).
+    """
+    today = today or date.today()
+    text = ' ' + query.lower() + ' '
+    filters: Dict = {}
+
+    def cents(raw: str) -> int:
+        return int(round(float(raw.replace(',', '')) * 100))
+
+    for name, pattern in _FILTER_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        if name == 'between':
+            low, high = sorted((cents(match.group(1)), cents(match.group(2))))
+            filters['min_cents'], filters['max_cents'] = low, high
+        elif name == 'min':
+            filters.setdefault('min_cents', cents(match.group(1)))
+        elif name == 'max':
+            filters.setdefault('max_cents', cents(match.group(1)))
+        elif name == 'since':
+            filters['start'] = _to_date(match.group(1))
+        elif name == 'before':
+            parsed = _to_date(match.group(1))
+            filters['end'] = parsed - timedelta(days=1) if parsed else None
+        elif name == 'last_days':
+            filters['start'] = today - timedelta(days=int(match.group(1)))
+            filters['end'] = today
+        elif name == 'relative':
+            which, unit = match.groups()
+            if unit == 'year':
+                year = today.year if which == 'this' else today.year - 1
+                filters['start'], filters['end'] = date(year, 1, 1), date(year, 12, 31)
+            else:
+                year, month = today.year, today.month
+                if which == 'last':
+                    year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+                filters['start'], filters['end'] = _month_range(year, month)
+        elif name == 'month':
+            if 'start' in filters:
+                continue
+            month = _MONTHS[match.group(1)]
+            year = int(match.group(2)) if match.group(2) else today.year
+            filters['start'], filters['end'] = _month_range(year, month)
+        elif name == 'year':
+            if 'start' in filters:
+                continue
+            year = int(match.group(1))
+            filters['start'], filters['end'] = date(year, 1, 1), date(year, 12, 31)
+        text = text[:match.start()] + ' ' + text[match.end():]
+
+    return ' '.join(text.split()), {key: value for key, value in filters.items() if value is not None}
+
+
+class ExpenseSearchIndex:
+    """Inverted index with BM25 scoring for one league's expenses."""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.doc_lengths: Dict[int, float] = {}
+        self.rows: Dict[int, tuple] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self.total_length = 0.0
+        self.last_expense_id = 0
+        self.built_at = time.monotonic()
+
+    def add(self, row: tuple) -> None:
+        """Index an expense row (``expense_id, date, amount_cents, category, vendor, description, ...``)."""
+        expense_id, _exp_date, _amount, category, vendor, description = row[:6]
+        if expense_id in self.rows:
+            self.remove(expense_id)
+
+        weights: Dict[str, float] = defaultdict(float)
+        for field, value in (('description', description), ('vendor', vendor), ('category', category)):
+            for token in tokenize(value):
+                weights[token] += FIELD_WEIGHTS[field]
+
+        length = sum(weights.values())
+        for token, weight in weights.items():
+            self.postings[token][expense_id] = weight
+        self.doc_lengths[expense_id] = length
+        self._doc_terms[expense_id] = tuple(weights)
+        self.rows[expense_id] = row
+        self.total_length += length
+        self.last_expense_id = max(self.last_expense_id, expense_id)
+
+    def remove(self, expense_id: int) -> None:
+        if expense_id not in self.rows:
+            return
+        for token in self._doc_terms.pop(expense_id, ()):
+            docs = self.postings.get(token)
+            if docs is not None:
+                docs.pop(expense_id, None)
+                if not docs:
+                    del self.postings[token]
+        self.total_length -= self.doc_lengths.pop(expense_id, 0.0)
+        del self.rows[expense_id]
+
+    def _matches_filters(self, row: tuple, filters: Dict) -> bool:
+        amount = row[2] or 0
+        if 'min_cents' in filters and amount < filters['min_cents']:
+            return False
+        if 'max_cents' in filters and amount > filters['max_cents']:
+            return False
+        if 'start' in filters or 'end' in filters:
+            exp_date = _to_date(row[1])
+            if exp_date is None:
+                return False
+            if 'start' in filters and exp_date < filters['start']:
+                return False
+            if 'end' in filters and exp_date > filters['end']:
+                return False
+        return True
+
+    def _query_terms(self, text: str) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        for token in tokenize(text):
+            terms[token] = max(terms.get(token, 0.0), 1.0)
+            category = _SYNONYM_LOOKUP.get(token)
+            if category:
+                terms[category] = max(terms.get(category, 0.0), SYNONYM_WEIGHT)
+            for synonym in _CATEGORY_TERMS.get(token, ()):
+                terms.setdefault(synonym, SYNONYM_WEIGHT)
+        return terms
+
+    def search(self, query: str, limit: int = 50, today: Optional[date] = None) -> List[Tuple[tuple, float]]:
+        """Return ``(row, score)`` pairs, best first."""
+        text, filters = parse_query(query, today=today)
+        terms = self._query_terms(text)
+
+        if not terms:
+            # Filter-only query: newest matching expenses first
+            rows = [row for row in self.rows.values() if self._matches_filters(row, filters)]
+            rows.sort(key=lambda row: (str(row[1] or ''), row[0]), reverse=True)
+            return [(row, 0.0) for row in rows[:limit]]
+
+        doc_count = len(self.rows)
+        avg_length = (self.total_length / doc_count) if doc_count else 0.0
+        scores: Dict[int, float] = defaultdict(float)
+        for term, query_weight in terms.items():
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for expense_id, tf in docs.items():
+                norm = 1 - BM25_B + BM25_B * (self.doc_lengths[expense_id] / avg_length if avg_length else 1)
+                scores[expense_id] += query_weight * idf * (tf * (BM25_K1 + 1)) / (tf + BM25_K1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        results = []
+        for expense_id, score in ranked:
+            row = self.rows[expense_id]
+            if self._matches_filters(row, filters):
+                results.append((row, score))
+                if len(results) >= limit:
+                    break
+        return results
+
+
+_INDEX_QUERY = """
+    SELECT expense_id, expense_date, amount_cents, category, vendor_name,
+           description, payment_method, reference_number, tax_deductible
+    FROM league_expenses
+    WHERE league_id = %s AND expense_id > %s
+    ORDER BY expense_id
+"""
+
+
+class ExpenseSearchRegistry:
+    """Per-process collection of league indexes.
+
+    The lock only guards the in-memory indexes. Ledger rows are read outside
+    it, so one league's index load never stalls searches or invalidations
+    for the other leagues in the worker.
+    """
+
+    def __init__(self, ttl: float = 900.0):
+        self.ttl = ttl
+        self._indexes: Dict[int, ExpenseSearchIndex] = {}
+        # Bumped by removals and invalidations so a concurrent load knows its rows are stale
+        self._generations: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get_index(self, cur, league_id: int) -> ExpenseSearchIndex:
+        """Return the league's index after pulling rows added since the last call."""
+        while True:
+            with self._lock:
+                index = self._indexes.get(league_id)
+                if index is None or (time.monotonic() - index.built_at) >= self.ttl:
+                    index = self._indexes[league_id] = ExpenseSearchIndex()
+                since = index.last_expense_id
+                generation = self._generations[league_id]
+
+            cur.execute(_INDEX_QUERY, (league_id, since))
+            rows = cur.fetchall()
+
+            with self._lock:
+                if self._generations[league_id] != generation:
+                    # Expenses were removed while we read; the rows may include them
+                    continue
+                for row in rows:
+                    # Another request may have merged the same rows meanwhile
+                    if row[0] > index.last_expense_id:
+                        index.add(tuple(row))
+                return index
+
+    def remove(self, league_id: int, expense_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._generations[league_id] += 1
+            index = self._indexes.get(league_id)
+            if index is not None:
+                for expense_id in expense_ids:
+                    index.remove(expense_id)
+
+    def invalidate(self, league_id: Optional[int] = None) -> None:
+        with self._lock:
+            if league_id is None:
+                for key in set(self._indexes) | set(self._generations):
+                    self._generations[key] += 1
+                self._indexes.clear()
+            else:
+                self._generations[league_id] += 1
+                self._indexes.pop(league_id, None)
+
+
+def get_expense_search_registry() -> ExpenseSearchRegistry:
+    """Return the registry for the current app, creating it on first use."""
+    registry = current_app.extensions.get('expense_search')
+    if registry is None:
+        registry = ExpenseSearchRegistry(ttl=float(current_app.config.get('EXPENSE_SEARCH_INDEX_TTL', 900)))
+        current_app.extensions['expense_search'] = registry
+    return registry
+
+
+def search_expenses(cur, league_id: int, query: str, limit: int = 50) -> List[Tuple[tuple, float]]:
+    """Search a league's full expense ledger."""
+    return get_expense_search_registry().get_index(cur, league_id).search(query, limit=limit)
+
+
+__all__ = [
+    'CATEGORY_SYNONYMS',
+    'ExpenseSearchIndex',
+    'ExpenseSearchRegistry',
+    'get_expense_search_registry',
+    'parse_query',
+    'search_expenses',
+    'tokenize',
+]
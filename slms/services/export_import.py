@@ -10,20 +10,18 @@ from flask import current_app
 from sqlalchemy import inspect
 from sqlalchemy.orm import Query
 
-try:
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill
-    XLSX_AVAILABLE = True
-except ImportError:
-    XLSX_AVAILABLE = False
-
 from slms.extensions import db
+from slms.services.lazy import lazy_import, module_available
 from slms.models.models import (
     Organization, User, League, Season, Team, Player, Venue, Game,
     Coach, CoachAssignment, Referee, GameOfficials, Sponsor, Transaction,
     Registration, MediaAsset, Article, ContentAsset
 )
 
+XLSX_AVAILABLE = module_available('openpyxl')
+openpyxl = lazy_import('openpyxl')
+openpyxl_styles = lazy_import('openpyxl.styles')
+
 
 class ExportImportService:
     """Service for exporting and importing domain objects."""
@@ -136,8 +134,8 @@ class ExportImportService:
         sheet.title = model_name
 
         # Header styling
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = openpyxl_styles.PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header_font = openpyxl_styles.Font(bold=True, color="FFFFFF")
 
         # Write headers
         for col_idx, field in enumerate(fields, start=1):
@@ -402,8 +400,8 @@ class ExportImportService:
             sheet.title = model_name
 
             # Header styling
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF")
+            header_fill = openpyxl_styles.PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            header_font = openpyxl_styles.Font(bold=True, color="FFFFFF")
 
             # Write headers
             for col_idx, field in enumerate(fields, start=1):
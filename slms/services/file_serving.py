@@ -0,0 +1,124 @@
+"""Serving uploaded files, optionally offloaded to the front proxy.
+
+Uploads live under ``static/uploads`` and their URLs (``/static/uploads/...``)
+are stored on registrations, media assets and content assets. The
+``uploads`` endpoint registered here is more specific than Flask's
+``/static/<path:filename>`` rule, so it answers for every existing URL.
+
+Files written through the blob store are named after their SHA-256, so the
+bytes behind such a URL never change. They are served with
+``Cache-Control: public, max-age=31536000, immutable`` and the hash as a
+strong ETag. Older files with random names get ``UPLOAD_CACHE_MAX_AGE`` and
+a validator so browsers revalidate them.
+
+``UPLOAD_SERVE_MODE`` decides who sends the bytes:
+
+* ``app`` (default): Flask streams the file, with ETag, If-None-Match and
+  Range support from ``send_file``.
+* ``x-accel-redirect``: the response carries only headers plus
+  ``X-Accel-Redirect: <UPLOAD_ACCEL_PREFIX><path>``. nginx then serves the
+  file from an ``internal`` location aliased to ``static/uploads``.
+* ``x-sendfile``: the same, using the absolute path in ``X-Sendfile``
+  (Apache mod_xsendfile, lighttpd).
+
+In both proxy modes the worker is released as soon as the headers are
+written. Range requests and conditional GETs are answered by the proxy.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from flask import Flask, Response, abort, current_app, send_file
+from werkzeug.security import safe_join
+
+# URL path uploads are served under, relative to the static URL path
+UPLOADS_SUBDIR = 'uploads'
+# One year: the longest lifetime browsers honour
+IMMUTABLE_MAX_AGE = 31536000
+
+_CAS_NAME_RE = re.compile(r'^([0-9a-f]{64})(\.[A-Za-z0-9]+)?$')
+
+
+def content_hash(filename: str) -> str | None:
+    """SHA-256 a content-addressed upload is named after, or None for other files."""
+    parts = filename.split('/')
+    match = _CAS_NAME_RE.match(parts[-1])
+    # Blob store layout: <prefix>/<sha[:2]>/<sha>.<ext>
+    if match is None or len(parts) < 2 or parts[-2] != match.group(1)[:2]:
+        return None
+    return match.group(1)
+
+
+def _resolve(filename: str) -> Path:
+    if any(part.startswith('.') for part in filename.split('/')):
+        # .incoming and other dot-directories are never public
+        abort(404)
+    uploads_root = Path(current_app.static_folder) / UPLOADS_SUBDIR
+    joined = safe_join(str(uploads_root), filename)
+    if joined is None or not os.path.isfile(joined):
+        abort(404)
+    return Path(joined)
+
+
+def _cache_headers(response: Response, sha256: str | None) -> Response:
+    if sha256:
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = int(current_app.config.get('UPLOAD_CACHE_MAX_AGE', 3600))
+    return response
+
+
+def serve_upload(filename: str) -> Response:
+    """Send ``static/uploads/<filename>`` according to ``UPLOAD_SERVE_MODE``."""
+    path = _resolve(filename)
+    sha256 = content_hash(filename)
+    mode = current_app.config.get('UPLOAD_SERVE_MODE', 'app')
+
+    if mode in ('x-accel-redirect', 'x-sendfile'):
+        response = Response(status=200)
+        response.headers['Content-Type'] = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if mode == 'x-accel-redirect':
+            prefix = current_app.config.get('UPLOAD_ACCEL_PREFIX', '/_uploads/')
+            response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + filename
+        else:
+            response.headers['X-Sendfile'] = str(path.resolve())
+        if sha256:
+            response.set_etag(sha256)
+        # The proxy sends the body; Content-Length belongs to it
+        response.headers.pop('Content-Length', None)
+        return _cache_headers(response, sha256)
+
+    return send_cached_file(path, sha256)
+
+
+def send_cached_file(path: Path, sha256: str | None) -> Response:
+    """Stream ``path`` from the app, immutable when ``sha256`` names its content."""
+    response = send_file(path, conditional=True, etag=sha256 or True, max_age=None)
+    return _cache_headers(response, sha256)
+
+
+def init_upload_serving(app: Flask) -> None:
+    """Route ``/static/uploads/...`` through ``serve_upload``."""
+    if not app.has_static_folder:
+        return
+    app.add_url_rule(
+        f"{app.static_url_path}/{UPLOADS_SUBDIR}/<path:filename>",
+        endpoint='uploads',
+        view_func=serve_upload,
+    )
+
+
+__all__ = [
+    'IMMUTABLE_MAX_AGE',
+    'content_hash',
+    'send_cached_file',
+    'serve_upload',
+    'init_upload_serving',
+]
@@ -0,0 +1,283 @@
+"""Pre-aggregated ledger rollups for the league finance hub.
+
+Revenue, in-person payment and expense totals are kept per league, month
+and category in ``league_finance_rollups`` so the hub reads a handful of
+summary rows instead of aggregating every transaction a league has ever
+recorded. The finance hub handlers apply deltas in the same transaction as
+the ledger write; a league without a ``league_finance_rollup_state`` row is
+rebuilt from the ledgers on first read.
+
+Detail lists are paginated with keyset cursors over ``(date, id)`` so
+older pages cost the same as the first one.
+"""
+
+from __future__ import annotations
+
+import base64
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+REVENUE_LEDGER = 'revenue'
+IN_PERSON_LEDGER = 'in_person'
+EXPENSE_LEDGER = 'expense'
+
+# ledger -> (table, date column, category expression, extra filter)
+_LEDGER_SOURCES = {
+    REVENUE_LEDGER: ('league_revenue', 'transaction_date', 'revenue_type', "AND status = 'confirmed'"),
+    IN_PERSON_LEDGER: ('in_person_payments', 'payment_date', 'payment_method', ''),
+    EXPENSE_LEDGER: ('league_expenses', 'expense_date', 'category', ''),
+}
+
+DEFAULT_EXPENSE_PAGE_SIZE = 50
+DEFAULT_TRANSACTION_PAGE_SIZE = 10
+
+
+def ensure_finance_rollup_tables(cur) -> None:
+    """Create the rollup tables (caller commits)."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS league_finance_rollups (
+            league_id INTEGER NOT NULL REFERENCES leagues(league_id) ON DELETE CASCADE,
+            ledger VARCHAR(20) NOT NULL, -- 'revenue', 'in_person', 'expense'
+            period VARCHAR(7) NOT NULL, -- 'YYYY-MM'
+            category VARCHAR(100) NOT NULL,
+            amount_cents BIGINT NOT NULL DEFAULT 0,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (league_id, ledger, period, category)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS league_finance_rollup_state (
+            league_id INTEGER PRIMARY KEY REFERENCES leagues(league_id) ON DELETE CASCADE,
+            rebuilt_at TIMESTAMP
+        )
+    """)
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_league_revenue_keyset "
+        "ON league_revenue(league_id, transaction_date, revenue_id)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_league_expenses_keyset "
+        "ON league_expenses(league_id, expense_date, expense_id)"
+    )
+
+
+def _period(value: Any) -> str:
+    """Return the ``YYYY-MM`` period for a date, datetime or ISO date string."""
+    if value is None or value == '':
+        value = date.today()
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m')
+    return str(value)[:7]
+
+
+def _upsert(cur, league_id: int, ledger: str, period: str, category: str,
+            amount_cents: int, count: int) -> None:
+    cur.execute("""
+        INSERT INTO league_finance_rollups
+            (league_id, ledger, period, category, amount_cents, entry_count)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (league_id, ledger, period, category) DO UPDATE SET
+            amount_cents = league_finance_rollups.amount_cents + EXCLUDED.amount_cents,
+            entry_count = league_finance_rollups.entry_count + EXCLUDED.entry_count
+    """, (league_id, ledger, period, category, amount_cents, count))
+
+
+def record_finance_entry(cur, league_id: int, ledger: str, entry_date: Any,
+                         category: str | None, amount_cents: int, count: int = 1) -> None:
+    """Apply a ledger write to the rollups (caller commits).
+
+    Pass negative ``amount_cents`` and ``count`` to reverse a deleted entry.
+    """
+    _upsert(cur, league_id, ledger, _period(entry_date), category or 'other',
+            int(amount_cents or 0), count)
+
+
+def rebuild_finance_rollups(cur, league_id: int) -> None:
+    """Recompute a league's rollups from the ledger tables (caller commits)."""
+    cur.execute('DELETE FROM league_finance_rollups WHERE league_id = %s', (league_id,))
+
+    for ledger, (table, date_column, category_column, extra_filter) in _LEDGER_SOURCES.items():
+        cur.execute(f"""
+            SELECT {date_column}, {category_column}, COALESCE(SUM(amount_cents), 0), COUNT(*)
+            FROM {table}
+            WHERE league_id = %s {extra_filter}
+            GROUP BY {date_column}, {category_column}
+        """, (league_id,))
+        totals: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0])
+        for entry_date, category, amount_cents, count in cur.fetchall():
+            bucket = totals[(_period(entry_date), category or 'other')]
+            bucket[0] += int(amount_cents or 0)
+            bucket[1] += int(count or 0)
+        for (period, category), (amount_cents, count) in totals.items():
+            _upsert(cur, league_id, ledger, period, category, amount_cents, count)
+
+    cur.execute('DELETE FROM league_finance_rollup_state WHERE league_id = %s', (league_id,))
+    cur.execute(
+        'INSERT INTO league_finance_rollup_state (league_id, rebuilt_at) VALUES (%s, %s)',
+        (league_id, datetime.utcnow()),
+    )
+
+
+def get_finance_rollups(db, league_id: int) -> Dict[str, Any]:
+    """Return rollup totals for a league, rebuilding them on first use.
+
+    Returns a dict with ``by_category`` (``{ledger: {category: (cents, count)}}``),
+    ``totals`` (``{ledger: cents}``) and ``monthly``
+    (``[{'period', 'revenue_cents', 'expense_cents'}]``, newest first).
+    """
+    cur = db.cursor()
+    try:
+        cur.execute(
+            'SELECT 1 FROM league_finance_rollup_state WHERE league_id = %s', (league_id,)
+        )
+        if cur.fetchone() is None:
+            try:
+                rebuild_finance_rollups(cur, league_id)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+        cur.execute("""
+            SELECT ledger, period, category, amount_cents, entry_count
+            FROM league_finance_rollups
+            WHERE league_id = %s
+        """, (league_id,))
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+
+    by_category: Dict[str, Dict[str, List[int]]] = {
+        ledger: defaultdict(lambda: [0, 0]) for ledger in _LEDGER_SOURCES
+    }
+    monthly: Dict[str, Dict[str, int]] = defaultdict(lambda: {'revenue_cents': 0, 'expense_cents': 0})
+    for ledger, period, category, amount_cents, count in rows:
+        amount_cents = int(amount_cents or 0)
+        count = int(count or 0)
+        if not count and not amount_cents:
+            continue
+        bucket = by_category[ledger][category]
+        bucket[0] += amount_cents
+        bucket[1] += count
+        if ledger == REVENUE_LEDGER:
+            monthly[period]['revenue_cents'] += amount_cents
+        elif ledger == EXPENSE_LEDGER:
+            monthly[period]['expense_cents'] += amount_cents
+
+    return {
+        'by_category': {
+            ledger: {
+                category: (amount, count)
+                for category, (amount, count) in sorted(
+                    categories.items(), key=lambda item: item[1][0], reverse=True
+                )
+                if count
+            }
+            for ledger, categories in by_category.items()
+        },
+        'totals': {
+            ledger: sum(amount for amount, _count in categories.values())
+            for ledger, categories in by_category.items()
+        },
+        'monthly': [
+            dict(period=period, **values)
+            for period, values in sorted(monthly.items(), reverse=True)
+        ],
+    }
+
+
+def encode_cursor(entry_date: Any, entry_id: int) -> str:
+    """Encode a ``(date, id)`` keyset position as an opaque URL-safe token."""
+    raw = f'{entry_date.isoformat() if isinstance(entry_date, (date, datetime)) else entry_date}|{entry_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str | None) -> Optional[Tuple[str, int]]:
+    """Decode a cursor token; invalid tokens are treated as "first page"."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        entry_date, entry_id = base64.urlsafe_b64decode(padded.encode()).decode().rsplit('|', 1)
+        return entry_date[:10], int(entry_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _fetch_page(cur, query: str, date_column: str, id_column: str,
+                league_id: int, cursor: str | None, limit: int):
+    position = decode_cursor(cursor)
+    if position is None:
+        keyset, params = '', (league_id, limit + 1)
+    else:
+        entry_date, entry_id = position
+        keyset = (
+            f'AND ({date_column} < %s OR ({date_column} = %s AND {id_column} < %s))'
+        )
+        params = (league_id, entry_date, entry_date, entry_id, limit + 1)
+    cur.execute(query.format(keyset=keyset), params)
+    rows = cur.fetchall()
+    return rows[:limit], len(rows) > limit
+
+
+_EXPENSE_PAGE_QUERY = """
+    SELECT expense_id, expense_date, amount_cents, category, vendor_name,
+           description, payment_method, reference_number, tax_deductible
+    FROM league_expenses
+    WHERE league_id = %s {keyset}
+    ORDER BY expense_date DESC, expense_id DESC
+    LIMIT %s
+"""
+
+_REVENUE_PAGE_QUERY = """
+    SELECT revenue_id, transaction_date, revenue_type, amount_cents, description, payment_method
+    FROM league_revenue
+    WHERE league_id = %s {keyset}
+    ORDER BY transaction_date DESC, revenue_id DESC
+    LIMIT %s
+"""
+
+
+def fetch_expense_page(cur, league_id: int, cursor: str | None = None,
+                       limit: int = DEFAULT_EXPENSE_PAGE_SIZE):
+    """Return ``(rows, next_cursor)`` for a league's expenses, newest first."""
+    rows, has_more = _fetch_page(cur, _EXPENSE_PAGE_QUERY, 'expense_date', 'expense_id',
+                                 league_id, cursor, limit)
+    next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None
+    return rows, next_cursor
+
+
+def fetch_revenue_page(cur, league_id: int, cursor: str | None = None,
+                       limit: int = DEFAULT_TRANSACTION_PAGE_SIZE):
+    """Return ``(rows, next_cursor)`` for a league's revenue entries, newest first."""
+    rows, has_more = _fetch_page(cur, _REVENUE_PAGE_QUERY, 'transaction_date', 'revenue_id',
+                                 league_id, cursor, limit)
+    next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None
+    return rows, next_cursor
+
+
+def iter_ledger_rows(fetch_page, cur, league_id: int, page_size: int = 500) -> Iterator[tuple]:
+    """Walk every page of a keyset-paginated ledger (used by exports)."""
+    cursor = None
+    while True:
+        rows, cursor = fetch_page(cur, league_id, cursor, page_size)
+        yield from rows
+        if cursor is None:
+            return
+
+
+__all__ = [
+    'REVENUE_LEDGER',
+    'IN_PERSON_LEDGER',
+    'EXPENSE_LEDGER',
+    'ensure_finance_rollup_tables',
+    'record_finance_entry',
+    'rebuild_finance_rollups',
+    'get_finance_rollups',
+    'encode_cursor',
+    'decode_cursor',
+    'fetch_expense_page',
+    'fetch_revenue_page',
+    'iter_ledger_rows',
+]
@@ -25,6 +25,23 @@ def send_email_job(to_email, subject, template_key, context=None, **kwargs):
             raise
 
 
+def send_transactional_email_job(to_email, subject, html_body, text_body):
+    """Background job to deliver a prebuilt transactional email (password reset, security alert)."""
+    from slms import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from slms.services.email import deliver_email
+            if not deliver_email(to_email, subject, html_body, text_body):
+                raise RuntimeError(f"delivery to {to_email} failed")
+            return True
+        except Exception as e:
+            print(f"Transactional email job failed: {str(e)}")
+            raise
+
+
 def send_registration_confirmation_job(registration_id, to_email, to_name=None):
     """Background job to send registration confirmation."""
     from slms import create_app
@@ -107,64 +124,89 @@ def generate_schedule_job(season_id, start_date, end_date, preferred_weekdays,
             raise
 
 
-def send_daily_game_reminders_job():
-    """Background job to send daily game reminders (24h before games)."""
+def send_game_reminder_digest_job(game_ids, to_email, to_name=None):
+    """Background job to send one reminder covering several games."""
     from slms import create_app
 
     app = create_app()
 
     with app.app_context():
         try:
-            from slms.extensions import db
-            from slms.models import Game, GameStatus, User, UserRole
+            from slms.services.emailer import send_game_reminder_digest
+            return send_game_reminder_digest(
+                game_ids=game_ids,
+                to_email=to_email,
+                to_name=to_name
+            )
+        except Exception as e:
+            print(f"Game reminder digest job failed: {str(e)}")
+            raise
+
+
+def collect_game_reminder_recipients(start_of_day, end_of_day):
+    """Return deduplicated (org_id, game_id, email) triples for games in the window.
+
+    Games and recipients are resolved with a single join on ``org_id`` rather
+    than one ``User`` query per team per game, and each recipient appears at
+    most once per game.
+    """
+    from slms.extensions import db
+    from slms.models import Game, GameStatus, User, UserRole
+
+    rows = (
+        db.session.query(Game.org_id, Game.id, User.email)
+        .join(User, User.org_id == Game.org_id)
+        .filter(
+            Game.start_time >= start_of_day,
+            Game.start_time <= end_of_day,
+            Game.status == GameStatus.SCHEDULED,
+            User.role.in_([UserRole.COACH, UserRole.ADMIN, UserRole.OWNER]),
+            User.email.isnot(None),
+        )
+        .order_by(Game.start_time, Game.id)
+        .all()
+    )
+
+    seen = set()
+    recipients = []
+    for org_id, game_id, email in rows:
+        email = (email or '').strip()
+        if not email:
+            continue
+        key = (email.lower(), game_id)
+        if key in seen:
+            continue
+        seen.add(key)
+        recipients.append((org_id, game_id, email))
+    return recipients
+
+
+def send_daily_game_reminders_job(digest=None):
+    """Background job to send daily game reminders (24h before games).
+
+    Set ``digest`` (or ``GAME_REMINDER_DIGEST=true``) to send each recipient a
+    single email listing all of their games instead of one email per game.
+    """
+    from slms import create_app
 
+    app = create_app()
+
+    with app.app_context():
+        try:
             tomorrow = datetime.utcnow() + timedelta(days=1)
             start_of_day = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = tomorrow.replace(hour=23, minute=59, second=59, microsecond=999999)
 
-            # Find games scheduled for tomorrow
-            from slms.blueprints.common.tenant import org_query
-            upcoming_games = (
-                org_query(Game)
-                .filter(
-                    Game.start_time >= start_of_day,
-                    Game.start_time <= end_of_day,
-                    Game.status == GameStatus.SCHEDULED
-                )
-                .all()
-            )
+            if digest is None:
+                digest = os.getenv('GAME_REMINDER_DIGEST', 'false').lower() in ('1', 'true', 'yes')
+
+            recipients = collect_game_reminder_recipients(start_of_day, end_of_day)
 
             from slms.services.queue import queue_service
-            sent_count = 0
-
-            for game in upcoming_games:
-                # Send reminders to coaches
-                teams = [game.home_team, game.away_team]
-
-                for team in teams:
-                    if team:
-                        # Find team coaches
-                        coaches = (
-                            db.session.query(User)
-                            .filter(
-                                User.org_id == game.org_id,
-                                User.role.in_([UserRole.COACH, UserRole.ADMIN, UserRole.OWNER])
-                            )
-                            .all()
-                        )
-
-                        for coach in coaches:
-                            if coach.email:
-                                queue_service.enqueue_email(
-                                    'send_game_reminder_job',
-                                    game_id=game.id,
-                                    to_email=coach.email,
-                                    to_name=coach.email  # Using email as name fallback
-                                )
-                                sent_count += 1
-
-            print(f"Queued {sent_count} game reminder emails for tomorrow's games")
-            return sent_count
+            jobs = queue_service.enqueue_game_reminders(recipients, digest=digest)
+
+            print(f"Queued {len(jobs)} game reminder emails for tomorrow's games")
+            return len(jobs)
 
         except Exception as e:
             print(f"Daily game reminders job failed: {str(e)}")
@@ -212,4 +254,92 @@ def retry_failed_emails_job():
 
         except Exception as e:
             print(f"Retry failed emails job failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+
+def reconcile_org_counters_job(org_ids=None):
+    """Background job to rebuild denormalized organization counters.
+
+    A full run (no ``org_ids``) schedules the next night's run, even when it
+    fails, so the nightly chain keeps going.
+    """
+    from slms import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from slms.services.org_counters import reconcile_org_counters
+            reconciled = reconcile_org_counters(org_ids)
+            print(f"Reconciled counters for {reconciled} organizations")
+            return reconciled
+        except Exception as e:
+            print(f"Org counter reconciliation job failed: {str(e)}")
+            raise
+        finally:
+            if org_ids is None:
+                from slms.services.queue import queue_service
+                queue_service.schedule_org_counter_reconciliation()
+
+
+
+def refresh_dashboard_insights_job():
+    """Background job to rebuild the admin dashboard insight snapshot.
+
+    Each run schedules the next one, even when it fails.
+    """
+    from slms import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from slms.services.dashboard_insights import refresh_league_insights
+            insights = refresh_league_insights()
+            print(f"Refreshed dashboard insights for {insights['current_year']}")
+            return insights['current_year']
+        except Exception as e:
+            print(f"Dashboard insights refresh job failed: {str(e)}")
+            raise
+        finally:
+            from slms.services.queue import queue_service
+            queue_service.schedule_dashboard_insights_refresh()
+
+
+def generate_media_derivatives_job(asset_id):
+    """Background job to render resized and WebP copies of a media image."""
+    from slms import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from slms.services.media_derivatives import generate_media_derivatives
+            asset = generate_media_derivatives(asset_id)
+            return asset.derivatives_status if asset else None
+        except Exception as e:
+            print(f"Media derivatives job failed: {str(e)}")
+            raise
+
+
+def publish_static_snapshots_job(kind, target_id):
+    """Background job to re-render the static snapshots of a season or game."""
+    from slms import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from slms.extensions import db
+            from slms.models import Game, Season
+            from slms.services.static_snapshots import sync_game_snapshots, sync_season_snapshots
+            model, sync = (Season, sync_season_snapshots) if kind == 'season' else (Game, sync_game_snapshots)
+            target = db.session.get(model, target_id)
+            if target is None:
+                return None
+            stats = sync(target)
+            print(f"Static snapshots for {kind} {target_id}: {dict(stats)}")
+            return dict(stats)
+        except Exception as e:
+            print(f"Static snapshot job failed: {str(e)}")
+            raise
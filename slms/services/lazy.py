@@ -0,0 +1,72 @@
+"""Deferred imports for heavy optional dependencies.
+
+Every gunicorn worker and RQ job builds the app via ``create_app()``, which
+imports each blueprint and, through them, most services. Modules such as
+``openai``, ``openpyxl``, ``httpx``, ``requests`` and ``numpy`` cost tens to
+hundreds of milliseconds to import and are only needed by a few endpoints.
+Services bind them with ``lazy_import`` instead, and the real import happens on the first
+attribute access::
+
+    openai = lazy_import('openai')
+    ...
+    openai.OpenAI(api_key=...)   # imports openai here
+
+``tests/test_import_time.py`` fails if any of them is imported during app
+startup again.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import threading
+import types
+from typing import Any
+
+# Modules that must not be imported while building the app
+DEFERRED_MODULES = ('openai', 'openpyxl', 'httpx', 'requests', 'numpy')
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f'<lazy module {self.__name__!r} ({state})>'
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy for ``name`` that defers the import until it is used."""
+    return LazyModule(name)
+
+
+def module_available(name: str) -> bool:
+    """True if the top-level module ``name`` is installed, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+__all__ = ['DEFERRED_MODULES', 'LazyModule', 'lazy_import', 'module_available']
@@ -9,6 +9,7 @@ from sqlalchemy.orm import joinedload
 
 from slms.extensions import db
 from slms.models.models import League, LeagueStatus, Season, SeasonStatus, Organization
+from slms.services.static_snapshots import queue_season_snapshots
 
 
 class LeagueService:
@@ -77,12 +78,17 @@ class LeagueService:
         league.archived_at = datetime.now(timezone.utc)
 
         # Archive all seasons in this league
+        previous = {}
         for season in league.seasons:
             if season.status != SeasonStatus.ARCHIVED:
+                previous[season.id] = season.status
                 season.status = SeasonStatus.ARCHIVED
                 season.archived_at = datetime.now(timezone.utc)
 
         db.session.commit()
+        for season in league.seasons:
+            if season.id in previous:
+                queue_season_snapshots(season, previous[season.id])
         return league
 
     @staticmethod
@@ -183,12 +189,14 @@ class SeasonService:
         season = db.session.get(Season, season_id)
         if not season or season.org_id != org_id:
             return None
+        previous_status = season.status
 
         for key, value in updates.items():
             if hasattr(season, key) and key not in ['id', 'org_id', 'league_id', 'created_at']:
                 setattr(season, key, value)
 
         db.session.commit()
+        queue_season_snapshots(season, previous_status)
         return season
 
     @staticmethod
@@ -197,6 +205,7 @@ class SeasonService:
         season = db.session.get(Season, season_id)
         if not season or season.org_id != org_id:
             return None
+        previous_status = season.status
 
         # Deactivate other active seasons in the same league
         stmt = (
@@ -212,6 +221,7 @@ class SeasonService:
         season.status = SeasonStatus.ACTIVE
         season.is_active = True
         db.session.commit()
+        queue_season_snapshots(season, previous_status)
         return season
 
     @staticmethod
@@ -220,11 +230,13 @@ class SeasonService:
         season = db.session.get(Season, season_id)
         if not season or season.org_id != org_id:
             return None
+        previous_status = season.status
 
         season.status = SeasonStatus.OFF_SEASON
         if message:
             season.off_season_message = message
         db.session.commit()
+        queue_season_snapshots(season, previous_status)
         return season
 
     @staticmethod
@@ -233,10 +245,12 @@ class SeasonService:
         season = db.session.get(Season, season_id)
         if not season or season.org_id != org_id:
             return None
+        previous_status = season.status
 
         season.status = SeasonStatus.COMPLETED
         season.is_active = False
         db.session.commit()
+        queue_season_snapshots(season, previous_status)
         return season
 
     @staticmethod
@@ -245,11 +259,13 @@ class SeasonService:
         season = db.session.get(Season, season_id)
         if not season or season.org_id != org_id:
             return None
+        previous_status = season.status
 
         season.status = SeasonStatus.ARCHIVED
         season.archived_at = datetime.now(timezone.utc)
         season.is_active = False
         db.session.commit()
+        queue_season_snapshots(season, previous_status)
         return season
 
     @staticmethod
@@ -258,10 +274,12 @@ class SeasonService:
         season = db.session.get(Season, season_id)
         if not season or season.org_id != org_id:
             return None
+        previous_status = season.status
 
         season.status = SeasonStatus.COMPLETED
         season.archived_at = None
         db.session.commit()
+        queue_season_snapshots(season, previous_status)
         return season
 
     @staticmethod
@@ -0,0 +1,226 @@
+"""Response cache and request coalescing for LLM completions.
+
+Completions are keyed by a SHA-256 of the normalized request (model,
+sampling parameters and whitespace-collapsed messages) and stored in
+``llm_response_cache`` for ``AI_RESPONSE_CACHE_TTL`` seconds; expired rows
+are swept whenever a new response is stored. Concurrent
+identical requests in a process share one upstream call. Only responses
+that pass the caller's validation (JSON by default) are stored, so a
+malformed completion is retried next time instead of being pinned.
+
+Callers that want a new draft of a sampled generation ("regenerate")
+pass ``bypass_cache=True``: the lookup and coalescing are skipped, and the
+fresh response replaces the stored one.
+
+The upstream client is pluggable: ``app.extensions['llm_client']`` (see
+``set_llm_client``) takes precedence over the default, which lets tests and
+offline development use ``LocalLLMClient``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from slms.extensions import db
+from slms.models import LLMResponse
+
+Messages = List[Dict[str, str]]
+
+# Seconds a waiter blocks on an identical in-flight request before giving up
+COALESCE_TIMEOUT = 120
+
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+class OpenAIChatClient:
+    """Chat completions via the OpenAI SDK; the SDK client is built on first use."""
+
+    def __init__(self, client_factory: Callable[[], Any]):
+        self._client_factory = client_factory
+
+    def complete(self, messages: Messages, model: str, temperature: float, max_tokens: int) -> str:
+        response = self._client_factory().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content.strip()
+
+
+class LocalLLMClient:
+    """Offline stand-in that answers from a callable or a canned response.
+
+    ``responder`` receives the messages and returns a string or a
+    JSON-serializable object. Every request is appended to ``calls``.
+    """
+
+    def __init__(self, responder: Union[Callable[[Messages], Any], str, Mapping, None] = None):
+        self._responder = responder
+        self.calls: List[Dict[str, Any]] = []
+
+    def complete(self, messages: Messages, model: str, temperature: float, max_tokens: int) -> str:
+        self.calls.append({'messages': messages, 'model': model,
+                           'temperature': temperature, 'max_tokens': max_tokens})
+        if callable(self._responder):
+            result = self._responder(messages)
+        elif self._responder is None:
+            result = {}
+        else:
+            result = self._responder
+        return result if isinstance(result, str) else json.dumps(result)
+
+
+def set_llm_client(app: Flask, client) -> None:
+    """Route an app's LLM calls through ``client``."""
+    app.extensions['llm_client'] = client
+
+
+def resolve_llm_client(default):
+    """Return the app's configured client, or ``default``."""
+    if has_app_context():
+        client = current_app.extensions.get('llm_client')
+        if client is not None:
+            return client
+    return default
+
+
+def _normalize(content: str) -> str:
+    return ' '.join(str(content).split())
+
+
+def prompt_key(messages: Messages, model: str, temperature: float, max_tokens: int) -> str:
+    """Hash of a normalized completion request."""
+    payload = {
+        'model': model,
+        'temperature': round(float(temperature), 3),
+        'max_tokens': int(max_tokens),
+        'messages': [
+            {'role': message['role'], 'content': _normalize(message['content'])}
+            for message in messages
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _cache_ttl() -> float:
+    if not has_app_context():
+        return 0
+    return float(current_app.config.get('AI_RESPONSE_CACHE_TTL', 604800))
+
+
+def lookup_response(key: str) -> Optional[str]:
+    """Return a stored, unexpired response for ``key``."""
+    if _cache_ttl() <= 0:
+        return None
+    table = LLMResponse.__table__
+    now = datetime.now(timezone.utc)
+    try:
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                select(table.c.response, table.c.expires_at).where(table.c.key == key)
+            ).first()
+    except SQLAlchemyError:
+        return None
+    if row is None:
+        return None
+    expires_at = row.expires_at
+    if expires_at is not None:
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= now:
+            return None
+    return row.response
+
+
+def store_response(key: str, model: str, response: str) -> None:
+    """Persist a response (outside the request's session transaction).
+
+    Expired rows are deleted in the same transaction, which keeps the table
+    bounded without a separate cleanup job.
+    """
+    ttl = _cache_ttl()
+    if ttl <= 0:
+        return
+    table = LLMResponse.__table__
+    now = datetime.now(timezone.utc)
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(delete(table).where(or_(table.c.key == key, table.c.expires_at <= now)))
+            conn.execute(insert(table).values(
+                key=key,
+                model=model,
+                response=response,
+                expires_at=now + timedelta(seconds=ttl),
+                created_at=now,
+                updated_at=now,
+            ))
+    except SQLAlchemyError:
+        # A concurrent writer stored the same key, or the table is missing
+        pass
+
+
+def cached_completion(messages: Messages, *, model: str, temperature: float, max_tokens: int,
+                      client, validate: Callable[[str], Any] = json.loads,
+                      bypass_cache: bool = False) -> str:
+    """Return a completion, served from cache or coalesced with an identical in-flight call.
+
+    ``validate`` runs on fresh responses before they are stored; its
+    exceptions propagate to the caller (and to any coalesced waiters).
+    With ``bypass_cache`` the upstream is always called.
+    """
+    key = prompt_key(messages, model, temperature, max_tokens)
+    if bypass_cache:
+        response = client.complete(messages, model, temperature, max_tokens)
+        validate(response)
+        store_response(key, model, response)
+        return response
+
+    cached = lookup_response(key)
+    if cached is not None:
+        return cached
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+
+    if not owner:
+        return future.result(timeout=COALESCE_TIMEOUT)
+
+    try:
+        response = client.complete(messages, model, temperature, max_tokens)
+        validate(response)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        store_response(key, model, response)
+        future.set_result(response)
+        return response
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+__all__ = [
+    'OpenAIChatClient',
+    'LocalLLMClient',
+    'set_llm_client',
+    'resolve_llm_client',
+    'prompt_key',
+    'lookup_response',
+    'store_response',
+    'cached_completion',
+]
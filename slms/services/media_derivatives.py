@@ -0,0 +1,276 @@
+"""Resized and WebP renditions for uploaded media images.
+
+Phones browsing the gallery or a team page should not download a
+multi-megabyte original to fill a 300px card. After an image is stored,
+``schedule_media_derivatives`` queues a job that makes a ``thumb``, ``medium``
+and ``large`` rendition (``RENDITION_WIDTHS``). Each rendition is written
+twice: once in the original format and once as WebP. The list is recorded
+on ``MediaAsset.renditions`` and templates pick from it with ``media_srcset``.
+
+Renditions are never wider than the original. A small image therefore gets
+fewer renditions; widths that would repeat are skipped.
+
+The resize runs off the request thread. ``MEDIA_DERIVATIVES_BACKEND`` picks
+where:
+
+* ``rq`` (default): a job on the default RQ queue. If Redis cannot be
+  reached, the pool is used instead.
+* ``pool``: a per-app ``ProcessPoolExecutor``. A callback thread saves the
+  result.
+* ``inline``: in the calling thread, for tests and CLI scripts.
+
+Renditions are stored through the blob store like their originals. They do
+not count against the organization's storage quota.
+"""
+
+from __future__ import annotations
+
+import io
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import Flask, current_app
+
+from slms.extensions import db
+from slms.models import MediaAsset
+from slms.services.blob_store import release_blob, store_blob
+
+# Target widths, smallest first; srcset lists them in this order
+RENDITION_WIDTHS = {'thumb': 320, 'medium': 960, 'large': 1920}
+# Directory beside an original's hash shards that its renditions are stored in
+RENDITIONS_SUBDIR = 'renditions'
+# storage_blob root of media library files (see slms.services.uploads)
+BLOB_ROOT = 'static'
+
+_MIME_TYPES = {'jpeg': 'image/jpeg', 'png': 'image/png', 'webp': 'image/webp'}
+_EXTENSIONS = {'jpeg': 'jpg', 'png': 'png', 'webp': 'webp'}
+_pool_lock = threading.Lock()
+
+
+def render_renditions(source_path: str, widths: Dict[str, int], quality: int = 80) -> Dict[str, Any]:
+    """Resize the image at ``source_path``; returns its size and encoded renditions.
+
+    This is a plain function of its arguments so it can run in another process.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as original:
+        if getattr(original, 'is_animated', False):
+            # Resizing would keep only the first frame
+            return {'width': original.width, 'height': original.height, 'renditions': []}
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    source_format = 'jpeg' if image.mode in ('RGB', 'L', 'CMYK', 'YCbCr') else 'png'
+    renditions = []
+    seen = set()
+    for name, target in sorted(widths.items(), key=lambda item: item[1]):
+        width = min(target, image.width)
+        if width in seen:
+            continue
+        seen.add(width)
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+
+        for fmt in (source_format, 'webp'):
+            frame = resized
+            if fmt == 'jpeg' and frame.mode != 'RGB':
+                frame = frame.convert('RGB')
+            elif fmt in ('png', 'webp') and frame.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                frame = frame.convert('RGBA')
+            buffer = io.BytesIO()
+            options = {'quality': quality} if fmt in ('jpeg', 'webp') else {'optimize': True}
+            if fmt == 'jpeg':
+                options.update(optimize=True, progressive=True)
+            if fmt == 'webp':
+                options['method'] = 4
+            frame.save(buffer, format=fmt.upper(), **options)
+            renditions.append({
+                'name': name, 'format': fmt, 'width': width, 'height': height,
+                'data': buffer.getvalue(),
+            })
+
+    return {'width': image.width, 'height': image.height, 'renditions': renditions}
+
+
+def _static_root() -> Path:
+    return Path(current_app.static_folder)
+
+
+def _wants_renditions(asset: MediaAsset) -> bool:
+    return bool(
+        asset.storage_path
+        and asset.media_type == 'image'
+        and (asset.mime_type or '').startswith('image/')
+        and asset.mime_type != 'image/svg+xml'
+    )
+
+
+def release_renditions(renditions: Optional[Iterable[Dict[str, Any]]]) -> None:
+    """Drop the blob references held by a rendition list; callers commit."""
+    for rendition in renditions or ():
+        path = rendition.get('path')
+        if path:
+            release_blob(root=BLOB_ROOT, root_dir=_static_root(), path=path)
+
+
+def _save_renditions(asset_id: str, storage_path: str, rendered: Dict[str, Any]) -> Optional[MediaAsset]:
+    asset = db.session.get(MediaAsset, asset_id)
+    if asset is None or asset.storage_path != storage_path:
+        # Deleted or replaced while the job ran
+        return None
+
+    directory = Path(storage_path).parent
+    if directory.name == Path(storage_path).stem[:2]:
+        # Content-addressed originals sit in a hash shard; keep renditions beside the shards
+        directory = directory.parent
+    prefix = f"{directory.as_posix()}/{RENDITIONS_SUBDIR}"
+    renditions: List[Dict[str, Any]] = []
+    for item in rendered['renditions']:
+        blob = store_blob(
+            io.BytesIO(item['data']),
+            root=BLOB_ROOT,
+            root_dir=_static_root(),
+            prefix=prefix,
+            extension=_EXTENSIONS[item['format']],
+            mime_type=_MIME_TYPES[item['format']],
+        )
+        renditions.append({
+            'name': item['name'],
+            'format': item['format'],
+            'width': item['width'],
+            'height': item['height'],
+            'size': blob['size'],
+            'path': blob['path'],
+            'url': f"/static/{blob['path']}",
+        })
+
+    release_renditions(asset.renditions)
+    asset.renditions = renditions
+    asset.width = rendered['width']
+    asset.height = rendered['height']
+    asset.derivatives_status = 'ready'
+    db.session.commit()
+    return asset
+
+
+def _mark_failed(asset_id: str, error: BaseException) -> None:
+    db.session.rollback()
+    current_app.logger.error(f"Failed to generate renditions for media asset {asset_id}: {error}")
+    asset = db.session.get(MediaAsset, asset_id)
+    if asset is not None:
+        asset.derivatives_status = 'failed'
+        db.session.commit()
+
+
+def generate_media_derivatives(asset_id: str) -> Optional[MediaAsset]:
+    """Render and record renditions for one asset in the current app context."""
+    asset = db.session.get(MediaAsset, asset_id)
+    if asset is None or not _wants_renditions(asset):
+        return None
+    storage_path = asset.storage_path
+    config = current_app.config
+    try:
+        rendered = render_renditions(
+            str(_static_root() / storage_path),
+            RENDITION_WIDTHS,
+            int(config.get('MEDIA_DERIVATIVES_QUALITY', 80)),
+        )
+        return _save_renditions(asset_id, storage_path, rendered)
+    except Exception as exc:
+        _mark_failed(asset_id, exc)
+        return None
+
+
+def _get_pool(app: Flask) -> ProcessPoolExecutor:
+    with _pool_lock:
+        pool = app.extensions.get('media_derivatives_pool')
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=int(app.config.get('MEDIA_DERIVATIVES_WORKERS', 2)))
+            app.extensions['media_derivatives_pool'] = pool
+        return pool
+
+
+def _submit_to_pool(asset: MediaAsset) -> Future:
+    app = current_app._get_current_object()
+    asset_id, storage_path = asset.id, asset.storage_path
+    future = _get_pool(app).submit(
+        render_renditions,
+        str(_static_root() / storage_path),
+        RENDITION_WIDTHS,
+        int(app.config.get('MEDIA_DERIVATIVES_QUALITY', 80)),
+    )
+
+    def _done(finished: Future) -> None:
+        with app.app_context():
+            try:
+                _save_renditions(asset_id, storage_path, finished.result())
+            except Exception as exc:
+                _mark_failed(asset_id, exc)
+            finally:
+                db.session.remove()
+
+    future.add_done_callback(_done)
+    return future
+
+
+def schedule_media_derivatives(asset: MediaAsset) -> Optional[str]:
+    """Queue rendition generation for a committed asset; returns the backend used."""
+    if not _wants_renditions(asset):
+        return None
+    asset.derivatives_status = 'pending'
+    db.session.commit()
+
+    backend = current_app.config.get('MEDIA_DERIVATIVES_BACKEND', 'rq')
+    if backend == 'inline':
+        generate_media_derivatives(asset.id)
+        return 'inline'
+    if backend == 'rq':
+        try:
+            from slms.services.queue import queue_service
+            queue_service.enqueue_media_derivatives(asset.id)
+            return 'rq'
+        except Exception as exc:
+            current_app.logger.warning(f"Could not queue renditions for {asset.id}, using local pool: {exc}")
+    _submit_to_pool(asset)
+    return 'pool'
+
+
+def media_srcset(renditions: Optional[Iterable[Dict[str, Any]]], format: Optional[str] = None) -> str:
+    """``srcset`` value for renditions in ``format`` (the non-WebP ones by default)."""
+    entries = []
+    for rendition in renditions or ():
+        fmt = rendition.get('format')
+        if (format is None and fmt == 'webp') or (format is not None and fmt != format):
+            continue
+        entries.append(f"{rendition['url']} {rendition['width']}w")
+    return ', '.join(entries)
+
+
+def media_thumbnail_url(renditions: Optional[Iterable[Dict[str, Any]]], fallback: Optional[str] = None,
+                        name: str = 'thumb') -> Optional[str]:
+    """URL of the named non-WebP rendition, or ``fallback`` when it does not exist yet."""
+    for rendition in renditions or ():
+        if rendition.get('name') == name and rendition.get('format') != 'webp':
+            return rendition['url']
+    return fallback
+
+
+def init_media_derivatives(app: Flask) -> None:
+    """Expose the srcset helpers to templates."""
+    app.add_template_global(media_srcset)
+    app.add_template_global(media_thumbnail_url)
+
+
+__all__ = [
+    'RENDITION_WIDTHS',
+    'render_renditions',
+    'generate_media_derivatives',
+    'schedule_media_derivatives',
+    'release_renditions',
+    'media_srcset',
+    'media_thumbnail_url',
+    'init_media_derivatives',
+]
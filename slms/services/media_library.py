@@ -2,14 +2,25 @@
 
 from __future__ import annotations
 
+import base64
 import mimetypes
+import threading
+import time
+from datetime import datetime
 from typing import Iterable
 
-from flask import g
+from flask import current_app, g
+from sqlalchemy import and_, func, or_
 from werkzeug.datastructures import FileStorage
 
 from slms.extensions import db
 from slms.models import MediaAsset
+from slms.services.media_derivatives import (
+    media_srcset,
+    media_thumbnail_url,
+    release_renditions,
+    schedule_media_derivatives,
+)
 from slms.services.uploads import store_media_file, delete_media_file
 
 
@@ -42,7 +53,7 @@ def create_media_asset(
         asset.uploaded_by_user_id = uploaded_by_user_id
 
     if file and file.filename:
-        stored = store_media_file(file, getattr(g, 'org_slug', None))
+        stored = store_media_file(file, getattr(g, 'org_slug', None), org_id=org.id)
         asset.storage_path = stored['storage_path']
         asset.public_url = stored['public_url']
         asset.mime_type = stored['mime_type']
@@ -63,6 +74,8 @@ def create_media_asset(
 
     db.session.add(asset)
     db.session.commit()
+    invalidate_media_categories(asset.org_id)
+    schedule_media_derivatives(asset)
     return asset
 
 
@@ -70,8 +83,11 @@ def delete_media_asset(asset: MediaAsset) -> None:
     """Remove the asset record and any stored file."""
     if asset.storage_path:
         delete_media_file(asset.storage_path)
+    release_renditions(asset.renditions)
+    org_id = asset.org_id
     db.session.delete(asset)
     db.session.commit()
+    invalidate_media_categories(org_id)
 
 
 def serialize_media_asset(asset: MediaAsset) -> dict:
@@ -89,6 +105,11 @@ def serialize_media_asset(asset: MediaAsset) -> dict:
         'file_size': asset.file_size,
         'mime_type': asset.mime_type,
         'original_name': asset.original_name,
+        'width': asset.width,
+        'height': asset.height,
+        'thumbnail_url': media_thumbnail_url(asset.renditions, asset.url),
+        'srcset': media_srcset(asset.renditions),
+        'webp_srcset': media_srcset(asset.renditions, 'webp'),
         'created_at': asset.created_at.isoformat() if asset.created_at else None,
     }
 
@@ -98,6 +119,13 @@ def serialize_media_collection(assets: Iterable[MediaAsset]) -> list[dict]:
     return [serialize_media_asset(asset) for asset in assets]
 
 
+def _clear_renditions(asset: MediaAsset) -> None:
+    release_renditions(asset.renditions)
+    asset.renditions = None
+    asset.width = asset.height = None
+    asset.derivatives_status = None
+
+
 def update_media_asset(
     asset: MediaAsset,
     *,
@@ -120,9 +148,11 @@ def update_media_asset(
         asset.alt_text = alt_text.strip() or None
 
     if file and file.filename:
+        # Store the replacement first so re-uploading the same file keeps its blob
+        stored = store_media_file(file, getattr(g, 'org_slug', None), org_id=asset.org_id)
         if asset.storage_path:
             delete_media_file(asset.storage_path)
-        stored = store_media_file(file, getattr(g, 'org_slug', None))
+        _clear_renditions(asset)
         asset.storage_path = stored['storage_path']
         asset.public_url = stored['public_url']
         asset.source_url = None
@@ -135,6 +165,7 @@ def update_media_asset(
         if cleaned:
             if asset.storage_path:
                 delete_media_file(asset.storage_path)
+            _clear_renditions(asset)
             asset.storage_path = None
             asset.source_url = cleaned
             asset.public_url = cleaned
@@ -153,13 +184,108 @@ def update_media_asset(
         asset.media_type = media_type
 
     db.session.commit()
+    invalidate_media_categories(asset.org_id)
+    if file and file.filename:
+        schedule_media_derivatives(asset)
     return asset
 
+
+_facet_lock = threading.Lock()
+
+
+def _facet_cache() -> dict:
+    return current_app.extensions.setdefault('media_category_facets', {})
+
+
+def media_category_facets(org_id: str | None) -> list[dict]:
+    """Categories with asset counts for an organization (all organizations for None).
+
+    Cached per process for ``MEDIA_FACET_CACHE_TTL`` seconds; writes through
+    this module clear the entry immediately.
+    """
+    cache = _facet_cache()
+    entry = cache.get(org_id)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    query = db.session.query(MediaAsset.category, func.count(MediaAsset.id)).filter(MediaAsset.category.isnot(None))
+    if org_id is not None:
+        query = query.filter(MediaAsset.org_id == org_id)
+    facets = [
+        {'category': category, 'count': count}
+        for category, count in sorted(query.group_by(MediaAsset.category).all())
+        if category
+    ]
+
+    ttl = float(current_app.config.get('MEDIA_FACET_CACHE_TTL', 300))
+    if ttl > 0:
+        with _facet_lock:
+            cache[org_id] = (time.monotonic() + ttl, facets)
+    return facets
+
+
+def invalidate_media_categories(org_id: str | None) -> None:
+    """Drop cached category facets for an organization and the all-organizations view."""
+    cache = _facet_cache()
+    with _facet_lock:
+        cache.pop(org_id, None)
+        cache.pop(None, None)
+
+
+def _encode_cursor(created_at: datetime, asset_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{asset_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, asset_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), asset_id
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+def page_media_assets(
+    org_id: str | None,
+    *,
+    category: str | None = None,
+    media_type: str | None = None,
+    limit: int = 24,
+    cursor: str | None = None,
+) -> tuple[list[MediaAsset], str | None]:
+    """One page of assets, newest first, keyed on ``ix_media_asset_org_created``.
+
+    Returns the assets and the cursor for the next page (None on the last one).
+    """
+    query = MediaAsset.query.order_by(MediaAsset.created_at.desc(), MediaAsset.id.desc())
+    if org_id is not None:
+        query = query.filter(MediaAsset.org_id == org_id)
+    if category:
+        query = query.filter(MediaAsset.category == category)
+    if media_type:
+        query = query.filter(MediaAsset.media_type == media_type)
+    if cursor:
+        created_at, asset_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            MediaAsset.created_at < created_at,
+            and_(MediaAsset.created_at == created_at, MediaAsset.id < asset_id),
+        ))
+
+    assets = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(assets) > limit:
+        assets = assets[:limit]
+        next_cursor = _encode_cursor(assets[-1].created_at, assets[-1].id)
+    return assets, next_cursor
+
+
 __all__ = [
     'create_media_asset',
     'update_media_asset',
     'delete_media_asset',
     'serialize_media_asset',
     'serialize_media_collection',
+    'media_category_facets',
+    'invalidate_media_categories',
+    'page_media_assets',
 ]
 
@@ -0,0 +1,172 @@
+"""Denormalized per-organization counters.
+
+Row counts shown on the branded landing page and organization settings are
+kept in ``org_counter`` instead of running ``COUNT(*)`` over the largest
+tables on every view. Mapper events adjust the counters as rows are
+inserted or deleted through the ORM, and a nightly reconciliation job
+(``reconcile_org_counters_job``, seeded by the RQ worker and re-scheduled
+by each run) rebuilds them to correct drift from raw SQL writes or database
+cascades. ``flask org reconcile-counters`` runs the same rebuild on demand.
+
+The row is created with the organization, in the same flush, and the
+``org_counters_001`` migration backfills rows for existing organizations.
+Reads never write: an organization still missing a row is counted live.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable
+
+from sqlalchemy import event, func, inspect, select
+
+from slms.extensions import db
+from slms.models import Game, League, Organization, OrgCounter, Player, Season, Team
+
+COUNTER_FIELDS = ('leagues', 'seasons', 'active_seasons', 'teams', 'players', 'games')
+
+_COUNTED_MODELS = {
+    League: 'leagues',
+    Season: 'seasons',
+    Team: 'teams',
+    Player: 'players',
+    Game: 'games',
+}
+
+
+def count_org_rows(org_id: str) -> Dict[str, int]:
+    """Count an organization's rows directly (single round trip)."""
+
+    def _count(model, *criteria):
+        return (
+            select(func.count())
+            .select_from(model)
+            .where(model.org_id == org_id, *criteria)
+            .scalar_subquery()
+        )
+
+    row = db.session.execute(
+        select(
+            _count(League).label('leagues'),
+            _count(Season).label('seasons'),
+            _count(Season, Season.is_active.is_(True)).label('active_seasons'),
+            _count(Team).label('teams'),
+            _count(Player).label('players'),
+            _count(Game).label('games'),
+        )
+    ).one()
+    return {field: int(row._mapping[field] or 0) for field in COUNTER_FIELDS}
+
+
+def _as_dict(counter: OrgCounter) -> Dict[str, int]:
+    return {field: getattr(counter, field) or 0 for field in COUNTER_FIELDS}
+
+
+def get_org_counters(org_id: str) -> Dict[str, int]:
+    """Return the maintained counters for an organization.
+
+    Without a counter row (e.g. an organization inserted by raw SQL) the
+    live counts are returned; the reconciliation job creates the row.
+    """
+    counter = db.session.execute(
+        select(OrgCounter).where(OrgCounter.org_id == org_id)
+    ).scalar_one_or_none()
+    if counter is not None:
+        return _as_dict(counter)
+    return count_org_rows(org_id)
+
+
+def reconcile_org_counters(org_ids: Iterable[str] | None = None) -> int:
+    """Rebuild counters from the source tables.
+
+    Args:
+        org_ids: Organizations to reconcile (defaults to all)
+
+    Returns:
+        Number of organizations reconciled
+    """
+    if org_ids is None:
+        org_ids = [row[0] for row in db.session.execute(select(Organization.id)).all()]
+
+    existing = {
+        counter.org_id: counter
+        for counter in db.session.execute(select(OrgCounter)).scalars()
+    }
+    now = datetime.now(timezone.utc)
+    reconciled = 0
+    for org_id in org_ids:
+        counts = count_org_rows(org_id)
+        counter = existing.get(org_id)
+        if counter is None:
+            counter = OrgCounter(org_id=org_id)
+            db.session.add(counter)
+        for field, value in counts.items():
+            setattr(counter, field, value)
+        counter.reconciled_at = now
+        reconciled += 1
+
+    db.session.commit()
+    return reconciled
+
+
+def _bump(connection, org_id: str | None, **deltas: int) -> None:
+    """Apply relative changes to an organization's counter row, if it exists."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not org_id or not deltas:
+        return
+    table = OrgCounter.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.org_id == org_id)
+        .values({table.c[field]: table.c[field] + delta for field, delta in deltas.items()})
+    )
+
+
+def _deltas_for(target, sign: int) -> Dict[str, int]:
+    deltas = {_COUNTED_MODELS[type(target)]: sign}
+    if isinstance(target, Season) and target.is_active:
+        deltas['active_seasons'] = sign
+    return deltas
+
+
+def _organization_after_insert(mapper, connection, target) -> None:
+    # Rows the organization gets later in the same flush bump this one
+    connection.execute(
+        OrgCounter.__table__.insert().values(
+            org_id=target.id,
+            reconciled_at=datetime.now(timezone.utc),
+            **{field: 0 for field in COUNTER_FIELDS},
+        )
+    )
+
+
+def _after_insert(mapper, connection, target) -> None:
+    _bump(connection, target.org_id, **_deltas_for(target, 1))
+
+
+def _after_delete(mapper, connection, target) -> None:
+    _bump(connection, target.org_id, **_deltas_for(target, -1))
+
+
+def _season_after_update(mapper, connection, target) -> None:
+    history = inspect(target).attrs.is_active.history
+    if not history.has_changes():
+        return
+    was_active = bool(history.deleted and history.deleted[0])
+    if was_active != bool(target.is_active):
+        _bump(connection, target.org_id, active_seasons=1 if target.is_active else -1)
+
+
+for _model in _COUNTED_MODELS:
+    event.listen(_model, 'after_insert', _after_insert)
+    event.listen(_model, 'after_delete', _after_delete)
+event.listen(Season, 'after_update', _season_after_update)
+event.listen(Organization, 'after_insert', _organization_after_insert)
+
+
+__all__ = [
+    'COUNTER_FIELDS',
+    'count_org_rows',
+    'get_org_counters',
+    'reconcile_org_counters',
+]
@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING
 from sqlalchemy.exc import IntegrityError
 from slms.extensions import db
 from slms.models import Organization, User, UserRole
+from slms.services.tenant_registry import invalidate_tenant_registry
 
 if TYPE_CHECKING:
     from slms.models import User as UserType
@@ -122,6 +123,7 @@ def create_organization(
             db.session.add(owner)
 
         db.session.commit()
+        invalidate_tenant_registry(org)
         return org, None
 
     except IntegrityError as e:
@@ -163,6 +165,7 @@ def update_organization(org: Organization, **kwargs) -> tuple[bool, str | None]:
                 setattr(org, key, value)
 
         db.session.commit()
+        invalidate_tenant_registry(org)
         return True, None
 
     except IntegrityError:
@@ -189,6 +192,7 @@ def delete_organization(org: Organization) -> tuple[bool, str | None]:
     try:
         db.session.delete(org)
         db.session.commit()
+        invalidate_tenant_registry(org)
         return True, None
 
     except Exception as e:
@@ -208,14 +212,15 @@ def get_organization_stats(org: Organization) -> dict:
     Returns:
         Dictionary with organization stats
     """
-    from slms.models import League, Team, Game, Season
+    from slms.services.org_counters import get_org_counters
 
+    counters = get_org_counters(org.id)
     return {
         'users': len(org.users),
-        'leagues': org_query(League).count(),
-        'teams': org_query(Team).count(),
-        'seasons': org_query(Season).count(),
-        'games': org_query(Game).count(),
+        'leagues': counters['leagues'],
+        'teams': counters['teams'],
+        'seasons': counters['seasons'],
+        'games': counters['games'],
         'storage_used': org.storage_used,
         'storage_quota': org.storage_quota,
         'storage_percent': (org.storage_used / org.storage_quota * 100) if org.storage_quota else 0,
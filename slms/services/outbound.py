@@ -0,0 +1,105 @@
+"""Bounded, time-limited outbound I/O for request handlers.
+
+Endpoints that wait on third parties (LLM calls, webhook tests, SMTP) run
+their blocking work through ``run_outbound``. Each app has a fixed pool of
+``OUTBOUND_IO_CONCURRENCY`` threads for this work. A request that cannot get
+a slot within ``OUTBOUND_QUEUE_TIMEOUT`` seconds fails fast with
+``OutboundBusy``, so a burst of slow admin calls cannot occupy every
+gunicorn thread. Work that exceeds ``timeout`` raises
+``asyncio.TimeoutError`` to the view. The thread keeps its slot until the
+call actually returns, which the client-level timeouts bound.
+
+Slots are a ``threading.BoundedSemaphore`` rather than an asyncio one,
+because Flask runs every async view on its own event loop. Waiting for a
+slot happens in ``asyncio.to_thread`` so the view's loop stays free.
+
+SMTP from views does not use this pool: transactional mail is handed to the
+RQ ``email`` queue (see ``slms.services.email``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Tuple
+
+from flask import current_app
+
+
+class OutboundBusy(Exception):
+    """Raised when no outbound I/O slot frees up in time."""
+
+
+def _pool() -> Tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    pool = current_app.extensions.get('outbound_pool')
+    if pool is None:
+        size = max(1, int(current_app.config.get('OUTBOUND_IO_CONCURRENCY', 4)))
+        pool = (
+            ThreadPoolExecutor(max_workers=size, thread_name_prefix='outbound'),
+            threading.BoundedSemaphore(size),
+        )
+        current_app.extensions['outbound_pool'] = pool
+    return pool
+
+
+async def _acquire_slot(slots: threading.BoundedSemaphore, queue_timeout: float) -> bool:
+    """Wait for a slot in a helper thread, so the event loop is never blocked."""
+    handoff = threading.Lock()
+    state = {'abandoned': False, 'acquired': False}
+
+    def _wait() -> bool:
+        if not slots.acquire(timeout=queue_timeout):
+            return False
+        with handoff:
+            if state['abandoned']:
+                slots.release()
+                return False
+            state['acquired'] = True
+        return True
+
+    try:
+        return await asyncio.to_thread(_wait)
+    except asyncio.CancelledError:
+        # The waiting thread cannot be interrupted; whichever side sees the
+        # slot last gives it back
+        with handoff:
+            state['abandoned'] = True
+            if state['acquired']:
+                slots.release()
+        raise
+
+
+async def run_outbound(func: Callable[..., Any], *args, timeout: float | None = None, **kwargs) -> Any:
+    """Run a blocking call on the outbound pool and await its result.
+
+    The call sees the caller's Flask app/request context (context variables
+    are copied into the worker thread).
+    """
+    executor, slots = _pool()
+    queue_timeout = float(current_app.config.get('OUTBOUND_QUEUE_TIMEOUT', 2))
+    if timeout is None:
+        timeout = float(current_app.config.get('OUTBOUND_IO_TIMEOUT', 30))
+
+    if not await _acquire_slot(slots, queue_timeout):
+        raise OutboundBusy('Too many outbound requests in progress; try again shortly.')
+
+    context = contextvars.copy_context()
+
+    def _call():
+        try:
+            return context.run(functools.partial(func, *args, **kwargs))
+        finally:
+            slots.release()
+
+    try:
+        future = executor.submit(_call)
+    except BaseException:
+        slots.release()
+        raise
+    return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+
+__all__ = ['OutboundBusy', 'run_outbound']
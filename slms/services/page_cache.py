@@ -0,0 +1,378 @@
+"""Tenant-aware page and fragment cache with tag-based invalidation.
+
+Public pages such as the portal home, season schedules and team profiles are
+the same for every anonymous visitor of an organization. They only change
+when a game, roster or venue changes. ``@cached_view`` stores the rendered
+response of such a view. The ``{% cache %}`` template tag does the same for a
+block of markup.
+
+Keys include the organization, the locale, the path and the query string, so
+tenants never see each other's pages. Only anonymous GET requests without
+pending flash messages are served from or stored in the cache.
+
+Invalidation uses tag versions. Every entry carries tags such as
+``season:<id>`` or ``team:<id>``, together with each tag's version at the
+time it was rendered. An entry is fresh only while all of its tags still
+have those versions. ORM hooks collect tags from flushed ``Game``, ``Team``,
+``Player``, ``Season``, ``League`` and ``Venue`` rows, and bump them once the
+transaction commits, so a final score or roster move drops exactly the pages
+that show it. Writes made with raw SQL are covered only by the timeout.
+
+Backends:
+
+* ``memory``: an LRU per worker process. Tag bumps only reach the worker
+  that made the commit, so other workers serve their copy until it times
+  out.
+* ``redis``: shared by every worker. Tag versions are Redis counters, so an
+  invalidation is seen everywhere.
+
+Cached pages contain a CSRF token placeholder. The requesting visitor's own
+token is substituted in on every hit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import redis
+from flask import Flask, Response, current_app, g, has_app_context, has_request_context, make_response, request, session
+from flask_login import current_user
+from flask_wtf.csrf import generate_csrf
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from slms.models import Game, League, Player, Season, Team, Venue
+
+# Seconds an entry lives when the caller gives no timeout and PAGE_CACHE_TIMEOUT is unset
+DEFAULT_TIMEOUT = 120
+# Stands in for the per-visitor CSRF token inside cached markup
+CSRF_PLACEHOLDER = '__slms_csrf_token__'
+
+# Column -> tag prefix for every model whose changes invalidate public pages
+TAG_SOURCES = {
+    Game: {'season_id': 'season', 'home_team_id': 'team', 'away_team_id': 'team',
+           'venue_id': 'venue', 'org_id': 'results'},
+    Team: {'id': 'team', 'season_id': 'season'},
+    Player: {'team_id': 'team'},
+    Season: {'id': 'season', 'org_id': 'org'},
+    League: {'org_id': 'org'},
+    Venue: {'id': 'venue'},
+}
+
+
+class MemoryCacheBackend:
+    """Per-process LRU with expiry and in-memory tag versions."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._tags: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], timeout: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def tag_versions(self, tags: Sequence[str]) -> List[int]:
+        with self._lock:
+            return [self._tags.get(tag, 0) for tag in tags]
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = self._tags.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+
+class RedisCacheBackend:
+    """Entries and tag versions in Redis, shared by every worker."""
+
+    def __init__(self, url: str, prefix: str = 'slms:page-cache:'):
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key: str, value: Dict[str, Any], timeout: float) -> None:
+        self._client.set(self.prefix + key, json.dumps(value), ex=max(1, int(timeout)))
+
+    def tag_versions(self, tags: Sequence[str]) -> List[int]:
+        if not tags:
+            return []
+        values = self._client.mget([f"{self.prefix}tag:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        with self._client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"{self.prefix}tag:{tag}")
+            pipe.execute()
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+
+def init_page_cache(app: Flask) -> None:
+    """Create the configured backend and register the ``{% cache %}`` tag."""
+    backend = app.config.get('PAGE_CACHE_BACKEND', 'memory')
+    if backend == 'redis':
+        cache = RedisCacheBackend(app.config.get('PAGE_CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    elif backend == 'memory':
+        cache = MemoryCacheBackend(int(app.config.get('PAGE_CACHE_MAX_ENTRIES', 2048)))
+    else:
+        cache = None
+    app.extensions['page_cache'] = cache
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+
+def get_page_cache():
+    """The current app's backend, or None when caching is off."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('page_cache')
+
+
+def _timeout(timeout: Optional[float]) -> float:
+    if timeout is not None:
+        return timeout
+    return float(current_app.config.get('PAGE_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+
+
+def _current_org_id() -> Optional[str]:
+    org = getattr(g, 'org', None)
+    return getattr(org, 'id', None)
+
+
+def _current_locale() -> str:
+    org = getattr(g, 'org', None)
+    return session.get('locale') or getattr(org, 'locale', None) or ''
+
+
+def cache_key(namespace: str, *parts: Any) -> str:
+    """Key for ``parts`` scoped to the current organization and locale."""
+    raw = json.dumps([namespace, _current_org_id(), _current_locale(), *parts], default=str)
+    return f"{namespace}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:40]}"
+
+
+def _is_fresh(cache, versions: Dict[str, int]) -> bool:
+    tags = list(versions)
+    return cache.tag_versions(tags) == [versions[tag] for tag in tags]
+
+
+def _request_is_cacheable() -> bool:
+    return (
+        request.method in ('GET', 'HEAD')
+        and not current_user.is_authenticated
+        and '_flashes' not in session
+        and not session.get('theme_preview_active')
+    )
+
+
+def add_cache_tags(*tags: str) -> None:
+    """Attach tags discovered while a cached view runs (e.g. a team's season)."""
+    collected = g.get('_page_cache_tags')
+    cache = get_page_cache()
+    if collected is None or cache is None:
+        return
+    new_tags = [tag for tag in tags if tag and tag not in collected]
+    collected.update(zip(new_tags, cache.tag_versions(new_tags)))
+
+
+def invalidate_tags(*tags: str) -> None:
+    """Drop every cached page and fragment carrying any of ``tags``."""
+    cache = get_page_cache()
+    if cache is not None and tags:
+        cache.bump_tags(tags)
+
+
+def _replay(entry: Dict[str, Any]) -> Response:
+    body = entry['body']
+    if CSRF_PLACEHOLDER in body:
+        body = body.replace(CSRF_PLACEHOLDER, generate_csrf())
+    response = Response(body, status=entry['status'], mimetype=entry['mimetype'])
+    response.headers['X-Cache'] = 'HIT'
+    return response
+
+
+def _store(cache, key: str, response: Response, versions: Dict[str, int], timeout: float) -> None:
+    body = response.get_data(as_text=True)
+    token = g.get(current_app.config.get('WTF_CSRF_FIELD_NAME', 'csrf_token'))
+    if token:
+        body = body.replace(token, CSRF_PLACEHOLDER)
+    cache.set(key, {
+        'body': body,
+        'status': response.status_code,
+        'mimetype': response.mimetype,
+        'tags': versions,
+    }, timeout)
+
+
+def cached_view(timeout: Optional[float] = None, tags: Sequence[str] = ()) -> Callable:
+    """Cache a view's response for anonymous visitors.
+
+    ``tags`` are format strings filled from the view arguments plus ``org``
+    (the current organization id), e.g. ``'season:{season_id}'``. Every
+    entry is also tagged ``org:<id>``. Views can add tags they only learn
+    while running with ``add_cache_tags``.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_page_cache()
+            if cache is None or not _request_is_cacheable():
+                return view(*args, **kwargs)
+
+            org_id = _current_org_id()
+            static_tags = [tag.format(org=org_id, **kwargs) for tag in tags]
+            if org_id:
+                static_tags.append(f'org:{org_id}')
+            key = cache_key(f'view:{request.endpoint}', request.path, sorted(request.args.items(multi=True)))
+
+            try:
+                entry = cache.get(key)
+                if entry is not None and _is_fresh(cache, entry['tags']):
+                    return _replay(entry)
+                # Versions are read before the view queries anything, so a
+                # commit that lands mid-render leaves the entry already stale
+                g._page_cache_tags = dict(zip(static_tags, cache.tag_versions(static_tags)))
+            except (redis.RedisError, OSError) as exc:
+                current_app.logger.warning(f"Page cache unavailable: {exc}")
+                return view(*args, **kwargs)
+
+            response = make_response(view(*args, **kwargs))
+            versions = g.pop('_page_cache_tags', {})
+            if response.status_code == 200 and not response.is_streamed and response.mimetype == 'text/html':
+                try:
+                    _store(cache, key, response, versions, _timeout(timeout))
+                except (redis.RedisError, OSError) as exc:
+                    current_app.logger.warning(f"Page cache unavailable: {exc}")
+            response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache timeout, 'name', 'tag', ... %}...{% endcache %}``.
+
+    The block is cached per organization and locale under ``name``. Pass
+    ``none`` as the timeout for the configured default. Fragments are shared
+    by every visitor, so they must not contain per-user markup.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render_cached', [nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, args, caller):
+        cache = get_page_cache()
+        if cache is None or not has_request_context() or len(args) < 2:
+            return caller()
+        timeout, name, *tags = args
+        tags = [str(tag) for tag in tags if tag]
+        org_id = _current_org_id()
+        if org_id:
+            tags.append(f'org:{org_id}')
+        key = cache_key('fragment', str(name))
+        try:
+            entry = cache.get(key)
+            if entry is not None and _is_fresh(cache, entry['tags']):
+                return Markup(entry['body'])
+            versions = dict(zip(tags, cache.tag_versions(tags)))
+            body = caller()
+            cache.set(key, {'body': str(body), 'tags': versions}, _timeout(timeout))
+            return body
+        except (redis.RedisError, OSError) as exc:
+            current_app.logger.warning(f"Fragment cache unavailable: {exc}")
+            return caller()
+
+
+def _row_tags(obj) -> set:
+    sources = TAG_SOURCES.get(type(obj))
+    if not sources:
+        return set()
+    state = inspect(obj)
+    tags = set()
+    for attr, prefix in sources.items():
+        # Old values too, so a player moving teams refreshes both rosters
+        for value in state.attrs[attr].history.sum():
+            if value is not None:
+                tags.add(f'{prefix}:{value}')
+    return tags
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_tags(session, flush_context):
+    pending = session.info.setdefault('page_cache_tags', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        pending.update(_row_tags(obj))
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_tags(session):
+    tags = session.info.pop('page_cache_tags', None)
+    if not tags:
+        return
+    try:
+        invalidate_tags(*tags)
+    except (redis.RedisError, OSError) as exc:
+        current_app.logger.warning(f"Page cache invalidation failed: {exc}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_tags(session):
+    session.info.pop('page_cache_tags', None)
+
+
+__all__ = [
+    'MemoryCacheBackend',
+    'RedisCacheBackend',
+    'FragmentCacheExtension',
+    'init_page_cache',
+    'get_page_cache',
+    'cache_key',
+    'cached_view',
+    'add_cache_tags',
+    'invalidate_tags',
+]
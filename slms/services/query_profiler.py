@@ -0,0 +1,293 @@
+"""Per-request SQL instrumentation.
+
+SQLAlchemy cursor events time every statement the app runs: ORM queries,
+lazy loads and the legacy ``SessionCursor``. The events are registered on
+the ``Engine`` class, so they also cover engines Flask-SQLAlchemy creates
+later. Statements are grouped by a normalized form, with literals and bind
+markers replaced by ``?``, so the same query with different ids counts as
+one statement.
+
+For each request the profiler records the query count, the total DB time,
+how many statements came through the legacy cursor, and the slowest
+normalized statements. Profiling is opt-in (``QUERY_PROFILER_ENABLED``),
+and so is the header (``SERVER_TIMING_ENABLED``). The result is surfaced
+in three places:
+
+* a ``Server-Timing`` header (``db`` and ``app`` metrics), which browser
+  dev tools show next to the request. It is only sent in debug mode or to
+  signed-in admins, so anonymous visitors never see backend timings;
+* a log line for a sampled share of requests (``QUERY_PROFILER_SAMPLE_RATE``),
+  plus every request over ``QUERY_PROFILER_SLOW_MS`` or with a statement
+  repeated ``QUERY_PROFILER_REPEAT_THRESHOLD`` times (the usual N+1
+  signature);
+* ``/admin/perf``, which reads the per-process aggregate kept in
+  ``app.extensions['query_profiler']``.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, current_app, g, has_request_context, request
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from slms.models import UserRole
+
+# Statements tracked in the per-process aggregate before the cheapest are evicted
+MAX_TRACKED_STATEMENTS = 500
+# Length normalized statements are truncated to
+MAX_STATEMENT_LENGTH = 600
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_BIND_RE = re.compile(r'%\(\w+\)s|%s|:\w+|\$\d+|\?')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse a SQL string to its shape: literals and binds become ``?``."""
+    normalized = _STRING_RE.sub('?', statement)
+    normalized = _BIND_RE.sub('?', normalized)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    normalized = _IN_LIST_RE.sub('IN (...)', normalized)
+    normalized = _SPACE_RE.sub(' ', normalized).strip()
+    return normalized[:MAX_STATEMENT_LENGTH]
+
+
+class RequestQueryStats:
+    """Queries run while handling one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.legacy_count = 0
+        self.total_ms = 0.0
+        self.statements: Dict[str, List[float]] = {}  # statement -> [count, total_ms, max_ms]
+
+    def record(self, statement: str, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        key = normalize_statement(statement)
+        entry = self.statements.get(key)
+        if entry is None:
+            self.statements[key] = [1, ms, ms]
+        else:
+            entry[0] += 1
+            entry[1] += ms
+            if ms > entry[2]:
+                entry[2] = ms
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        """Slowest statements by total time."""
+        rows = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {'statement': statement, 'count': int(count), 'total_ms': total, 'max_ms': max_ms}
+            for statement, (count, total, max_ms) in rows
+        ]
+
+    def max_repeats(self) -> int:
+        return int(max((entry[0] for entry in self.statements.values()), default=0))
+
+
+class QueryProfiler:
+    """Per-process aggregate of request query statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.since = time.time()
+            self.requests = 0
+            self.endpoints: Dict[str, Dict[str, Any]] = {}
+            self.statements: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, endpoint: str, stats: RequestQueryStats, request_ms: float) -> None:
+        with self._lock:
+            self.requests += 1
+            summary = self.endpoints.get(endpoint)
+            if summary is None:
+                summary = self.endpoints[endpoint] = {
+                    'endpoint': endpoint, 'requests': 0, 'queries': 0, 'max_queries': 0,
+                    'db_ms': 0.0, 'request_ms': 0.0, 'max_repeats': 0,
+                }
+            summary['requests'] += 1
+            summary['queries'] += stats.count
+            summary['max_queries'] = max(summary['max_queries'], stats.count)
+            summary['db_ms'] += stats.total_ms
+            summary['request_ms'] += request_ms
+            summary['max_repeats'] = max(summary['max_repeats'], stats.max_repeats())
+
+            for statement, (count, total, max_ms) in stats.statements.items():
+                entry = self.statements.get(statement)
+                if entry is None:
+                    if len(self.statements) >= MAX_TRACKED_STATEMENTS:
+                        cheapest = min(self.statements, key=lambda key: self.statements[key]['total_ms'])
+                        if self.statements[cheapest]['total_ms'] >= total:
+                            continue
+                        del self.statements[cheapest]
+                    entry = self.statements[statement] = {
+                        'statement': statement, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                        'endpoints': set(),
+                    }
+                entry['count'] += int(count)
+                entry['total_ms'] += total
+                entry['max_ms'] = max(entry['max_ms'], max_ms)
+                entry['endpoints'].add(endpoint)
+
+    def snapshot(self, limit: int = 25) -> Dict[str, Any]:
+        """Endpoints and statements ordered by total DB time."""
+        with self._lock:
+            endpoints = []
+            for summary in self.endpoints.values():
+                row = dict(summary)
+                row['avg_queries'] = row['queries'] / row['requests']
+                row['avg_db_ms'] = row['db_ms'] / row['requests']
+                row['avg_request_ms'] = row['request_ms'] / row['requests']
+                endpoints.append(row)
+            statements = []
+            for entry in self.statements.values():
+                row = dict(entry)
+                row['endpoints'] = sorted(entry['endpoints'])
+                row['avg_ms'] = row['total_ms'] / row['count'] if row['count'] else 0.0
+                statements.append(row)
+            since, requests = self.since, self.requests
+
+        endpoints.sort(key=lambda row: row['db_ms'], reverse=True)
+        statements.sort(key=lambda row: row['total_ms'], reverse=True)
+        return {
+            'since': since,
+            'requests': requests,
+            'endpoints': endpoints[:limit],
+            'statements': statements[:limit],
+        }
+
+
+def get_query_profiler() -> QueryProfiler:
+    """Return the current app's per-process query aggregate."""
+    profiler = current_app.extensions.get('query_profiler')
+    if profiler is None:
+        profiler = QueryProfiler()
+        current_app.extensions['query_profiler'] = profiler
+    return profiler
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats for the request being handled, if profiling is on."""
+    if not has_request_context():
+        return None
+    return g.get('query_stats')
+
+
+def note_legacy_execute() -> None:
+    """Count a statement issued through the legacy ``SessionCursor``."""
+    stats = current_query_stats()
+    if stats is not None:
+        stats.legacy_count += 1
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_stats' in g:
+        conn.info.setdefault('query_profiler_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_profiler_started')
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None:
+        started = connection.info.get('query_profiler_started')
+        if started:
+            started.pop()
+
+
+def _server_timing(stats: RequestQueryStats, request_ms: float) -> str:
+    return (
+        f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", '
+        f'app;dur={request_ms:.1f}'
+    )
+
+
+def _server_timing_allowed() -> bool:
+    if not current_app.config.get('SERVER_TIMING_ENABLED', False):
+        return False
+    if current_app.debug:
+        return True
+    return bool(current_user.is_authenticated and current_user.has_role(UserRole.OWNER, UserRole.ADMIN))
+
+
+def _log_request(stats: RequestQueryStats, request_ms: float, reason: str) -> None:
+    top = stats.top(int(current_app.config.get('QUERY_PROFILER_TOP_N', 5)))
+    lines = [
+        f'SQL profile ({reason}) {request.method} {request.path}: '
+        f'{stats.count} queries ({stats.legacy_count} legacy), '
+        f'{stats.total_ms:.1f} ms DB of {request_ms:.1f} ms'
+    ]
+    for row in top:
+        lines.append(f"  {row['count']}x {row['total_ms']:.1f} ms (max {row['max_ms']:.1f}) {row['statement']}")
+    current_app.logger.info('\n'.join(lines))
+
+
+def init_query_profiler(app: Flask) -> None:
+    """Register request hooks that collect and publish SQL statistics."""
+    if not app.config.get('QUERY_PROFILER_ENABLED', False):
+        return
+
+    @app.before_request
+    def _start_query_stats() -> None:
+        g.query_stats = RequestQueryStats()
+
+    @app.after_request
+    def _finish_query_stats(response):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return response
+        config = current_app.config
+        request_ms = (time.perf_counter() - stats.started) * 1000
+        endpoint = request.endpoint or request.path
+
+        get_query_profiler().add(endpoint, stats, request_ms)
+
+        if _server_timing_allowed():
+            response.headers.add('Server-Timing', _server_timing(stats, request_ms))
+
+        reason = None
+        if stats.total_ms >= float(config.get('QUERY_PROFILER_SLOW_MS', 500)):
+            reason = 'slow'
+        elif stats.max_repeats() >= int(config.get('QUERY_PROFILER_REPEAT_THRESHOLD', 20)):
+            reason = 'repeated'
+        elif random.random() < float(config.get('QUERY_PROFILER_SAMPLE_RATE', 0.01)):
+            reason = 'sampled'
+        if reason:
+            _log_request(stats, request_ms, reason)
+        return response
+
+
+__all__ = [
+    'normalize_statement',
+    'RequestQueryStats',
+    'QueryProfiler',
+    'get_query_profiler',
+    'current_query_stats',
+    'note_legacy_execute',
+    'init_query_profiler',
+]
@@ -9,12 +9,18 @@ from rq.job import Job
 
 from slms.services.jobs import (
     send_email_job,
+    send_transactional_email_job,
     send_registration_confirmation_job,
     send_game_reminder_job,
+    send_game_reminder_digest_job,
     send_game_recap_job,
     generate_schedule_job,
     send_daily_game_reminders_job,
-    retry_failed_emails_job
+    retry_failed_emails_job,
+    reconcile_org_counters_job,
+    refresh_dashboard_insights_job,
+    generate_media_derivatives_job,
+    publish_static_snapshots_job
 )
 
 
@@ -44,6 +50,17 @@ class QueueService:
         )
         return job
 
+    def enqueue_transactional_email(self, to_email, subject, html_body, text_body):
+        """Queue delivery of an already rendered transactional email."""
+        job = self.email_queue.enqueue(
+            send_transactional_email_job,
+            to_email=to_email,
+            subject=subject,
+            html_body=html_body,
+            text_body=text_body
+        )
+        return job
+
     def enqueue_registration_confirmation(self, registration_id, to_email, to_name=None):
         """Queue a registration confirmation email."""
         job = self.email_queue.enqueue(
@@ -74,6 +91,46 @@ class QueueService:
             )
         return job
 
+    def enqueue_game_reminders(self, reminders, digest=False):
+        """Queue game reminders for many (org_id, game_id, to_email) triples at once.
+
+        Duplicate triples are dropped and every job is written through a
+        single Redis pipeline. With ``digest`` each recipient gets one job per
+        organization covering all of their games there; the same address in
+        two organizations belongs to two separate users.
+        """
+        grouped = {}
+        for org_id, game_id, to_email in reminders:
+            game_ids = grouped.setdefault((org_id, to_email), [])
+            if game_id not in game_ids:
+                game_ids.append(game_id)
+
+        if digest:
+            job_datas = [
+                Queue.prepare_data(
+                    send_game_reminder_digest_job,
+                    kwargs={'game_ids': game_ids, 'to_email': to_email, 'to_name': to_email}
+                )
+                for (_, to_email), game_ids in grouped.items()
+            ]
+        else:
+            job_datas = [
+                Queue.prepare_data(
+                    send_game_reminder_job,
+                    kwargs={'game_id': game_id, 'to_email': to_email, 'to_name': to_email}
+                )
+                for (_, to_email), game_ids in grouped.items()
+                for game_id in game_ids
+            ]
+
+        if not job_datas:
+            return []
+
+        with self.redis_conn.pipeline() as pipe:
+            jobs = self.email_queue.enqueue_many(job_datas, pipeline=pipe)
+            pipe.execute()
+        return jobs
+
     def enqueue_game_recap(self, game_id, to_email, to_name=None):
         """Queue a game recap email."""
         job = self.email_queue.enqueue(
@@ -119,6 +176,59 @@ class QueueService:
         )
         return job
 
+    def schedule_org_counter_reconciliation(self):
+        """Schedule the next nightly reconciliation of organization counters.
+
+        The job id is derived from the run date, so calling this from every
+        worker start and from the job itself never queues duplicates.
+        """
+        # Run nightly at 3 AM
+        run_at = datetime.utcnow().replace(hour=3, minute=0, second=0, microsecond=0)
+        if run_at <= datetime.utcnow():
+            run_at += timedelta(days=1)
+        job = self.default_queue.enqueue_at(
+            run_at,
+            reconcile_org_counters_job,
+            job_id=f"org-counters-{run_at:%Y%m%d}"
+        )
+        return job
+
+    def schedule_dashboard_insights_refresh(self):
+        """Schedule the next rebuild of the admin dashboard insight snapshot.
+
+        Runs on 15-minute boundaries; the job id names the slot, so repeated
+        calls schedule the same run once.
+        """
+        # Run every 15 minutes
+        now = datetime.utcnow()
+        run_at = now.replace(minute=now.minute - now.minute % 15, second=0, microsecond=0)
+        run_at += timedelta(minutes=15)
+        job = self.default_queue.enqueue_at(
+            run_at,
+            refresh_dashboard_insights_job,
+            job_id=f"dashboard-insights-{run_at:%Y%m%d%H%M}"
+        )
+        return job
+
+    def enqueue_media_derivatives(self, asset_id):
+        """Queue rendition generation for an uploaded media image."""
+        job = self.default_queue.enqueue(
+            generate_media_derivatives_job,
+            asset_id=asset_id,
+            job_timeout=300
+        )
+        return job
+
+    def enqueue_static_snapshots(self, kind, target_id):
+        """Queue static snapshot rendering for a season or game."""
+        job = self.default_queue.enqueue(
+            publish_static_snapshots_job,
+            kind=kind,
+            target_id=target_id,
+            job_timeout=1800
+        )
+        return job
+
     def get_job_status(self, job_id):
         """Get the status of a job by ID."""
         try:
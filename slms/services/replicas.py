@@ -0,0 +1,247 @@
+"""Read-replica routing for ``db.session``.
+
+Replicas are configured with ``DATABASE_REPLICA_URLS``, a comma-separated
+list. Each URL gets its own engine named ``replica_<n>``. These are not
+Flask-SQLAlchemy binds, so ``db.create_all`` and migrations never touch them.
+``RoutingSession``, the class behind ``db.session``, sends statements for
+the default bind to a replica when the current request is marked read-only:
+
+* GET/HEAD requests to the blueprints in ``REPLICA_READ_BLUEPRINTS``
+  (public, portal and the ``/api/v1`` API by default);
+* any view decorated with ``@replica_read``.
+
+``@primary_only`` opts a view out. Everything else, including code outside a
+request (CLI, RQ jobs), uses the primary.
+
+Reads that follow a write stay consistent:
+
+* The first write in a request moves the rest of the request to the primary.
+  That covers DML (including ``WITH`` queries whose CTEs modify data), DDL,
+  ``FOR UPDATE`` and ORM flushes.
+* The writer's session is pinned to the primary for ``REPLICA_STICKY_SECONDS``,
+  so the redirect after a form post does not read stale rows.
+
+Replica health is probed per process at most every
+``REPLICA_CHECK_INTERVAL`` seconds. A replica that cannot be reached, or that
+lags more than ``REPLICA_MAX_LAG_SECONDS`` behind, is skipped until the next
+probe. With no usable replica, reads fall back to the primary.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import Flask, current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+
+REPLICA_BIND_PREFIX = 'replica_'
+# Session key holding the epoch time until which this client reads from the primary
+STICKY_SESSION_KEY = 'db_primary_until'
+
+_WRITE_SQL_RE = re.compile(
+    r'^\s*(?:insert|update|delete|replace|merge|upsert|create|alter|drop|truncate|grant|revoke|vacuum|copy)\b'
+    # Data-modifying CTEs: WITH moved AS (UPDATE ... RETURNING ...) SELECT ...
+    r'|^\s*with\b.*?\b(?:insert|update|delete|merge)\b'
+    r'|\bfor\s+(?:no\s+key\s+)?update\b',
+    re.IGNORECASE | re.DOTALL,
+)
+
+_POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def _replica_urls(app: Flask) -> List[str]:
+    urls = app.config.get('DATABASE_REPLICA_URLS') or []
+    if isinstance(urls, str):
+        urls = [url.strip() for url in urls.split(',') if url.strip()]
+    return list(urls)
+
+
+def _probe_lag(engine) -> float:
+    with engine.connect() as conn:
+        if engine.dialect.name == 'postgresql':
+            return float(conn.execute(_POSTGRES_LAG_SQL).scalar() or 0)
+        conn.execute(text('SELECT 1'))
+        return 0.0
+
+
+class ReplicaMonitor:
+    """Replica engines plus their cached health and lag, shared by a process."""
+
+    def __init__(self, engines: Dict[str, Engine], check_interval: float, max_lag: float,
+                 lag_probe: Callable[[Any], float] = _probe_lag):
+        self.engines = dict(engines)
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.lag_probe = lag_probe
+        self._lock = threading.Lock()
+        self._status: Dict[str, Dict[str, Any]] = {}
+
+    def _check(self, key: str, engine) -> Dict[str, Any]:
+        try:
+            lag = self.lag_probe(engine)
+            status = {'healthy': lag <= self.max_lag, 'lag': lag, 'error': None}
+        except Exception as exc:
+            status = {'healthy': False, 'lag': None, 'error': str(exc)}
+        status['checked_at'] = time.monotonic()
+        return status
+
+    def status(self, key: str, engine) -> Dict[str, Any]:
+        with self._lock:
+            current = self._status.get(key)
+            if current is not None and time.monotonic() - current['checked_at'] < self.check_interval:
+                return current
+            # Mark as fresh before probing so concurrent requests do not pile up probes
+            if current is not None:
+                current['checked_at'] = time.monotonic()
+        status = self._check(key, engine)
+        with self._lock:
+            self._status[key] = status
+        return status
+
+    def healthy_keys(self) -> List[str]:
+        return [key for key, engine in sorted(self.engines.items()) if self.status(key, engine)['healthy']]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._status.clear()
+
+    def dispose(self) -> None:
+        for engine in self.engines.values():
+            engine.dispose()
+
+
+def get_replica_monitor() -> Optional[ReplicaMonitor]:
+    """Return the current app's replica monitor, or None without replicas."""
+    return current_app.extensions.get('db_replicas')
+
+
+def replica_read(func):
+    """Allow this view's reads to go to a replica, whatever the method or blueprint."""
+    func._db_route = 'replica'
+    return func
+
+
+def primary_only(func):
+    """Keep this view on the primary even when it would otherwise read from a replica."""
+    func._db_route = 'primary'
+    return func
+
+
+def _view_route() -> Optional[str]:
+    view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+    while view is not None:
+        route = getattr(view, '_db_route', None)
+        if route is not None:
+            return route
+        view = getattr(view, '__wrapped__', None)
+    return None
+
+
+def _wants_replica() -> bool:
+    route = _view_route()
+    if route is not None:
+        return route == 'replica'
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    blueprints = current_app.config.get('REPLICA_READ_BLUEPRINTS', ('public', 'portal', 'api'))
+    return request.blueprint in blueprints
+
+
+def mark_primary() -> None:
+    """Send the rest of this request, and this client's next few seconds, to the primary."""
+    if not has_request_context():
+        return
+    g.db_route = 'primary'
+    sticky = float(current_app.config.get('REPLICA_STICKY_SECONDS', 5))
+    if sticky > 0:
+        session[STICKY_SESSION_KEY] = time.time() + sticky
+
+
+def current_route() -> str:
+    """'replica_<n>' or 'primary' for the current request."""
+    if not has_request_context():
+        return 'primary'
+    return g.get('db_route', 'primary')
+
+
+def _is_write(clause) -> bool:
+    if clause is None:
+        return False
+    if getattr(clause, 'is_dml', False) or getattr(clause, 'is_ddl', False):
+        return True
+    if getattr(clause, '_for_update_arg', None) is not None:
+        return True
+    if isinstance(clause, TextClause):
+        return bool(_WRITE_SQL_RE.search(clause.text))
+    return False
+
+
+class RoutingSession(Session):
+    """``db.session`` class that routes read-only request traffic to replicas."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_request_context():
+            return engine
+        route = g.get('db_route')
+        if route is None or route == 'primary':
+            return engine
+        if engine is not self._db.engines.get(None):
+            return engine
+        if self._flushing or _is_write(clause):
+            mark_primary()
+            return engine
+        if mapper is None and clause is None:
+            return engine
+        monitor = current_app.extensions.get('db_replicas')
+        if monitor is None:
+            return engine
+        return monitor.engines.get(route, engine)
+
+
+def init_replica_routing(app: Flask) -> None:
+    """Create replica engines and register per-request routing."""
+    urls = _replica_urls(app)
+    if not urls:
+        return
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.setdefault('pool_pre_ping', True)
+    app.extensions['db_replicas'] = ReplicaMonitor(
+        {f'{REPLICA_BIND_PREFIX}{index}': create_engine(url, **options) for index, url in enumerate(urls)},
+        check_interval=float(app.config.get('REPLICA_CHECK_INTERVAL', 5)),
+        max_lag=float(app.config.get('REPLICA_MAX_LAG_SECONDS', 10)),
+    )
+
+    @app.before_request
+    def _choose_database() -> None:
+        g.db_route = 'primary'
+        if not _wants_replica():
+            return
+        if session.get(STICKY_SESSION_KEY, 0) > time.time():
+            return
+        keys = get_replica_monitor().healthy_keys()
+        if keys:
+            g.db_route = random.choice(keys)
+
+
+__all__ = [
+    'RoutingSession',
+    'ReplicaMonitor',
+    'current_route',
+    'get_replica_monitor',
+    'init_replica_routing',
+    'mark_primary',
+    'primary_only',
+    'replica_read',
+]
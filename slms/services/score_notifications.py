@@ -8,6 +8,8 @@ from flask import current_app
 
 from slms.extensions import db
 from slms.models.models import Game
+from slms.services.score_ticker import schedule_ticker_refresh
+from slms.services.static_snapshots import queue_game_snapshots
 
 if TYPE_CHECKING:
     from slms.models.models import Team
@@ -23,7 +25,7 @@ class ScoreNotificationService:
         payload = ScoreNotificationService._build_payload(game, update_type)
 
         # Update ticker
-        ScoreNotificationService._update_ticker(payload)
+        ScoreNotificationService._update_ticker(game)
 
         # Update standings cache
         ScoreNotificationService._invalidate_standings(game)
@@ -31,6 +33,10 @@ class ScoreNotificationService:
         # Send webhooks (if configured)
         ScoreNotificationService._send_webhooks(payload)
 
+        # Re-render static pages once the result is settled
+        if update_type in ('game_end', 'reconciled'):
+            queue_game_snapshots(game)
+
         # Log notification
         current_app.logger.info(f'Score notification sent for game {game.id}: {update_type}')
 
@@ -61,15 +67,12 @@ class ScoreNotificationService:
         }
 
     @staticmethod
-    def _update_ticker(payload: dict):
-        """Update live ticker/scoreboard data."""
-        # This would typically update a Redis cache or similar
-        # For now, we'll just mark it as updated
+    def _update_ticker(game: Game):
+        """Fold the change into the league's next ticker snapshot."""
         try:
-            from flask import current_app
-            cache_key = f"ticker:game:{payload['game_id']}"
-            # If using Redis: redis_client.set(cache_key, json.dumps(payload), ex=3600)
-            current_app.logger.debug(f'Ticker updated: {cache_key}')
+            league_id = game.season.league_id if game.season else None
+            schedule_ticker_refresh(league_id)
+            current_app.logger.debug(f'Ticker refresh scheduled for league {league_id}')
         except Exception as e:
             current_app.logger.error(f'Failed to update ticker: {e}')
 
@@ -0,0 +1,235 @@
+"""Per-league score ticker snapshots fed by game state changes.
+
+The ticker embed (``GET /api/ticker/<league_id>``) is polled by every site
+that shows the bar. Instead of querying ``ticker_settings`` and
+``ticker_items`` on each poll, the endpoint reads one cached snapshot per
+league. The snapshot holds the serialized response body and a version
+derived from a hash of that body. The version doubles as the ETag, so
+rebuilds that change nothing (TTL expiry, other workers) keep it stable.
+
+A snapshot combines the league's ticker settings, the manual items posted
+through the admin endpoints, and the league's games: every live game, plus
+finals and upcoming games within ``GAME_WINDOW`` of now. Games feed the
+ticker automatically. ``ScoreNotificationService`` calls
+``schedule_ticker_refresh`` on start, score, overtime, final and
+reconciliation events.
+
+Refreshes are coalesced. The first event for a league starts a timer of
+``TICKER_COALESCE_SECONDS``, and events arriving before it fires are folded
+into the same rebuild. A burst of score changes therefore costs a single
+pair of queries. With a window of 0 the rebuild runs immediately, which is
+what tests and single-process setups use.
+
+Snapshots live in the same backends as the page cache:
+
+* ``memory``: per worker. Other workers pick up changes when their copy
+  reaches ``TICKER_SNAPSHOT_TTL``.
+* ``redis``: shared by every worker, so one rebuild serves all of them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, current_app
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import joinedload
+
+from slms.extensions import db
+from slms.models import Game, GameStatus, Season
+from slms.services.db import get_db
+from slms.services.page_cache import MemoryCacheBackend, RedisCacheBackend
+
+# Items sent to the embed, manual and game items combined
+TICKER_ITEM_LIMIT = 100
+# Finals and upcoming games this close to now are shown alongside live games
+GAME_WINDOW = timedelta(hours=24)
+# Leagues whose snapshots a worker keeps with the memory backend
+TICKER_MAX_LEAGUES = 512
+# Statuses shown first and flagged live
+LIVE_STATUSES = (GameStatus.IN_PROGRESS, GameStatus.HALFTIME, GameStatus.OVERTIME)
+
+DISABLED_BODY = {'enabled': False, 'items': []}
+
+
+class ScoreTicker:
+    """Snapshot store plus the per-league timers that coalesce refreshes."""
+
+    def __init__(self, app: Flask, store, coalesce_seconds: float, snapshot_ttl: float):
+        self.app = app
+        self.store = store
+        self.coalesce_seconds = coalesce_seconds
+        self.snapshot_ttl = snapshot_ttl
+        self._pending: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, league_id: str) -> None:
+        if self.coalesce_seconds <= 0:
+            refresh_ticker(league_id)
+            return
+        with self._lock:
+            if league_id in self._pending:
+                return
+            timer = threading.Timer(self.coalesce_seconds, self._flush, args=(league_id,))
+            timer.daemon = True
+            self._pending[league_id] = timer
+        timer.start()
+
+    def _flush(self, league_id: str) -> None:
+        with self._lock:
+            self._pending.pop(league_id, None)
+        with self.app.app_context():
+            try:
+                refresh_ticker(league_id)
+            except Exception as exc:
+                # The stale snapshot keeps serving until its TTL or the next event
+                current_app.logger.error(f'Failed to refresh ticker for league {league_id}: {exc}')
+
+
+def init_score_ticker(app: Flask) -> None:
+    """Create the snapshot store configured by ``TICKER_BACKEND``."""
+    if app.config.get('TICKER_BACKEND', 'memory') == 'redis':
+        store = RedisCacheBackend(app.config.get('TICKER_REDIS_URL', 'redis://localhost:6379/0'),
+                                  prefix='slms:ticker:')
+    else:
+        store = MemoryCacheBackend(TICKER_MAX_LEAGUES)
+    app.extensions['score_ticker'] = ScoreTicker(
+        app,
+        store,
+        coalesce_seconds=float(app.config.get('TICKER_COALESCE_SECONDS', 1.0)),
+        snapshot_ttl=float(app.config.get('TICKER_SNAPSHOT_TTL', 60)),
+    )
+
+
+def _ticker() -> ScoreTicker:
+    return current_app.extensions['score_ticker']
+
+
+def _legacy_rows(sql: str, params: tuple) -> List[Dict[str, Any]]:
+    # The ticker tables come from a standalone migration and may be missing;
+    # the savepoint keeps a failed read from aborting the caller's transaction
+    try:
+        with db.session.begin_nested():
+            cur = get_db().cursor()
+            cur.execute(sql, params)
+            return [dict(row._mapping) for row in cur.fetchall()]
+    except Exception:
+        return []
+
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _game_item(game: Game, links) -> Dict[str, Any]:
+    return {
+        'id': f'game:{game.id}',
+        'game_id': game.id,
+        'status': game.status.name,
+        'live': game.status in LIVE_STATUSES,
+        'start_time': _isoformat(game.start_time),
+        'home_name': game.home_team.name if game.home_team else 'TBD',
+        'away_name': game.away_team.name if game.away_team else 'TBD',
+        'home_score': game.home_score,
+        'away_score': game.away_score,
+        'home_logo': None,
+        'away_logo': None,
+        'venue': game.venue.name if game.venue else None,
+        'link_url': links.build('portal.game_detail', {'game_id': game.id}),
+        'period': game.current_period,
+        'clock': game.game_clock,
+        'sort_key': _isoformat(_aware(game.last_score_update or game.start_time)),
+    }
+
+
+def _league_games(league_id: str) -> List[Game]:
+    now = datetime.now(timezone.utc)
+    return (
+        Game.query
+        .filter(
+            Game.season_id.in_(select(Season.id).where(Season.league_id == league_id)),
+            or_(
+                Game.status.in_(LIVE_STATUSES),
+                Game.start_time.between(now - GAME_WINDOW, now + GAME_WINDOW),
+            ),
+            Game.status != GameStatus.CANCELED,
+        )
+        .options(joinedload(Game.home_team), joinedload(Game.away_team), joinedload(Game.venue))
+        .order_by(func.coalesce(Game.last_score_update, Game.start_time).desc())
+        .limit(TICKER_ITEM_LIMIT)
+        .all()
+    )
+
+
+def build_ticker_body(league_id: str) -> Dict[str, Any]:
+    """The embed payload for ``league_id``, read from the database."""
+    settings = _legacy_rows('SELECT enabled, theme FROM ticker_settings WHERE league_id=%s', (league_id,))
+    if not settings or not settings[0]['enabled']:
+        return DISABLED_BODY
+    theme = settings[0]['theme']
+    if isinstance(theme, str):
+        theme = json.loads(theme)
+
+    manual = _legacy_rows("""
+        SELECT id, status, start_time, home_name, away_name, home_score, away_score,
+               home_logo, away_logo, venue, link_url, sort_key
+        FROM ticker_items
+        WHERE league_id=%s
+        ORDER BY sort_key DESC, id DESC
+        LIMIT 100
+    """, (league_id,))
+    items = [{key: _isoformat(value) for key, value in row.items()} for row in manual]
+    links = current_app.url_map.bind('localhost')
+    items.extend(_game_item(game, links) for game in _league_games(league_id))
+    # Live games lead, everything else newest first
+    items.sort(key=lambda item: str(item.get('sort_key') or ''), reverse=True)
+    items.sort(key=lambda item: not item.get('live', False))
+    return {'enabled': True, 'theme': theme, 'items': items[:TICKER_ITEM_LIMIT]}
+
+
+def refresh_ticker(league_id: str) -> Dict[str, Any]:
+    """Rebuild and store the snapshot for ``league_id``."""
+    ticker = _ticker()
+    body = json.dumps(build_ticker_body(league_id), separators=(',', ':'), sort_keys=True, default=str)
+    # Content-derived, so every worker that builds the same body agrees on the ETag
+    snapshot = {'version': hashlib.sha256(body.encode('utf-8')).hexdigest()[:16], 'body': body}
+    ticker.store.set(f'league:{league_id}', snapshot, ticker.snapshot_ttl)
+    return snapshot
+
+
+def ticker_snapshot(league_id: str) -> Dict[str, Any]:
+    """``{'version', 'body'}`` for ``league_id``: one cache read, rebuilt on a miss."""
+    snapshot = _ticker().store.get(f'league:{league_id}')
+    if snapshot is None:
+        snapshot = refresh_ticker(league_id)
+    return snapshot
+
+
+def schedule_ticker_refresh(league_id: Optional[str]) -> None:
+    """Fold a change into the league's next (coalesced) snapshot rebuild."""
+    if not league_id:
+        return
+    try:
+        _ticker().schedule(league_id)
+    except Exception as exc:
+        current_app.logger.error(f'Failed to refresh ticker for league {league_id}: {exc}')
+
+
+__all__ = [
+    'TICKER_ITEM_LIMIT',
+    'init_score_ticker',
+    'build_ticker_body',
+    'refresh_ticker',
+    'ticker_snapshot',
+    'schedule_ticker_refresh',
+]
@@ -8,9 +8,11 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Set
 from urllib.parse import urlparse
 
-from flask import g, url_for, session
+from flask import current_app, g, url_for, session
 
 from slms.services.db import get_db
+from slms.services.branding import generate_custom_css
+from slms.services.theme_bundles import theme_bundle_url
 
 DEFAULT_PRIMARY_COLOR = "#343a40"
 
@@ -581,6 +583,10 @@ def _merge_nested(default: Dict[str, Any], override: Dict[str, Any]) -> Dict[str
     return result
 
 def _ensure_site_settings_schema(cur) -> None:
+    # Once per app: the DDL below would otherwise run on every page render and
+    # pin read-only requests to the primary database
+    if current_app.extensions.get("site_settings_schema_ready"):
+        return
     session = getattr(cur, "_session", None)
     dialect_name = ""
     if session is not None:
@@ -725,6 +731,7 @@ def _ensure_site_settings_schema(cur) -> None:
     for column, statement in migrations.items():
         if column not in existing_columns:
             cur.execute(statement)
+    current_app.extensions["site_settings_schema_ready"] = True
 
 def _sanitize_nav_link(entry: Dict[str, Any]) -> Dict[str, Any] | None:
     if not isinstance(entry, dict):
@@ -995,6 +1002,12 @@ def invalidate_site_settings_cache() -> None:
         delattr(g, "_site_settings_cache")
 
 
+def refresh_theme_bundle() -> Optional[str]:
+    """Compile the stylesheet for the stored site theme so visitors never wait on it."""
+    theme = _load_site_settings().get("theme", DEFAULT_THEME_CONFIG)
+    return theme_bundle_url(theme, getattr(g, 'org', None))
+
+
 def inject_site_settings():
     settings = _load_site_settings()
     preview_active = False
@@ -1022,6 +1035,11 @@ def inject_site_settings():
         "duotone": "ph-duotone",
     }
     icon_class = icon_weight_map.get(weight, "ph")
+    # Previews are per-admin and short-lived; they stay inline instead of leaving bundles behind
+    org = getattr(g, 'org', None)
+    theme_css_url = None if preview_active else theme_bundle_url(theme, org)
+    # The inline fallback needs the organization's branding the bundle would have carried
+    org_css = generate_custom_css(org) if theme_css_url is None and org is not None else ''
 
     return dict(
         site_title=settings.get("site_title", "Sports League Management System"),
@@ -1039,6 +1057,8 @@ def inject_site_settings():
         site_cta_slots=cta_slots,
         site_footer=footer_config,
         site_icon_class=icon_class,
+        site_theme_css_url=theme_css_url,
+        site_org_css=org_css,
         theme_preview_active=preview_active,
     )
 
@@ -1271,6 +1291,7 @@ def _record_site_theme_version(status: str, payload: Dict[str, Any], author_id:
 def publish_site_theme(payload: Dict[str, Any], author_id: Optional[int], label: Optional[str]) -> int:
     version_id = _record_site_theme_version('published', payload, author_id, label)
     discard_site_theme_preview()
+    refresh_theme_bundle()
     return version_id
 
 
@@ -1415,4 +1436,5 @@ def apply_site_payload(payload: Dict[str, Any]) -> None:
     finally:
         cur.close()
     invalidate_site_settings_cache()
+    refresh_theme_bundle()
 
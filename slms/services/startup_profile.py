@@ -0,0 +1,217 @@
+"""Phase timings for ``create_app`` and per-module import costs.
+
+``create_app`` wraps each phase in ``startup_span``. The span is a no-op
+unless a profile is active, so normal boots only pay for one global read per
+phase. ``flask perf startup`` uses ``measure_startup``, which runs a fresh
+interpreter under ``python -X importtime`` for every sample. That way module
+caches never hide the import cost a new gunicorn worker or RQ job pays. The
+runs use a throwaway SQLite database so the schema bootstrap is measured
+from scratch.
+
+This module must stay stdlib-only: it is imported early during startup.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+_profile: Optional['StartupProfile'] = None
+
+# Child script for one cold-start sample; prints a JSON document on its last line
+_SAMPLE_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import slms
+imported = time.perf_counter()
+from slms.config import Config
+from slms.services.startup_profile import start_profile, stop_profile
+
+class StartupConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = sys.argv[1]
+
+profile = start_profile()
+profile.add('import slms', (imported - started) * 1000)
+with profile.span('create_app'):
+    app = slms.create_app(StartupConfig)
+with profile.span('jinja'):
+    env = app.jinja_env
+    for name in sys.argv[2:]:
+        env.get_template(name)
+stop_profile()
+print(json.dumps(profile.as_list()))
+"""
+
+# Templates compiled in the ``jinja`` span (most pages extend these)
+DEFAULT_TEMPLATES = ('base.html', 'layout.html')
+
+
+class StartupProfile:
+    """Nested wall-clock spans, recorded in the order they start."""
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._depth = 0
+
+    def add(self, name: str, ms: float) -> None:
+        self.spans.append({'name': name, 'depth': self._depth, 'ms': ms})
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        entry = {'name': name, 'depth': self._depth, 'ms': 0.0}
+        self.spans.append(entry)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['ms'] = (time.perf_counter() - started) * 1000
+            self._depth -= 1
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        return [dict(span) for span in self.spans]
+
+
+def start_profile() -> StartupProfile:
+    """Begin recording ``startup_span`` timings in this process."""
+    global _profile
+    _profile = StartupProfile()
+    return _profile
+
+
+def stop_profile() -> Optional[StartupProfile]:
+    global _profile
+    profile, _profile = _profile, None
+    return profile
+
+
+@contextmanager
+def startup_span(name: str) -> Iterator[None]:
+    """Time a startup phase when a profile is active."""
+    profile = _profile
+    if profile is None:
+        yield
+        return
+    with profile.span(name):
+        yield
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """Map module name to ``{'self_us', 'cumulative_us'}`` from ``-X importtime`` output."""
+    modules: Dict[str, Dict[str, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = {'self_us': int(self_us), 'cumulative_us': int(cumulative_us)}
+        except ValueError:
+            continue
+    return modules
+
+
+def _run_sample(database_url: str, templates: List[str], cwd: str) -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _SAMPLE_SCRIPT, database_url, *templates],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'startup sample failed:\n{result.stderr[-2000:]}')
+    return {
+        'spans': json.loads(result.stdout.strip().splitlines()[-1]),
+        'imports': parse_importtime(result.stderr),
+    }
+
+
+def _git_revision(cwd: str) -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=cwd,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def measure_startup(runs: int = 5, database_url: Optional[str] = None,
+                    templates=DEFAULT_TEMPLATES, cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Cold-start ``create_app`` ``runs`` times and report median timings.
+
+    Each run gets a fresh SQLite file unless ``database_url`` is given.
+    """
+    cwd = cwd or os.getcwd()
+    samples = []
+    for _ in range(max(1, runs)):
+        with tempfile.TemporaryDirectory(prefix='slms-startup-') as tmp:
+            url = database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+            samples.append(_run_sample(url, list(templates), cwd))
+
+    spans = []
+    for index, span in enumerate(samples[0]['spans']):
+        values = [sample['spans'][index]['ms'] for sample in samples
+                  if index < len(sample['spans']) and sample['spans'][index]['name'] == span['name']]
+        spans.append({
+            'name': span['name'],
+            'depth': span['depth'],
+            'ms': round(statistics.median(values), 3),
+            'min_ms': round(min(values), 3),
+        })
+
+    imports = []
+    for name in samples[0]['imports']:
+        values = [sample['imports'][name] for sample in samples if name in sample['imports']]
+        imports.append({
+            'module': name,
+            'self_us': int(statistics.median(v['self_us'] for v in values)),
+            'cumulative_us': int(statistics.median(v['cumulative_us'] for v in values)),
+        })
+    imports.sort(key=lambda item: item['cumulative_us'], reverse=True)
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'revision': _git_revision(cwd),
+        'python': platform.python_version(),
+        'runs': len(samples),
+        'spans': spans,
+        'imports': imports,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-span deltas between two ``measure_startup`` reports, matched by name and depth."""
+    previous = {(span['name'], span['depth']): span['ms'] for span in baseline.get('spans', [])}
+    rows = []
+    for span in current.get('spans', []):
+        before = previous.get((span['name'], span['depth']))
+        rows.append({
+            'name': span['name'],
+            'depth': span['depth'],
+            'baseline_ms': before,
+            'ms': span['ms'],
+            'delta_ms': None if before is None else round(span['ms'] - before, 3),
+        })
+    return rows
+
+
+__all__ = [
+    'DEFAULT_TEMPLATES',
+    'StartupProfile',
+    'start_profile',
+    'stop_profile',
+    'startup_span',
+    'parse_importtime',
+    'measure_startup',
+    'compare_reports',
+]
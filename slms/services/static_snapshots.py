@@ -0,0 +1,294 @@
+"""Static snapshots of finished portal pages for the web server to serve.
+
+Once a season is completed or archived, its schedule and standings stop
+changing. So does the page of every final game. The publisher renders those
+pages once and writes them under ``STATIC_SNAPSHOT_DIR``, so historical
+traffic is answered by nginx without reaching Python::
+
+    <STATIC_SNAPSHOT_DIR>/<org slug>/portal/seasons/<id>/schedule/index.html
+    <STATIC_SNAPSHOT_DIR>/<org slug>/portal/seasons/<id>/standings/index.html
+    <STATIC_SNAPSHOT_DIR>/<org slug>/portal/games/<id>/index.html
+    <STATIC_SNAPSHOT_DIR>/<org slug>/api/v1/games/<id>/index.json
+
+with, for example (``$org_slug`` mapped from the host name)::
+
+    location /portal/ {
+        root /srv/slms/snapshots/$org_slug;
+        try_files $uri/index.html @slms;
+    }
+    location /api/v1/games/ {
+        root /srv/slms/snapshots/$org_slug;
+        default_type application/json;
+        try_files $uri/index.json @slms;
+    }
+
+Pages are rendered through the normal request pipeline: tenant
+resolution, the view, the templates and after-request hooks. Each render
+runs in a fresh application context as an anonymous visitor, so the
+snapshot never contains the signed-in admin's navigation. The CSRF token
+that base.html embeds is blanked, because it would belong to a session
+nobody has.
+
+Publishing is incremental and runs in the background: the hooks call
+``queue_season_snapshots``/``queue_game_snapshots``, which enqueue an RQ
+job (``STATIC_SNAPSHOT_BACKEND=rq``, the default) or render in place
+(``inline``, used by tests and single-process setups).
+
+
+* Changing a season's status to completed, archived or restored publishes its two pages and
+  its final games. Reopening the season removes its two pages, so the
+  dynamic pages take over again.
+* Finalizing or reconciling a game re-renders that game, the other finals
+  between the same two teams (their head-to-head list changed) and, if
+  the season is finished, the season's two pages.
+* A file is only rewritten when its content changed.
+
+Edits made outside these paths, such as a team rename, are picked up by
+``flask snapshots publish``. Publishing is off while ``STATIC_SNAPSHOT_DIR``
+is empty.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from flask import current_app, g, request
+from sqlalchemy import and_, or_
+
+from slms.extensions import db, limiter
+from slms.models import Game, GameStatus, Organization, Season, SeasonStatus
+
+# Season statuses whose pages no longer change
+FINISHED_SEASON_STATUSES = (SeasonStatus.COMPLETED, SeasonStatus.ARCHIVED)
+# Game statuses whose pages no longer change
+FINISHED_GAME_STATUSES = (GameStatus.FINAL, GameStatus.FORFEIT)
+# WSGI environ flag marking the publisher's own renders
+SNAPSHOT_ENVIRON_KEY = 'slms.static_snapshot'
+
+
+@limiter.request_filter
+def _is_snapshot_render() -> bool:
+    # Internal renders must not use up the loopback address's rate limit
+    return bool(request.environ.get(SNAPSHOT_ENVIRON_KEY))
+
+
+def snapshots_enabled() -> bool:
+    return bool(current_app.config.get('STATIC_SNAPSHOT_DIR'))
+
+
+def _snapshot_root(org_slug: str) -> Path:
+    return Path(current_app.config['STATIC_SNAPSHOT_DIR']) / org_slug
+
+
+def _url(endpoint: str, **values) -> str:
+    return current_app.url_map.bind('localhost').build(endpoint, values)
+
+
+def season_paths(season: Season) -> List[str]:
+    return [
+        _url('portal.season_schedule', season_id=season.id),
+        _url('portal.season_standings', season_id=season.id),
+    ]
+
+
+def game_paths(game: Game) -> List[str]:
+    return [
+        _url('portal.game_detail', game_id=game.id),
+        _url('api.game_detail', game_id=game.id),
+    ]
+
+
+def _target(org_slug: str, path: str, json: bool) -> Path:
+    return _snapshot_root(org_slug) / path.strip('/') / ('index.json' if json else 'index.html')
+
+
+def _render(path: str, org_slug: str):
+    """``(body, is_json)`` for an anonymous GET of ``path``, or None unless it is a 200."""
+    app = current_app._get_current_object()
+    # A fresh app context gives the render its own g, session and anonymous user
+    with app.app_context(), app.test_request_context(
+        path,
+        headers={'X-Org-Slug': org_slug},
+        environ_overrides={SNAPSHOT_ENVIRON_KEY: True},
+    ):
+        response = app.full_dispatch_request()
+        if response.status_code != 200:
+            return None
+        body = response.get_data()
+        token = g.get('csrf_token')
+        if token:
+            body = body.replace(token.encode('utf-8'), b'')
+        return body, response.mimetype == 'application/json'
+
+
+def _write_if_changed(target: Path, body: bytes) -> bool:
+    if target.is_file() and target.read_bytes() == body:
+        return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(body)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, target)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    return True
+
+
+def publish_paths(org_slug: str, paths: Iterable[str]) -> Counter:
+    """Render ``paths`` for ``org_slug`` and write the ones that changed."""
+    stats: Counter = Counter()
+    for path in dict.fromkeys(paths):
+        try:
+            rendered = _render(path, org_slug)
+        except Exception as exc:
+            current_app.logger.error(f'Static snapshot of {path} failed: {exc}')
+            rendered = None
+        if rendered is None:
+            stats['failed'] += 1
+            continue
+        body, is_json = rendered
+        stats['written' if _write_if_changed(_target(org_slug, path, is_json), body) else 'unchanged'] += 1
+    return stats
+
+
+def unpublish_paths(org_slug: str, paths: Iterable[str]) -> Counter:
+    """Remove snapshots of ``paths`` so requests fall through to the app."""
+    stats: Counter = Counter()
+    for path in paths:
+        for is_json in (False, True):
+            target = _target(org_slug, path, is_json)
+            if target.is_file():
+                target.unlink()
+                stats['removed'] += 1
+    return stats
+
+
+def _org_slug(org_id: str) -> Optional[str]:
+    org = db.session.get(Organization, org_id)
+    return org.slug if org else None
+
+
+def _finished_games(*criteria) -> List[Game]:
+    return Game.query.filter(Game.status.in_(FINISHED_GAME_STATUSES), *criteria).all()
+
+
+def sync_season_snapshots(season: Season) -> Counter:
+    """Publish a finished season's pages and final games; remove them otherwise."""
+    if not snapshots_enabled():
+        return Counter()
+    try:
+        return _sync_season(season)
+    except Exception as exc:
+        # Runs after the caller's commit; a failed publish must not fail the request
+        current_app.logger.error(f'Static snapshots for season {season.id} failed: {exc}')
+        return Counter({'failed': 1})
+
+
+def _sync_season(season: Season) -> Counter:
+    org_slug = _org_slug(season.org_id)
+    if org_slug is None:
+        return Counter()
+    if season.status not in FINISHED_SEASON_STATUSES:
+        return unpublish_paths(org_slug, season_paths(season))
+    paths = season_paths(season)
+    for game in _finished_games(Game.season_id == season.id):
+        paths.extend(game_paths(game))
+    return publish_paths(org_slug, paths)
+
+
+def sync_game_snapshots(game: Game) -> Counter:
+    """Re-render a game and the pages that show its result; remove it if reopened."""
+    if not snapshots_enabled():
+        return Counter()
+    try:
+        return _sync_game(game)
+    except Exception as exc:
+        current_app.logger.error(f'Static snapshots for game {game.id} failed: {exc}')
+        return Counter({'failed': 1})
+
+
+def _sync_game(game: Game) -> Counter:
+    org_slug = _org_slug(game.org_id)
+    if org_slug is None:
+        return Counter()
+    if game.status not in FINISHED_GAME_STATUSES:
+        return unpublish_paths(org_slug, game_paths(game))
+
+    paths = game_paths(game)
+    if game.home_team_id and game.away_team_id:
+        rematches = _finished_games(
+            Game.id != game.id,
+            or_(
+                and_(Game.home_team_id == game.home_team_id, Game.away_team_id == game.away_team_id),
+                and_(Game.home_team_id == game.away_team_id, Game.away_team_id == game.home_team_id),
+            ),
+        )
+        for other in rematches:
+            paths.extend(game_paths(other))
+    season = db.session.get(Season, game.season_id)
+    if season is not None and season.status in FINISHED_SEASON_STATUSES:
+        paths.extend(season_paths(season))
+    return publish_paths(org_slug, paths)
+
+
+def _enqueue(kind: str, target_id: str, sync, target) -> Optional[str]:
+    backend = current_app.config.get('STATIC_SNAPSHOT_BACKEND', 'rq')
+    if backend == 'inline':
+        sync(target)
+        return 'inline'
+    try:
+        from slms.services.queue import queue_service
+        queue_service.enqueue_static_snapshots(kind, target_id)
+        return 'rq'
+    except Exception as exc:
+        # Rendering in the request is what the queue exists to avoid;
+        # ``flask snapshots publish`` catches up once the queue is back
+        current_app.logger.warning(f"Could not queue static snapshots for {kind} {target_id}: {exc}")
+        return None
+
+
+def queue_season_snapshots(season: Season, previous_status: Optional[SeasonStatus] = None) -> Optional[str]:
+    """Queue ``sync_season_snapshots`` after a season's status changed; returns the backend used."""
+    if not snapshots_enabled() or season.status == previous_status:
+        return None
+    return _enqueue('season', season.id, sync_season_snapshots, season)
+
+
+def queue_game_snapshots(game: Game) -> Optional[str]:
+    """Queue ``sync_game_snapshots`` for a settled or reopened game; returns the backend used."""
+    if not snapshots_enabled():
+        return None
+    return _enqueue('game', game.id, sync_game_snapshots, game)
+
+
+def publish_organization(org: Organization) -> Counter:
+    """Publish every finished season and final game of ``org``."""
+    seasons = Season.query.filter(Season.org_id == org.id, Season.status.in_(FINISHED_SEASON_STATUSES)).all()
+    paths: List[str] = []
+    for season in seasons:
+        paths.extend(season_paths(season))
+    for game in _finished_games(Game.org_id == org.id):
+        paths.extend(game_paths(game))
+    return publish_paths(org.slug, paths)
+
+
+__all__ = [
+    'SNAPSHOT_ENVIRON_KEY',
+    'snapshots_enabled',
+    'season_paths',
+    'game_paths',
+    'publish_paths',
+    'unpublish_paths',
+    'sync_season_snapshots',
+    'sync_game_snapshots',
+    'queue_season_snapshots',
+    'queue_game_snapshots',
+    'publish_organization',
+]
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-import os
-import uuid
+import mimetypes
+from datetime import timezone
 from pathlib import Path
 from typing import TYPE_CHECKING, BinaryIO
 
@@ -65,47 +65,39 @@ class TenantStorage:
         Returns:
             (file_path, error_message)
         """
+        from slms.extensions import db
+        from slms.services.blob_store import QuotaExceeded, UploadTooLarge, store_blob
+
         try:
             # Validate file extension
-            if allowed_extensions:
-                ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-                if ext not in allowed_extensions:
-                    return None, f"File type .{ext} is not allowed"
-
-            # Check storage quota
-            if self.org.storage_quota:
-                file.seek(0, 2)  # Seek to end
-                file_size = file.tell()
-                file.seek(0)  # Seek back to start
-
-                if self.org.storage_used + file_size > self.org.storage_quota:
-                    return None, "Storage quota exceeded"
-
-            # Generate safe filename
-            safe_name = secure_filename(filename)
-            # Add unique prefix to avoid collisions
-            unique_name = f"{uuid.uuid4().hex[:8]}_{safe_name}"
-
-            # Get storage path
-            storage_path = self.get_org_path(subdir)
-            self.ensure_path_exists(storage_path)
-
-            # Save file
-            file_path = storage_path / unique_name
-            with open(file_path, 'wb') as f:
-                file.seek(0)
-                f.write(file.read())
-
-            # Update storage usage
-            from slms.extensions import db
-            self.org.storage_used += file_path.stat().st_size
+            ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+            if allowed_extensions and ext not in allowed_extensions:
+                return None, f"File type .{ext} is not allowed"
+
+            # Stream to a content-addressed path; the quota is checked atomically
+            prefix = self.get_org_path(subdir).relative_to(self.base_path).as_posix()
+            blob = store_blob(
+                file,
+                root='tenant',
+                root_dir=self.base_path,
+                prefix=prefix,
+                extension=secure_filename(ext),
+                org_id=self.org.id,
+                mime_type=mimetypes.guess_type(filename)[0],
+                max_size=current_app.config.get('MAX_CONTENT_LENGTH'),
+            )
             db.session.commit()
 
-            # Return relative path
-            relative_path = str(file_path.relative_to(self.base_path))
-            return relative_path, None
+            return blob['path'], None
 
+        except QuotaExceeded:
+            db.session.rollback()
+            return None, "Storage quota exceeded"
+        except UploadTooLarge as e:
+            db.session.rollback()
+            return None, str(e)
         except Exception as e:
+            db.session.rollback()
             current_app.logger.error(f"Failed to save file: {e}")
             return None, "Failed to save file"
 
@@ -119,6 +111,9 @@ class TenantStorage:
         Returns:
             (success, error_message)
         """
+        from slms.extensions import db
+        from slms.services.blob_store import release_blob
+
         try:
             full_path = self.base_path / file_path
 
@@ -126,23 +121,20 @@ class TenantStorage:
             if not str(full_path.resolve()).startswith(str(self.org_path.resolve())):
                 return False, "Invalid file path"
 
-            if not full_path.exists():
-                return False, "File not found"
-
-            # Get file size before deletion
-            file_size = full_path.stat().st_size
-
-            # Delete file
-            full_path.unlink()
-
-            # Update storage usage
-            from slms.extensions import db
-            self.org.storage_used = max(0, self.org.storage_used - file_size)
+            released = release_blob(root='tenant', root_dir=self.base_path,
+                                    path=Path(file_path).as_posix())
+            if released is None:
+                # Files stored before content addressing are not tracked, and
+                # never counted in storage_used (the manifest total)
+                if not full_path.exists():
+                    return False, "File not found"
+                full_path.unlink()
             db.session.commit()
 
             return True, None
 
         except Exception as e:
+            db.session.rollback()
             current_app.logger.error(f"Failed to delete file: {e}")
             return False, "Failed to delete file"
 
@@ -168,31 +160,49 @@ class TenantStorage:
             pattern: Glob pattern (e.g., '*.jpg')
 
         Returns:
-            List of file info dictionaries
+            List of file info dictionaries, newest first
+        """
+        return self.list_files_page(subdir, pattern, limit=None)['files']
+
+    def list_files_page(
+        self,
+        subdir: str | None = None,
+        pattern: str = '*',
+        limit: int | None = 100,
+        cursor: str | None = None
+    ) -> dict:
+        """
+        List one page of files from the storage manifest.
+
+        Args:
+            subdir: Subdirectory to list
+            pattern: Glob pattern matched against file names
+            limit: Page size (None for everything)
+            cursor: ``next_cursor`` from the previous page
+
+        Returns:
+            Dictionary with ``files`` and ``next_cursor``
         """
+        from slms.services.storage_manifest import list_blobs
+
         try:
-            storage_path = self.get_org_path(subdir)
-            if not storage_path.exists():
-                return []
-
-            files = []
-            for file_path in storage_path.glob(pattern):
-                if file_path.is_file():
-                    stat = file_path.stat()
-                    relative_path = str(file_path.relative_to(self.base_path))
-                    files.append({
-                        'path': relative_path,
-                        'name': file_path.name,
-                        'size': stat.st_size,
-                        'modified': stat.st_mtime,
-                        'url': self.get_file_url(relative_path)
-                    })
-
-            return sorted(files, key=lambda x: x['modified'], reverse=True)
+            prefix = self.get_org_path(subdir).relative_to(self.base_path).as_posix()
+            rows, next_cursor = list_blobs(self.org.id, 'tenant', prefix=prefix, pattern=pattern,
+                                           limit=limit, cursor=cursor)
+            files = [{
+                'path': row.path,
+                'name': Path(row.path).name,
+                'size': row.size,
+                'modified': row.mtime.replace(tzinfo=row.mtime.tzinfo or timezone.utc).timestamp(),
+                'sha256': row.sha256,
+                'mime_type': row.mime_type,
+                'url': self.get_file_url(row.path)
+            } for row in rows]
+            return {'files': files, 'next_cursor': next_cursor}
 
         except Exception as e:
             current_app.logger.error(f"Failed to list files: {e}")
-            return []
+            return {'files': [], 'next_cursor': None}
 
     def get_storage_stats(self) -> dict:
         """
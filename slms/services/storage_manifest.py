@@ -0,0 +1,240 @@
+"""Storage manifest: listing and reconciling stored files through ``storage_blob``.
+
+Every file written through the blob store has a ``storage_blob`` row with its
+path, size, SHA-256, MIME type and mtime. Listings page through the
+``(org_id, root, mtime)`` index with a keyset cursor instead of globbing and
+stat-ing a tenant directory. An organization's ``storage_used`` is the sum of
+its rows' sizes.
+
+The rows can still drift from the disk. Files may predate the blob store,
+be copied in by hand, or be left behind by a transaction that rolled back
+after its file was moved into place. ``reconcile_storage`` walks a storage
+root and:
+
+* indexes untracked files that do not look content-addressed (legacy
+  uploads);
+* re-hashes files whose size or mtime changed;
+* drops rows whose file is gone;
+* counts content-addressed files that have no row. These are orphans from
+  rolled-back uploads. With ``remove_orphans`` it deletes them, along with
+  ``.incoming`` leftovers, once they are older than the grace period.
+
+``flask storage reconcile`` runs it for the tenant and static roots, then
+resets ``storage_used`` from the manifest with ``recompute_storage_used``.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+
+from slms.extensions import db
+from slms.models import Organization, StorageBlob
+from slms.services.blob_store import CHUNK_SIZE, INCOMING_DIR
+
+# Files younger than this are skipped as possibly mid-upload
+ORPHAN_GRACE_SECONDS = 3600
+# Rows listed per page when the caller gives no limit
+DEFAULT_PAGE_SIZE = 100
+
+_CAS_NAME_RE = re.compile(r'^[0-9a-f]{64}(\.[A-Za-z0-9]+)?$')
+
+
+def _encode_cursor(mtime: datetime, blob_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{mtime.isoformat()}|{blob_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        mtime, blob_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(mtime), blob_id
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+def _glob_to_like(pattern: str) -> str:
+    escaped = pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped.replace('*', '%').replace('?', '_')
+
+
+def list_blobs(org_id: str, root: str, *, prefix: Optional[str] = None, pattern: Optional[str] = None,
+               limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+               ) -> Tuple[List[StorageBlob], Optional[str]]:
+    """One page of an organization's files, newest first; returns (rows, next_cursor)."""
+    blobs = StorageBlob.__table__
+    query = (
+        select(StorageBlob)
+        .where(StorageBlob.org_id == org_id, StorageBlob.root == root)
+        .order_by(blobs.c.mtime.desc(), blobs.c.id.desc())
+    )
+    if prefix:
+        query = query.where(blobs.c.path.like(_glob_to_like(prefix.strip('/')) + '/%', escape='\\'))
+    if pattern and pattern != '*':
+        query = query.where(or_(
+            blobs.c.path.like('%/' + _glob_to_like(pattern), escape='\\'),
+            blobs.c.path.like(_glob_to_like(pattern), escape='\\'),
+        ))
+    if cursor:
+        mtime, blob_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            blobs.c.mtime < mtime,
+            and_(blobs.c.mtime == mtime, blobs.c.id < blob_id),
+        ))
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = list(db.session.execute(query).scalars())
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].mtime, rows[-1].id)
+    return rows, next_cursor
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_content_addressed(relative: str) -> bool:
+    parts = relative.split('/')
+    return (
+        len(parts) >= 2
+        and bool(_CAS_NAME_RE.match(parts[-1]))
+        and parts[-2] == parts[-1][:2]
+    )
+
+
+def _walk(directory: Path, skip: Tuple[Path, ...]) -> Iterator[os.DirEntry]:
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            path = Path(entry.path)
+            if entry.name == INCOMING_DIR or path.resolve() in skip:
+                continue
+            yield from _walk(path, skip)
+        elif entry.is_file(follow_symlinks=False):
+            yield entry
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def reconcile_storage(root: str, root_dir: Path, *, scope: Optional[str] = None,
+                      org_for_path: Callable[[str], Optional[str]] = lambda path: None,
+                      skip: Tuple[Path, ...] = (), remove_orphans: bool = False,
+                      grace_seconds: float = ORPHAN_GRACE_SECONDS, dry_run: bool = False) -> Dict[str, Any]:
+    """Bring ``storage_blob`` rows for ``root`` (under ``scope``) in line with the disk.
+
+    ``org_for_path`` maps a relative path to the organization that owns a
+    newly indexed legacy file. ``skip`` lists directories that belong to
+    another root. Commits unless ``dry_run``.
+    """
+    root_dir = Path(root_dir)
+    scope = (scope or '').strip('/')
+    start_dir = root_dir / scope if scope else root_dir
+    skip = tuple(Path(path).resolve() for path in skip)
+    blobs = StorageBlob.__table__
+    now = time.time()
+    stats = {'scanned': 0, 'indexed': 0, 'updated': 0, 'missing': 0, 'orphans': 0,
+             'orphans_removed': 0, 'incoming_removed': 0, 'bytes': 0}
+
+    query = select(blobs.c.id, blobs.c.path, blobs.c.size, blobs.c.mtime, blobs.c.org_id).where(blobs.c.root == root)
+    if scope:
+        query = query.where(blobs.c.path.like(_glob_to_like(scope) + '/%', escape='\\'))
+    known = {row.path: row for row in db.session.execute(query)}
+    seen = set()
+
+    for entry in _walk(start_dir, skip):
+        relative = Path(entry.path).relative_to(root_dir).as_posix()
+        stat = entry.stat(follow_symlinks=False)
+        stats['scanned'] += 1
+        row = known.get(relative)
+
+        if row is not None:
+            seen.add(relative)
+            stats['bytes'] += stat.st_size
+            if row.size != stat.st_size or abs(_timestamp(row.mtime) - stat.st_mtime) >= 1:
+                stats['updated'] += 1
+                db.session.execute(update(blobs).where(blobs.c.id == row.id).values(
+                    size=stat.st_size,
+                    sha256=_file_sha256(Path(entry.path)),
+                    mtime=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                ))
+            continue
+
+        if _is_content_addressed(relative):
+            # Written by an upload whose transaction never committed
+            if now - stat.st_mtime < grace_seconds:
+                continue
+            stats['orphans'] += 1
+            if remove_orphans and not dry_run:
+                Path(entry.path).unlink(missing_ok=True)
+                stats['orphans_removed'] += 1
+            continue
+
+        org_id = org_for_path(relative)
+        stats['indexed'] += 1
+        stats['bytes'] += stat.st_size
+        db.session.execute(insert(blobs).values(
+            org_id=org_id, root=root, path=relative,
+            sha256=_file_sha256(Path(entry.path)), size=stat.st_size,
+            mime_type=mimetypes.guess_type(relative)[0], ref_count=1,
+            mtime=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        ))
+
+    missing = [row for path, row in known.items() if path not in seen]
+    for row in missing:
+        db.session.execute(delete(blobs).where(blobs.c.id == row.id))
+    stats['missing'] = len(missing)
+
+    incoming = root_dir / INCOMING_DIR
+    if remove_orphans and not dry_run and incoming.is_dir():
+        for entry in os.scandir(incoming):
+            if entry.is_file(follow_symlinks=False) and now - entry.stat().st_mtime >= grace_seconds:
+                Path(entry.path).unlink(missing_ok=True)
+                stats['incoming_removed'] += 1
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return stats
+
+
+def recompute_storage_used(org_ids) -> None:
+    """Set ``storage_used`` to the manifest total for each organization; callers commit."""
+    org = Organization.__table__
+    blobs = StorageBlob.__table__
+    total = (
+        select(func.coalesce(func.sum(blobs.c.size), 0))
+        .where(blobs.c.org_id == org.c.id)
+        .scalar_subquery()
+    )
+    db.session.execute(update(org).where(org.c.id.in_(list(org_ids))).values(storage_used=total))
+
+
+__all__ = [
+    'ORPHAN_GRACE_SECONDS',
+    'list_blobs',
+    'reconcile_storage',
+    'recompute_storage_used',
+]
@@ -0,0 +1,162 @@
+"""In-process registry of organizations keyed by slug and custom domain."""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from slms.extensions import db
+from slms.models import Organization
+
+Snapshot = Dict[str, Any]
+
+_MISSING = object()
+
+# Columns changed by raw SQL (the blob store's atomic quota updates), which
+# never fire the invalidation listeners. They are left out of snapshots and
+# load from the database on first access instead.
+VOLATILE_COLUMNS = frozenset({'storage_used'})
+
+
+def _snapshot(org: Organization | None) -> Snapshot | None:
+    """Copy the column values of an organization into a plain dict."""
+    if org is None:
+        return None
+    return {
+        attr.key: copy.deepcopy(getattr(org, attr.key))
+        for attr in inspect(Organization).column_attrs
+        if attr.key not in VOLATILE_COLUMNS
+    }
+
+
+class TenantRegistry:
+    """Cache organization snapshots so tenant resolution can skip SELECTs.
+
+    Lookups by slug, custom domain and the "first organization" fallback are
+    cached for ``ttl`` seconds, including misses. Any ORM write to an
+    organization clears the registry for the process that performed it;
+    other workers converge once their entries expire.
+
+    Settings and branding columns may be served up to ``ttl`` seconds stale.
+    ``VOLATILE_COLUMNS`` are never cached: on an attached organization they
+    are loaded from the database when first read.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, Any], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: Tuple[str, Any]):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                self._entries.pop(key, None)
+            return _MISSING
+        return value
+
+    def _set(self, key: Tuple[str, Any], value) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def get_by_slug(self, slug: str | None) -> Snapshot | None:
+        """Return the snapshot for an organization slug."""
+        if not slug:
+            return None
+        key = ('slug', slug)
+        value = self._get(key)
+        if value is _MISSING:
+            value = _snapshot(Organization.query.filter_by(slug=slug).first())
+            self._set(key, value)
+        return value
+
+    def get_by_domain(self, host: str | None) -> Snapshot | None:
+        """Return the snapshot for an organization custom domain."""
+        if not host:
+            return None
+        key = ('domain', host)
+        value = self._get(key)
+        if value is _MISSING:
+            value = _snapshot(Organization.query.filter_by(custom_domain=host).first())
+            self._set(key, value)
+        return value
+
+    def get_fallback(self) -> Tuple[Snapshot | None, bool]:
+        """Return the oldest organization and whether it is the only one."""
+        key = ('fallback', None)
+        value = self._get(key)
+        if value is _MISSING:
+            first_two = (
+                Organization.query.order_by(Organization.created_at.asc())
+                .limit(2)
+                .all()
+            )
+            first = first_two[0] if first_two else None
+            value = (_snapshot(first), len(first_two) == 1)
+            self._set(key, value)
+        return value
+
+    def attach(self, snapshot: Snapshot | None) -> Organization | None:
+        """Return a session-bound Organization for a snapshot without a SELECT.
+
+        Volatile columns are left unloaded, so reading one issues a SELECT.
+        """
+        if snapshot is None:
+            return None
+        existing = db.session.identity_map.get(
+            db.session.identity_key(Organization, snapshot['id'])
+        )
+        if existing is not None:
+            return existing
+        org = Organization(**copy.deepcopy(snapshot))
+        make_transient_to_detached(org)
+        return db.session.merge(org, load=False)
+
+    def invalidate(self, org: Organization | None = None) -> None:
+        """Drop cached lookups.
+
+        Organization changes are rare, so every entry is cleared (including
+        cached misses and the fallback) rather than tracking per-org keys.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def get_tenant_registry() -> TenantRegistry:
+    """Return the registry for the current app, creating it on first use."""
+    registry = current_app.extensions.get('tenant_registry')
+    if registry is None:
+        registry = TenantRegistry(ttl=float(current_app.config.get('TENANT_REGISTRY_TTL', 30)))
+        current_app.extensions['tenant_registry'] = registry
+    return registry
+
+
+def invalidate_tenant_registry(org: Organization | None = None) -> None:
+    """Invalidate the current app's registry if an app context is active."""
+    if has_app_context():
+        get_tenant_registry().invalidate(org)
+
+
+@event.listens_for(Organization, 'after_insert')
+@event.listens_for(Organization, 'after_update')
+@event.listens_for(Organization, 'after_delete')
+def _invalidate_on_write(mapper, connection, target) -> None:
+    invalidate_tenant_registry(target)
+
+
+__all__ = [
+    'TenantRegistry',
+    'get_tenant_registry',
+    'invalidate_tenant_registry',
+]
@@ -0,0 +1,166 @@
+"""Compiled, fingerprinted theme stylesheets.
+
+The site theme (``site_settings.theme_config_json``) used to be rendered into
+an inline ``<style>`` block on every page. Now ``templates/theme/site_theme.css``
+and the organization's branding CSS (``generate_custom_css``: brand color
+variables plus ``custom_css``) are compiled once, minified and written to
+``static/themes/<sha[:2]>/<sha>.css``. Pages link to that file, which is
+served with ``Cache-Control: immutable``. Any change to the theme produces a
+new file name, so browsers never see stale styles. Theme previews and failed
+builds fall back to inline styles in ``base.html`` that carry the same
+organization CSS.
+
+Bundles are built eagerly when a theme is saved or published
+(``apply_site_payload``, ``publish_site_theme``, ``/admin/api/branding/save``).
+They are also built lazily by ``theme_bundle_url`` the first time a worker
+sees a theme it has no bundle for, e.g. after a restart or on another
+worker. Each worker keeps a small map from a digest of the theme inputs to
+the bundle URL in ``app.extensions['theme_bundles']``. A page view therefore
+costs one JSON dump and hash instead of re-rendering about 200 lines of CSS.
+
+Bundles are written atomically under their content hash, so workers that
+build the same theme concurrently produce the same file. Superseded bundles
+stay on disk because cached HTML may still reference them. They are a few
+kilobytes each.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from flask import Flask, Response, abort, current_app
+
+from slms.services.branding import generate_custom_css
+from slms.services.file_serving import send_cached_file
+
+if TYPE_CHECKING:
+    from slms.models import Organization
+
+# Directory under the static folder that holds compiled bundles
+THEME_BUNDLE_DIR = 'themes'
+# Template compiled into every bundle
+THEME_TEMPLATE = 'theme/site_theme.css'
+# Distinct theme/organization combinations remembered per worker
+THEME_BUNDLE_CACHE_SIZE = 256
+
+_BUNDLE_NAME_RE = re.compile(r'^([0-9a-f]{2})/(\1[0-9a-f]{62})\.css$')
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+# Colons inside declaration blocks (the next brace closes the block)
+_CSS_COLON_RE = re.compile(r'\s*:\s*(?=[^{}]*\})')
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from ``css``."""
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = _CSS_SPACE_RE.sub(' ', css)
+    css = _CSS_PUNCT_RE.sub(r'\1', css)
+    css = _CSS_COLON_RE.sub(':', css)
+    return css.replace(';}', '}').strip()
+
+
+def compile_theme_css(theme: Dict[str, Any], org: Optional[Organization] = None) -> str:
+    """Minified stylesheet for ``theme`` plus ``org``'s branding CSS."""
+    # Rendered straight from the environment: context processors need a request
+    template = current_app.jinja_env.get_template(THEME_TEMPLATE)
+    parts = [template.render(theme=theme or {})]
+    if org is not None:
+        parts.append(generate_custom_css(org))
+    return minify_css('\n'.join(parts))
+
+
+def _bundle_key(theme: Dict[str, Any], org: Optional[Organization]) -> str:
+    inputs = {'theme': theme or {}}
+    if org is not None:
+        inputs['org'] = [org.id, org.primary_color, org.secondary_color, org.custom_css]
+    encoded = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _bundle_root() -> Path:
+    return Path(current_app.static_folder) / THEME_BUNDLE_DIR
+
+
+def _write_bundle(css: str) -> str:
+    data = css.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    relative = f"{digest[:2]}/{digest}.css"
+    target = _bundle_root() / relative
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(data)
+            os.replace(temp_path, target)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+    return f"{current_app.static_url_path}/{THEME_BUNDLE_DIR}/{relative}"
+
+
+def _bundle_cache() -> Dict[str, str]:
+    return current_app.extensions.setdefault('theme_bundles', {})
+
+
+def build_theme_bundle(theme: Dict[str, Any], org: Optional[Organization] = None) -> str:
+    """Compile and write the bundle for ``theme``/``org``; returns its URL."""
+    url = _write_bundle(compile_theme_css(theme, org))
+    cache = _bundle_cache()
+    if len(cache) >= THEME_BUNDLE_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+    cache[_bundle_key(theme, org)] = url
+    return url
+
+
+def theme_bundle_url(theme: Dict[str, Any], org: Optional[Organization] = None) -> Optional[str]:
+    """URL of the compiled bundle, building it on first use; None if that fails."""
+    url = _bundle_cache().get(_bundle_key(theme, org))
+    if url is not None:
+        return url
+    try:
+        return build_theme_bundle(theme, org)
+    except Exception as exc:
+        # base.html falls back to the inline stylesheet
+        current_app.logger.warning(f"Theme bundle build failed: {exc}")
+        return None
+
+
+def serve_theme_bundle(filename: str) -> Response:
+    """Send a compiled bundle with immutable caching."""
+    match = _BUNDLE_NAME_RE.match(filename)
+    if match is None:
+        abort(404)
+    path = _bundle_root() / filename
+    if not path.is_file():
+        abort(404)
+    return send_cached_file(path, match.group(2))
+
+
+def init_theme_bundles(app: Flask) -> None:
+    """Route ``/static/themes/...`` through ``serve_theme_bundle``."""
+    if not app.has_static_folder:
+        return
+    app.add_url_rule(
+        f"{app.static_url_path}/{THEME_BUNDLE_DIR}/<path:filename>",
+        endpoint='theme_bundle',
+        view_func=serve_theme_bundle,
+    )
+
+
+__all__ = [
+    'THEME_BUNDLE_DIR',
+    'minify_css',
+    'compile_theme_css',
+    'build_theme_bundle',
+    'theme_bundle_url',
+    'serve_theme_bundle',
+    'init_theme_bundles',
+]
@@ -2,18 +2,20 @@
 
 from __future__ import annotations
 
-import os
-import uuid
 from pathlib import Path
 
 from flask import current_app
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
+from slms.services.blob_store import QuotaExceeded, UploadTooLarge, release_blob, store_blob
+
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 STATIC_UPLOAD_SUBDIR = 'uploads'
+# storage_blob root for files under the static folder
+BLOB_ROOT = 'static'
 
 
 def allowed_file(filename: str) -> bool:
@@ -36,24 +38,13 @@ def _ensure_within_static_root(path: Path) -> None:
         raise PermissionError('Attempted to write outside static directory')
 
 
-def _ensure_directory(path: Path) -> Path:
-    path.mkdir(parents=True, exist_ok=True)
-    return path
-
-
-def _determine_size(file: FileStorage) -> int:
-    stream = file.stream
-    current = stream.tell()
-    stream.seek(0, os.SEEK_END)
-    size = stream.tell()
-    stream.seek(current)
-    return size
-
-
 def save_upload(file: FileStorage, subfolder: str = 'general') -> str | None:
     """
     Save an uploaded file and return the relative URL path.
 
+    Identical uploads to the same subfolder share one file. The caller's
+    commit keeps the blob reference.
+
     Args:
         file: The uploaded file from the form
         subfolder: Subfolder within uploads directory (e.g., 'team_logos', 'player_photos')
@@ -67,27 +58,32 @@ def save_upload(file: FileStorage, subfolder: str = 'general') -> str | None:
     if not allowed_file(file.filename):
         return None
 
-    upload_root = _ensure_directory(_static_upload_root() / subfolder)
+    static_root = Path(current_app.static_folder)
+    upload_root = _static_upload_root() / secure_filename(subfolder)
+    _ensure_within_static_root(upload_root)
 
     ext = file.filename.rsplit('.', 1)[1].lower()
-    filename = f"{uuid.uuid4().hex}.{ext}"
-    filepath = upload_root / filename
-    _ensure_within_static_root(filepath)
-
-    size = _determine_size(file)
-    if size > MAX_FILE_SIZE:
+    try:
+        blob = store_blob(
+            file.stream,
+            root=BLOB_ROOT,
+            root_dir=static_root,
+            prefix=upload_root.relative_to(static_root).as_posix(),
+            extension=ext,
+            mime_type=file.mimetype,
+            max_size=MAX_FILE_SIZE,
+        )
+    except UploadTooLarge:
         return None
-
-    file.stream.seek(0)
-    file.save(str(filepath))
-    relative = filepath.relative_to(Path(current_app.static_folder))
-    return f"/static/{relative.as_posix()}"
+    return f"/static/{blob['path']}"
 
 
 def delete_upload(file_url: str) -> bool:
     """
     Delete an uploaded file given its URL path.
 
+    The file is only removed once no other record references it.
+
     Args:
         file_url: The URL path of the file (e.g., '/static/uploads/team_logos/abc123.jpg')
 
@@ -97,49 +93,51 @@ def delete_upload(file_url: str) -> bool:
     if not file_url or not file_url.startswith('/static/'):
         return False
 
-    relative = file_url[len('/static/'):]
-    target = Path(current_app.static_folder) / relative
-    _ensure_within_static_root(target)
-
-    if target.exists() and target.is_file():
-        target.unlink()
-        _cleanup_empty_dirs(target.parent)
-        return True
+    return _release_static_file(file_url[len('/static/'):])
 
-    return False
 
+def store_media_file(file: FileStorage, org_slug: str | None, library_subdir: str = 'media',
+                     org_id: str | None = None) -> dict:
+    """Persist a media library upload and return metadata for the saved file.
 
-def store_media_file(file: FileStorage, org_slug: str | None, library_subdir: str = 'media') -> dict:
-    """Persist a media library upload and return metadata for the saved file."""
+    New files count against ``org_id``'s storage quota; re-uploading an
+    existing file is free.
+    """
     if not file or file.filename == '':
         raise ValueError('No file provided')
 
     if not allowed_file(file.filename):
         raise ValueError('Unsupported file type')
 
-    size = _determine_size(file)
-    if size > MAX_FILE_SIZE:
-        raise ValueError('File exceeds maximum upload size of 5 MB')
-
+    static_root = Path(current_app.static_folder)
     safe_org = secure_filename(org_slug or 'default') or 'default'
-    upload_root = _ensure_directory(_static_upload_root() / library_subdir / safe_org)
+    upload_root = _static_upload_root() / library_subdir / safe_org
+    _ensure_within_static_root(upload_root)
 
     ext = file.filename.rsplit('.', 1)[1].lower()
-    unique_name = f"{uuid.uuid4().hex}.{ext}"
-    filepath = upload_root / unique_name
-    _ensure_within_static_root(filepath)
+    try:
+        blob = store_blob(
+            file.stream,
+            root=BLOB_ROOT,
+            root_dir=static_root,
+            prefix=upload_root.relative_to(static_root).as_posix(),
+            extension=ext,
+            org_id=org_id,
+            mime_type=file.mimetype,
+            max_size=MAX_FILE_SIZE,
+        )
+    except UploadTooLarge:
+        raise ValueError('File exceeds maximum upload size of 5 MB') from None
+    except QuotaExceeded:
+        raise ValueError('Storage quota exceeded') from None
 
-    file.stream.seek(0)
-    file.save(str(filepath))
-
-    relative = filepath.relative_to(Path(current_app.static_folder))
     return {
-        'storage_path': relative.as_posix(),
-        'public_url': f"/static/{relative.as_posix()}",
-        'file_name': unique_name,
+        'storage_path': blob['path'],
+        'public_url': f"/static/{blob['path']}",
+        'file_name': Path(blob['path']).name,
         'original_name': file.filename,
         'mime_type': file.mimetype,
-        'file_size': size,
+        'file_size': blob['size'],
     }
 
 
@@ -148,10 +146,18 @@ def delete_media_file(storage_path: str) -> bool:
     if not storage_path:
         return False
 
-    static_root = Path(current_app.static_folder)
-    target = static_root / storage_path
+    return _release_static_file(storage_path)
+
+
+def _release_static_file(relative: str) -> bool:
+    """Drop a reference to a static upload, unlinking untracked legacy files directly."""
+    target = Path(current_app.static_folder) / relative
     _ensure_within_static_root(target)
 
+    # Tracked blobs are unlinked by the blob store once the caller commits
+    if release_blob(root=BLOB_ROOT, root_dir=Path(current_app.static_folder), path=relative) is not None:
+        return True
+
     if target.exists() and target.is_file():
         target.unlink()
         _cleanup_empty_dirs(target.parent)
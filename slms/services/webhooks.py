@@ -9,13 +9,16 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 from enum import Enum
 
-import requests
 from flask import current_app
 from sqlalchemy import select, and_
 
 from slms.extensions import db
+from slms.services.lazy import lazy_import
 from slms.models.models import TimestampedBase
 
+httpx = lazy_import('httpx')
+requests = lazy_import('requests')
+
 
 class WebhookEventType(Enum):
     """Types of webhook events."""
@@ -215,6 +218,14 @@ class WebhookService:
     @staticmethod
     def _queue_delivery(webhook: Webhook, event_type: str, payload: Dict[str, Any]):
         """Queue a webhook delivery."""
+        delivery = WebhookService._queue_delivery_record(webhook, event_type, payload)
+
+        # Attempt immediate delivery
+        WebhookService._deliver_webhook(delivery)
+
+    @staticmethod
+    def _queue_delivery_record(webhook: Webhook, event_type: str, payload: Dict[str, Any]) -> WebhookDelivery:
+        """Persist a pending delivery without sending it."""
         delivery = WebhookDelivery(
             webhook_id=webhook.id,
             event_type=event_type,
@@ -224,9 +235,83 @@ class WebhookService:
 
         db.session.add(delivery)
         db.session.commit()
+        return delivery
 
-        # Attempt immediate delivery
-        WebhookService._deliver_webhook(delivery)
+    @staticmethod
+    def _build_request(delivery: WebhookDelivery) -> Dict[str, Any]:
+        """Return the URL, signed body (``content``), headers and timeout for a delivery attempt."""
+        webhook = delivery.webhook
+
+        # Prepare payload
+        full_payload = {
+            'event': delivery.event_type,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'data': delivery.payload
+        }
+
+        # Serialize once and sign the exact bytes that are sent
+        body = json.dumps(full_payload)
+        signature = WebhookService._generate_signature(body, webhook.secret)
+
+        # Prepare headers
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Webhook-Signature': signature,
+            'X-Webhook-Event': delivery.event_type,
+            'X-Webhook-ID': webhook.id,
+            'X-Delivery-ID': delivery.id,
+        }
+
+        # Add custom headers
+        if webhook.custom_headers:
+            headers.update(webhook.custom_headers)
+
+        return {
+            'url': webhook.url,
+            'content': body.encode('utf-8'),
+            'headers': headers,
+            'timeout': webhook.timeout,
+        }
+
+    @staticmethod
+    def _record_response(delivery: WebhookDelivery, status_code: int, body: str):
+        """Record a completed HTTP attempt; non-2xx responses raise."""
+        webhook = delivery.webhook
+
+        delivery.response_status = status_code
+        delivery.response_body = body[:1000]  # Limit size
+
+        if not 200 <= status_code < 300:
+            # Counted as an attempt by _record_failure
+            raise Exception(f"HTTP {status_code}: {body[:200]}")
+
+        delivery.attempts += 1
+        delivery.status = WebhookStatus.SUCCESS
+        delivery.completed_at = datetime.now(timezone.utc)
+
+        webhook.success_count += 1
+        webhook.last_success_at = datetime.now(timezone.utc)
+
+    @staticmethod
+    def _record_failure(delivery: WebhookDelivery, error: BaseException):
+        """Record a failed attempt and schedule a retry if attempts remain."""
+        webhook = delivery.webhook
+
+        delivery.attempts += 1
+        delivery.error_message = str(error)[:1000]
+
+        webhook.failure_count += 1
+        webhook.last_failure_at = datetime.now(timezone.utc)
+
+        # Schedule retry if under limit
+        if delivery.attempts < webhook.retry_count:
+            delivery.status = WebhookStatus.RETRY
+            # Exponential backoff: 1min, 5min, 15min
+            retry_delay = timedelta(minutes=5 ** delivery.attempts)
+            delivery.next_retry_at = datetime.now(timezone.utc) + retry_delay
+        else:
+            delivery.status = WebhookStatus.FAILED
+            delivery.completed_at = datetime.now(timezone.utc)
 
     @staticmethod
     def _deliver_webhook(delivery: WebhookDelivery):
@@ -236,76 +321,45 @@ class WebhookService:
         Args:
             delivery: WebhookDelivery instance
         """
-        webhook = delivery.webhook
-
         try:
-            # Prepare payload
-            full_payload = {
-                'event': delivery.event_type,
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'data': delivery.payload
-            }
-
-            # Generate signature
-            signature = WebhookService._generate_signature(
-                json.dumps(full_payload),
-                webhook.secret
-            )
-
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Webhook-Signature': signature,
-                'X-Webhook-Event': delivery.event_type,
-                'X-Webhook-ID': webhook.id,
-                'X-Delivery-ID': delivery.id,
-            }
-
-            # Add custom headers
-            if webhook.custom_headers:
-                headers.update(webhook.custom_headers)
+            request_args = WebhookService._build_request(delivery)
+            request_args['data'] = request_args.pop('content')
 
             # Send request
-            response = requests.post(
-                webhook.url,
-                json=full_payload,
-                headers=headers,
-                timeout=webhook.timeout
-            )
-
-            # Update delivery status
-            delivery.attempts += 1
-            delivery.response_status = response.status_code
-            delivery.response_body = response.text[:1000]  # Limit size
-
-            if 200 <= response.status_code < 300:
-                delivery.status = WebhookStatus.SUCCESS
-                delivery.completed_at = datetime.now(timezone.utc)
-
-                webhook.success_count += 1
-                webhook.last_success_at = datetime.now(timezone.utc)
-            else:
-                raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
+            response = requests.post(**request_args)
+            WebhookService._record_response(delivery, response.status_code, response.text)
+
+        except Exception as e:
+            WebhookService._record_failure(delivery, e)
+
+        finally:
+            delivery.webhook.last_triggered_at = datetime.now(timezone.utc)
+            db.session.commit()
+
+    @staticmethod
+    async def deliver_async(delivery: WebhookDelivery):
+        """
+        Attempt to deliver a webhook without blocking on a synchronous HTTP client.
+
+        Used by request handlers (e.g. test deliveries) so the outbound call
+        honours the webhook timeout and is cancelled with the request.
+
+        Args:
+            delivery: WebhookDelivery instance
+        """
+        try:
+            request_args = WebhookService._build_request(delivery)
+            timeout = request_args.pop('timeout')
+
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.post(**request_args)
+            WebhookService._record_response(delivery, response.status_code, response.text)
 
         except Exception as e:
-            delivery.attempts += 1
-            delivery.error_message = str(e)[:1000]
-
-            webhook.failure_count += 1
-            webhook.last_failure_at = datetime.now(timezone.utc)
-
-            # Schedule retry if under limit
-            if delivery.attempts < webhook.retry_count:
-                delivery.status = WebhookStatus.RETRY
-                # Exponential backoff: 1min, 5min, 15min
-                retry_delay = timedelta(minutes=5 ** delivery.attempts)
-                delivery.next_retry_at = datetime.now(timezone.utc) + retry_delay
-            else:
-                delivery.status = WebhookStatus.FAILED
-                delivery.completed_at = datetime.now(timezone.utc)
+            WebhookService._record_failure(delivery, e)
 
         finally:
-            webhook.last_triggered_at = datetime.now(timezone.utc)
+            delivery.webhook.last_triggered_at = datetime.now(timezone.utc)
             db.session.commit()
 
     @staticmethod
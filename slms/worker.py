@@ -47,10 +47,14 @@ if __name__ == '__main__':
             send_email_job,
             send_registration_confirmation_job,
             send_game_reminder_job,
+            send_game_reminder_digest_job,
             send_game_recap_job,
             generate_schedule_job,
             send_daily_game_reminders_job,
-            retry_failed_emails_job
+            retry_failed_emails_job,
+            reconcile_org_counters_job,
+            refresh_dashboard_insights_job,
+            generate_media_derivatives_job
         )
 
         # Create worker with multiple queues (email has higher priority)
@@ -59,11 +63,17 @@ if __name__ == '__main__':
             connection=redis_conn
         )
 
+        # Seed the recurring jobs; each one schedules its own next run
+        from slms.services.queue import queue_service
+        queue_service.schedule_org_counter_reconciliation()
+        queue_service.schedule_dashboard_insights_refresh()
+
         print("Starting RQ worker...")
         print(f"Listening on queues: {list(queues.keys())}")
         print(f"Redis connection: {redis_conn}")
 
-        worker.work()
+        # The scheduler moves enqueue_at/enqueue_in jobs onto their queues
+        worker.work(with_scheduler=True)
     except KeyboardInterrupt:
         print("\nWorker stopped by user")
         if 'worker' in locals():
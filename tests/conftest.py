@@ -0,0 +1,33 @@
+import pytest
+
+from slms import create_app
+from slms.config import Config
+from slms.extensions import db
+
+
+class BaseTestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+@pytest.fixture()
+def config_overrides():
+    """Settings a test module changes on top of ``BaseTestConfig``; override per module."""
+    return {}
+
+
+@pytest.fixture()
+def app_config(config_overrides):
+    return type('ModuleTestConfig', (BaseTestConfig,), dict(config_overrides))
+
+
+@pytest.fixture()
+def app(app_config, tmp_path):
+    app = create_app(app_config)
+    # Generated assets (theme bundles, media renditions) stay out of the source tree
+    app.static_folder = str(tmp_path / 'static')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,140 @@
+import hashlib
+import io
+
+import pytest
+
+from slms.extensions import db
+from slms.models import Organization, StorageBlob
+from slms.services.blob_store import (
+    INCOMING_DIR,
+    QuotaExceeded,
+    UploadTooLarge,
+    release_blob,
+    store_blob,
+    stream_to_temp,
+)
+from slms.services.storage import TenantStorage
+
+
+@pytest.fixture()
+def config_overrides(tmp_path):
+    return {'UPLOAD_FOLDER': str(tmp_path / 'uploads')}
+
+
+@pytest.fixture()
+def org(app):  # noqa: ARG001 - needs the app context
+    org = Organization(name='Blob League', slug='blob-league', storage_quota=100, storage_used=0)
+    db.session.add(org)
+    db.session.commit()
+    return org
+
+
+def _store(root_dir, data, org_id=None, **kwargs):
+    return store_blob(io.BytesIO(data), root='tenant', root_dir=root_dir, prefix='blob-league/files',
+                      extension='PNG', org_id=org_id, **kwargs)
+
+
+def test_stream_to_temp_hashes_in_chunks_and_enforces_limit(tmp_path):
+    path, sha256, size = stream_to_temp(io.BytesIO(b'abcdef' * 10), tmp_path, chunk_size=4)
+    assert size == 60
+    assert sha256 == hashlib.sha256(b'abcdef' * 10).hexdigest()
+    assert path.read_bytes() == b'abcdef' * 10
+
+    with pytest.raises(UploadTooLarge):
+        stream_to_temp(io.BytesIO(b'x' * 20), tmp_path / 'limited', max_size=10, chunk_size=4)
+    assert list((tmp_path / 'limited').iterdir()) == []
+
+
+def test_identical_uploads_share_one_file_and_one_quota_charge(org, tmp_path):
+    first = _store(tmp_path, b'same bytes', org_id=org.id)
+    second = _store(tmp_path, b'same bytes', org_id=org.id)
+
+    assert first['path'] == second['path']
+    assert first['path'].startswith('blob-league/files/' + first['sha256'][:2] + '/')
+    assert first['path'].endswith('.png')
+    assert (first['deduplicated'], second['deduplicated']) == (False, True)
+    db.session.commit()
+
+    blob = StorageBlob.query.filter_by(path=first['path']).one()
+    assert blob.ref_count == 2
+    assert db.session.get(Organization, org.id).storage_used == len(b'same bytes')
+    assert list((tmp_path / INCOMING_DIR).iterdir()) == []
+
+    released = release_blob(root='tenant', root_dir=tmp_path, path=first['path'])
+    assert released['deleted'] is False
+    assert (tmp_path / first['path']).exists()
+
+    released = release_blob(root='tenant', root_dir=tmp_path, path=first['path'])
+    db.session.commit()
+    assert released['deleted'] is True
+    assert not (tmp_path / first['path']).exists()
+    assert StorageBlob.query.count() == 0
+    assert db.session.get(Organization, org.id).storage_used == 0
+    assert release_blob(root='tenant', root_dir=tmp_path, path=first['path']) is None
+
+
+def test_released_file_survives_a_rollback(org, tmp_path):
+    stored = _store(tmp_path, b'keep me', org_id=org.id)
+    db.session.commit()
+
+    assert release_blob(root='tenant', root_dir=tmp_path, path=stored['path'])['deleted'] is True
+    assert (tmp_path / stored['path']).exists()
+    db.session.rollback()
+
+    assert (tmp_path / stored['path']).exists()
+    assert StorageBlob.query.filter_by(path=stored['path']).one().ref_count == 1
+
+    release_blob(root='tenant', root_dir=tmp_path, path=stored['path'])
+    # Stored again before the commit: the pending unlink is cancelled
+    _store(tmp_path, b'keep me', org_id=org.id)
+    db.session.commit()
+    assert (tmp_path / stored['path']).read_bytes() == b'keep me'
+
+
+def test_quota_is_checked_and_charged_in_one_statement(org, tmp_path):
+    _store(tmp_path, b'a' * 60, org_id=org.id)
+    db.session.commit()
+
+    with pytest.raises(QuotaExceeded):
+        _store(tmp_path, b'b' * 60, org_id=org.id)
+    db.session.rollback()
+
+    assert db.session.get(Organization, org.id).storage_used == 60
+    assert StorageBlob.query.count() == 1
+    # Duplicates of stored bytes are free even when the quota is full
+    assert _store(tmp_path, b'a' * 60, org_id=org.id)['deduplicated'] is True
+
+
+def test_tenant_storage_saves_and_deletes_through_blob_store(app, org):
+    storage = TenantStorage(org)
+
+    path, error = storage.save_file(io.BytesIO(b'logo'), 'logo.png', subdir='logos')
+    assert error is None
+    again, _ = storage.save_file(io.BytesIO(b'logo'), 'copy.png', subdir='logos')
+    assert again == path
+    with app.test_request_context():
+        assert [f['path'] for f in storage.list_files('logos')] == [path]
+
+    assert storage.save_file(io.BytesIO(b'x' * 200), 'big.png')[1] == 'Storage quota exceeded'
+    assert storage.save_file(io.BytesIO(b'x'), 'script.exe', allowed_extensions={'png'})[1] == \
+        'File type .exe is not allowed'
+
+    assert storage.delete_file(path) == (True, None)
+    assert (storage.base_path / path).exists()
+    assert storage.delete_file(path) == (True, None)
+    assert not (storage.base_path / path).exists()
+    assert db.session.get(Organization, org.id).storage_used == 0
+
+
+@pytest.mark.usefixtures('app')
+def test_deleting_an_untracked_file_leaves_storage_used_alone(org):
+    storage = TenantStorage(org)
+    stored, _ = storage.save_file(io.BytesIO(b'tracked'), 'logo.png', subdir='logos')
+    legacy = storage.org_path / 'old' / 'banner.jpg'
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b'legacy banner bytes')
+
+    assert storage.delete_file(legacy.relative_to(storage.base_path).as_posix()) == (True, None)
+    assert not legacy.exists()
+    assert db.session.get(Organization, org.id).storage_used == len(b'tracked')
+    assert (storage.base_path / stored).exists()
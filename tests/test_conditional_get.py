@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from slms.blueprints.api import routes as api_routes
+from slms.extensions import db
+from slms.models import Game, GameStatus, League, Organization, Season, SportType, Team
+
+
+@pytest.fixture()
+def config_overrides():
+    return {'PAGE_CACHE_BACKEND': 'none', 'ETAG_VERSION': 'test'}
+
+
+def _seed_season(slug):
+    org = Organization(name=slug.title(), slug=slug)
+    db.session.add(org)
+    db.session.flush()
+    league = League(org_id=org.id, name='League', sport=SportType.BASKETBALL)
+    db.session.add(league)
+    db.session.flush()
+    season = Season(org_id=org.id, league_id=league.id, name='Season')
+    db.session.add(season)
+    db.session.flush()
+    home = Team(org_id=org.id, season_id=season.id, name=f'{slug} Home')
+    away = Team(org_id=org.id, season_id=season.id, name=f'{slug} Away')
+    db.session.add_all([home, away])
+    db.session.flush()
+    game = Game(org_id=org.id, season_id=season.id, home_team_id=home.id, away_team_id=away.id,
+                status=GameStatus.SCHEDULED, start_time=datetime.utcnow() + timedelta(days=1))
+    db.session.add(game)
+    db.session.commit()
+    return org, season, home, away, game
+
+
+def _touch(row, **changes):
+    # SQLite's CURRENT_TIMESTAMP has one-second resolution; move past it explicitly
+    for name, value in changes.items():
+        setattr(row, name, value)
+    row.updated_at = datetime.utcnow() + timedelta(seconds=5)
+    db.session.commit()
+
+
+def _get(client, url, slug, **headers):
+    return client.get(url, headers={'X-Org-Slug': slug, **headers})
+
+
+def test_matching_etag_answers_304_without_running_the_view(app, monkeypatch):
+    _seed_season('alpha')
+    client = app.test_client()
+
+    first = _get(client, '/api/v1/games', 'alpha')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('W/"')
+    assert first.cache_control.private and first.cache_control.no_cache
+
+    def fail(_game):
+        raise AssertionError('view ran for a matching ETag')
+
+    monkeypatch.setattr(api_routes, 'serialize_game', fail)
+    again = _get(client, '/api/v1/games', 'alpha', **{'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert again.headers['ETag'] == etag
+
+
+def test_committed_changes_and_deletes_change_the_etag(app):
+    org, season, home, away, game = _seed_season('beta')
+    client = app.test_client()
+    etag = _get(client, '/api/v1/games', 'beta').headers['ETag']
+
+    _touch(db.session.get(Game, game.id), home_score=3)
+    changed = _get(client, '/api/v1/games', 'beta', **{'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.json['items'][0]['home_score'] == 3
+
+    db.session.delete(db.session.get(Game, game.id))
+    db.session.commit()
+    emptied = _get(client, '/api/v1/games', 'beta', **{'If-None-Match': changed.headers['ETag']})
+    assert emptied.status_code == 200
+    assert emptied.json['items'] == []
+
+
+def test_count_stamps_never_answer_if_modified_since(app):
+    _seed_season('theta')
+    client = app.test_client()
+    first = _get(client, '/api/v1/games', 'theta')
+    # A delete lowers the count without moving any timestamp, so only the ETag can tell
+    assert first.last_modified is None
+
+    since = (datetime.utcnow() + timedelta(days=1)).strftime('%a, %d %b %Y %H:%M:%S GMT')
+    assert _get(client, '/api/v1/games', 'theta', **{'If-Modified-Since': since}).status_code == 200
+
+
+def test_etags_are_scoped_to_the_organization_and_query(app):
+    _seed_season('gamma')
+    _seed_season('delta')
+    client = app.test_client()
+
+    gamma = _get(client, '/api/v1/players', 'gamma').headers['ETag']
+    delta = _get(client, '/api/v1/players', 'delta').headers['ETag']
+    filtered = _get(client, '/api/v1/players?team_id=x', 'gamma').headers['ETag']
+    assert len({gamma, delta, filtered}) == 3
+    assert _get(client, '/api/v1/players', 'delta', **{'If-None-Match': gamma}).status_code == 200
+
+
+def test_portal_pages_follow_their_season(app):
+    org, season, home, away, game = _seed_season('epsilon')
+    _, other_season, *_ = _seed_season('zeta')
+    client = app.test_client()
+    standings = f'/portal/seasons/{season.id}/standings'
+    game_page = f'/portal/games/{game.id}'
+    # The first render creates the site settings row every page is stamped with
+    _get(client, '/portal/', 'epsilon')
+
+    etags = {url: _get(client, url, 'epsilon').headers['ETag'] for url in (standings, game_page)}
+
+    db.session.get(Season, other_season.id).name = 'Elsewhere'
+    db.session.commit()
+    assert all(_get(client, url, 'epsilon', **{'If-None-Match': etag}).status_code == 304
+               for url, etag in etags.items())
+
+    _touch(db.session.get(Team, away.id), name='Renamed')
+    assert all(_get(client, url, 'epsilon', **{'If-None-Match': etag}).status_code == 200
+               for url, etag in etags.items())
+
+
+def test_pages_are_not_revalidated_across_csrf_sessions(app):
+    _org, season, *_ = _seed_season('iota')
+    standings = f'/portal/seasons/{season.id}/standings'
+    first, second = app.test_client(), app.test_client()
+    _get(first, '/portal/', 'iota')
+
+    response = _get(first, standings, 'iota')
+    assert response.last_modified is None
+    etag = response.headers['ETag']
+    assert _get(first, standings, 'iota', **{'If-None-Match': etag}).status_code == 304
+    # Another session's copy embeds a CSRF token this visitor cannot use
+    assert _get(second, standings, 'iota', **{'If-None-Match': etag}).status_code == 200
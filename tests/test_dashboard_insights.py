@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from slms.extensions import db
+from slms.models import DashboardSnapshot
+from slms.services.dashboard_insights import build_league_insights, get_league_insights
+from slms.services.db import get_db
+
+
+@pytest.fixture()
+def app(app):
+    for statement in (
+        "CREATE TABLE leagues (league_id INTEGER PRIMARY KEY, name TEXT)",
+        "CREATE TABLE players (player_id INTEGER PRIMARY KEY, team_id INTEGER)",
+        "CREATE TABLE matches (match_id INTEGER PRIMARY KEY, league_id INTEGER, "
+        "home_team_id INTEGER, away_team_id INTEGER, winner TEXT, utc_date TIMESTAMP)",
+    ):
+        db.session.execute(text(statement))
+    db.session.commit()
+    return app
+
+
+def _seed(year):
+    cur = get_db().cursor()
+    cur.execute("INSERT INTO leagues (league_id, name) VALUES (%s, %s)", (1, 'Premier'))
+    for player_id, team_id in ((1, 10), (2, 10), (3, 11), (4, 12)):
+        cur.execute("INSERT INTO players (player_id, team_id) VALUES (%s, %s)", (player_id, team_id))
+    for home, away, winner, when in (
+        (10, 11, 'HOME_TEAM', datetime(year, 3, 1)),
+        (10, 12, None, datetime(year, 4, 1)),
+        (11, 12, 'AWAY_TEAM', datetime(year - 1, 5, 1)),
+    ):
+        cur.execute(
+            "INSERT INTO matches (league_id, home_team_id, away_team_id, winner, utc_date) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            (1, home, away, winner, when),
+        )
+    get_db().commit()
+
+
+@pytest.mark.usefixtures('app')
+def test_build_league_insights_aggregates_both_years():
+    now = datetime.now(timezone.utc)
+    _seed(now.year)
+
+    insights = build_league_insights(now)
+    totals = insights['totals']
+
+    assert totals['teams'] == {'current': 3, 'previous': 2, 'delta': 1, 'delta_pct': 50.0}
+    assert totals['players']['current'] == 4
+    assert totals['players']['previous'] == 2
+    assert totals['registrations']['current'] == 2
+    assert totals['paid_registrations']['current'] == 1
+    assert insights['conversion_rate'] == 50.0
+    assert insights['league_breakdown'][0]['name'] == 'Premier'
+    assert insights['league_breakdown'][0]['registrations_current'] == 2
+
+
+@pytest.mark.usefixtures('app')
+def test_snapshot_is_reused_and_dropped_on_legacy_writes():
+    now = datetime.now(timezone.utc)
+    _seed(now.year)
+
+    first = get_league_insights()
+    assert db.session.query(DashboardSnapshot).count() == 1
+    assert get_league_insights()['updated_at'] == first['updated_at']
+
+    cur = get_db().cursor()
+    cur.execute("DELETE FROM matches WHERE winner IS NULL")
+    get_db().commit()
+    assert db.session.query(DashboardSnapshot).count() == 0
+
+    assert get_league_insights()['totals']['registrations']['current'] == 1
+
+
+def test_refresh_is_scheduled_on_quarter_hour_slots(monkeypatch):
+    from slms.services.queue import queue_service
+
+    scheduled = []
+    monkeypatch.setattr(
+        queue_service.default_queue, 'enqueue_at',
+        lambda run_at, _func, **kwargs: scheduled.append((run_at, kwargs['job_id'])),
+    )
+
+    queue_service.schedule_dashboard_insights_refresh()
+    queue_service.schedule_dashboard_insights_refresh()
+
+    (run_at, job_id), second = scheduled
+    assert second == (run_at, job_id)
+    assert run_at.minute % 15 == 0 and run_at > datetime.utcnow()
+    assert job_id == f'dashboard-insights-{run_at:%Y%m%d%H%M}'
@@ -0,0 +1,38 @@
+import pytest
+
+from slms.extensions import db
+from slms.models import Organization
+from slms.services.email_renderer import EmailRenderer
+
+
+@pytest.fixture()
+def config_overrides():
+    return {'BASE_URL': 'https://league.example.com'}
+
+
+@pytest.mark.usefixtures('app')
+def test_render_many_shares_template_and_org_fragment():
+    org = Organization(name='Downtown Hoops', slug='downtown')
+    db.session.add(org)
+    db.session.commit()
+
+    renderer = EmailRenderer()
+    contexts = [{'test_message': 'first'}, {'test_message': 'second'}]
+    first, second = renderer.render_many('test_email', contexts, org=org)
+
+    assert 'first' in first and 'second' in second
+    assert 'Downtown Hoops' in first and 'Downtown Hoops' in second
+    assert list(renderer._templates) == ['test_email']
+    assert len(renderer._org_fragments) == 1
+    # Caller contexts are left untouched.
+    assert contexts[0] == {'test_message': 'first'}
+
+
+@pytest.mark.usefixtures('app')
+def test_missing_template_uses_fallback():
+    renderer = EmailRenderer()
+    html = renderer.render('does_not_exist', {'team_name': 'Wildcats'}, subject='Hello')
+
+    assert 'Wildcats' in html
+    assert 'Sports League Management' in html
+    assert renderer._templates['does_not_exist'] is None
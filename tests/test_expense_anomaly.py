@@ -0,0 +1,72 @@
+from slms.services.expense_anomaly import ExpenseAnomalyDetector
+
+
+def _history():
+    amounts = [10000, 10500, 9800, 10200, 9900, 10100, 10300]
+    return [
+        {'date': f'2024-01-{day + 1:02d}', 'amount_cents': amount,
+         'category': 'officials', 'vendor': 'Ref Crew LLC'}
+        for day, amount in enumerate(amounts)
+    ]
+
+
+def test_typical_expense_is_not_flagged():
+    detector = ExpenseAnomalyDetector()
+    detector.prime(1, _history())
+
+    result = detector.score(1, {'date': '2024-03-01', 'amount_cents': 10050,
+                                'category': 'officials', 'vendor': 'Ref Crew LLC'})
+
+    assert result['is_anomaly'] is False
+    assert result['anomaly_score'] == 0.0
+
+
+def test_outlier_amount_and_new_vendor_are_flagged():
+    detector = ExpenseAnomalyDetector()
+    detector.prime(1, _history())
+
+    result = detector.score(1, {'date': '2024-03-01', 'amount_cents': 95000,
+                                'category': 'officials', 'vendor': 'Unknown Co'})
+
+    assert result['is_anomaly'] is True
+    assert result['anomaly_score'] > 0.7
+    assert result['signals']['vendor_novelty'] == 0.3
+    assert any('New vendor' in reason for reason in result['reasons'])
+
+
+def test_duplicate_burst_detected_after_observe():
+    detector = ExpenseAnomalyDetector()
+    detector.prime(1, _history())
+    expense = {'date': '2024-03-01', 'amount_cents': 10400,
+               'category': 'officials', 'vendor': 'Ref Crew LLC'}
+
+    assert 'duplicate' not in detector.score(1, expense)['signals']
+    detector.observe(1, expense)
+    result = detector.score(1, dict(expense, date='2024-03-03'))
+
+    assert result['signals']['duplicate'] >= 0.75
+    assert result['is_anomaly'] is True
+
+
+def test_unprimed_league_reports_insufficient_history():
+    detector = ExpenseAnomalyDetector()
+
+    assert detector.is_primed(2) is False
+    assert detector.score(2, {'amount_cents': 500, 'category': 'other'})['reasons'] == [
+        'Insufficient historical data'
+    ]
+
+
+def test_constant_history_only_flags_higher_amounts():
+    detector = ExpenseAnomalyDetector()
+    detector.prime(1, [dict(row, amount_cents=10000) for row in _history()])
+
+    def score(amount_cents):
+        return detector.score(1, {'date': '2024-03-01', 'amount_cents': amount_cents,
+                                  'category': 'officials', 'vendor': 'Ref Crew LLC'})
+
+    assert score(10000)['anomaly_score'] == 0.0
+    assert score(7500)['is_anomaly'] is False
+    assert score(7500)['signals']['category_amount'] == 0.0
+    assert score(12500)['signals']['category_amount'] == 1.0
+    assert any('exceeds every previous' in reason for reason in score(12500)['reasons'])
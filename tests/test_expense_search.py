@@ -0,0 +1,87 @@
+from datetime import date
+
+from slms.services.expense_search import ExpenseSearchIndex, ExpenseSearchRegistry, parse_query
+
+
+def _row(expense_id, exp_date, amount_cents, category, vendor, description):
+    return (expense_id, exp_date, amount_cents, category, vendor, description, None, None, True)
+
+
+def _index():
+    index = ExpenseSearchIndex()
+    for row in (
+        _row(1, '2023-02-10', 15000, 'officials', 'Ref Crew LLC', 'Referee fees week 1'),
+        _row(2, '2024-03-05', 4500, 'equipment', 'Sports Depot', 'Soccer balls and pump'),
+        _row(3, '2024-03-20', 90000, 'facilities', 'City Parks', 'Field rental spring season'),
+        _row(4, '2024-04-02', 12000, 'officials', 'Ref Crew LLC', 'Umpires for tournament'),
+        _row(5, '2024-04-15', 2500, 'marketing', 'PrintCo', 'Flyers for registration'),
+    ):
+        index.add(row)
+    return index
+
+
+def test_synonyms_reach_category_matches():
+    results = _index().search('refs')
+
+    assert [row[0] for row, _score in results][:2] in ([1, 4], [4, 1])
+
+
+def test_amount_and_date_filters():
+    index = _index()
+
+    assert [row[0] for row, _ in index.search('officials over $130')] == [1]
+    assert [row[0] for row, _ in index.search('in March 2024')] == [3, 2]
+    assert [row[0] for row, _ in index.search('between 20 and 50')] == [5, 2]
+
+
+def test_removed_expenses_drop_out_of_results():
+    index = _index()
+    index.remove(3)
+
+    assert index.search('field rental') == []
+    assert 3 not in index.rows
+
+
+def test_parse_query_relative_month():
+    text, filters = parse_query('gym rental last month', today=date(2024, 1, 15))
+
+    assert text == 'gym rental'
+    assert filters == {'start': date(2023, 12, 1), 'end': date(2023, 12, 31)}
+
+
+class _LedgerCursor:
+    """Serves ``league_expenses`` rows from a list; ``on_execute`` runs mid-query."""
+
+    def __init__(self, rows, on_execute=None):
+        self.ledger = list(rows)
+        self.on_execute = on_execute
+        self._result = []
+
+    def execute(self, _sql, params):
+        _league_id, since = params
+        self._result = [row for row in self.ledger if row[0] > since]
+        if self.on_execute is not None:
+            self.on_execute(self)
+
+    def fetchall(self):
+        return self._result
+
+
+def test_registry_reads_rows_outside_its_lock_and_retries_after_removals():
+    registry = ExpenseSearchRegistry()
+    seen_locked = []
+
+    def concurrent_delete(cur):
+        seen_locked.append(registry._lock.locked())
+        if len(seen_locked) == 1:
+            # Another request deletes expense 2 while this one is reading
+            cur.ledger = [row for row in cur.ledger if row[0] != 2]
+            registry.remove(1, [2])
+
+    cur = _LedgerCursor(_index().rows.values(), on_execute=concurrent_delete)
+    index = registry.get_index(cur, 1)
+
+    assert seen_locked == [False, False]
+    assert sorted(index.rows) == [1, 3, 4, 5]
+    assert index.last_expense_id == 5
+
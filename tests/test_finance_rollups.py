@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import text
+
+from slms.extensions import db
+from slms.services.db import get_db
+from slms.services.finance_rollups import (
+    EXPENSE_LEDGER,
+    REVENUE_LEDGER,
+    ensure_finance_rollup_tables,
+    fetch_expense_page,
+    get_finance_rollups,
+    record_finance_entry,
+)
+
+
+@pytest.fixture()
+def app(app):
+    for statement in (
+        "CREATE TABLE leagues (league_id INTEGER PRIMARY KEY, name TEXT)",
+        "CREATE TABLE league_revenue (revenue_id INTEGER PRIMARY KEY, league_id INTEGER, "
+        "revenue_type TEXT, amount_cents INTEGER, transaction_date DATE, description TEXT, "
+        "payment_method TEXT, status TEXT DEFAULT 'confirmed')",
+        "CREATE TABLE in_person_payments (payment_id INTEGER PRIMARY KEY, league_id INTEGER, "
+        "amount_cents INTEGER, payment_method TEXT, payment_date DATE)",
+        "CREATE TABLE league_expenses (expense_id INTEGER PRIMARY KEY, league_id INTEGER, "
+        "expense_date DATE, amount_cents INTEGER, category TEXT, vendor_name TEXT, "
+        "description TEXT, payment_method TEXT, reference_number TEXT, tax_deductible BOOLEAN)",
+        "INSERT INTO leagues (league_id, name) VALUES (1, 'Premier')",
+    ):
+        db.session.execute(text(statement))
+    cur = get_db().cursor()
+    ensure_finance_rollup_tables(cur)
+    get_db().commit()
+    return app
+
+
+def _add_expense(cur, expense_date, amount_cents, category):
+    cur.execute(
+        "INSERT INTO league_expenses (league_id, expense_date, amount_cents, category, description) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        (1, expense_date, amount_cents, category, 'item'),
+    )
+
+
+@pytest.mark.usefixtures('app')
+def test_rollups_rebuild_then_track_incremental_writes():
+    wrapper = get_db()
+    cur = wrapper.cursor()
+    _add_expense(cur, '2024-01-05', 1000, 'equipment')
+    _add_expense(cur, '2024-01-20', 500, 'officials')
+    _add_expense(cur, '2024-02-02', 250, 'equipment')
+    cur.execute(
+        "INSERT INTO league_revenue (league_id, revenue_type, amount_cents, transaction_date, status) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        (1, 'fees', 4000, '2024-01-10', 'confirmed'),
+    )
+    cur.execute(
+        "INSERT INTO league_revenue (league_id, revenue_type, amount_cents, transaction_date, status) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        (1, 'fees', 9999, '2024-01-11', 'pending'),
+    )
+    wrapper.commit()
+
+    rollups = get_finance_rollups(wrapper, 1)
+    assert rollups['totals'][EXPENSE_LEDGER] == 1750
+    assert rollups['totals'][REVENUE_LEDGER] == 4000
+    assert rollups['by_category'][EXPENSE_LEDGER]['equipment'] == (1250, 2)
+    assert rollups['monthly'][0] == {'period': '2024-02', 'revenue_cents': 0, 'expense_cents': 250}
+    assert rollups['monthly'][1] == {'period': '2024-01', 'revenue_cents': 4000, 'expense_cents': 1500}
+
+    # Subsequent writes adjust the summary rows without a rebuild
+    _add_expense(cur, '2024-02-15', 300, 'equipment')
+    record_finance_entry(cur, 1, EXPENSE_LEDGER, '2024-02-15', 'equipment', 300)
+    record_finance_entry(cur, 1, EXPENSE_LEDGER, '2024-01-20', 'officials', -500, count=-1)
+    wrapper.commit()
+
+    rollups = get_finance_rollups(wrapper, 1)
+    assert rollups['totals'][EXPENSE_LEDGER] == 1550
+    assert 'officials' not in rollups['by_category'][EXPENSE_LEDGER]
+    assert rollups['by_category'][EXPENSE_LEDGER]['equipment'] == (1550, 3)
+
+
+@pytest.mark.usefixtures('app')
+def test_expense_pages_follow_keyset_cursor():
+    wrapper = get_db()
+    cur = wrapper.cursor()
+    for day in range(1, 6):
+        _add_expense(cur, f'2024-03-0{day}', day * 100, 'equipment')
+    _add_expense(cur, '2024-03-05', 999, 'equipment')
+    wrapper.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = fetch_expense_page(cur, 1, cursor, limit=2)
+        seen.extend(row[0] for row in rows)
+        if cursor is None:
+            break
+
+    assert seen == [6, 5, 4, 3, 2, 1]
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from slms.extensions import db
+from slms.models import (
+    Game,
+    GameStatus,
+    League,
+    Organization,
+    Season,
+    SportType,
+    Team,
+    User,
+    UserRole,
+)
+from slms.services.jobs import (
+    collect_game_reminder_recipients,
+    send_game_reminder_digest_job,
+    send_game_reminder_job,
+)
+from slms.services.queue import queue_service
+
+
+class _FakePipeline:
+    def __init__(self):
+        self.executed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self):
+        self.executed += 1
+
+
+@pytest.fixture()
+def enqueued(monkeypatch):
+    """Capture the job data ``enqueue_game_reminders`` writes, without Redis."""
+    pipeline = _FakePipeline()
+    batches = []
+
+    def enqueue_many(job_datas, pipeline=None):
+        batches.append((job_datas, pipeline))
+        return list(job_datas)
+
+    monkeypatch.setattr(queue_service, 'redis_conn', type('Redis', (), {'pipeline': lambda _self: pipeline})())
+    monkeypatch.setattr(queue_service.email_queue, 'enqueue_many', enqueue_many)
+    return {'pipeline': pipeline, 'batches': batches}
+
+
+def _seed_org(slug: str, game_count: int, start_time: datetime) -> list[str]:
+    org = Organization(name=slug.title(), slug=slug)
+    db.session.add(org)
+    db.session.flush()
+
+    league = League(org_id=org.id, name='League', sport=SportType.BASKETBALL)
+    db.session.add(league)
+    db.session.flush()
+    season = Season(org_id=org.id, league_id=league.id, name='Season')
+    db.session.add(season)
+    db.session.flush()
+    home = Team(org_id=org.id, season_id=season.id, name='Home')
+    away = Team(org_id=org.id, season_id=season.id, name='Away')
+    db.session.add_all([home, away])
+    db.session.flush()
+
+    for email, role in (
+        ('coach@example.com', UserRole.COACH),
+        ('owner@example.com', UserRole.OWNER),
+        ('viewer@example.com', UserRole.VIEWER),
+    ):
+        user = User(org_id=org.id, email=email, role=role)
+        user.set_password('Password123!')
+        db.session.add(user)
+
+    game_ids = []
+    for offset in range(game_count):
+        game = Game(
+            org_id=org.id,
+            season_id=season.id,
+            home_team_id=home.id,
+            away_team_id=away.id,
+            status=GameStatus.SCHEDULED,
+            start_time=start_time + timedelta(hours=offset),
+        )
+        db.session.add(game)
+        db.session.flush()
+        game_ids.append(game.id)
+
+    db.session.commit()
+    return game_ids
+
+
+@pytest.mark.usefixtures('app')
+def test_recipients_are_deduplicated_per_game():
+    start = datetime(2030, 1, 2, 0, 0)
+    end = datetime(2030, 1, 2, 23, 59, 59)
+    first_org_games = _seed_org('alpha', 2, start + timedelta(hours=10))
+    second_org_games = _seed_org('beta', 1, start + timedelta(hours=12))
+
+    recipients = collect_game_reminder_recipients(start, end)
+
+    # Two eligible users per org, one entry per game (not per team).
+    assert len(recipients) == 2 * (len(first_org_games) + len(second_org_games))
+    assert len(set(recipients)) == len(recipients)
+    assert {email for _, _, email in recipients} == {'coach@example.com', 'owner@example.com'}
+    assert {game_id for _, game_id, _ in recipients} == set(first_org_games + second_org_games)
+    assert len({org_id for org_id, _, _ in recipients}) == 2
+
+
+@pytest.mark.usefixtures('app')
+def test_recipients_ignore_games_outside_window():
+    start = datetime(2030, 1, 2, 0, 0)
+    end = datetime(2030, 1, 2, 23, 59, 59)
+    _seed_org('gamma', 1, start + timedelta(days=2))
+
+    assert collect_game_reminder_recipients(start, end) == []
+
+
+@pytest.mark.usefixtures('app')
+def test_digests_are_grouped_per_organization(enqueued):
+    start = datetime(2030, 1, 2, 0, 0)
+    end = datetime(2030, 1, 2, 23, 59, 59)
+    alpha_games = _seed_org('alpha', 2, start + timedelta(hours=10))
+    beta_games = _seed_org('beta', 1, start + timedelta(hours=12))
+
+    recipients = collect_game_reminder_recipients(start, end)
+    jobs = queue_service.enqueue_game_reminders(recipients + recipients[:1], digest=True)
+
+    # One digest per (organization, address), never mixing organizations
+    assert len(jobs) == 4
+    assert enqueued['pipeline'].executed == 1
+    (job_datas, pipeline), = enqueued['batches']
+    assert pipeline is enqueued['pipeline']
+    assert {data.func for data in job_datas} == {send_game_reminder_digest_job}
+    assert sorted(sorted(data.kwargs['game_ids']) for data in job_datas) == sorted(
+        [sorted(alpha_games)] * 2 + [beta_games] * 2
+    )
+
+
+@pytest.mark.usefixtures('app', 'enqueued')
+def test_individual_reminders_are_deduplicated():
+    start = datetime(2030, 1, 2, 0, 0)
+    end = datetime(2030, 1, 2, 23, 59, 59)
+    _seed_org('alpha', 2, start + timedelta(hours=10))
+
+    recipients = collect_game_reminder_recipients(start, end)
+    jobs = queue_service.enqueue_game_reminders(recipients * 2)
+
+    assert len(jobs) == len(recipients) == 4
+    assert {data.func for data in jobs} == {send_game_reminder_job}
+    assert {(data.kwargs['game_id'], data.kwargs['to_email']) for data in jobs} == {
+        (game_id, email) for _, game_id, email in recipients
+    }
+
+
+@pytest.mark.usefixtures('app')
+def test_no_reminders_skips_redis(enqueued):
+    assert queue_service.enqueue_game_reminders([], digest=True) == []
+    assert enqueued['batches'] == []
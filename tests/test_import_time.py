@@ -0,0 +1,63 @@
+"""Cold-start regression checks based on ``python -X importtime``."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from slms.services.lazy import DEFERRED_MODULES, lazy_import
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative microseconds allowed for ``import slms`` in a fresh interpreter
+IMPORT_BUDGET_US = int(os.getenv('SLMS_IMPORT_BUDGET_US', 2_000_000))
+
+_SCRIPT = """
+import json, sys
+from slms import create_app
+from slms.config import Config
+
+class StartupConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+create_app(StartupConfig)
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _cold_start():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self_us, cumulative_us, name = line.split('|')
+        cumulative[name.strip()] = int(cumulative_us)
+    return set(json.loads(result.stdout.strip().splitlines()[-1])), cumulative
+
+
+def test_create_app_defers_heavy_dependencies_and_fits_budget():
+    modules, cumulative = _cold_start()
+
+    assert sorted(m for m in DEFERRED_MODULES if m in modules) == []
+    assert cumulative['slms'] < IMPORT_BUDGET_US, (
+        f"import slms took {cumulative['slms'] / 1000:.0f} ms "
+        f"(budget {IMPORT_BUDGET_US / 1000:.0f} ms)"
+    )
+
+
+def test_lazy_module_imports_on_first_attribute_access():
+    json_module = lazy_import('json')
+
+    assert 'not loaded' in repr(json_module)
+    assert json_module.dumps([1]) == '[1]'
+    assert 'not loaded' not in repr(json_module)
@@ -0,0 +1,133 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from slms.extensions import db
+from slms.models import LLMResponse
+from slms.services.ai_finance import (
+    categorize_expense,
+    categorize_expenses_batch,
+    generate_match_recap,
+)
+from slms.services.llm_cache import (
+    LocalLLMClient,
+    cached_completion,
+    lookup_response,
+    set_llm_client,
+    store_response,
+)
+
+
+@pytest.fixture()
+def config_overrides():
+    return {'AI_RESPONSE_CACHE_TTL': 3600}
+
+
+def test_identical_prompts_are_served_from_cache(app):
+    client = LocalLLMClient({'category': 'officials', 'confidence': 0.9, 'reasoning': 'refs'})
+    set_llm_client(app, client)
+
+    first = categorize_expense('Referee fees  week 3', 'Ref Crew')
+    second = categorize_expense('Referee fees week 3', 'Ref Crew')
+
+    assert first == second == {'category': 'officials', 'confidence': 0.9, 'reasoning': 'refs'}
+    assert len(client.calls) == 1
+
+
+def test_invalid_json_is_not_cached(app):
+    client = LocalLLMClient('not json')
+    set_llm_client(app, client)
+
+    recap = {'home_team': 'A', 'away_team': 'B', 'home_score': 1, 'away_score': 0}
+    assert generate_match_recap(recap)['success'] is False
+    assert generate_match_recap(recap)['success'] is False
+    assert len(client.calls) == 2
+
+
+def test_regenerate_asks_for_a_new_draft_and_keeps_it(app):
+    drafts = iter(['First', 'Second'])
+    client = LocalLLMClient(lambda _messages: {'title': next(drafts), 'summary': '', 'content': ''})
+    set_llm_client(app, client)
+    recap = {'home_team': 'A', 'away_team': 'B', 'home_score': 1, 'away_score': 0}
+
+    assert generate_match_recap(recap)['title'] == 'First'
+    assert generate_match_recap(recap)['title'] == 'First'
+    assert generate_match_recap(recap, regenerate=True)['title'] == 'Second'
+    # The new draft replaces the cached one
+    assert generate_match_recap(recap)['title'] == 'Second'
+    assert len(client.calls) == 2
+
+
+def test_batch_asks_once_and_fills_single_item_cache(app):
+    def responder(messages):
+        items = json.loads(messages[1]['content'].split('expenses:\n', 1)[1].split('\n\nValid')[0])
+        return {'results': [
+            {'index': item['index'], 'category': 'equipment', 'confidence': 0.8, 'reasoning': 'gear'}
+            for item in items
+        ]}
+
+    client = LocalLLMClient(responder)
+    set_llm_client(app, client)
+
+    rows = [
+        {'description': 'Soccer balls', 'vendor': 'Sports Depot', 'amount': 120},
+        {'description': 'Corner flags', 'vendor': 'Sports Depot'},
+        {'description': 'Soccer balls', 'vendor': 'Sports Depot', 'amount': 120},
+    ]
+    results = categorize_expenses_batch(rows)
+
+    assert [r['category'] for r in results] == ['equipment'] * 3
+    assert len(client.calls) == 1
+    assert json.loads(client.calls[0]['messages'][1]['content'].split('expenses:\n', 1)[1]
+                      .split('\n\nValid')[0])[-1]['index'] == 1
+
+    assert categorize_expense('Corner flags', 'Sports Depot')['category'] == 'equipment'
+    assert len(client.calls) == 1
+
+
+def test_concurrent_identical_requests_are_coalesced(app):
+    release = threading.Event()
+    started = threading.Event()
+
+    class SlowClient:
+        calls = 0
+
+        def complete(self, _messages, _model, _temperature, _max_tokens):
+            SlowClient.calls += 1
+            started.set()
+            release.wait(5)
+            return '{"ok": true}'
+
+    messages = [{'role': 'user', 'content': 'hello'}]
+    results = []
+
+    def worker():
+        with app.app_context():
+            results.append(cached_completion(messages, model='m', temperature=0, max_tokens=5,
+                                             client=SlowClient()))
+
+    first = threading.Thread(target=worker)
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=worker)
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert results == ['{"ok": true}', '{"ok": true}']
+    assert SlowClient.calls == 1
+
+
+@pytest.mark.usefixtures('app')
+def test_storing_a_response_sweeps_expired_rows():
+    db.session.add(LLMResponse(key='stale', model='m', response='{}',
+                               expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    db.session.commit()
+
+    store_response('fresh', 'm', '{"ok": true}')
+
+    assert db.session.query(LLMResponse.key).all() == [('fresh',)]
+    assert lookup_response('fresh') == '{"ok": true}'
@@ -0,0 +1,124 @@
+import io
+from pathlib import Path
+
+import pytest
+from flask import g
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from slms import create_app
+from slms.extensions import db
+from slms.models import MediaAsset, Organization, StorageBlob
+from slms.services import media_derivatives
+from slms.services.media_derivatives import media_srcset, media_thumbnail_url, render_renditions
+from slms.services.media_library import create_media_asset, delete_media_asset, serialize_media_asset
+
+
+@pytest.fixture()
+def config_overrides():
+    return {'MEDIA_DERIVATIVES_BACKEND': 'inline'}
+
+
+@pytest.fixture()
+def org(app):  # noqa: ARG001 - needs the app context
+    org = Organization(name='Photo League', slug='photo-league')
+    db.session.add(org)
+    db.session.commit()
+    return org
+
+
+def _image_bytes(size, mode='RGB', fmt='JPEG'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 40, 40) if mode == 'RGB' else (200, 40, 40, 128)).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_renditions_are_capped_at_the_original_width(tmp_path):
+    large = tmp_path / 'large.jpg'
+    large.write_bytes(_image_bytes((2400, 1200)))
+    rendered = render_renditions(str(large), media_derivatives.RENDITION_WIDTHS)
+
+    assert (rendered['width'], rendered['height']) == (2400, 1200)
+    assert [(r['name'], r['format'], r['width'], r['height']) for r in rendered['renditions']] == [
+        ('thumb', 'jpeg', 320, 160), ('thumb', 'webp', 320, 160),
+        ('medium', 'jpeg', 960, 480), ('medium', 'webp', 960, 480),
+        ('large', 'jpeg', 1920, 960), ('large', 'webp', 1920, 960),
+    ]
+    assert Image.open(io.BytesIO(rendered['renditions'][1]['data'])).format == 'WEBP'
+
+    small = tmp_path / 'small.png'
+    small.write_bytes(_image_bytes((500, 250), mode='RGBA', fmt='PNG'))
+    rendered = render_renditions(str(small), media_derivatives.RENDITION_WIDTHS)
+    assert [(r['name'], r['format'], r['width']) for r in rendered['renditions']] == [
+        ('thumb', 'png', 320), ('thumb', 'webp', 320), ('medium', 'png', 500), ('medium', 'webp', 500),
+    ]
+
+
+def test_uploaded_images_get_recorded_renditions_and_srcset(app, org):
+    upload = FileStorage(io.BytesIO(_image_bytes((1200, 800))), filename='team.jpg', content_type='image/jpeg')
+    with app.test_request_context():
+        g.org = org
+        g.org_slug = org.slug
+        asset = create_media_asset(title='Team photo', file=upload)
+
+    assert asset.derivatives_status == 'ready'
+    assert (asset.width, asset.height) == (1200, 800)
+    assert [(r['name'], r['format'], r['width']) for r in asset.renditions] == [
+        ('thumb', 'jpeg', 320), ('thumb', 'webp', 320),
+        ('medium', 'jpeg', 960), ('medium', 'webp', 960),
+        ('large', 'jpeg', 1200), ('large', 'webp', 1200),
+    ]
+    static_root = Path(app.static_folder)
+    for rendition in asset.renditions:
+        assert rendition['path'].startswith('uploads/media/photo-league/renditions/')
+        assert rendition['url'] == f"/static/{rendition['path']}"
+        assert (static_root / rendition['path']).exists()
+
+    thumb = asset.renditions[0]['url']
+    assert media_thumbnail_url(asset.renditions, asset.url) == thumb
+    assert media_srcset(asset.renditions).startswith(f'{thumb} 320w, ')
+    assert media_srcset(asset.renditions, 'webp').count('.webp') == 3
+    serialized = serialize_media_asset(asset)
+    assert serialized['thumbnail_url'] == thumb
+    assert serialized['webp_srcset'] == media_srcset(asset.renditions, 'webp')
+
+    paths = [r['path'] for r in asset.renditions]
+    delete_media_asset(asset)
+    assert StorageBlob.query.count() == 0
+    assert not any((static_root / path).exists() for path in paths)
+
+
+def test_rq_failure_falls_back_to_the_process_pool(app, org, monkeypatch):
+    app.config['MEDIA_DERIVATIVES_BACKEND'] = 'rq'
+    submitted = []
+
+    class _BrokenQueue:
+        def enqueue_media_derivatives(self, _asset_id):
+            raise ConnectionError('redis is down')
+
+    import slms.services.queue as queue_module
+    monkeypatch.setattr(queue_module, 'queue_service', _BrokenQueue())
+    monkeypatch.setattr(media_derivatives, '_submit_to_pool', submitted.append)
+
+    asset = MediaAsset(org_id=org.id, title='Logo', media_type='image', mime_type='image/png',
+                       storage_path='uploads/media/photo-league/ab/logo.png')
+    db.session.add(asset)
+    db.session.commit()
+
+    assert media_derivatives.schedule_media_derivatives(asset) == 'pool'
+    assert submitted == [asset]
+    assert asset.derivatives_status == 'pending'
+
+    video = MediaAsset(org_id=org.id, title='Clip', media_type='video', mime_type='video/mp4',
+                       storage_path='uploads/media/photo-league/cd/clip.mp4')
+    db.session.add(video)
+    db.session.commit()
+    assert media_derivatives.schedule_media_derivatives(video) is None
+
+
+def test_media_helpers_are_registered_without_site_settings(monkeypatch, app_config):
+    monkeypatch.setenv('SLMS_SKIP_SITE', '1')
+    bare_app = create_app(app_config)
+
+    assert 'media_srcset' in bare_app.jinja_env.globals
+    assert 'media_thumbnail_url' in bare_app.jinja_env.globals
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import g
+
+from slms.extensions import db
+from slms.models import MediaAsset, Organization
+from slms.services.media_library import (
+    create_media_asset,
+    delete_media_asset,
+    media_category_facets,
+    page_media_assets,
+)
+
+
+@pytest.fixture()
+def config_overrides():
+    return {'MEDIA_GALLERY_PAGE_SIZE': 2}
+
+
+@pytest.fixture()
+def org(app):  # noqa: ARG001 - needs the app context
+    org = Organization(name='Gallery League', slug='gallery-league')
+    db.session.add(org)
+    db.session.commit()
+    return org
+
+
+def _add_assets(org, count, category='match_day'):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assets = [
+        MediaAsset(org_id=org.id, title=f'Photo {index}', media_type='image', category=category,
+                   public_url=f'https://cdn.example.com/{index}.jpg',
+                   created_at=start + timedelta(minutes=index // 2))
+        for index in range(count)
+    ]
+    db.session.add_all(assets)
+    db.session.commit()
+    return assets
+
+
+def test_keyset_pages_cover_every_asset_once_newest_first(org):
+    _add_assets(org, 7)
+
+    seen, cursor = [], None
+    while True:
+        assets, cursor = page_media_assets(org.id, limit=3, cursor=cursor)
+        seen.extend(assets)
+        if cursor is None:
+            break
+
+    assert len(seen) == len({asset.id for asset in seen}) == 7
+    keys = [(asset.created_at, asset.id) for asset in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert page_media_assets(org.id, category='other')[0] == []
+    with pytest.raises(ValueError):
+        page_media_assets(org.id, cursor='garbage')
+
+
+def test_category_facets_are_cached_until_the_library_changes(app, org):
+    _add_assets(org, 2, category='training')
+    assert media_category_facets(org.id) == [{'category': 'training', 'count': 2}]
+
+    # Writes outside the media library service are only seen after the TTL
+    _add_assets(org, 1, category='awards')
+    assert media_category_facets(org.id) == [{'category': 'training', 'count': 2}]
+
+    with app.test_request_context():
+        g.org = org
+        asset = create_media_asset(title='Trophy', category='awards',
+                                   source_url='https://cdn.example.com/trophy.jpg')
+    assert media_category_facets(org.id) == [
+        {'category': 'awards', 'count': 2}, {'category': 'training', 'count': 2},
+    ]
+
+    delete_media_asset(asset)
+    assert media_category_facets(org.id)[0] == {'category': 'awards', 'count': 1}
+
+
+def test_gallery_renders_first_page_and_serves_the_rest_as_json(app, org):
+    _add_assets(org, 5)
+    client = app.test_client()
+
+    response = client.get('/gallery')
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert html.count('class="card h-100 shadow-sm gallery-card"') == 2
+    assert 'Match Day (5)' in html
+    assert 'data-next-url="/gallery/items?cursor=' in html
+
+    next_url = html.split('data-next-url="', 1)[1].split('"', 1)[0].replace('&amp;', '&')
+    counts = []
+    while next_url:
+        page = client.get(next_url).get_json()
+        counts.append(page['count'])
+        next_url = page['next_url']
+    assert counts == [2, 1]
+    assert client.get('/gallery/items?cursor=garbage').status_code == 400
@@ -0,0 +1,121 @@
+import pytest
+
+from slms.extensions import db
+from slms.models import League, Organization, OrgCounter, Season, SportType, Team
+from slms.services.domain_loader import get_org_stats
+from slms.services.org_counters import count_org_rows, get_org_counters, reconcile_org_counters
+
+
+@pytest.fixture()
+def org(app):  # noqa: ARG001 - needs the app context
+    org = Organization(name='Counter League', slug='counter-league')
+    db.session.add(org)
+    db.session.commit()
+    return org
+
+
+def _add_season(org, is_active=True):
+    league = League(org_id=org.id, name='League', sport=SportType.SOCCER)
+    db.session.add(league)
+    db.session.flush()
+    season = Season(org_id=org.id, league_id=league.id, name='Season', is_active=is_active)
+    db.session.add(season)
+    db.session.commit()
+    return season
+
+
+def test_counters_follow_inserts_updates_and_deletes(org):
+    # Created with the organization, not by the first read
+    assert db.session.query(OrgCounter).filter_by(org_id=org.id).count() == 1
+    assert get_org_counters(org.id)['teams'] == 0
+
+    season = _add_season(org, is_active=True)
+    teams = [Team(org_id=org.id, season_id=season.id, name=f'Team {i}') for i in range(3)]
+    db.session.add_all(teams)
+    db.session.commit()
+
+    counters = get_org_counters(org.id)
+    assert counters['teams'] == 3
+    assert counters['seasons'] == 1
+    assert counters['active_seasons'] == 1
+
+    season.is_active = False
+    db.session.delete(teams[0])
+    db.session.commit()
+
+    counters = get_org_counters(org.id)
+    assert counters['teams'] == 2
+    assert counters['active_seasons'] == 0
+    assert counters == count_org_rows(org.id)
+
+
+def test_reconcile_repairs_drift(org):
+    get_org_counters(org.id)
+    _add_season(org)
+    db.session.query(OrgCounter).filter_by(org_id=org.id).update({'teams': 42, 'seasons': 0})
+    db.session.commit()
+
+    assert reconcile_org_counters() == 1
+    assert get_org_counters(org.id) == count_org_rows(org.id)
+    assert get_org_stats(org)['seasons'] == 1
+
+
+def test_reads_without_a_counter_row_do_not_write(org):
+    _add_season(org)
+    db.session.query(OrgCounter).filter_by(org_id=org.id).delete()
+    db.session.commit()
+    org.name = 'Uncommitted'
+
+    assert get_org_counters(org.id) == count_org_rows(org.id)
+    # The caller's transaction was neither committed nor given a counter row
+    db.session.rollback()
+    assert db.session.get(Organization, org.id).name == 'Counter League'
+    assert db.session.query(OrgCounter).filter_by(org_id=org.id).count() == 0
+
+    assert reconcile_org_counters([org.id]) == 1
+    assert db.session.query(OrgCounter).filter_by(org_id=org.id).count() == 1
+
+
+def test_migration_backfills_existing_organizations(org):
+    import importlib.util
+    from pathlib import Path
+
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    path = Path(__file__).resolve().parents[1] / 'migrations' / 'versions' / 'org_counters_001.py'
+    spec = importlib.util.spec_from_file_location('org_counters_001', path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    _add_season(org)
+    db.session.query(OrgCounter).filter_by(org_id=org.id).delete()
+    db.session.commit()
+
+    with db.engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            migration._backfill_counters(connection)
+
+    counter = db.session.query(OrgCounter).filter_by(org_id=org.id).one()
+    assert counter.seasons == 1
+    assert counter.active_seasons == 1
+    assert counter.reconciled_at is not None
+    assert get_org_counters(org.id) == count_org_rows(org.id)
+
+
+def test_reconciliation_schedules_one_job_per_night(monkeypatch):
+    from slms.services.queue import queue_service
+
+    scheduled = []
+    monkeypatch.setattr(
+        queue_service.default_queue, 'enqueue_at',
+        lambda run_at, _func, **kwargs: scheduled.append((run_at, kwargs['job_id'])),
+    )
+
+    queue_service.schedule_org_counter_reconciliation()
+    queue_service.schedule_org_counter_reconciliation()
+
+    (run_at, job_id), second = scheduled
+    assert second == (run_at, job_id)
+    assert (run_at.hour, run_at.minute) == (3, 0)
+    assert job_id == f'org-counters-{run_at:%Y%m%d}'
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+
+import pytest
+
+from slms.auth import admin_required
+from slms.services.outbound import OutboundBusy, run_outbound
+
+
+@pytest.fixture()
+def config_overrides():
+    return {'OUTBOUND_IO_CONCURRENCY': 1, 'OUTBOUND_QUEUE_TIMEOUT': 0.05, 'OUTBOUND_IO_TIMEOUT': 0.2}
+
+
+@pytest.mark.usefixtures('app')
+def test_run_outbound_returns_result_with_app_context():
+    from flask import current_app
+
+    def work(value):
+        return current_app.config['OUTBOUND_IO_CONCURRENCY'] + value
+
+    assert asyncio.run(run_outbound(work, 41)) == 42
+
+
+@pytest.mark.usefixtures('app')
+def test_run_outbound_times_out_and_rejects_when_saturated():
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await run_outbound(release.wait, 5)
+        # The timed-out call still holds the only slot
+        with pytest.raises(OutboundBusy):
+            await run_outbound(lambda: None)
+        release.set()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.usefixtures('app')
+def test_waiting_for_a_slot_leaves_the_event_loop_running():
+    release = threading.Event()
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    async def scenario():
+        holder = asyncio.ensure_future(run_outbound(release.wait, 5, timeout=1))
+        await asyncio.sleep(0.01)
+        ticker = asyncio.ensure_future(tick())
+        with pytest.raises(OutboundBusy):
+            await run_outbound(lambda: None)
+        ticker.cancel()
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+    assert ticks > 3
+
+
+def test_admin_required_wraps_async_views_for_anonymous_users(app):
+    @admin_required
+    async def view():
+        return 'secret'
+
+    with app.test_request_context('/admin/x'):
+        response = asyncio.run(view())
+
+    assert response.status_code == 302
+    assert '/login' in response.location
+
+
+def test_password_reset_mail_is_queued_instead_of_sent_in_the_request(app, monkeypatch):
+    import smtplib
+
+    import slms.services.queue as queue_module
+    from slms.services.email import send_password_reset_email
+
+    queued = []
+
+    class _Queue:
+        def enqueue_transactional_email(self, to_email, subject, _html_body, text_body):
+            queued.append((to_email, subject, text_body))
+
+    def no_smtp(*_args, **_kwargs):
+        raise AssertionError('SMTP opened in the request')
+
+    monkeypatch.setenv('EMAIL_ENABLED', 'true')
+    monkeypatch.setattr(queue_module, 'queue_service', _Queue())
+    monkeypatch.setattr(smtplib, 'SMTP', no_smtp)
+    user = type('User', (), {'email': 'coach@example.com'})()
+
+    with app.test_request_context('/auth/forgot-password'):
+        assert send_password_reset_email(user, 'tok123', 'acme')
+
+    (to_email, subject, text_body), = queued
+    assert (to_email, subject) == ('coach@example.com', 'Password Reset Request')
+    assert 'tok123' in text_body and 'org=acme' in text_body
+
+
+def _signed_delivery():
+    from slms.services.webhooks import Webhook, WebhookDelivery
+
+    webhook = Webhook(id='wh-1', url='https://hooks.example.com/in', secret='s3cret',
+                      timeout=5, retry_count=3, success_count=0, failure_count=0, custom_headers={})
+    return WebhookDelivery(id='dl-1', webhook=webhook, event_type='game.updated',
+                           payload={'team': 'Équipe Zürich', 'score': [2, 1]}, attempts=0)
+
+
+def _assert_signed(body, headers):
+    import hashlib
+    import hmac
+    import json
+
+    expected = hmac.new(b's3cret', body, hashlib.sha256).hexdigest()
+    assert headers['X-Webhook-Signature'] == expected
+    assert json.loads(body)['data']['team'] == 'Équipe Zürich'
+
+
+@pytest.mark.usefixtures('app')
+def test_async_webhook_signature_matches_the_bytes_sent(monkeypatch):
+    import httpx
+
+    from slms.services.webhooks import WebhookService, WebhookStatus
+
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(200, text='ok')
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, 'AsyncClient',
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+    delivery = _signed_delivery()
+
+    asyncio.run(WebhookService.deliver_async(delivery))
+
+    assert delivery.status == WebhookStatus.SUCCESS
+    (request,) = sent
+    _assert_signed(request.content, request.headers)
+
+
+@pytest.mark.usefixtures('app')
+def test_sync_webhook_signature_matches_the_bytes_sent(monkeypatch):
+    import requests
+
+    from slms.services.webhooks import WebhookService, WebhookStatus
+
+    sent = []
+
+    def post(data, headers, **_kwargs):
+        sent.append((data, headers))
+        return type('Response', (), {'status_code': 200, 'text': 'ok'})()
+
+    monkeypatch.setattr(requests, 'post', post)
+    delivery = _signed_delivery()
+
+    WebhookService._deliver_webhook(delivery)
+
+    assert delivery.status == WebhookStatus.SUCCESS
+    (body, headers), = sent
+    _assert_signed(body, headers)
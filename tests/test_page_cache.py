@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import render_template_string
+
+from slms.extensions import db
+from slms.models import Game, GameStatus, League, Organization, Player, Season, SportType, Team
+from slms.services.page_cache import CSRF_PLACEHOLDER, MemoryCacheBackend
+
+
+@pytest.fixture()
+def config_overrides():
+    return {'PAGE_CACHE_BACKEND': 'memory'}
+
+
+def _seed_season(slug):
+    org = Organization(name=slug.title(), slug=slug)
+    db.session.add(org)
+    db.session.flush()
+    league = League(org_id=org.id, name='League', sport=SportType.BASKETBALL)
+    db.session.add(league)
+    db.session.flush()
+    season = Season(org_id=org.id, league_id=league.id, name='Season')
+    db.session.add(season)
+    db.session.flush()
+    home = Team(org_id=org.id, season_id=season.id, name=f'{slug} Home')
+    away = Team(org_id=org.id, season_id=season.id, name=f'{slug} Away')
+    db.session.add_all([home, away])
+    db.session.flush()
+    game = Game(org_id=org.id, season_id=season.id, home_team_id=home.id, away_team_id=away.id,
+                status=GameStatus.SCHEDULED, start_time=datetime.utcnow() + timedelta(days=1))
+    db.session.add(game)
+    db.session.commit()
+    return org, season, home, away, game
+
+
+def _get(client, url, slug):
+    return client.get(url, headers={'X-Org-Slug': slug})
+
+
+def test_memory_backend_evicts_least_recently_used_and_expires():
+    cache = MemoryCacheBackend(max_entries=2)
+    cache.set('a', {'v': 1}, 60)
+    cache.set('b', {'v': 2}, 60)
+    cache.get('a')
+    cache.set('c', {'v': 3}, 60)
+    assert cache.get('b') is None
+    assert cache.get('a') == {'v': 1}
+    cache.set('d', {'v': 4}, -1)
+    assert cache.get('d') is None
+
+    assert cache.tag_versions(['season:1']) == [0]
+    cache.bump_tags(['season:1'])
+    assert cache.tag_versions(['season:1', 'team:2']) == [1, 0]
+
+
+def test_committed_game_changes_drop_only_the_pages_that_show_them(app):
+    org, season, home, away, game = _seed_season('alpha')
+    _, other_season, *_ = _seed_season('beta')
+    client = app.test_client()
+    schedule = f'/portal/seasons/{season.id}/schedule'
+    other_schedule = f'/portal/seasons/{other_season.id}/schedule'
+
+    assert _get(client, schedule, 'alpha').headers['X-Cache'] == 'MISS'
+    assert _get(client, other_schedule, 'beta').headers['X-Cache'] == 'MISS'
+    hit = _get(client, schedule, 'alpha')
+    assert hit.headers['X-Cache'] == 'HIT'
+    assert CSRF_PLACEHOLDER not in hit.get_data(as_text=True)
+
+    db.session.get(Game, game.id).start_time = datetime.utcnow() + timedelta(days=2)
+    db.session.commit()
+
+    assert _get(client, schedule, 'alpha').headers['X-Cache'] == 'MISS'
+    assert _get(client, other_schedule, 'beta').headers['X-Cache'] == 'HIT'
+
+
+def test_roster_moves_refresh_both_teams_and_rollbacks_do_not(app):
+    org, season, home, away, game = _seed_season('gamma')
+    player = Player(org_id=org.id, team_id=home.id, first_name='Sam', last_name='Lee')
+    db.session.add(player)
+    db.session.commit()
+    client = app.test_client()
+    pages = [f'/portal/teams/{home.id}', f'/portal/teams/{away.id}']
+    for url in pages:
+        assert _get(client, url, 'gamma').headers['X-Cache'] == 'MISS'
+
+    db.session.get(Player, player.id).last_name = 'Smith'
+    db.session.flush()
+    db.session.rollback()
+    assert [_get(client, url, 'gamma').headers['X-Cache'] for url in pages] == ['HIT', 'HIT']
+
+    db.session.get(Player, player.id).team_id = away.id
+    db.session.commit()
+    assert [_get(client, url, 'gamma').headers['X-Cache'] for url in pages] == ['MISS', 'MISS']
+
+
+def test_pages_are_keyed_by_org_and_query_string(app):
+    _seed_season('delta')
+    _seed_season('epsilon')
+    client = app.test_client()
+
+    assert _get(client, '/portal/', 'delta').headers['X-Cache'] == 'MISS'
+    assert _get(client, '/portal/', 'epsilon').headers['X-Cache'] == 'MISS'
+    assert _get(client, '/portal/', 'delta').headers['X-Cache'] == 'HIT'
+    assert _get(client, '/portal/?view=compact', 'delta').headers['X-Cache'] == 'MISS'
+
+
+def test_fragment_tag_caches_until_its_tag_changes(app):
+    template = "{% cache none, 'greeting', 'season:' ~ season_id %}{{ value }}{% endcache %}"
+    org, season, *_ = _seed_season('zeta')
+
+    with app.test_request_context():
+        assert render_template_string(template, season_id=season.id, value='first') == 'first'
+        assert render_template_string(template, season_id=season.id, value='second') == 'first'
+
+    db.session.get(Season, season.id).name = 'Renamed'
+    db.session.commit()
+    with app.test_request_context():
+        assert render_template_string(template, season_id=season.id, value='third') == 'third'
@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from slms.extensions import db
+from slms.services.db import get_db
+from slms.services.query_profiler import get_query_profiler, normalize_statement
+
+
+@pytest.fixture()
+def config_overrides():
+    return {
+        'QUERY_PROFILER_ENABLED': True,
+        'SERVER_TIMING_ENABLED': True,
+        'QUERY_PROFILER_SAMPLE_RATE': 0,
+        'QUERY_PROFILER_REPEAT_THRESHOLD': 5,
+    }
+
+
+@pytest.fixture()
+def app(app):
+    @app.route('/_profiled/<int:rows>')
+    def profiled(rows):
+        cur = get_db().cursor()
+        for team_id in range(rows):
+            cur.execute('SELECT name FROM profiled_teams WHERE team_id = %s', (team_id,))
+            cur.fetchone()
+        db.session.execute(text('SELECT COUNT(*) FROM profiled_teams')).scalar()
+        return 'ok'
+
+    db.session.execute(text('CREATE TABLE profiled_teams (team_id INTEGER PRIMARY KEY, name TEXT)'))
+    db.session.commit()
+    return app
+
+
+def test_normalize_statement_groups_by_shape():
+    assert normalize_statement("SELECT * FROM t WHERE id = 42 AND name = 'x''y'") == \
+        'SELECT * FROM t WHERE id = ? AND name = ?'
+    assert normalize_statement('SELECT * FROM t\n WHERE id IN (:a, :b, :c) LIMIT 10') == \
+        'SELECT * FROM t WHERE id IN (...) LIMIT ?'
+
+
+def test_server_timing_header_and_aggregate(app):
+    app.debug = True
+    response = app.test_client().get('/_profiled/3')
+
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=') and 'app;dur=' in timing
+
+    snapshot = get_query_profiler().snapshot()
+    endpoint = next(row for row in snapshot['endpoints'] if row['endpoint'] == 'profiled')
+    assert endpoint['requests'] == 1
+    assert endpoint['max_queries'] >= 4
+    assert endpoint['max_repeats'] == 3
+    statement = next(row for row in snapshot['statements']
+                     if row['statement'] == 'SELECT name FROM profiled_teams WHERE team_id = ?')
+    assert statement['count'] == 3
+    assert statement['endpoints'] == ['profiled']
+
+
+def test_server_timing_is_hidden_from_anonymous_visitors(app):
+    response = app.test_client().get('/_profiled/1')
+
+    assert 'Server-Timing' not in response.headers
+    assert get_query_profiler().snapshot()['requests'] == 1
+
+
+def test_repeated_statements_are_logged(app, caplog):
+    with caplog.at_level(logging.INFO):
+        app.test_client().get('/_profiled/6')
+
+    logged = [record.getMessage() for record in caplog.records if 'SQL profile' in record.getMessage()]
+    assert len(logged) == 1
+    assert '(repeated)' in logged[0]
+    assert '6 legacy' in logged[0]
+    assert '6x' in logged[0]
@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from slms import create_app
+from slms.config import Config
+from slms.extensions import db
+from slms.services.db import get_db
+from slms.services.replicas import _is_write, get_replica_monitor, replica_read
+
+
+@pytest.fixture()
+def app(tmp_path):
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    for url, label in ((primary_url, 'primary'), (replica_url, 'replica')):
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(text('CREATE TABLE replica_items (item_id INTEGER PRIMARY KEY, source TEXT)'))
+            conn.execute(text('INSERT INTO replica_items (source) VALUES (:label)'), {'label': label})
+        engine.dispose()
+
+    class ReplicaTestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = primary_url
+        DATABASE_REPLICA_URLS = [replica_url]
+        REPLICA_STICKY_SECONDS = 30
+        REPLICA_CHECK_INTERVAL = 0
+
+    app = create_app(ReplicaTestConfig)
+
+    def _sources():
+        return ','.join(row[0] for row in db.session.execute(
+            text('SELECT source FROM replica_items ORDER BY item_id')))
+
+    @app.route('/_items')
+    @replica_read
+    def items():
+        return _sources()
+
+    @app.route('/_items/add')
+    @replica_read
+    def add_item():
+        cur = get_db().cursor()
+        cur.execute('INSERT INTO replica_items (source) VALUES (%s)', ('written',))
+        get_db().commit()
+        return _sources()
+
+    @app.route('/_items/add-cte')
+    @replica_read
+    def add_item_with_cte():
+        db.session.execute(text(
+            "WITH src AS (SELECT 'cte' AS source) "
+            "INSERT INTO replica_items (source) SELECT source FROM src"
+        ))
+        db.session.commit()
+        return _sources()
+
+    @app.route('/_items/plain')
+    def plain_items():
+        return _sources()
+
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+        get_replica_monitor().dispose()
+
+
+def test_marked_reads_use_the_replica(app):
+    client = app.test_client()
+
+    assert client.get('/_items').text == 'replica'
+    assert client.get('/_items/plain').text == 'primary'
+
+
+def test_reads_after_a_write_stick_to_the_primary(app):
+    client = app.test_client()
+
+    assert client.get('/_items/add').text == 'primary,written'
+    assert client.get('/_items').text == 'primary,written'
+
+    with client.session_transaction() as sess:
+        sess.pop('db_primary_until')
+    assert client.get('/_items').text == 'replica'
+
+
+def test_data_modifying_ctes_go_to_the_primary(app):
+    client = app.test_client()
+
+    assert client.get('/_items/add-cte').text == 'primary,cte'
+    assert client.get('/_items').text == 'primary,cte'
+
+    assert _is_write(text(
+        'WITH moved AS (UPDATE game SET status = :s WHERE id = :id RETURNING id) SELECT id FROM moved'
+    ))
+    assert _is_write(text('with gone as (\n  delete from team where id = 1 returning id\n) select 1'))
+    assert not _is_write(text('WITH recent AS (SELECT id, updated_at FROM game) SELECT * FROM recent'))
+
+
+def test_lagging_or_unreachable_replicas_fall_back_to_primary(app):
+    client = app.test_client()
+    with app.app_context():
+        monitor = get_replica_monitor()
+
+    monitor.lag_probe = lambda _engine: 60.0
+    assert client.get('/_items').text == 'primary'
+
+    def unreachable(_engine):
+        raise OSError('connection refused')
+
+    monitor.lag_probe = unreachable
+    assert client.get('/_items').text == 'primary'
+
+    monitor.lag_probe = lambda _engine: 0.0
+    assert client.get('/_items').text == 'replica'
@@ -0,0 +1,135 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from backend.routes.ticker import bp as ticker_bp
+from slms.extensions import db
+from slms.models import Game, GameStatus, League, Organization, Season, SportType, Team
+from slms.services import score_ticker
+from slms.services.score_notifications import ScoreNotificationService
+
+
+@pytest.fixture()
+def config_overrides():
+    return {'TICKER_BACKEND': 'memory', 'TICKER_COALESCE_SECONDS': 0}
+
+
+@pytest.fixture()
+def app(app):
+    app.register_blueprint(ticker_bp)
+    # SQLite version of backend/migrations/2025_09_25_add_ticker.sql
+    db.session.execute(text(
+        "CREATE TABLE ticker_settings (id INTEGER PRIMARY KEY, league_id TEXT UNIQUE, "
+        "enabled BOOLEAN, theme TEXT, source TEXT, updated_at TIMESTAMP)"
+    ))
+    db.session.execute(text(
+        "CREATE TABLE ticker_items (id INTEGER PRIMARY KEY, league_id TEXT, start_time TIMESTAMP, "
+        "status TEXT, home_name TEXT, away_name TEXT, home_logo TEXT, away_logo TEXT, home_score INT, "
+        "away_score INT, venue TEXT, link_url TEXT, sort_key TIMESTAMP, created_at TIMESTAMP)"
+    ))
+    db.session.commit()
+    return app
+
+
+def _seed_league(enabled=True):
+    org = Organization(name='Ticker', slug='ticker')
+    db.session.add(org)
+    db.session.flush()
+    league = League(org_id=org.id, name='League', sport=SportType.BASKETBALL)
+    db.session.add(league)
+    db.session.flush()
+    season = Season(org_id=org.id, league_id=league.id, name='Season')
+    db.session.add(season)
+    db.session.flush()
+    home = Team(org_id=org.id, season_id=season.id, name='Hawks')
+    away = Team(org_id=org.id, season_id=season.id, name='Owls')
+    db.session.add_all([home, away])
+    db.session.flush()
+    game = Game(org_id=org.id, season_id=season.id, home_team_id=home.id, away_team_id=away.id,
+                status=GameStatus.SCHEDULED, start_time=datetime.utcnow() + timedelta(hours=2))
+    db.session.add(game)
+    db.session.execute(
+        text("INSERT INTO ticker_settings (league_id, enabled, theme) VALUES (:league, :enabled, :theme)"),
+        {'league': league.id, 'enabled': enabled, 'theme': '{"bg": "#000"}'},
+    )
+    db.session.commit()
+    return league, game
+
+
+def test_embed_serves_the_snapshot_with_a_version_etag(app, monkeypatch):
+    league, game = _seed_league()
+    db.session.execute(
+        text("INSERT INTO ticker_items (league_id, status, home_name, away_name, sort_key) "
+             "VALUES (:league, 'FINAL', 'Manual', 'Item', :sort_key)"),
+        {'league': league.id, 'sort_key': datetime.utcnow() - timedelta(days=1)},
+    )
+    db.session.commit()
+    client = app.test_client()
+
+    response = client.get(f'/api/ticker/{league.id}')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['enabled'] and body['theme'] == {'bg': '#000'}
+    assert [item['home_name'] for item in body['items']] == ['Hawks', 'Manual']
+    assert body['items'][0]['link_url'] == f'/portal/games/{game.id}'
+
+    def fail(_league_id):
+        raise AssertionError('ticker rebuilt on a cached poll')
+
+    monkeypatch.setattr(score_ticker, 'build_ticker_body', fail)
+    assert client.get(f'/api/ticker/{league.id}').get_json() == body
+    cached = client.get(f'/api/ticker/{league.id}', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+
+def test_game_events_rebuild_the_league_snapshot(app):
+    league, game = _seed_league()
+    client = app.test_client()
+    etag = client.get(f'/api/ticker/{league.id}').headers['ETag']
+
+    game = db.session.get(Game, game.id)
+    game.status = GameStatus.IN_PROGRESS
+    game.home_score = 12
+    game.last_score_update = datetime.utcnow()
+    db.session.commit()
+    ScoreNotificationService.notify_score_update(game)
+
+    response = client.get(f'/api/ticker/{league.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    item = response.get_json()['items'][0]
+    assert (item['status'], item['live'], item['home_score']) == ('IN_PROGRESS', True, 12)
+
+
+def test_disabled_leagues_send_no_items(app):
+    league, _game = _seed_league(enabled=False)
+    assert app.test_client().get(f'/api/ticker/{league.id}').get_json() == {'enabled': False, 'items': []}
+
+
+def test_bursts_of_events_coalesce_into_one_rebuild(app, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(score_ticker, 'refresh_ticker', refreshed.append)
+    ticker = app.extensions['score_ticker']
+    ticker.coalesce_seconds = 0.05
+
+    for _ in range(5):
+        score_ticker.schedule_ticker_refresh('league-1')
+    score_ticker.schedule_ticker_refresh('league-2')
+    time.sleep(0.3)
+
+    assert sorted(refreshed) == ['league-1', 'league-2']
+    score_ticker.schedule_ticker_refresh('league-1')
+    time.sleep(0.3)
+    assert refreshed.count('league-1') == 2
+
+
+def test_rebuilding_an_unchanged_ticker_keeps_its_etag(app):
+    league, _game = _seed_league()
+    client = app.test_client()
+    etag = client.get(f'/api/ticker/{league.id}').headers['ETag']
+
+    # Another worker, or a TTL expiry, rebuilds the same body
+    score_ticker.refresh_ticker(league.id)
+
+    assert client.get(f'/api/ticker/{league.id}', headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import text
+
+from slms.extensions import db
+from slms.services.db import _compile_statement, _prepare_statement, get_db
+
+
+@pytest.fixture()
+def app(app):
+    db.session.execute(text('CREATE TABLE cursor_teams (team_id INTEGER PRIMARY KEY, name TEXT, wins INTEGER)'))
+    db.session.commit()
+    return app
+
+
+def test_prepared_statements_are_reused_per_query_and_shape():
+    query = 'SELECT * FROM cursor_teams WHERE team_id = %s AND name = %s'
+
+    first, first_params = _prepare_statement(query, (1, 'A'))
+    second, second_params = _prepare_statement(query, [2, 'B'])
+
+    assert first is second
+    assert str(first) == 'SELECT * FROM cursor_teams WHERE team_id = :param_0 AND name = :param_1'
+    assert first_params == {'param_0': 1, 'param_1': 'A'}
+    assert second_params == {'param_0': 2, 'param_1': 'B'}
+
+    named, named_params = _prepare_statement('SELECT %(id)s, %(idx)s', {'idx': 2, 'id': 1})
+    assert str(named) == 'SELECT :id, :idx'
+    assert named_params == {'id': 1, 'idx': 2}
+    assert _prepare_statement('SELECT %s', 7)[1] == {'param_0': 7}
+
+    with pytest.raises(ValueError):
+        _prepare_statement(query, (1,))
+    assert _compile_statement.cache_info().currsize > 0
+
+
+@pytest.mark.usefixtures('app')
+def test_executemany_batches_writes_and_tracks_tables():
+    wrapper = get_db()
+    cur = wrapper.cursor()
+
+    cur.executemany(
+        'INSERT INTO cursor_teams (team_id, name, wins) VALUES (%s, %s, %s)',
+        [(1, 'Lions', 3), (2, 'Tigers', 1), (3, 'Bears', 0)],
+    )
+    cur.executemany('UPDATE cursor_teams SET wins = %(wins)s WHERE team_id = %(team_id)s',
+                    [{'team_id': 2, 'wins': 5}, {'team_id': 3, 'wins': 4}])
+    assert wrapper._written_tables == {'cursor_teams'}
+    wrapper.commit()
+
+    cur.execute('SELECT team_id, wins FROM cursor_teams ORDER BY team_id')
+    assert [tuple(row) for row in cur.fetchall()] == [(1, 3), (2, 5), (3, 4)]
+
+    assert cur.executemany('DELETE FROM cursor_teams WHERE team_id = %s', []) is None
+    with pytest.raises(ValueError):
+        cur.executemany('DELETE FROM cursor_teams WHERE team_id = %s', [(1,), (1, 2)])
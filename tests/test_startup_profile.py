@@ -0,0 +1,61 @@
+import json
+
+from slms import create_app
+from slms.services.startup_profile import (
+    compare_reports,
+    parse_importtime,
+    start_profile,
+    startup_span,
+    stop_profile,
+)
+
+
+def test_create_app_records_nested_phases(app_config):
+    profile = start_profile()
+    try:
+        create_app(app_config)
+    finally:
+        stop_profile()
+
+    spans = {(span['name'], span['depth']) for span in profile.spans}
+    assert {('extensions', 0), ('blueprints', 0), ('commands', 0)} <= spans
+    assert ('ensure_core_tables', 1) in spans
+    assert all(span['ms'] >= 0 for span in profile.spans)
+
+
+def test_spans_are_no_ops_without_a_profile():
+    with startup_span('ignored'):
+        pass
+
+    assert stop_profile() is None
+
+
+def test_parse_importtime_and_compare_reports():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:       300 |        420 | json\n"
+    )
+    assert parse_importtime(stderr) == {
+        'json.decoder': {'self_us': 120, 'cumulative_us': 120},
+        'json': {'self_us': 300, 'cumulative_us': 420},
+    }
+
+    baseline = {'spans': [{'name': 'create_app', 'depth': 0, 'ms': 100.0}]}
+    current = {'spans': [{'name': 'create_app', 'depth': 0, 'ms': 80.0},
+                         {'name': 'jinja', 'depth': 0, 'ms': 5.0}]}
+    rows = compare_reports(baseline, current)
+    assert [row['delta_ms'] for row in rows] == [-20.0, None]
+
+
+def test_perf_startup_command_writes_report(app_config, tmp_path):
+    app = create_app(app_config)
+    output = tmp_path / 'startup.json'
+
+    result = app.test_cli_runner().invoke(args=['perf', 'startup', '--runs', '1', '--top', '3',
+                                                '--output', str(output)])
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(output.read_text())
+    assert [span['name'] for span in report['spans']][:2] == ['import slms', 'create_app']
+    assert report['imports'][0]['module'] == 'slms'
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from slms.extensions import db
+from slms.models import Game, GameStatus, League, Organization, Season, SportType, Team
+from slms.services.league import SeasonService
+from slms.services.score_notifications import ScoreNotificationService
+from slms.services.static_snapshots import sync_game_snapshots, sync_season_snapshots
+
+
+@pytest.fixture()
+def config_overrides(tmp_path):
+    return {
+        'TICKER_COALESCE_SECONDS': 0,
+        'STATIC_SNAPSHOT_BACKEND': 'inline',
+        'STATIC_SNAPSHOT_DIR': str(tmp_path / 'snapshots'),
+    }
+
+
+def _seed_season():
+    org = Organization(name='Archive', slug='archive')
+    db.session.add(org)
+    db.session.flush()
+    league = League(org_id=org.id, name='League', sport=SportType.BASKETBALL)
+    db.session.add(league)
+    db.session.flush()
+    season = Season(org_id=org.id, league_id=league.id, name='Season')
+    db.session.add(season)
+    db.session.flush()
+    home = Team(org_id=org.id, season_id=season.id, name='Hawks')
+    away = Team(org_id=org.id, season_id=season.id, name='Owls')
+    db.session.add_all([home, away])
+    db.session.flush()
+    games = [
+        Game(org_id=org.id, season_id=season.id, home_team_id=home.id, away_team_id=away.id,
+             status=status, home_score=score, away_score=1,
+             start_time=datetime.utcnow() - timedelta(days=days))
+        for status, score, days in [(GameStatus.FINAL, 5, 3), (GameStatus.SCHEDULED, 0, -1)]
+    ]
+    db.session.add_all(games)
+    db.session.commit()
+    return org, season, games
+
+
+@pytest.mark.usefixtures('app')
+def test_archiving_a_season_publishes_its_pages_and_final_games(tmp_path):
+    org, season, (final, scheduled) = _seed_season()
+    root = tmp_path / 'snapshots' / 'archive'
+
+    SeasonService.archive_season(season.id, org.id)
+
+    standings = root / 'portal' / 'seasons' / season.id / 'standings' / 'index.html'
+    assert standings.is_file()
+    assert 'Hawks' in standings.read_text()
+    assert (root / 'portal' / 'seasons' / season.id / 'schedule' / 'index.html').is_file()
+    assert (root / 'portal' / 'games' / final.id / 'index.html').is_file()
+    assert '"home_score":5' in (root / 'api' / 'v1' / 'games' / final.id / 'index.json').read_text().replace(' ', '')
+    assert not (root / 'portal' / 'games' / scheduled.id).exists()
+    assert 'name="csrf-token" content=""' in standings.read_text()
+
+    assert sync_season_snapshots(season) == {'unchanged': 4}
+
+
+@pytest.mark.usefixtures('app')
+def test_finalizing_a_game_rerenders_only_the_affected_pages(tmp_path):
+    org, season, (final, scheduled) = _seed_season()
+    root = tmp_path / 'snapshots' / 'archive'
+    SeasonService.complete_season(season.id, org.id)
+
+    game = db.session.get(Game, scheduled.id)
+    game.status = GameStatus.FINAL
+    game.home_score = 9
+    db.session.commit()
+    ScoreNotificationService.notify_game_end(game)
+
+    assert '"home_score":9' in (root / 'api' / 'v1' / 'games' / game.id / 'index.json').read_text().replace(' ', '')
+    # The new result reaches the season standings and the earlier meeting's head-to-head list
+    assert sync_game_snapshots(game) == {'unchanged': 6}
+
+
+@pytest.mark.usefixtures('app')
+def test_reopening_a_season_hands_its_pages_back_to_the_app(tmp_path):
+    org, season, (final, _scheduled) = _seed_season()
+    root = tmp_path / 'snapshots' / 'archive'
+    SeasonService.archive_season(season.id, org.id)
+
+    SeasonService.activate_season(season.id, org.id)
+
+    assert not (root / 'portal' / 'seasons' / season.id / 'standings' / 'index.html').exists()
+    assert (root / 'portal' / 'games' / final.id / 'index.html').is_file()
+
+
+def test_publishing_is_off_without_a_directory(app, tmp_path):
+    org, season, _games = _seed_season()
+    app.config['STATIC_SNAPSHOT_DIR'] = ''
+
+    SeasonService.archive_season(season.id, org.id)
+
+    assert not (tmp_path / 'snapshots').exists()
+
+
+def test_hooks_queue_jobs_only_when_the_status_changes(app, tmp_path, monkeypatch):
+    org, season, (final, _scheduled) = _seed_season()
+    app.config['STATIC_SNAPSHOT_BACKEND'] = 'rq'
+    queued = []
+
+    class _Queue:
+        def enqueue_static_snapshots(self, kind, target_id):
+            queued.append((kind, target_id))
+
+    import slms.services.queue as queue_module
+    monkeypatch.setattr(queue_module, 'queue_service', _Queue())
+
+    SeasonService.update_season(season.id, org.id, name='Renamed')
+    SeasonService.complete_season(season.id, org.id)
+    SeasonService.complete_season(season.id, org.id)
+    ScoreNotificationService.notify_game_end(db.session.get(Game, final.id))
+
+    assert queued == [('season', season.id), ('game', final.id)]
+    assert not (tmp_path / 'snapshots').exists()
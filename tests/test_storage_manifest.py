@@ -0,0 +1,112 @@
+import io
+import os
+import time
+
+import pytest
+
+from slms.extensions import db
+from slms.models import Organization, StorageBlob
+from slms.services.blob_store import INCOMING_DIR, store_blob
+from slms.services.storage import TenantStorage
+from slms.services.storage_manifest import list_blobs, reconcile_storage
+
+
+@pytest.fixture()
+def config_overrides(tmp_path):
+    return {'UPLOAD_FOLDER': str(tmp_path / 'uploads')}
+
+
+@pytest.fixture()
+def org(app):  # noqa: ARG001 - needs the app context
+    org = Organization(name='Manifest League', slug='manifest', storage_used=0)
+    db.session.add(org)
+    db.session.commit()
+    return org
+
+
+def _age(path, seconds=7200):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_listing_pages_through_the_manifest_newest_first(app, org):
+    storage = TenantStorage(org)
+    for index in range(5):
+        storage.save_file(io.BytesIO(f'doc {index}'.encode()), f'doc{index}.pdf', subdir='docs')
+    storage.save_file(io.BytesIO(b'logo'), 'logo.png', subdir='logos')
+
+    rows, cursor = list_blobs(org.id, 'tenant', prefix='manifest/docs', limit=2)
+    seen = [row.path for row in rows]
+    while cursor:
+        rows, cursor = list_blobs(org.id, 'tenant', prefix='manifest/docs', limit=2, cursor=cursor)
+        seen.extend(row.path for row in rows)
+    assert len(seen) == len(set(seen)) == 5
+    assert all(path.endswith('.pdf') for path in seen)
+
+    with app.test_request_context():
+        page = storage.list_files_page(pattern='*.png', limit=10)
+    assert [item['name'].endswith('.png') for item in page['files']] == [True]
+    assert page['next_cursor'] is None
+
+    with pytest.raises(ValueError):
+        list_blobs(org.id, 'tenant', cursor='not-a-cursor')
+
+
+@pytest.mark.usefixtures('app')
+def test_reconcile_indexes_legacy_files_and_drops_missing_rows(org, tmp_path):
+    root = tmp_path / 'uploads'
+    stored = store_blob(io.BytesIO(b'kept'), root='tenant', root_dir=root, prefix='manifest/logos',
+                        extension='png', org_id=org.id)
+    gone = store_blob(io.BytesIO(b'gone'), root='tenant', root_dir=root, prefix='manifest/logos',
+                      extension='png', org_id=org.id)
+    db.session.commit()
+    (root / gone['path']).unlink()
+
+    legacy = root / 'manifest' / 'old' / 'a1b2c3_banner.jpg'
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b'legacy banner')
+
+    orphan = root / 'manifest' / 'logos' / ('f' * 2) / (('f' * 64) + '.png')
+    orphan.parent.mkdir(parents=True)
+    orphan.write_bytes(b'orphan')
+    _age(orphan)
+    stale = root / INCOMING_DIR / 'tmp-upload'
+    stale.write_bytes(b'partial')
+    _age(stale)
+
+    stats = reconcile_storage('tenant', root, dry_run=True,
+                              org_for_path=lambda _path: org.id, remove_orphans=True)
+    assert (stats['indexed'], stats['missing'], stats['orphans']) == (1, 1, 1)
+    assert orphan.exists() and stale.exists()
+    assert StorageBlob.query.count() == 2
+
+    stats = reconcile_storage('tenant', root, org_for_path=lambda _path: org.id, remove_orphans=True)
+    assert (stats['indexed'], stats['missing'], stats['orphans_removed'], stats['incoming_removed']) == (1, 1, 1, 1)
+    assert not orphan.exists() and not stale.exists()
+    assert sorted(blob.path for blob in StorageBlob.query) == sorted([
+        stored['path'], 'manifest/old/a1b2c3_banner.jpg',
+    ])
+    legacy_row = StorageBlob.query.filter_by(path='manifest/old/a1b2c3_banner.jpg').one()
+    assert (legacy_row.size, legacy_row.mime_type, legacy_row.org_id) == (13, 'image/jpeg', org.id)
+
+    legacy.write_bytes(b'legacy banner, edited')
+    assert reconcile_storage('tenant', root)['updated'] == 1
+    assert StorageBlob.query.filter_by(path='manifest/old/a1b2c3_banner.jpg').one().size == 21
+
+
+def test_reconcile_command_resets_storage_used(app, org, tmp_path):
+    storage = TenantStorage(org)
+    storage.save_file(io.BytesIO(b'12345'), 'a.txt')
+    legacy = tmp_path / 'uploads' / 'manifest' / 'notes.txt'
+    legacy.write_bytes(b'1234567890')
+    db.session.get(Organization, org.id).storage_used = 999
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['storage', 'reconcile', '--org', 'manifest'])
+    assert result.exit_code == 0, result.output
+    assert '1 indexed' in result.output
+    assert db.session.get(Organization, org.id).storage_used == 15
+
+    result = app.test_cli_runner().invoke(args=['storage', 'ls', '--org', 'manifest', '--limit', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Next page: --cursor' in result.output
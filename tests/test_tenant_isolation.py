@@ -134,3 +134,52 @@ def test_cross_org_route_returns_404(app, client):
 
     resp = client.get(f"/leagues/{league_id}")
     assert resp.status_code == 404
+
+
+def test_tenant_registry_caches_and_invalidates(app):
+    from slms.services.organization import update_organization
+    from slms.services.tenant_registry import get_tenant_registry
+
+    with app.app_context():
+        org = _create_org("Registry Org", "registry-org")
+        org_id = org.id
+
+    with app.test_request_context("/", headers={"X-Org-Slug": "registry-org"}):
+        app.preprocess_request()
+        assert g.org.id == org_id
+        registry = get_tenant_registry()
+        assert registry.get_by_slug("registry-org")["id"] == org_id
+
+        update_organization(g.org, name="Renamed Org")
+        assert registry._entries == {}
+
+    with app.test_request_context("/", headers={"X-Org-Slug": "registry-org"}):
+        app.preprocess_request()
+        assert g.org.id == org_id
+        assert g.org.name == "Renamed Org"
+
+
+def test_attached_org_reads_storage_used_from_the_database(app):
+    from sqlalchemy import update
+
+    from slms.services.tenant_registry import get_tenant_registry
+
+    with app.app_context():
+        org = _create_org("Quota Org", "quota-org")
+        org_id = org.id
+
+    with app.test_request_context("/", headers={"X-Org-Slug": "quota-org"}):
+        app.preprocess_request()
+        assert "storage_used" not in get_tenant_registry().get_by_slug("quota-org")
+        # The blob store charges quota with raw SQL, which never invalidates the registry
+        db.session.execute(
+            update(Organization.__table__)
+            .where(Organization.__table__.c.id == org_id)
+            .values(storage_used=1234)
+        )
+        db.session.commit()
+
+    with app.test_request_context("/", headers={"X-Org-Slug": "quota-org"}):
+        app.preprocess_request()
+        assert get_tenant_registry()._entries
+        assert g.org.storage_used == 1234
@@ -0,0 +1,74 @@
+import copy
+from types import SimpleNamespace
+
+import pytest
+from flask import g, render_template
+
+import slms.services.site as site
+from slms.models import Organization
+from slms.services.file_serving import IMMUTABLE_MAX_AGE
+from slms.services.site import DEFAULT_THEME_CONFIG
+from slms.services.theme_bundles import build_theme_bundle, minify_css, theme_bundle_url
+
+
+def _theme(**palette):
+    theme = copy.deepcopy(DEFAULT_THEME_CONFIG)
+    theme['palette'].update(palette)
+    return theme
+
+
+def test_minify_keeps_selectors_and_drops_whitespace():
+    css = """
+    /* header */
+    .navbar .nav-link:hover ,
+    a > b {
+        color : #fff ;
+        padding: calc(2rem * 1.1);
+    }
+    """
+    assert minify_css(css) == '.navbar .nav-link:hover,a>b{color:#fff;padding:calc(2rem * 1.1)}'
+
+
+@pytest.mark.usefixtures('app')
+def test_bundle_names_follow_the_compiled_css(tmp_path):
+    org = SimpleNamespace(id='org-1', primary_color='#112233', secondary_color=None,
+                          custom_css='.hero { color: red; }')
+
+    url = build_theme_bundle(_theme(primary='#0055ff'), org)
+    assert url.startswith('/static/themes/') and url.endswith('.css')
+    css = (tmp_path / 'static' / url[len('/static/'):]).read_text()
+    assert '--slms-primary:#0055ff' in css
+    assert '--org-primary-color:#112233' in css
+    assert '.hero{color:red}' in css
+    assert '\n' not in css
+
+    assert theme_bundle_url(_theme(primary='#0055ff'), org) == url
+    assert theme_bundle_url(_theme(primary='#ff0000'), org) != url
+
+
+def test_pages_link_the_bundle_and_it_is_served_immutable(app):
+    client = app.test_client()
+    html = client.get('/auth/login').get_data(as_text=True)
+    assert 'id="site-theme-stylesheet"' in html
+    assert 'id="site-theme-inline"' not in html
+
+    url = html.split('id="site-theme-stylesheet" rel="stylesheet" href="', 1)[1].split('"', 1)[0]
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/css'
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == IMMUTABLE_MAX_AGE
+    assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    assert client.get('/static/themes/ab/not-a-bundle.css').status_code == 404
+
+
+def test_inline_fallback_keeps_org_branding(app, monkeypatch):
+    monkeypatch.setattr(site, 'theme_bundle_url', lambda _theme, _org=None: None)
+    with app.test_request_context('/'):
+        g.org = Organization(id='org-1', name='Fallback League', slug='fallback-league',
+                             primary_color='#112233', custom_css='.hero { color: "red"; } </style>')
+        html = render_template('base.html')
+
+    inline = html.split('<style id="site-theme-inline">', 1)[1].split('</style>', 1)[0]
+    assert '--org-primary-color: #112233;' in inline
+    assert '.hero { color: "red"; } <\\/style>' in inline
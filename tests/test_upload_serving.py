@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+from slms.extensions import db
+from slms.services.blob_store import store_blob
+from slms.services.file_serving import IMMUTABLE_MAX_AGE
+from slms.services.uploads import BLOB_ROOT
+
+
+@pytest.fixture()
+def stored(app, tmp_path):  # noqa: ARG001 - needs the app context
+    blob = store_blob(io.BytesIO(b'0123456789'), root=BLOB_ROOT, root_dir=tmp_path / 'static',
+                      prefix='uploads/logos', extension='png')
+    db.session.commit()
+    return blob
+
+
+def test_content_addressed_uploads_are_immutable_and_support_ranges(app, stored):
+    client = app.test_client()
+    url = '/' + stored['path'].replace('uploads/', 'static/uploads/', 1)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == b'0123456789'
+    assert response.headers['ETag'] == f'"{stored["sha256"]}"'
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == IMMUTABLE_MAX_AGE
+
+    assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+    partial = client.get(url, headers={'Range': 'bytes=2-4'})
+    assert partial.status_code == 206
+    assert partial.data == b'234'
+
+
+def test_legacy_uploads_get_the_short_lifetime(app, tmp_path):
+    legacy = tmp_path / 'static' / 'uploads' / 'logos' / 'a1b2c3_logo.png'
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b'legacy')
+
+    response = app.test_client().get('/static/uploads/logos/a1b2c3_logo.png')
+    assert response.status_code == 200
+    assert not response.cache_control.immutable
+    assert response.cache_control.max_age == app.config['UPLOAD_CACHE_MAX_AGE']
+    assert response.headers.get('ETag')
+
+
+@pytest.mark.parametrize('mode, header', [
+    ('x-accel-redirect', 'X-Accel-Redirect'),
+    ('x-sendfile', 'X-Sendfile'),
+])
+def test_proxy_modes_hand_the_body_to_the_front_server(app, stored, tmp_path, mode, header):
+    app.config['UPLOAD_SERVE_MODE'] = mode
+    relative = stored['path'][len('uploads/'):]
+
+    response = app.test_client().get(f'/static/uploads/{relative}')
+    assert response.status_code == 200
+    assert response.data == b''
+    assert response.headers['Content-Type'] == 'image/png'
+    assert response.cache_control.immutable
+    if mode == 'x-accel-redirect':
+        assert response.headers[header] == f'/_uploads/{relative}'
+    else:
+        assert response.headers[header] == str((tmp_path / 'static' / stored['path']).resolve())
+
+
+@pytest.mark.usefixtures('stored')
+def test_hidden_and_missing_paths_are_not_served(app, tmp_path):
+    hidden = tmp_path / 'static' / 'uploads' / '.incoming'
+    hidden.mkdir(parents=True)
+    (hidden / 'partial').write_bytes(b'x')
+    client = app.test_client()
+
+    assert client.get('/static/uploads/.incoming/partial').status_code == 404
+    assert client.get('/static/uploads/../secret.txt').status_code == 404
+    assert client.get('/static/uploads/logos/missing.png').status_code == 404